@@ -441,19 +441,24 @@ async def delete_trigger(trigger_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/workflows/{workflow_id}/history")
-async def get_workflow_history(workflow_id: str, limit: int = 50):
-    """Get workflow execution history"""
+async def get_workflow_history(workflow_id: str, limit: int = 50, cursor: Optional[str] = None,
+                               fields: Optional[str] = None):
+    """Get workflow execution history; follow next_cursor for older pages"""
     try:
         automation_engine = get_automation_engine()
-        history = await automation_engine.get_workflow_execution_history(workflow_id, limit)
+        page = await automation_engine.get_workflow_execution_page(workflow_id, limit, cursor, fields)
         
         return {
             "status": "success",
             "workflow_id": workflow_id,
-            "history": history,
-            "count": len(history)
+            "history": page["executions"],
+            "count": len(page["executions"]),
+            "has_more": page["has_more"],
+            "next_cursor": page["next_cursor"]
         }
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Failed to get workflow history {workflow_id}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,54 +1,245 @@
 # backend/automation_engine/engine.py
 # Custom Automation Engine to interpret and execute workflow JSON
 
-import time
-import requests
+import os
 import json
-from typing import Dict, List, Any
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict, deque
+from typing import Dict, List, Any, NamedTuple, Optional, Tuple
+
+try:
+    from core.http_client import http_client_manager
+except ImportError:
+    from backend.core.http_client import http_client_manager
+
+logger = logging.getLogger(__name__)
+
+PLAN_CACHE_SIZE = int(os.getenv("WORKFLOW_PLAN_CACHE_SIZE", 256))
+
+
+class Ref(NamedTuple):
+    """A parsed {{node_name.field}} reference"""
+    node: str
+    path: Tuple[str, ...]
+
+
+class CompiledNode:
+    __slots__ = ("index", "name", "type", "params", "has_refs", "successors", "branches", "level")
+
+    def __init__(self, index: int, name: str, node_type: str, params: Any, has_refs: bool):
+        self.index = index
+        self.name = name
+        self.type = node_type
+        self.params = params
+        self.has_refs = has_refs
+        self.successors: Tuple[int, ...] = ()
+        self.branches: Optional[Dict[bool, Tuple[int, ...]]] = None  # conditional outputs
+        self.level = 0
+
+    def next_nodes(self, output: Any) -> Tuple[int, ...]:
+        if self.branches is None:
+            return self.successors
+        return self.branches[bool((output or {}).get("pass"))]
+
+
+class WorkflowPlan:
+    """
+    A workflow compiled once: nodes reachable from the trigger, indexed in
+    topological order, with successor index lists and parameters whose
+    references are already parsed. Nodes are grouped into levels; every node
+    only depends on nodes in earlier levels (its predecessors and the nodes
+    it references), so each level can run concurrently.
+    """
+
+    def __init__(self, nodes: List[CompiledNode], levels: List[List[int]]):
+        self.nodes = nodes
+        self.levels = levels
+        self.index = {node.name: node.index for node in nodes}
+
+
+def _parse_params(value: Any, refs: List[Ref]) -> Any:
+    """Replace every {{node.field}} string with a Ref, recursively"""
+    if isinstance(value, str) and value.startswith("{{"):
+        path = value.strip("{} ").split(".")
+        ref = Ref(path[0], tuple(path[1:]))
+        refs.append(ref)
+        return ref
+    if isinstance(value, dict):
+        return {key: _parse_params(item, refs) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_parse_params(item, refs) for item in value]
+    return value
+
+
+def compile_workflow(workflow: Dict[str, Any]) -> WorkflowPlan:
+    nodes = workflow.get("nodes", [])
+    connections = workflow.get("connections", {})
+    by_name = {node["name"]: node for node in nodes}
+
+    # Find the trigger node (manual, cron, webhook)
+    trigger = next((n for n in nodes if n['type'].endswith('Trigger')), None)
+    if not trigger:
+        raise ValueError("No trigger node found")
+
+    def targets(name: str) -> List[str]:
+        next_nodes = connections.get(name, [])
+        if isinstance(next_nodes, dict):
+            next_nodes = list(next_nodes.get("true", [])) + list(next_nodes.get("false", []))
+        for target in next_nodes:
+            if target not in by_name:
+                raise ValueError(f"Node '{target}' not found")
+        return next_nodes
+
+    # Only nodes reachable from the trigger can ever run
+    reachable, stack = {trigger["name"]}, [trigger["name"]]
+    while stack:
+        for target in targets(stack.pop()):
+            if target not in reachable:
+                reachable.add(target)
+                stack.append(target)
+
+    # Dependencies: connections, plus referenced nodes that must have produced output first
+    parsed, dependents = {}, {name: set() for name in reachable}
+    in_degree = dict.fromkeys(reachable, 0)
+    for name in reachable:
+        refs: List[Ref] = []
+        parsed[name] = (_parse_params(by_name[name].get("parameters", {}), refs), bool(refs))
+        upstream = {ref.node for ref in refs if ref.node in reachable and ref.node != name}
+        for target in targets(name):
+            dependents[name].add(target)
+        for source in upstream:
+            dependents[source].add(name)
+    for name in reachable:
+        for target in dependents[name]:
+            in_degree[target] += 1
+
+    # Kahn's algorithm, in workflow declaration order for stable plans
+    declared = {node["name"]: position for position, node in enumerate(nodes) if node["name"] in reachable}
+    ready = deque(name for name in declared if in_degree[name] == 0)
+    order: List[str] = []
+    while ready:
+        name = ready.popleft()
+        order.append(name)
+        for target in sorted(dependents[name], key=declared.get):
+            in_degree[target] -= 1
+            if in_degree[target] == 0:
+                ready.append(target)
+    if len(order) != len(reachable):
+        stuck = sorted(name for name in reachable if in_degree[name] > 0)
+        raise ValueError(f"Workflow has a cycle through: {', '.join(stuck)}")
+
+    index = {name: position for position, name in enumerate(order)}
+    compiled = [CompiledNode(position, name, by_name[name]["type"], *parsed[name])
+                for position, name in enumerate(order)]
+    for node in compiled:
+        next_nodes = connections.get(node.name, [])
+        if isinstance(next_nodes, dict):
+            node.branches = {True: tuple(index[n] for n in next_nodes.get("true", [])),
+                             False: tuple(index[n] for n in next_nodes.get("false", []))}
+        else:
+            node.successors = tuple(index[n] for n in next_nodes)
+        for target in dependents[node.name]:
+            target_node = compiled[index[target]]
+            target_node.level = max(target_node.level, node.level + 1)
+
+    levels: List[List[int]] = [[] for _ in range(max((n.level for n in compiled), default=0) + 1)]
+    for node in compiled:
+        levels[node.level].append(node.index)
+    return WorkflowPlan(compiled, levels)
+
+
+class PlanCache:
+    """LRU of compiled plans keyed by a hash of the workflow JSON"""
+
+    def __init__(self, max_entries: int = PLAN_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._plans: "OrderedDict[str, WorkflowPlan]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def workflow_hash(workflow: Dict[str, Any]) -> str:
+        canonical = json.dumps(workflow, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def get(self, workflow: Dict[str, Any]) -> WorkflowPlan:
+        key = self.workflow_hash(workflow)
+        plan = self._plans.get(key)
+        if plan is not None:
+            self._plans.move_to_end(key)
+            self.hits += 1
+            return plan
+        self.misses += 1
+        plan = self._plans[key] = compile_workflow(workflow)
+        if len(self._plans) > self.max_entries:
+            self._plans.popitem(last=False)
+        return plan
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "plans": len(self._plans),
+            "max_plans": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+        }
+
+
+plan_cache = PlanCache()
+
 
 class NodeExecutor:
     def __init__(self, workflow: Dict[str, Any]):
-        self.nodes = workflow.get("nodes", [])
-        self.connections = workflow.get("connections", {})
+        self.plan = plan_cache.get(workflow)
         self.context = {}  # shared memory between nodes
         self.node_outputs = {}
 
-    def execute_workflow(self):
-        # Find the trigger node (manual, cron, webhook)
-        trigger_node = next((n for n in self.nodes if n['type'].endswith('Trigger')), None)
-        if not trigger_node:
-            raise ValueError("No trigger node found")
+    async def execute_workflow(self):
+        plan = self.plan
+        active = [False] * len(plan.nodes)
+        active[0] = True  # every other node depends on the trigger, so it is always first
+        logger.info(f"Triggering node: {plan.nodes[0].name}")
 
-        print(f"Triggering node: {trigger_node['name']}")
-        self.run_node(trigger_node['name'])
-
-    def run_node(self, node_name: str):
-        node = next((n for n in self.nodes if n['name'] == node_name), None)
-        if not node:
-            raise ValueError(f"Node '{node_name}' not found")
+        for level in plan.levels:
+            ready = [plan.nodes[i] for i in level if active[i]]
+            if not ready:
+                continue
+            if len(ready) == 1:
+                outputs = [await self.run_node(ready[0])]
+            else:
+                outputs = await asyncio.gather(*(self.run_node(node) for node in ready))
+            for node, output in zip(ready, outputs):
+                self.node_outputs[node.name] = output
+                for target in node.next_nodes(output):
+                    active[target] = True
 
-        node_type = node['type']
-        params = node.get("parameters", {})
-        print(f"Running node '{node_name}' of type '{node_type}'")
+    async def run_node(self, node: CompiledNode) -> Any:
+        params = self.resolve(node.params) if node.has_refs else node.params
+        logger.debug(f"Running node '{node.name}' of type '{node.type}'")
 
         output = None
-        if node_type == "manualTrigger":
+        if node.type == "manualTrigger":
             output = {"manual": True}
 
-        elif node_type == "httpRequest":
+        elif node.type == "httpRequest":
             method = params.get("method", "GET")
             url = params["url"]
             headers = params.get("headers", {})
             body = params.get("body")
-            res = requests.request(method, url, headers=headers, data=body)
-            output = res.json()
+            async with http_client_manager.session("automation_engine") as session:
+                async with session.request(method, url, headers=headers, data=body) as response:
+                    output = await response.json(content_type=None)
 
-        elif node_type == "set":
-            output = params.get("fields", {})
+        elif node.type == "set":
+            # Copy so callers can't mutate the cached plan's parameters
+            output = dict(params.get("fields", {}))
 
-        elif node_type == "if":
-            a = self.resolve(params["valueA"])
-            b = self.resolve(params["valueB"])
+        elif node.type == "if":
+            a = params["valueA"]
+            b = params["valueB"]
             condition = params.get("operation", "equals")
             output = {"pass": False}
             if condition == "equals":
@@ -58,31 +249,24 @@ class NodeExecutor:
 
         # Add additional node types here...
 
-        self.node_outputs[node_name] = output
-
-        next_nodes = self.connections.get(node_name, [])
-        if isinstance(next_nodes, dict):  # conditional outputs
-            if output.get("pass"):
-                next_list = next_nodes.get("true", [])
-            else:
-                next_list = next_nodes.get("false", [])
-        else:
-            next_list = next_nodes
-
-        for next_node in next_list:
-            self.run_node(next_node)
+        return output
 
     def resolve(self, val):
-        # Handle variable references (e.g., {{node_name.field}})
-        if isinstance(val, str) and val.startswith("{{"):
-            path = val.strip("{} ").split(".")
-            node_data = self.node_outputs.get(path[0], {})
-            return node_data.get(path[1], None)
+        # Substitute pre-parsed references (e.g., {{node_name.field}}) with upstream outputs
+        if isinstance(val, Ref):
+            data = self.node_outputs.get(val.node, {})
+            for key in val.path:
+                data = data.get(key) if isinstance(data, dict) else None
+            return data
+        if isinstance(val, dict):
+            return {key: self.resolve(item) for key, item in val.items()}
+        if isinstance(val, list):
+            return [self.resolve(item) for item in val]
         return val
 
 # Entry function for FastAPI endpoint
 
-def run_workflow(workflow_json: Dict[str, Any]):
+async def run_workflow(workflow_json: Dict[str, Any]):
     executor = NodeExecutor(workflow_json)
-    executor.execute_workflow()
+    await executor.execute_workflow()
     return executor.node_outputs
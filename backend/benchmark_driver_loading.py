@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Universal Driver Startup Benchmark
+Compares eager loading of every driver against manifest-based lazy loading
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+backend_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Each mode runs in a fresh interpreter so module caching does not skew results
+RUN_SNIPPET = """
+import asyncio, json, logging, resource, sys, time
+logging.disable(logging.CRITICAL)
+sys.path.insert(0, {backend_dir!r})
+from mcp.universal_driver_manager import UniversalDriverManager
+
+async def run():
+    manager = UniversalDriverManager()
+    started = time.perf_counter()
+    await manager.load_all_drivers(eager={eager})
+    startup = time.perf_counter() - started
+
+    started = time.perf_counter()
+    await manager.execute_node('n8n-nodes-base.if', {{'data': [], 'config': {{}}}})
+    first_node = time.perf_counter() - started
+
+    print(json.dumps({{
+        "startup_ms": round(startup * 1000, 2),
+        "first_node_ms": round(first_node * 1000, 2),
+        "drivers_imported": len(manager.loaded_drivers),
+        "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    }}))
+
+asyncio.run(run())
+"""
+
+def run_mode(eager: bool, runs: int = 3) -> dict:
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", RUN_SNIPPET.format(backend_dir=backend_dir, eager=eager)],
+            capture_output=True, text=True, cwd=backend_dir
+        ).stdout.strip().splitlines()
+        samples.append(json.loads(output[-1]))
+    return min(samples, key=lambda sample: sample["startup_ms"])
+
+def main():
+    print("⏱️ Universal driver startup benchmark (best of 3)")
+    print("=" * 60)
+
+    results = {"eager": run_mode(True), "lazy": run_mode(False)}
+    for mode, result in results.items():
+        print(f"{mode:>6}: startup {result['startup_ms']:>8.2f} ms | first node {result['first_node_ms']:>7.2f} ms | "
+              f"{result['drivers_imported']:>3} drivers imported | max RSS {result['max_rss_mb']} MB")
+
+    speedup = results["eager"]["startup_ms"] / max(results["lazy"]["startup_ms"], 0.01)
+    print(f"\n✅ Lazy startup is {speedup:.1f}x faster")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Intent Classifier Benchmark
+Compares the per-list keyword scans the agent engine used to run against the
+compiled single-pass classifier, and checks both route every message the same way
+"""
+
+import logging
+import os
+import re
+import sys
+import time
+
+logging.disable(logging.CRITICAL)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mcp.intent_classifier import KEYWORD_GROUPS, classify
+
+EMAIL_REGEX = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
+
+MESSAGES = [
+    "hi",
+    "Thanks, appreciate it!",
+    "What can you do for me?",
+    "Send email to alice@example.com about our Q3 results",
+    "Please draft email to investors@fund.vc introducing our company and our latest traction",
+    "Set up a zoom meeting with the team tomorrow at 10am and send the link",
+    "Connect my Google Calendar so you can schedule follow-ups automatically",
+    "Our company overview: we are an AI automation startup with 40 customers and $2M ARR",
+    "Find the top 10 AI investors on the web and email them a pitch summary",
+    "Sure, go ahead and proceed with the workflow",
+    "Can you research competitor pricing and market size for workflow automation tools in Europe? "
+    "Include funding info and positioning for each company, and then create workflow to send a weekly digest.",
+]
+
+
+def legacy_route(user_input: str) -> tuple:
+    """The routing decisions as previously computed: one scan per keyword list"""
+    user_lower = user_input.lower()
+    scans = {group: any(keyword in user_lower for keyword in keywords) for group, keywords in KEYWORD_GROUPS.items()}
+    has_email_recipient = '@' in user_input
+    if has_email_recipient and scans['email_action']:
+        kind = "email"
+    elif scans['zoom_request'] and scans['meeting_action']:
+        kind = "zoom"
+    elif scans['calendar_request'] and scans['calendar_action']:
+        kind = "calendar"
+    elif scans['automation_action'] and not scans['informational']:
+        kind = "action"
+    elif scans['informational'] and not scans['automation_action']:
+        kind = "informational"
+    else:
+        kind = "conversation"
+    email_match = re.search(EMAIL_REGEX, user_input)
+    automation_request = ((has_email_recipient and scans['email_contact']) or
+                          (scans['clear_action'] and not scans['company_info']))
+    return kind, automation_request, scans['continuation'], scans['greeting'], email_match.group() if email_match else None
+
+
+def compiled_route(user_input: str, classifier=classify) -> tuple:
+    intent = classifier(user_input)
+    return (intent.kind, intent.is_automation_request, intent.has('continuation'), intent.has('greeting'),
+            intent.recipient_email)
+
+
+def time_per_call(fn, text: str, rounds: int = 2000) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        fn(text)
+    return (time.perf_counter() - started) / rounds * 1e6
+
+
+def main():
+    print("⏱️ Intent classifier benchmark (µs per message)")
+    print("=" * 72)
+
+    mismatches = [text for text in MESSAGES if legacy_route(text) != compiled_route(text)]
+    if mismatches:
+        print(f"❌ {len(mismatches)} messages routed differently: {mismatches}")
+        sys.exit(1)
+    print(f"✅ Routing identical for all {len(MESSAGES)} messages\n")
+
+    uncached = classify.__wrapped__
+    print(f"{'chars':>6} | {'legacy scans':>12} | {'compiled':>9} | {'cached':>7} | speedup")
+    total_legacy = total_compiled = 0.0
+    for text in MESSAGES:
+        legacy = time_per_call(legacy_route, text)
+        compiled = time_per_call(lambda t: compiled_route(t, uncached), text)
+        cached = time_per_call(compiled_route, text)
+        total_legacy += legacy
+        total_compiled += compiled
+        print(f"{len(text):>6} | {legacy:>12.2f} | {compiled:>9.2f} | {cached:>7.2f} | {legacy / compiled:>5.1f}x")
+
+    print(f"\n✅ Compiled classifier is {total_legacy / total_compiled:.1f}x faster over the corpus "
+          f"(history messages are served from the classify() cache)")
+
+
+if __name__ == "__main__":
+    main()
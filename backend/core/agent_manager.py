@@ -5,6 +5,7 @@ from typing import Optional, Dict, Any
 
 # Import the LLM engine type for type hints
 from mcp.custom_mcp_llm_iteration import CustomMCPLLMIterationEngine
+from core.session_cache import invalidate_agent
 
 class AgentManager:
     def __init__(self, db_pool):
@@ -164,6 +165,7 @@ class AgentManager:
         """
         try:
             rows = await self._execute_db_query(query, memory_json_str, agent_id, user_id=user_id, is_admin=is_admin)
+            invalidate_agent(agent_id)
             return len(rows) > 0 # Returns True if update was successful
         except Exception as e:
             print(f"Error updating agent memory: {e}")
@@ -206,6 +208,7 @@ class AgentManager:
         """
         try:
             rows = await self._execute_db_query(query, agent_id, user_id=user_id, is_admin=is_admin)
+            invalidate_agent(agent_id)
             return len(rows) > 0
         except Exception as e:
             print(f"Error deleting agent: {e}")
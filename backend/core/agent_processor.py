@@ -7,18 +7,34 @@ import os
 import json
 import logging
 import asyncio
+import time
 import uuid
 from typing import Dict, Any, Optional
 from datetime import datetime
 from dotenv import load_dotenv
 from pathlib import Path
 
+from core.session_cache import agent_cache
+from core.agent_schema import AGENT_RUNTIME_SCHEMA
+from core.execution_history import LOG_EXECUTION_SQL, INSERT_EXECUTION_SQL, execution_histogram
+
 # Load environment variables from .env.local  
 env_path = Path(__file__).parent.parent.parent / '.env.local'
 load_dotenv(dotenv_path=env_path)
 
 logger = logging.getLogger(__name__)
 
+# Number of recent conversation turns loaded into an agent's context
+MEMORY_HISTORY_LIMIT = 50
+
+
+def _load_jsonb(value: Any) -> Any:
+    """asyncpg returns JSONB as text unless a codec is registered"""
+    if isinstance(value, str):
+        return json.loads(value)
+    return value or {}
+
+
 class AgentProcessor:
     """
     Simple processor that fetches agent-specific custom MCP LLM code and executes it
@@ -27,6 +43,22 @@ class AgentProcessor:
     def __init__(self, db_pool, automation_engine):
         self.db_pool = db_pool
         self.automation_engine = automation_engine
+        self._schema_ready = False
+        self._schema_lock = asyncio.Lock()
+    
+    async def ensure_schema(self) -> bool:
+        """Create the tables this processor writes to if they don't exist yet (once per process)"""
+        if self._schema_ready:
+            return True
+        async with self._schema_lock:
+            if not self._schema_ready:
+                try:
+                    async with self.db_pool.acquire() as conn:
+                        await conn.execute(AGENT_RUNTIME_SCHEMA)
+                    self._schema_ready = True
+                except Exception as e:
+                    logger.warning(f"Could not create agent runtime tables, using the memory blob and unrolled execution logs: {e}")
+        return self._schema_ready
         
     async def process_with_agent(self, agent_id: str, user_input: str, user_id: str = None, request_data: dict = None) -> Dict[str, Any]:
         """
@@ -67,7 +99,11 @@ class AgentProcessor:
             }
     
     async def _fetch_agent_data(self, agent_id: str) -> Optional[Dict[str, Any]]:
-        """Fetch agent details including custom MCP LLM code"""
+        """Fetch agent details including custom MCP LLM code (cached until the agent changes)"""
+        cached = agent_cache.get(str(agent_id))
+        if cached is not None:
+            return cached
+        
         async with self.db_pool.acquire() as conn:
             query = """
                 SELECT agent_id, agent_name, agent_role, agent_personality, 
@@ -77,38 +113,62 @@ class AgentProcessor:
                 WHERE agent_id = $1
             """
             row = await conn.fetchrow(query, agent_id)
-            if row:
-                return dict(row)
-            return None
+        if row:
+            agent_data = dict(row)
+            agent_cache.set(str(agent_id), agent_data)
+            return agent_data
+        return None
     
     async def _fetch_agent_memory(self, agent_id: str, user_id: str = None) -> Dict[str, Any]:
-        """Fetch conversation memory for this agent and user"""
+        """Fetch recent conversation turns and the rolling context for this agent and user"""
         try:
+            await self.ensure_schema()
             async with self.db_pool.acquire() as conn:
-                query = """
-                    SELECT memory_data, updated_at
-                    FROM agent_memory 
-                    WHERE agent_id = $1 AND user_id = $2
-                    ORDER BY updated_at DESC LIMIT 1
-                """
-                row = await conn.fetchrow(query, agent_id, user_id or 'system')
-                
-                if row:
-                    return {
-                        "conversation_history": row['memory_data'].get('conversation_history', []),
-                        "context": row['memory_data'].get('context', {}),
-                        "last_updated": row['updated_at'].isoformat()
-                    }
-                
-                return {
-                    "conversation_history": [],
-                    "context": {},
-                    "last_updated": None
-                }
+                return await self._fetch_agent_memory_with_conn(conn, agent_id, user_id)
         except Exception as e:
             logger.warning(f"Memory fetch error: {e}")
             return {"conversation_history": [], "context": {}, "last_updated": None}
     
+    async def _fetch_agent_memory_with_conn(self, conn, agent_id: str, user_id: str = None) -> Dict[str, Any]:
+        """Read memory on an already acquired connection"""
+        user_key = user_id or 'system'
+        
+        turn_rows = []
+        if self._schema_ready:
+            turn_rows = await conn.fetch("""
+                SELECT turn_data, created_at
+                FROM agent_conversation_turns
+                WHERE agent_id = $1 AND user_id = $2
+                ORDER BY id DESC LIMIT $3
+            """, agent_id, user_key, MEMORY_HISTORY_LIMIT)
+        
+        context_row = await conn.fetchrow("""
+            SELECT memory_data, updated_at
+            FROM agent_memory 
+            WHERE agent_id = $1 AND user_id = $2
+        """, agent_id, user_key)
+        
+        memory_data = _load_jsonb(context_row['memory_data']) if context_row else {}
+        conversation_history = [_load_jsonb(row['turn_data']) for row in reversed(turn_rows)]
+        
+        # Until db/migrate_agent_memory_turns.py runs, older turns are still in the blob;
+        # every turn row was appended after it was last written
+        legacy_history = memory_data.get('conversation_history')
+        if isinstance(legacy_history, list) and legacy_history:
+            conversation_history = (legacy_history + conversation_history)[-MEMORY_HISTORY_LIMIT:]
+        
+        last_updated = None
+        if turn_rows:
+            last_updated = turn_rows[0]['created_at']
+        if context_row and (last_updated is None or context_row['updated_at'] > last_updated):
+            last_updated = context_row['updated_at']
+        
+        return {
+            "conversation_history": conversation_history,
+            "context": memory_data.get('context', {}),
+            "last_updated": last_updated.isoformat() if last_updated else None
+        }
+    
     async def _execute_custom_mcp_code(self, agent_data: Dict, user_input: str, 
                                      memory: Dict, user_id: str = None, trigger_context: Dict = None, request_data: Dict = None) -> Dict[str, Any]:
         """
@@ -326,106 +386,130 @@ class AgentProcessor:
         }
     
     async def _update_agent_memory(self, agent_id: str, user_id: str, user_input: str, result: Dict):
-        """Update agent memory with enhanced context tracking for workflows"""
+        """Append this interaction as one turn row and patch the rolling context if it changed"""
         try:
-            async with self.db_pool.acquire() as conn:
-                # Fetch current memory
-                current_memory = await self._fetch_agent_memory(agent_id, user_id)
-                
-                # Add new interaction with enhanced context
-                conversation_history = current_memory.get('conversation_history', [])
-                
-                # Create enhanced interaction record
-                interaction_record = {
-                    "timestamp": datetime.now().isoformat(),
-                    "user_input": user_input,
-                    "agent_response": result.get('message', ''),
-                    "status": result.get('status', 'unknown'),
-                    "workflow_id": result.get('workflow_id'),
-                    "automation_type": result.get('automation_type'),
-                    "action_required": result.get('action_required')
-                }
-                
-                # Add email-specific context if present
-                if result.get('status') == 'preview_ready' or result.get('automation_type') == 'email_preview':
-                    interaction_record.update({
-                        "email_context": {
-                            "recipient": result.get('recipient'),
-                            "email_subject": result.get('email_subject'),
-                            "content_type": result.get('content_type'),
-                            "workflow_stage": "preview_generated"
-                        }
-                    })
-                
-                # Track SEND_APPROVED_EMAIL context
-                if user_input.startswith("SEND_APPROVED_EMAIL:"):
-                    interaction_record.update({
-                        "email_context": {
-                            "workflow_stage": "email_confirmed_and_sent",
-                            "action_type": "email_execution"
-                        }
-                    })
-                
-                conversation_history.append(interaction_record)
-                
-                # Keep only last 50 interactions
-                if len(conversation_history) > 50:
-                    conversation_history = conversation_history[-50:]
-                
-                # Enhanced context tracking
-                context = current_memory.get('context', {})
-                
-                # Track active email workflows
-                if result.get('status') == 'preview_ready':
-                    context['active_email_workflow'] = {
-                        "workflow_id": result.get('workflow_id'),
+            user_key = user_id or 'system'
+            
+            # Create enhanced interaction record
+            interaction_record = {
+                "timestamp": datetime.now().isoformat(),
+                "user_input": user_input,
+                "agent_response": result.get('message', ''),
+                "status": result.get('status', 'unknown'),
+                "workflow_id": result.get('workflow_id'),
+                "automation_type": result.get('automation_type'),
+                "action_required": result.get('action_required')
+            }
+            
+            # Add email-specific context if present
+            if result.get('status') == 'preview_ready' or result.get('automation_type') == 'email_preview':
+                interaction_record.update({
+                    "email_context": {
                         "recipient": result.get('recipient'),
-                        "subject": result.get('email_subject'),
-                        "stage": "awaiting_confirmation",
-                        "created_at": datetime.now().isoformat()
+                        "email_subject": result.get('email_subject'),
+                        "content_type": result.get('content_type'),
+                        "workflow_stage": "preview_generated"
                     }
-                
-                # Clear active workflow when completed
-                if user_input.startswith("SEND_APPROVED_EMAIL:") and result.get('email_sent'):
-                    context.pop('active_email_workflow', None)
-                    context['last_completed_email'] = {
-                        "completed_at": datetime.now().isoformat(),
-                        "recipient": result.get('recipient', 'unknown')
+                })
+            
+            # Track SEND_APPROVED_EMAIL context
+            if user_input.startswith("SEND_APPROVED_EMAIL:"):
+                interaction_record.update({
+                    "email_context": {
+                        "workflow_stage": "email_confirmed_and_sent",
+                        "action_type": "email_execution"
                     }
+                })
+            
+            schema_ready = await self.ensure_schema()
+            async with self.db_pool.acquire() as conn:
+                if not schema_ready:
+                    # No turns table: keep the turn in the blob, as before the migration
+                    await self._update_rolling_context(conn, agent_id, user_key, user_input, result,
+                                                       legacy_turn=interaction_record)
+                    return
                 
-                # Track content generation patterns for learning
-                if result.get('automation_type') in ['email_preview', 'content_creation']:
-                    content_patterns = context.get('content_generation_patterns', [])
-                    content_patterns.append({
-                        "request_type": result.get('content_type'),
-                        "timestamp": datetime.now().isoformat(),
-                        "success": result.get('success', False)
-                    })
-                    # Keep last 20 patterns
-                    context['content_generation_patterns'] = content_patterns[-20:]
-                
-                memory_data = {
-                    "conversation_history": conversation_history,
-                    "context": context,
-                    "last_interaction": datetime.now().isoformat()
-                }
-                
-                # Upsert memory
-                query = """
-                    INSERT INTO agent_memory (agent_id, user_id, memory_data, updated_at)
-                    VALUES ($1, $2, $3, $4)
-                    ON CONFLICT (agent_id, user_id) 
-                    DO UPDATE SET memory_data = $3, updated_at = $4
-                """
+                await conn.execute("""
+                    INSERT INTO agent_conversation_turns (agent_id, user_id, turn_data)
+                    VALUES ($1, $2, $3)
+                """, agent_id, user_key, json.dumps(interaction_record))
                 
-                await conn.execute(query, agent_id, user_id or 'system', 
-                                 json.dumps(memory_data), datetime.now())
+                if self._result_changes_context(user_input, result):
+                    await self._update_rolling_context(conn, agent_id, user_key, user_input, result)
                 
-                logger.debug(f"📝 Enhanced memory updated for agent {agent_id}: workflow_stage={interaction_record.get('email_context', {}).get('workflow_stage', 'none')}")
+            logger.debug(f"📝 Enhanced memory updated for agent {agent_id}: workflow_stage={interaction_record.get('email_context', {}).get('workflow_stage', 'none')}")
                 
         except Exception as e:
             logger.warning(f"Memory update error: {e}")
     
+    @staticmethod
+    def _result_changes_context(user_input: str, result: Dict) -> bool:
+        return (
+            result.get('status') == 'preview_ready'
+            or (user_input.startswith("SEND_APPROVED_EMAIL:") and result.get('email_sent'))
+            or result.get('automation_type') in ['email_preview', 'content_creation']
+        )
+    
+    async def _update_rolling_context(self, conn, agent_id: str, user_key: str, user_input: str, result: Dict,
+                                      legacy_turn: Optional[Dict] = None):
+        """Read-modify-write the compact context row under a row lock so concurrent turns don't lose updates"""
+        async with conn.transaction():
+            await conn.execute("""
+                INSERT INTO agent_memory (agent_id, user_id, memory_data, updated_at)
+                VALUES ($1, $2, '{}', $3)
+                ON CONFLICT (agent_id, user_id) DO NOTHING
+            """, agent_id, user_key, datetime.now())
+            row = await conn.fetchrow("""
+                SELECT memory_data FROM agent_memory
+                WHERE agent_id = $1 AND user_id = $2
+                FOR UPDATE
+            """, agent_id, user_key)
+            
+            memory_data = _load_jsonb(row['memory_data']) if row else {}
+            context = memory_data.get('context', {})
+            
+            # Track active email workflows
+            if result.get('status') == 'preview_ready':
+                context['active_email_workflow'] = {
+                    "workflow_id": result.get('workflow_id'),
+                    "recipient": result.get('recipient'),
+                    "subject": result.get('email_subject'),
+                    "stage": "awaiting_confirmation",
+                    "created_at": datetime.now().isoformat()
+                }
+            
+            # Clear active workflow when completed
+            if user_input.startswith("SEND_APPROVED_EMAIL:") and result.get('email_sent'):
+                context.pop('active_email_workflow', None)
+                context['last_completed_email'] = {
+                    "completed_at": datetime.now().isoformat(),
+                    "recipient": result.get('recipient', 'unknown')
+                }
+            
+            # Track content generation patterns for learning
+            if result.get('automation_type') in ['email_preview', 'content_creation']:
+                content_patterns = context.get('content_generation_patterns', [])
+                content_patterns.append({
+                    "request_type": result.get('content_type'),
+                    "timestamp": datetime.now().isoformat(),
+                    "success": result.get('success', False)
+                })
+                # Keep last 20 patterns
+                context['content_generation_patterns'] = content_patterns[-20:]
+            
+            # A legacy conversation_history is left for the migration to move into turn rows
+            if legacy_turn is not None:
+                history = memory_data.get('conversation_history')
+                history = history if isinstance(history, list) else []
+                memory_data['conversation_history'] = (history + [legacy_turn])[-MEMORY_HISTORY_LIMIT:]
+            memory_data['context'] = context
+            memory_data['last_interaction'] = datetime.now().isoformat()
+            
+            await conn.execute("""
+                UPDATE agent_memory SET memory_data = $3, updated_at = $4
+                WHERE agent_id = $1 AND user_id = $2
+            """, agent_id, user_key, json.dumps(memory_data), datetime.now())
+    
     async def _fetch_agent_triggers(self, agent_id: str) -> Dict[str, Any]:
         """Fetch active triggers for the agent"""
         try:
@@ -462,6 +546,7 @@ class AgentProcessor:
         """
         Execute agent workflow manually (one-click trigger from dashboard)
         """
+        started = time.perf_counter()
         try:
             # Fetch agent data
             agent_data = await self._fetch_agent_data(agent_id)
@@ -502,7 +587,8 @@ class AgentProcessor:
                 trigger_type="manual",
                 input_data=trigger_input,
                 output_data=result,
-                execution_status="success" if result.get("status") != "error" else "error"
+                execution_status="success" if result.get("status") != "error" else "error",
+                execution_time_ms=int((time.perf_counter() - started) * 1000)
             )
             
             return result
@@ -518,7 +604,8 @@ class AgentProcessor:
                 input_data=trigger_input,
                 output_data={},
                 execution_status="error",
-                error_message=str(e)
+                error_message=str(e),
+                execution_time_ms=int((time.perf_counter() - started) * 1000)
             )
             
             return {
@@ -528,19 +615,16 @@ class AgentProcessor:
 
     async def _log_agent_execution(self, agent_id: str, user_id: str, trigger_type: str, 
                                  input_data: Dict, output_data: Dict, execution_status: str,
-                                 error_message: str = None) -> None:
-        """Log agent execution to agent_executions table"""
+                                 error_message: str = None, execution_time_ms: int = None) -> None:
+        """Log agent execution to agent_executions and fold it into the hourly rollup"""
         try:
+            args = (agent_id, user_id, trigger_type, json.dumps(input_data), json.dumps(output_data),
+                    execution_status, execution_time_ms, error_message)
+            rollups_ready = await self.ensure_schema()
             async with self.db_pool.acquire() as conn:
-                query = """
-                    INSERT INTO agent_executions 
-                    (agent_id, user_id, trigger_type, input_data, output_data, execution_status, error_message)
-                    VALUES ($1, $2, $3, $4, $5, $6, $7)
-                """
-                await conn.execute(
-                    query, agent_id, user_id, trigger_type, 
-                    json.dumps(input_data), json.dumps(output_data), 
-                    execution_status, error_message
-                )
+                if rollups_ready:
+                    await conn.execute(LOG_EXECUTION_SQL, *args, execution_histogram(execution_time_ms))
+                else:
+                    await conn.execute(INSERT_EXECUTION_SQL, *args)
         except Exception as e:
             logger.warning(f"Execution logging error: {e}")
@@ -20,6 +20,15 @@ CREATE TABLE IF NOT EXISTS agent_memory (
     UNIQUE(agent_id, user_id)
 );
 
+-- Append-only conversation turns; agent_memory.memory_data keeps only the compact rolling context
+CREATE TABLE IF NOT EXISTS agent_conversation_turns (
+    id BIGSERIAL PRIMARY KEY,
+    agent_id UUID NOT NULL REFERENCES agents(agent_id) ON DELETE CASCADE,
+    user_id VARCHAR(255) NOT NULL DEFAULT 'system',
+    turn_data JSONB NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
 -- Agent trigger schedules for cron/webhook/email triggers
 CREATE TABLE IF NOT EXISTS agent_triggers (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
@@ -45,10 +54,50 @@ CREATE TABLE IF NOT EXISTS agent_executions (
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
+-- Hourly execution rollups, updated in the same statement that logs an execution
+CREATE TABLE IF NOT EXISTS agent_execution_rollups (
+    agent_id UUID NOT NULL REFERENCES agents(agent_id) ON DELETE CASCADE,
+    bucket_start TIMESTAMP WITH TIME ZONE NOT NULL,
+    executions INTEGER NOT NULL DEFAULT 0,
+    errors INTEGER NOT NULL DEFAULT 0,
+    timed_executions INTEGER NOT NULL DEFAULT 0,
+    total_time_ms BIGINT NOT NULL DEFAULT 0,
+    max_time_ms INTEGER,
+    latency_histogram INTEGER[] NOT NULL, -- counts per core.execution_history.LATENCY_BOUNDS bucket
+    PRIMARY KEY (agent_id, bucket_start)
+);
+
 -- Indexes for performance
 CREATE INDEX IF NOT EXISTS idx_agent_memory_agent_user ON agent_memory(agent_id, user_id);
+CREATE INDEX IF NOT EXISTS idx_agent_conversation_turns_recent ON agent_conversation_turns(agent_id, user_id, id DESC);
 CREATE INDEX IF NOT EXISTS idx_agent_triggers_active ON agent_triggers(agent_id, is_active);
-CREATE INDEX IF NOT EXISTS idx_agent_executions_agent ON agent_executions(agent_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_agent_executions_keyset ON agent_executions(agent_id, created_at DESC, id DESC);
+"""
+
+# Tables AgentProcessor writes to that databases created before them lack.
+# Applied idempotently on first use; db/migrate_agent_memory_turns.py still
+# moves the old conversation history out of agent_memory and
+# db/migrate_execution_history.py backfills the rollups.
+AGENT_RUNTIME_SCHEMA = """
+CREATE TABLE IF NOT EXISTS agent_conversation_turns (
+    id BIGSERIAL PRIMARY KEY,
+    agent_id UUID NOT NULL REFERENCES agents(agent_id) ON DELETE CASCADE,
+    user_id VARCHAR(255) NOT NULL DEFAULT 'system',
+    turn_data JSONB NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+CREATE INDEX IF NOT EXISTS idx_agent_conversation_turns_recent ON agent_conversation_turns(agent_id, user_id, id DESC);
+CREATE TABLE IF NOT EXISTS agent_execution_rollups (
+    agent_id UUID NOT NULL REFERENCES agents(agent_id) ON DELETE CASCADE,
+    bucket_start TIMESTAMP WITH TIME ZONE NOT NULL,
+    executions INTEGER NOT NULL DEFAULT 0,
+    errors INTEGER NOT NULL DEFAULT 0,
+    timed_executions INTEGER NOT NULL DEFAULT 0,
+    total_time_ms BIGINT NOT NULL DEFAULT 0,
+    max_time_ms INTEGER,
+    latency_histogram INTEGER[] NOT NULL,
+    PRIMARY KEY (agent_id, bucket_start)
+);
 """
 
 # Default custom MCP LLM code template
@@ -0,0 +1,131 @@
+# backend/core/bulk_load.py
+# Row batching and conflict options shared by the database drivers' bulkInsert operation
+
+import os
+import asyncio
+import itertools
+from typing import Dict, Any, List, Optional, Tuple
+
+BULK_BATCH_SIZE = int(os.getenv("DB_DRIVER_BULK_BATCH_SIZE", 1000))
+
+CONFLICT_ACTIONS = ('error', 'ignore', 'update')
+
+
+def bulk_rows_source(parameters: Dict[str, Any], context: Dict[str, Any] = None):
+    """
+    Rows to load: parameters 'rows' / 'values', else the upstream node's output.
+    A CSV/JSON driver result ({"data": [...]}) is unwrapped. Lists, plain
+    iterators/generators and async iterators are all accepted.
+    """
+    rows = parameters.get('rows', parameters.get('values'))
+    if rows is None and context and context.get('input_data') is not None:
+        upstream = context['input_data']
+        # The automation engine passes the node's own parameters as input_data; they aren't rows
+        if not (isinstance(upstream, list) and upstream == [parameters or {}]):
+            rows = upstream
+    if isinstance(rows, dict):
+        rows = rows.get('data', rows.get('rows', [rows]))
+    return rows if rows is not None else []
+
+
+def conflict_options(parameters: Dict[str, Any], columns: List[str]) -> Tuple[str, List[str], List[str]]:
+    """(action, conflict columns, columns to overwrite on conflict)"""
+    action = parameters.get('onConflict', 'error') or 'error'
+    if action not in CONFLICT_ACTIONS:
+        raise ValueError(f"onConflict must be one of {', '.join(CONFLICT_ACTIONS)}")
+    conflict_columns = list(parameters.get('conflictColumns', []) or [])
+    missing = [column for column in conflict_columns if column not in columns]
+    if missing:
+        raise ValueError(f"Conflict columns not being loaded: {', '.join(missing)}")
+    update_columns = list(parameters.get('updateColumns', []) or
+                          [column for column in columns if column not in conflict_columns])
+    if action == 'update' and not update_columns:
+        raise ValueError("No columns left to update on conflict")
+    return action, conflict_columns, update_columns
+
+
+class RowBatches:
+    """
+    Async iterator of row-tuple batches from a list, iterator or async
+    iterator of dict or sequence rows. Columns come from the caller or the
+    first dict row. Plain iterators are drained in a worker thread so a
+    generator reading a file never blocks the event loop.
+    """
+
+    def __init__(self, rows, columns: Optional[List[str]] = None,
+                 batch_size: int = BULK_BATCH_SIZE, empty_as_null: bool = False):
+        self.columns = list(columns or [])
+        self.batch_size = max(1, int(batch_size))
+        self.empty_as_null = empty_as_null
+        self.row_count = 0
+        self.batch_count = 0
+        self._pending: Optional[List[tuple]] = None
+
+        if hasattr(rows, '__aiter__'):
+            self._async_rows = rows.__aiter__()
+            self._rows = None
+        elif isinstance(rows, (list, tuple)):
+            self._async_rows = None
+            self._rows = rows
+            self._offset = 0
+        else:
+            self._async_rows = None
+            self._rows = iter(rows)
+
+    async def _take(self) -> list:
+        size = self.batch_size
+        if self._async_rows is not None:
+            taken = []
+            async for row in self._async_rows:
+                taken.append(row)
+                if len(taken) >= size:
+                    break
+            return taken
+        if isinstance(self._rows, (list, tuple)):
+            taken = self._rows[self._offset:self._offset + size]
+            self._offset += len(taken)
+            return list(taken)
+        return await asyncio.to_thread(lambda: list(itertools.islice(self._rows, size)))
+
+    def _to_tuple(self, row) -> tuple:
+        if isinstance(row, dict):
+            values = tuple(row.get(column) for column in self.columns)
+        else:
+            values = tuple(row)
+            if len(values) != len(self.columns):
+                raise ValueError(f"Row {self.row_count + 1} has {len(values)} values, "
+                                 f"expected {len(self.columns)} ({', '.join(self.columns)})")
+        if self.empty_as_null:
+            values = tuple(None if value == '' else value for value in values)
+        return values
+
+    async def _next_batch(self) -> List[tuple]:
+        raw = await self._take()
+        if raw and not self.columns:
+            if not isinstance(raw[0], dict):
+                raise ValueError("Columns are required when rows are not objects")
+            self.columns = list(raw[0].keys())
+        batch = []
+        for row in raw:
+            batch.append(self._to_tuple(row))
+            self.row_count += 1
+        return batch
+
+    async def prepare(self) -> List[str]:
+        """Read the first batch so the columns are known before any SQL is built"""
+        if self._pending is None:
+            self._pending = await self._next_batch()
+        return self.columns
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> List[tuple]:
+        if self._pending is not None:
+            batch, self._pending = self._pending, None
+        else:
+            batch = await self._next_batch()
+        if not batch:
+            raise StopAsyncIteration
+        self.batch_count += 1
+        return batch
@@ -12,6 +12,8 @@ import logging
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 
+from core.session_cache import invalidate_agent
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -217,6 +219,7 @@ class ContextualAgentManager:
             user_id=user_id
         )
         
+        invalidate_agent(agent_id)
         logger.info(f"✅ Updated memory for agent {agent_id}")
         return True
 
@@ -283,6 +286,7 @@ class ContextualAgentManager:
             user_id=user_id
         )
         
+        invalidate_agent(agent_id)
         logger.info(f"✅ Deleted agent {agent_id}")
         return True
 
@@ -0,0 +1,303 @@
+# backend/core/credits.py
+# Atomic credit charges, buffered credit_logs writes and credit reservations
+
+import os
+import uuid
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+try:
+    from core.session_cache import invalidate_user
+except ImportError:
+    from backend.core.session_cache import invalidate_user
+
+logger = logging.getLogger(__name__)
+
+LEDGER_BATCH_SIZE = int(os.getenv("CREDIT_LEDGER_BATCH_SIZE", 500))
+LEDGER_FLUSH_INTERVAL = float(os.getenv("CREDIT_LEDGER_FLUSH_INTERVAL", 1.0))
+# Holds that are neither settled nor released within this many seconds are refunded
+RESERVATION_TTL = float(os.getenv("CREDIT_RESERVATION_TTL", 3600))
+RESERVATION_SWEEP_INTERVAL = float(os.getenv("CREDIT_RESERVATION_SWEEP_INTERVAL", 60))
+
+LEDGER_COLUMNS = ("user_id", "change", "reason", "service_used", "created_at")
+
+# The balance check and the update are one statement, so concurrent charges
+# can't both pass the check; no row comes back when the balance is too low
+DEDUCT_SQL = """
+    UPDATE users SET credits = credits - $1, updated_at = CURRENT_TIMESTAMP
+    WHERE user_id = $2 AND credits >= $1
+    RETURNING credits
+"""
+
+ADD_SQL = """
+    UPDATE users SET credits = credits + $1, updated_at = CURRENT_TIMESTAMP
+    WHERE user_id = $2
+    RETURNING credits
+"""
+
+RESERVE_SQL = """
+    WITH debit AS (
+        UPDATE users SET credits = credits - $2, updated_at = CURRENT_TIMESTAMP
+        WHERE user_id = $1 AND credits >= $2
+        RETURNING user_id
+    )
+    INSERT INTO credit_reservations (reservation_id, user_id, amount, reason, service_used, expires_at)
+    SELECT $3, user_id, $2, $4, $5, CURRENT_TIMESTAMP + $6::float8 * INTERVAL '1 second'
+    FROM debit
+    RETURNING reservation_id
+"""
+
+# Deleting the hold is what makes settle/release/expiry mutually exclusive:
+# whichever statement deletes the row refunds it, the others see nothing
+SETTLE_SQL = """
+    WITH held AS (
+        DELETE FROM credit_reservations WHERE reservation_id = $1
+        RETURNING user_id, amount, reason, service_used
+    ), refund AS (
+        UPDATE users SET credits = users.credits + held.amount - LEAST($2::int, held.amount),
+                         updated_at = CURRENT_TIMESTAMP
+        FROM held
+        WHERE users.user_id = held.user_id
+        RETURNING users.credits
+    )
+    SELECT held.user_id, held.amount, LEAST($2::int, held.amount) AS charged,
+           held.reason, held.service_used, refund.credits
+    FROM held, refund
+"""
+
+RELEASE_EXPIRED_SQL = """
+    WITH expired AS (
+        DELETE FROM credit_reservations WHERE expires_at <= CURRENT_TIMESTAMP
+        RETURNING user_id, amount
+    ), totals AS (
+        SELECT user_id, SUM(amount)::int AS amount, COUNT(*) AS holds FROM expired GROUP BY user_id
+    )
+    UPDATE users SET credits = users.credits + totals.amount, updated_at = CURRENT_TIMESTAMP
+    FROM totals
+    WHERE users.user_id = totals.user_id
+    RETURNING users.user_id, totals.holds
+"""
+
+# credit_reservations is created by db/migrate_credit_reservations.py
+RESERVATIONS_TABLE_SQL = "SELECT to_regclass('credit_reservations') IS NOT NULL"
+
+
+class CreditLedgerWriter:
+    """
+    Buffers credit_logs rows and appends them with one COPY per batch, either
+    once LEDGER_BATCH_SIZE rows are waiting or every LEDGER_FLUSH_INTERVAL
+    seconds. Rows keep the time they were appended, not the time they were
+    written. A failed write puts the rows back at the front of the buffer.
+    """
+
+    def __init__(self, pool, batch_size: int = LEDGER_BATCH_SIZE,
+                 flush_interval: float = LEDGER_FLUSH_INTERVAL):
+        self.pool = pool
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self._buffer: List[Tuple] = []
+        self._lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._flusher: Optional[asyncio.Task] = None
+        self.appended = 0
+        self.written = 0
+        self.batches = 0
+        self.failures = 0
+
+    def append(self, user_id: str, change: int, reason: str, service_used: str = None):
+        self._buffer.append((user_id, change, reason, service_used, datetime.now()))
+        self.appended += 1
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.get_running_loop().create_task(self._run())
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> int:
+        """Write everything buffered so far; returns the number of rows written"""
+        async with self._lock:
+            written = 0
+            while self._buffer:
+                records, self._buffer = self._buffer[:self.batch_size], self._buffer[self.batch_size:]
+                try:
+                    async with self.pool.acquire() as conn:
+                        await conn.copy_records_to_table(
+                            "credit_logs", records=records, columns=list(LEDGER_COLUMNS))
+                except Exception as e:
+                    self._buffer[:0] = records
+                    self.failures += 1
+                    logger.error(f"Failed to write {len(records)} credit log rows, will retry: {e}")
+                    break
+                written += len(records)
+                self.batches += 1
+            self.written += written
+            return written
+
+    async def close(self):
+        if self._flusher:
+            self._flusher.cancel()
+            await asyncio.gather(self._flusher, return_exceptions=True)
+            self._flusher = None
+        await self.flush()
+        if self._buffer:
+            logger.error(f"⚠️ {len(self._buffer)} credit log rows could not be written on shutdown")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "pending": len(self._buffer),
+            "appended": self.appended,
+            "written": self.written,
+            "batches": self.batches,
+            "failures": self.failures,
+            "batch_size": self.batch_size,
+            "flush_interval": self.flush_interval
+        }
+
+
+class CreditManager:
+    """
+    Credit balance changes as single statements against users.credits, with
+    the matching credit_logs rows going through a CreditLedgerWriter.
+
+    Long-running automations reserve() credits up front: the amount is taken
+    from the balance and parked in credit_reservations, so nothing holds a
+    connection while the automation runs. settle() charges the actual cost
+    (capped at the reserved amount) and refunds the rest; release() refunds
+    everything. Holds past their TTL are refunded by a background sweep.
+    """
+
+    def __init__(self, pool, ledger: CreditLedgerWriter = None):
+        self.pool = pool
+        self.ledger = ledger or CreditLedgerWriter(pool)
+        self._sweeper: Optional[asyncio.Task] = None
+        self.stats = {
+            "deductions": 0,
+            "insufficient": 0,
+            "reservations": 0,
+            "reservations_declined": 0,
+            "settled": 0,
+            "expired_released": 0
+        }
+
+    @staticmethod
+    def _check_amount(amount: int):
+        if amount < 0:
+            raise ValueError(f"Credit amount must not be negative, got {amount}")
+
+    async def add(self, user_id: str, amount: int, reason: str,
+                  service_used: str = None) -> Optional[int]:
+        """Add credits; returns the new balance, or None if the user doesn't exist"""
+        self._check_amount(amount)
+        balance = await self.pool.fetchval(ADD_SQL, amount, user_id)
+        if balance is not None:
+            self.ledger.append(user_id, amount, reason, service_used)
+            invalidate_user(user_id)
+        return balance
+
+    async def deduct(self, user_id: str, amount: int, reason: str,
+                     service_used: str = None) -> Optional[int]:
+        """Deduct credits if the balance covers them; returns the new balance or None"""
+        self._check_amount(amount)
+        balance = await self.pool.fetchval(DEDUCT_SQL, amount, user_id)
+        if balance is None:
+            self.stats["insufficient"] += 1
+            return None
+        self.stats["deductions"] += 1
+        self.ledger.append(user_id, -amount, reason, service_used)
+        invalidate_user(user_id)
+        return balance
+
+    async def reserve(self, user_id: str, amount: int, reason: str, service_used: str = None,
+                      ttl: float = RESERVATION_TTL) -> Optional[str]:
+        """Pre-authorize credits; returns a reservation id, or None if the balance is too low"""
+        self._check_amount(amount)
+        self._ensure_sweeper()
+        reservation_id = await self.pool.fetchval(
+            RESERVE_SQL, user_id, amount, uuid.uuid4(), reason, service_used, float(ttl))
+        if reservation_id is None:
+            self.stats["reservations_declined"] += 1
+            return None
+        self.stats["reservations"] += 1
+        invalidate_user(user_id)
+        return str(reservation_id)
+
+    async def settle(self, reservation_id: str, actual: int) -> Optional[Dict[str, Any]]:
+        """
+        Charge `actual` credits against a reservation and refund the remainder.
+        Returns None if the reservation was already settled, released or expired.
+        """
+        self._check_amount(actual)
+        row = await self.pool.fetchrow(SETTLE_SQL, uuid.UUID(str(reservation_id)), actual)
+        if row is None:
+            return None
+        self.stats["settled"] += 1
+        user_id = str(row["user_id"])
+        if row["charged"]:
+            self.ledger.append(user_id, -row["charged"], row["reason"], row["service_used"])
+        invalidate_user(user_id)
+        return {
+            "user_id": user_id,
+            "reserved": row["amount"],
+            "charged": row["charged"],
+            "refunded": row["amount"] - row["charged"],
+            "credits": row["credits"]
+        }
+
+    async def release(self, reservation_id: str) -> Optional[Dict[str, Any]]:
+        """Refund a reservation in full"""
+        return await self.settle(reservation_id, 0)
+
+    async def release_expired(self) -> int:
+        """Refund every hold past its TTL; returns the number of holds released"""
+        rows = await self.pool.fetch(RELEASE_EXPIRED_SQL)
+        released = 0
+        for row in rows:
+            invalidate_user(str(row["user_id"]))
+            released += row["holds"]
+        self.stats["expired_released"] += released
+        return released
+
+    def start(self):
+        """Start the expired-hold sweep; holds left by a previous process are refunded too"""
+        self._ensure_sweeper()
+
+    def _ensure_sweeper(self):
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.get_running_loop().create_task(self._sweep())
+
+    async def _sweep(self):
+        try:
+            if not await self.pool.fetchval(RESERVATIONS_TABLE_SQL):
+                # Not migrated yet; the next reserve() starts the sweep again
+                logger.info("No credit_reservations table, expired-hold sweep not started")
+                return
+        except Exception as e:
+            logger.warning(f"Could not check for credit_reservations, sweeping anyway: {e}")
+        while True:
+            await asyncio.sleep(RESERVATION_SWEEP_INTERVAL)
+            try:
+                released = await self.release_expired()
+                if released:
+                    logger.info(f"Released {released} expired credit reservations")
+            except Exception as e:
+                logger.error(f"Credit reservation sweep failed: {e}")
+
+    async def close(self):
+        if self._sweeper:
+            self._sweeper.cancel()
+            await asyncio.gather(self._sweeper, return_exceptions=True)
+            self._sweeper = None
+        await self.ledger.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "ledger": self.ledger.get_stats()}
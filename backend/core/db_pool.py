@@ -0,0 +1,369 @@
+# backend/core/db_pool.py
+# Per-credential connection pools and statement caches for the database drivers
+
+import os
+import time
+import asyncio
+import hmac
+import hashlib
+import logging
+import weakref
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Callable, Tuple
+
+try:
+    from core.loop_local import LoopLocal
+except ImportError:
+    from backend.core.loop_local import LoopLocal
+
+logger = logging.getLogger(__name__)
+
+POOL_MIN_SIZE = int(os.getenv("DB_DRIVER_POOL_MIN_SIZE", 1))
+POOL_MAX_SIZE = int(os.getenv("DB_DRIVER_POOL_MAX_SIZE", 10))
+ACQUIRE_TIMEOUT = float(os.getenv("DB_DRIVER_ACQUIRE_TIMEOUT", 30))
+# Connections idle longer than this are closed by the pool
+CONNECTION_IDLE_TIMEOUT = float(os.getenv("DB_DRIVER_CONNECTION_IDLE_TIMEOUT", 300))
+# Whole pools unused for this long are closed by the reaper
+POOL_IDLE_TIMEOUT = float(os.getenv("DB_DRIVER_POOL_IDLE_TIMEOUT", 900))
+# Connections idle longer than this are pinged before being handed out
+HEALTH_CHECK_INTERVAL = float(os.getenv("DB_DRIVER_HEALTH_CHECK_INTERVAL", 30))
+STATEMENT_CACHE_SIZE = int(os.getenv("DB_DRIVER_STATEMENT_CACHE_SIZE", 256))
+
+
+# Pool ids are HMACs under this secret; set DB_POOL_KEY_SECRET to keep them stable across restarts
+POOL_KEY_SECRET = os.getenv("DB_POOL_KEY_SECRET", "").encode("utf-8") or os.urandom(32)
+
+
+def pool_key(config: Dict[str, Any]) -> str:
+    """
+    One pool per credential. The key is an opaque id (an HMAC over the whole
+    connection config), so stats can show it without revealing the tenant's
+    user, host, database or anything derived from the password alone.
+    """
+    material = "\0".join(str(config.get(field, "")) for field in ("user", "password", "host", "port", "database"))
+    return hmac.new(POOL_KEY_SECRET, material.encode("utf-8"), hashlib.sha256).hexdigest()[:16]
+
+
+class StatementCache:
+    """
+    LRU of SQL text keyed by statement shape (operation, table, columns,
+    where keys, ...). Building the same shape always yields the same text,
+    so the server-side prepared statement for it is reused too.
+    """
+
+    def __init__(self, max_entries: int = STATEMENT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._statements: "OrderedDict[tuple, str]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, shape: tuple, build: Callable[[], str]) -> str:
+        statement = self._statements.get(shape)
+        if statement is not None:
+            self._statements.move_to_end(shape)
+            self.hits += 1
+            return statement
+        self.misses += 1
+        statement = self._statements[shape] = build()
+        if len(self._statements) > self.max_entries:
+            self._statements.popitem(last=False)
+        return statement
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "statements": len(self._statements),
+            "max_statements": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+        }
+
+
+class PoolStats:
+    def __init__(self):
+        self.created_at = time.time()
+        self.last_used = time.monotonic()
+        self.in_use = 0
+        self.acquisitions = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.health_checks = 0
+        self.health_check_failures = 0
+        self.timeouts = 0
+
+
+class ConnectionPoolRegistry:
+    """
+    Lazily created connection pools, one per credential and event loop.
+
+    connection() hands out a pooled connection; a connection that sat idle
+    longer than HEALTH_CHECK_INTERVAL is pinged first and replaced if it is
+    dead. Pool size is bounded by POOL_MAX_SIZE, idle connections are closed
+    by the pool itself, and a background reaper closes pools nobody used for
+    POOL_IDLE_TIMEOUT. Subclasses adapt one client library.
+    """
+
+    dialect = "database"
+
+    def __init__(self):
+        # Pools, stats and locks are keyed by pool_key() within each event loop
+        self._pools = LoopLocal(on_discard=self._terminate)
+        self._stats = LoopLocal()
+        self._locks = LoopLocal()
+        # pool key -> {underlying connection: time it was released}, dropped with the pool
+        self._idle_since = LoopLocal()
+        self._reapers = LoopLocal()
+        self.statements = StatementCache()
+
+    # ---- Library adapters ----
+
+    async def _open(self, config: Dict[str, Any]):
+        raise NotImplementedError
+
+    async def _close(self, pool):
+        raise NotImplementedError
+
+    async def _ping(self, connection):
+        raise NotImplementedError
+
+    async def _discard(self, pool, connection):
+        """Drop a dead connection so the pool opens a fresh one"""
+        raise NotImplementedError
+
+    async def _reset(self, connection):
+        """Leave the connection clean for the next borrower"""
+
+    def _terminate(self, pool):
+        """Drop the sockets of a pool whose event loop closed before the pool did"""
+
+    def _raw(self, connection):
+        """The connection object that outlives a checkout (for idle tracking)"""
+        return connection
+
+    def _sizes(self, pool) -> Tuple[int, int]:
+        """(open connections, idle connections)"""
+        raise NotImplementedError
+
+    # ---- Pools ----
+
+    def _idle_times(self, key: str) -> "weakref.WeakKeyDictionary":
+        idle_times = self._idle_since.get(key)
+        if idle_times is None:
+            idle_times = self._idle_since.set(key, weakref.WeakKeyDictionary())
+        return idle_times
+
+    async def _pool(self, config: Dict[str, Any]):
+        key = pool_key(config)
+        pool = self._pools.get(key)
+        if pool is not None:
+            return key, pool
+
+        lock = self._locks.current().setdefault(key, asyncio.Lock())
+        async with lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                pool = self._pools.set(key, await self._open(config))
+                self._stats.set(key, PoolStats())
+                logger.info(f"Opened {self.dialect} pool {key} for {config['host']}:{config['port']}/{config['database']} (max {POOL_MAX_SIZE})")
+                reaper = self._reapers.get("reaper")
+                if reaper is None or reaper.done():
+                    self._reapers.set("reaper", asyncio.get_running_loop().create_task(self._reap()))
+        return key, pool
+
+    @asynccontextmanager
+    async def connection(self, config: Dict[str, Any]):
+        key, pool = await self._pool(config)
+        stats = self._stats.get(key)
+        idle_times = self._idle_times(key)
+        connection = await self._acquire(pool, stats, idle_times)
+        stats.in_use += 1
+        try:
+            yield connection
+        finally:
+            try:
+                await self._reset(connection)
+            except Exception as e:
+                logger.warning(f"Could not reset {self.dialect} connection: {e}")
+            stats.in_use -= 1
+            stats.last_used = time.monotonic()
+            idle_times[self._raw(connection)] = stats.last_used
+            await pool.release(connection)
+
+    async def _acquire(self, pool, stats: PoolStats, idle_times: "weakref.WeakKeyDictionary"):
+        for attempt in range(2):
+            started = time.monotonic()
+            try:
+                connection = await asyncio.wait_for(pool.acquire(), timeout=ACQUIRE_TIMEOUT)
+            except asyncio.TimeoutError:
+                stats.timeouts += 1
+                raise TimeoutError(f"No {self.dialect} connection available within {ACQUIRE_TIMEOUT:.0f}s "
+                                   f"(pool max {POOL_MAX_SIZE})")
+            waited = time.monotonic() - started
+            stats.acquisitions += 1
+            stats.wait_total += waited
+            stats.wait_max = max(stats.wait_max, waited)
+
+            idle_since = idle_times.pop(self._raw(connection), None)
+            if idle_since is None or time.monotonic() - idle_since < HEALTH_CHECK_INTERVAL:
+                return connection
+
+            stats.health_checks += 1
+            try:
+                await self._ping(connection)
+                return connection
+            except Exception as e:
+                stats.health_check_failures += 1
+                logger.warning(f"Discarding dead {self.dialect} connection: {e}")
+                await self._discard(pool, connection)
+        # Second connection also failed its check; let the caller see a fresh acquire
+        return await asyncio.wait_for(pool.acquire(), timeout=ACQUIRE_TIMEOUT)
+
+    async def _reap(self):
+        while True:
+            await asyncio.sleep(min(POOL_IDLE_TIMEOUT, 60))
+            now = time.monotonic()
+            for key, stats in list(self._stats.current().items()):
+                if stats.in_use == 0 and now - stats.last_used > POOL_IDLE_TIMEOUT:
+                    await self._close_key(key)
+                    logger.info(f"Closed idle {self.dialect} pool {key}")
+            if not self._pools.current():
+                self._reapers.pop("reaper", None)
+                return
+
+    async def _close_key(self, key: str):
+        pool = self._pools.pop(key, None)
+        self._stats.pop(key, None)
+        self._locks.pop(key, None)
+        self._idle_since.pop(key, None)
+        if pool is not None:
+            try:
+                await self._close(pool)
+            except Exception as e:
+                logger.warning(f"Error closing {self.dialect} pool: {e}")
+
+    async def close(self):
+        """Close the pools of the running event loop"""
+        for key in list(self._pools.current()):
+            await self._close_key(key)
+        reaper = self._reapers.pop("reaper", None)
+        if reaper is not None:
+            reaper.cancel()
+
+    def get_stats(self) -> Dict[str, Any]:
+        pools = {}
+        for loop, key, pool in self._pools.items():
+            stats = self._stats.of(loop)[key]
+            size, idle = self._sizes(pool)
+            pools[key] = {
+                "size": size,
+                "idle": idle,
+                "in_use": stats.in_use,
+                "max_size": POOL_MAX_SIZE,
+                "acquisitions": stats.acquisitions,
+                "wait_avg_ms": round(stats.wait_total / max(stats.acquisitions, 1) * 1000, 2),
+                "wait_max_ms": round(stats.wait_max * 1000, 2),
+                "acquire_timeouts": stats.timeouts,
+                "health_checks": stats.health_checks,
+                "health_check_failures": stats.health_check_failures,
+                "idle_seconds": round(time.monotonic() - stats.last_used, 1)
+            }
+        return {
+            "dialect": self.dialect,
+            "active_pools": len(self._pools),
+            "pools": pools,
+            "statement_cache": self.statements.get_stats()
+        }
+
+
+class PostgresPoolRegistry(ConnectionPoolRegistry):
+    """asyncpg pools; asyncpg keeps an LRU of server-side prepared statements per connection"""
+
+    dialect = "postgres"
+
+    async def _open(self, config: Dict[str, Any]):
+        import asyncpg
+        return await asyncpg.create_pool(
+            host=config['host'],
+            port=config['port'],
+            database=config['database'],
+            user=config['user'],
+            password=config['password'],
+            min_size=POOL_MIN_SIZE,
+            max_size=POOL_MAX_SIZE,
+            max_inactive_connection_lifetime=CONNECTION_IDLE_TIMEOUT,
+            statement_cache_size=STATEMENT_CACHE_SIZE
+        )
+
+    async def _close(self, pool):
+        await pool.close()
+
+    def _terminate(self, pool):
+        pool.terminate()
+
+    def _raw(self, connection):
+        # pool.acquire() wraps the pooled Connection in a new PoolConnectionProxy every time
+        return getattr(connection, '_con', None) or connection
+
+    async def _ping(self, connection):
+        await connection.fetchval("SELECT 1")
+
+    async def _discard(self, pool, connection):
+        connection.terminate()
+        await pool.release(connection)
+
+    def _sizes(self, pool) -> Tuple[int, int]:
+        return pool.get_size(), pool.get_idle_size()
+
+
+class MySQLPoolRegistry(ConnectionPoolRegistry):
+    """aiomysql pools; connections older than the idle timeout are recycled on acquire"""
+
+    dialect = "mysql"
+
+    async def _open(self, config: Dict[str, Any]):
+        import aiomysql
+        return await aiomysql.create_pool(
+            host=config['host'],
+            port=config['port'],
+            db=config['database'],
+            user=config['user'],
+            password=config['password'],
+            autocommit=False,
+            minsize=POOL_MIN_SIZE,
+            maxsize=POOL_MAX_SIZE,
+            pool_recycle=int(CONNECTION_IDLE_TIMEOUT)
+        )
+
+    async def _close(self, pool):
+        pool.close()
+        await pool.wait_closed()
+
+    def _terminate(self, pool):
+        pool.terminate()
+
+    async def _ping(self, connection):
+        await connection.ping(reconnect=False)
+
+    async def _discard(self, pool, connection):
+        connection.close()
+        pool.release(connection)
+
+    async def _reset(self, connection):
+        # autocommit is off, so even a SELECT leaves a transaction (and its snapshot) open
+        if not connection.closed and connection.get_transaction_status():
+            await connection.rollback()
+
+    def _sizes(self, pool) -> Tuple[int, int]:
+        return pool.size, pool.freesize
+
+
+# Shared by every PostgresDriver / MysqlDriver instance
+postgres_pools = PostgresPoolRegistry()
+mysql_pools = MySQLPoolRegistry()
+
+
+async def close_driver_pools():
+    await postgres_pools.close()
+    await mysql_pools.close()
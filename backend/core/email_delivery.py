@@ -0,0 +1,423 @@
+# backend/core/email_delivery.py
+# Process-wide SMTP delivery service shared by every email path
+
+import os
+import time
+import random
+import socket
+import asyncio
+import smtplib
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from email.message import Message
+from typing import Dict, Any, List, Optional, NamedTuple, Tuple
+
+try:
+    from core.loop_local import LoopLocal
+except ImportError:
+    from backend.core.loop_local import LoopLocal
+
+logger = logging.getLogger(__name__)
+
+
+class SMTPCredential(NamedTuple):
+    """Identifies one authenticated SMTP account; each gets its own session pool"""
+    host: str
+    port: int = 587
+    username: Optional[str] = None
+    password: Optional[str] = None
+    use_tls: bool = True
+
+    def __repr__(self) -> str:
+        return f"SMTPCredential({self.username}@{self.host}:{self.port})"
+
+
+def is_transient_smtp_error(error: Exception) -> bool:
+    """4xx replies and dropped connections are worth retrying; 5xx are not"""
+    if isinstance(error, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError)):
+        return True
+    if isinstance(error, smtplib.SMTPAuthenticationError):
+        return False
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    if isinstance(error, smtplib.SMTPException):
+        return False
+    # Socket errors and timeouts
+    return isinstance(error, OSError)
+
+
+def _session_broken(error: Exception) -> bool:
+    """Whether the session must be discarded (protocol-level rejections keep it usable)"""
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    return isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException)
+
+
+class SMTPSessionPool:
+    """
+    Thread-safe pool of logged-in SMTP sessions for one credential.
+    Sessions are reused across messages and verified with NOOP after sitting
+    idle, so connect + STARTTLS + login happens once per session rather than
+    once per message.
+    """
+
+    def __init__(self, credential: SMTPCredential, max_sessions: int, idle_timeout: float,
+                 timeout: float, keepalive_check: float = 10.0):
+        self.credential = credential
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.keepalive_check = keepalive_check
+
+        self._idle: deque = deque()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_sessions)
+
+        self.sessions_opened = 0
+        self.sessions_reused = 0
+        self.messages_sent = 0
+        self.messages_failed = 0
+
+    def _connect(self) -> smtplib.SMTP:
+        credential = self.credential
+        if credential.port == 465:
+            session = smtplib.SMTP_SSL(credential.host, credential.port, timeout=self.timeout)
+        else:
+            session = smtplib.SMTP(credential.host, credential.port, timeout=self.timeout)
+        try:
+            if credential.port != 465:
+                session.ehlo()
+                if credential.use_tls:
+                    # Fail closed: a server (or MITM) not offering STARTTLS must never see the password
+                    if not session.has_extn("starttls"):
+                        raise smtplib.SMTPNotSupportedError(
+                            f"{credential.host} does not offer STARTTLS; refusing to log in over plaintext")
+                    session.starttls()
+                    session.ehlo()
+            if credential.username and credential.password:
+                session.login(credential.username, credential.password)
+        except BaseException:
+            self._close_session(session)
+            raise
+        self.sessions_opened += 1
+        return session
+
+    @staticmethod
+    def _close_session(session: smtplib.SMTP):
+        try:
+            session.quit()
+        except Exception:
+            try:
+                session.close()
+            except Exception:
+                pass
+
+    def acquire(self) -> smtplib.SMTP:
+        """Check out a live session, opening one if none is idle"""
+        self._slots.acquire()
+        try:
+            while True:
+                with self._lock:
+                    entry = self._idle.pop() if self._idle else None
+                if entry is None:
+                    return self._connect()
+
+                session, last_used = entry
+                idle_for = time.monotonic() - last_used
+                if idle_for > self.idle_timeout:
+                    self._close_session(session)
+                    continue
+                if idle_for > self.keepalive_check:
+                    try:
+                        if session.noop()[0] != 250:
+                            raise smtplib.SMTPServerDisconnected("NOOP failed")
+                    except Exception:
+                        self._close_session(session)
+                        continue
+                self.sessions_reused += 1
+                return session
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, session: smtplib.SMTP, healthy: bool = True):
+        if healthy:
+            with self._lock:
+                self._idle.append((session, time.monotonic()))
+        else:
+            self._close_session(session)
+        self._slots.release()
+
+    def send_batch(self, jobs: List[Tuple[Message, Optional[str], Optional[List[str]]]]) -> List[Tuple[Optional[str], bool]]:
+        """
+        Send messages over one session. Returns (error, transient) per message;
+        error is None on success. A dropped session is replaced once per batch.
+        """
+        outcomes: List[Tuple[Optional[str], bool]] = []
+        try:
+            session = self.acquire()
+        except Exception as e:
+            logger.warning(f"📭 SMTP connect failed for {self.credential!r}: {e}")
+            self.messages_failed += len(jobs)
+            return [(str(e), is_transient_smtp_error(e))] * len(jobs)
+
+        reconnected = False
+        healthy = True
+        for message, from_addr, to_addrs in jobs:
+            while True:
+                try:
+                    refused = session.send_message(message, from_addr=from_addr, to_addrs=to_addrs)
+                    if refused:
+                        logger.warning(f"📭 Some recipients were refused: {list(refused)}")
+                    self.messages_sent += 1
+                    outcomes.append((None, False))
+                except smtplib.SMTPServerDisconnected as e:
+                    if not reconnected:
+                        reconnected = True
+                        self._close_session(session)
+                        try:
+                            session = self._connect()
+                            continue
+                        except Exception as connect_error:
+                            e = connect_error
+                    healthy = False
+                    self.messages_failed += 1
+                    outcomes.append((str(e), is_transient_smtp_error(e)))
+                except Exception as e:
+                    self.messages_failed += 1
+                    outcomes.append((str(e), is_transient_smtp_error(e)))
+                    if _session_broken(e):
+                        healthy = False
+                break
+            if not healthy:
+                # Fail the rest of the batch fast; the caller retries transient errors
+                remaining = len(jobs) - len(outcomes)
+                self.messages_failed += remaining
+                outcomes.extend([("SMTP session lost", True)] * remaining)
+                break
+
+        self.release(session, healthy)
+        return outcomes
+
+    def test_connection(self):
+        """Raise if a session cannot be opened and authenticated"""
+        session = self.acquire()
+        self.release(session)
+
+    def close(self):
+        with self._lock:
+            sessions = [session for session, _ in self._idle]
+            self._idle.clear()
+        for session in sessions:
+            self._close_session(session)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "idle_sessions": len(self._idle),
+            "max_sessions": self.max_sessions,
+            "sessions_opened": self.sessions_opened,
+            "sessions_reused": self.sessions_reused,
+            "messages_sent": self.messages_sent,
+            "messages_failed": self.messages_failed
+        }
+
+
+class _EmailJob:
+    __slots__ = ("message", "from_addr", "to_addrs", "future", "attempts", "enqueued_at", "last_error")
+
+    def __init__(self, message: Message, from_addr: Optional[str], to_addrs: Optional[List[str]],
+                 future: asyncio.Future):
+        self.message = message
+        self.from_addr = from_addr
+        self.to_addrs = to_addrs
+        self.future = future
+        self.attempts = 0
+        self.enqueued_at = time.perf_counter()
+        self.last_error: Optional[str] = None
+
+
+class EmailDeliveryService:
+    """
+    Async email delivery with a bounded send queue per credential.
+    Worker tasks drain the queue in batches and hand each batch to a pooled
+    SMTP session on a thread executor, so sends never block the event loop.
+    Transient failures are retried with exponential backoff and jitter.
+    """
+
+    def __init__(self):
+        self.sessions_per_credential = int(os.getenv("EMAIL_POOL_SIZE", 4))
+        self.queue_size = int(os.getenv("EMAIL_QUEUE_SIZE", 1000))
+        self.batch_size = int(os.getenv("EMAIL_BATCH_SIZE", 20))
+        self.max_retries = int(os.getenv("EMAIL_MAX_RETRIES", 3))
+        self.retry_base_delay = float(os.getenv("EMAIL_RETRY_BASE_DELAY", 1.0))
+        self.retry_max_delay = float(os.getenv("EMAIL_RETRY_MAX_DELAY", 30.0))
+        self.session_idle_timeout = float(os.getenv("EMAIL_SESSION_IDLE_TIMEOUT", 120))
+        self.smtp_timeout = float(os.getenv("EMAIL_SMTP_TIMEOUT", 30))
+
+        self._pools: Dict[SMTPCredential, SMTPSessionPool] = {}
+        self._pools_lock = threading.Lock()
+        # Queues and workers belong to one event loop; ask_mcp may run private loops
+        self._queues = LoopLocal()
+        self._workers = LoopLocal()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+        self.retries_total = 0
+        self.queue_wait_total = 0.0
+        self.delivered_total = 0
+
+    @staticmethod
+    def credential_from_env(user_var: str = "SMTP_USER", password_var: str = "SMTP_PASSWORD",
+                            default_host: Optional[str] = None) -> Optional[SMTPCredential]:
+        host = os.getenv("SMTP_HOST", default_host)
+        username = os.getenv(user_var)
+        password = os.getenv(password_var)
+        if not host or not username or not password:
+            return None
+        return SMTPCredential(host, int(os.getenv("SMTP_PORT", 587)), username, password)
+
+    def get_pool(self, credential: SMTPCredential) -> SMTPSessionPool:
+        with self._pools_lock:
+            pool = self._pools.get(credential)
+            if pool is None:
+                pool = SMTPSessionPool(credential, self.sessions_per_credential,
+                                       self.session_idle_timeout, self.smtp_timeout)
+                self._pools[credential] = pool
+                logger.info(f"📮 Created SMTP session pool for {credential!r}")
+            return pool
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            workers = int(os.getenv("EMAIL_MAX_THREADS", max(4, self.sessions_per_credential * 2)))
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="smtp")
+        return self._executor
+
+    def _get_queue(self, credential: SMTPCredential) -> asyncio.Queue:
+        queue = self._queues.get(credential)
+        workers = self._workers.get(credential, [])
+        if queue is None or all(worker.done() for worker in workers):
+            queue = self._queues.set(credential, asyncio.Queue(maxsize=self.queue_size))
+            loop = asyncio.get_running_loop()
+            self._workers.set(credential, [
+                loop.create_task(self._worker(credential, queue))
+                for _ in range(self.sessions_per_credential)
+            ])
+        return queue
+
+    async def send(self, credential: SMTPCredential, message: Message, from_addr: Optional[str] = None,
+                   to_addrs: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Queue a message and wait for its delivery outcome
+
+        Waits for queue space when the queue is full (backpressure).
+        """
+        future = asyncio.get_running_loop().create_future()
+        job = _EmailJob(message, from_addr, to_addrs, future)
+        await self._get_queue(credential).put(job)
+        return await future
+
+    def send_sync(self, credential: SMTPCredential, message: Message, from_addr: Optional[str] = None,
+                  to_addrs: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Blocking send for synchronous callers, sharing the same session pool"""
+        pool = self.get_pool(credential)
+        for attempt in range(1, self.max_retries + 2):
+            error, transient = pool.send_batch([(message, from_addr, to_addrs)])[0]
+            if error is None:
+                self.delivered_total += 1
+                return {"success": True, "attempts": attempt}
+            if not transient or attempt > self.max_retries:
+                return {"success": False, "attempts": attempt, "error": error}
+            self.retries_total += 1
+            time.sleep(self._retry_delay(attempt))
+
+    def _retry_delay(self, attempt: int) -> float:
+        delay = min(self.retry_max_delay, self.retry_base_delay * (2 ** (attempt - 1)))
+        return delay * random.uniform(0.5, 1.0)
+
+    async def _worker(self, credential: SMTPCredential, queue: asyncio.Queue):
+        pool = self.get_pool(credential)
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+
+            started = time.perf_counter()
+            for job in batch:
+                self.queue_wait_total += started - job.enqueued_at
+
+            try:
+                outcomes = await loop.run_in_executor(
+                    self._get_executor(), pool.send_batch,
+                    [(job.message, job.from_addr, job.to_addrs) for job in batch]
+                )
+            except Exception as e:
+                outcomes = [(str(e), False)] * len(batch)
+
+            for job, (error, transient) in zip(batch, outcomes):
+                job.attempts += 1
+                queue.task_done()
+                if job.future.done():
+                    continue
+                if error is None:
+                    self.delivered_total += 1
+                    job.future.set_result({"success": True, "attempts": job.attempts})
+                elif transient and job.attempts <= self.max_retries:
+                    job.last_error = error
+                    self.retries_total += 1
+                    loop.create_task(self._requeue_later(queue, job, self._retry_delay(job.attempts)))
+                else:
+                    job.future.set_result({"success": False, "attempts": job.attempts, "error": error})
+
+    async def _requeue_later(self, queue: asyncio.Queue, job: _EmailJob, delay: float):
+        logger.info(f"🔁 Retrying email in {delay:.1f}s (attempt {job.attempts + 1}): {job.last_error}")
+        await asyncio.sleep(delay)
+        job.enqueued_at = time.perf_counter()
+        await queue.put(job)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "pools": {repr(credential): pool.get_stats() for credential, pool in self._pools.items()},
+            "queued": sum(queue.qsize() for queue in self._queues.values()),
+            "delivered_total": self.delivered_total,
+            "retries_total": self.retries_total,
+            "queue_wait_avg_ms": round(self.queue_wait_total / max(self.delivered_total, 1) * 1000, 2),
+            "limits": {
+                "sessions_per_credential": self.sessions_per_credential,
+                "queue_size": self.queue_size,
+                "batch_size": self.batch_size,
+                "max_retries": self.max_retries
+            }
+        }
+
+    async def close(self):
+        """Stop workers and close pooled sessions (called on application shutdown)"""
+        await self._workers.close_all(_cancel_workers)
+        self._queues.clear()
+        # QUIT is a blocking round trip, keep it off the event loop
+        loop = asyncio.get_running_loop()
+        for pool in self._pools.values():
+            await loop.run_in_executor(self._get_executor(), pool.close)
+        self._pools.clear()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        logger.info("✅ Email delivery service closed")
+
+
+async def _cancel_workers(workers: List[asyncio.Task]):
+    for worker in workers:
+        worker.cancel()
+
+
+# Global delivery service instance
+email_delivery = EmailDeliveryService()
+
+
+def get_email_delivery() -> EmailDeliveryService:
+    return email_delivery
@@ -0,0 +1,254 @@
+# backend/core/execution_history.py
+# Keyset pagination, field projection and hourly rollups for execution history
+
+import os
+import json
+import uuid
+import base64
+import binascii
+from bisect import bisect_left
+from datetime import datetime
+from typing import Dict, Any, Iterable, List, Optional, Sequence, Tuple, Union
+
+DEFAULT_PAGE_SIZE = int(os.getenv("EXECUTION_HISTORY_PAGE_SIZE", 50))
+MAX_PAGE_SIZE = int(os.getenv("EXECUTION_HISTORY_MAX_PAGE_SIZE", 200))
+MAX_SUMMARY_HOURS = int(os.getenv("EXECUTION_SUMMARY_MAX_HOURS", 24 * 30))
+
+# Latency histogram bucket upper bounds in ms: 10% apart from 1ms to ~10 minutes,
+# plus one overflow bucket, so percentiles read back from it are within ~10%
+LATENCY_BOUNDS: Tuple[float, ...] = tuple(1.1 ** i for i in range(141))
+HISTOGRAM_SIZE = len(LATENCY_BOUNDS) + 1
+
+# agent_executions columns a page can return; the JSONB blobs are opt-in
+AGENT_EXECUTION_FIELDS = ("id", "user_id", "trigger_type", "input_data", "output_data",
+                          "execution_status", "execution_time_ms", "error_message", "created_at")
+AGENT_EXECUTION_BLOBS = ("input_data", "output_data")
+
+# Execution log without the rollup, for databases that don't have agent_execution_rollups
+INSERT_EXECUTION_SQL = """
+    INSERT INTO agent_executions
+    (agent_id, user_id, trigger_type, input_data, output_data, execution_status,
+     execution_time_ms, error_message)
+    VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
+"""
+
+LOG_EXECUTION_SQL = """
+    WITH execution AS (
+        INSERT INTO agent_executions
+        (agent_id, user_id, trigger_type, input_data, output_data, execution_status,
+         execution_time_ms, error_message)
+        VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
+        RETURNING agent_id, created_at, execution_status, execution_time_ms
+    )
+    INSERT INTO agent_execution_rollups AS r
+    (agent_id, bucket_start, executions, errors, timed_executions, total_time_ms,
+     max_time_ms, latency_histogram)
+    SELECT agent_id, date_trunc('hour', created_at), 1, (execution_status = 'error')::int,
+           (execution_time_ms IS NOT NULL)::int, COALESCE(execution_time_ms, 0),
+           execution_time_ms, $9::int[]
+    FROM execution
+    ON CONFLICT (agent_id, bucket_start) DO UPDATE SET
+        executions = r.executions + EXCLUDED.executions,
+        errors = r.errors + EXCLUDED.errors,
+        timed_executions = r.timed_executions + EXCLUDED.timed_executions,
+        total_time_ms = r.total_time_ms + EXCLUDED.total_time_ms,
+        max_time_ms = GREATEST(r.max_time_ms, EXCLUDED.max_time_ms),
+        latency_histogram = (
+            SELECT array_agg(COALESCE(a, 0) + COALESCE(b, 0) ORDER BY i)
+            FROM unnest(r.latency_histogram, EXCLUDED.latency_histogram) WITH ORDINALITY AS h(a, b, i)
+        )
+"""
+
+SUMMARY_SQL = """
+    SELECT bucket_start, executions, errors, timed_executions, total_time_ms,
+           max_time_ms, latency_histogram
+    FROM agent_execution_rollups
+    WHERE agent_id = $1 AND bucket_start >= date_trunc('hour', NOW()) - ($2::int - 1) * INTERVAL '1 hour'
+    ORDER BY bucket_start
+"""
+
+
+# ----- Cursors and projection -----
+
+def encode_cursor(created_at: Union[datetime, str], row_id: Any) -> str:
+    """Opaque cursor for the row after which the next page starts"""
+    if isinstance(created_at, datetime):
+        created_at = created_at.isoformat()
+    raw = json.dumps([created_at, str(row_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """(created_at, id) from a cursor; ValueError if it wasn't made by encode_cursor"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, row_id = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+    if not isinstance(created_at, str) or not isinstance(row_id, str):
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return created_at, row_id
+
+
+def clamp_page_size(limit: Any) -> int:
+    try:
+        return max(1, min(int(limit), MAX_PAGE_SIZE))
+    except (TypeError, ValueError):
+        return DEFAULT_PAGE_SIZE
+
+
+def project_fields(requested: Optional[Union[str, Iterable[str]]], allowed: Sequence[str],
+                   blobs: Sequence[str], required: Sequence[str]) -> List[str]:
+    """
+    Fields for a history page, in `allowed` order. Without a request every
+    non-blob field is returned; `required` fields (the cursor columns) are
+    always included. Unknown names raise ValueError.
+    """
+    if requested is None or requested == "":
+        wanted = {name for name in allowed if name not in blobs}
+    else:
+        if isinstance(requested, str):
+            requested = requested.split(",")
+        wanted = {name.strip() for name in requested if name.strip()}
+        unknown = wanted.difference(allowed)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}. "
+                             f"Available: {', '.join(allowed)}")
+    wanted.update(required)
+    return [name for name in allowed if name in wanted]
+
+
+# ----- agent_executions (PostgreSQL) -----
+
+async def fetch_agent_execution_page(conn, agent_id: str, limit: Any = DEFAULT_PAGE_SIZE,
+                                     cursor: Optional[str] = None,
+                                     fields: Optional[Union[str, Iterable[str]]] = None) -> Dict[str, Any]:
+    """
+    One page of an agent's executions, newest first, using the
+    (agent_id, created_at DESC, id DESC) index. Each page costs the same
+    however deep it is, unlike OFFSET which scans every skipped row.
+    """
+    limit = clamp_page_size(limit)
+    columns = project_fields(fields, AGENT_EXECUTION_FIELDS, AGENT_EXECUTION_BLOBS, ("id", "created_at"))
+    params: List[Any] = [agent_id]
+    after = ""
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        try:
+            params += [datetime.fromisoformat(created_at), uuid.UUID(row_id)]
+        except ValueError as e:
+            raise ValueError(f"Invalid cursor: {cursor!r}") from e
+        after = "AND (created_at, id) < ($2, $3)"
+    params.append(limit + 1)  # one extra row tells whether another page exists
+
+    rows = await conn.fetch(f"""
+        SELECT {', '.join(columns)}
+        FROM agent_executions
+        WHERE agent_id = $1 {after}
+        ORDER BY created_at DESC, id DESC
+        LIMIT ${len(params)}
+    """, *params)
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    executions = []
+    for row in rows:
+        execution = dict(row)
+        execution["id"] = str(execution["id"])
+        execution["created_at"] = execution["created_at"].isoformat() if execution["created_at"] else None
+        executions.append(execution)
+
+    return {
+        "executions": executions,
+        "fields": columns,
+        "limit": limit,
+        "has_more": has_more,
+        "next_cursor": encode_cursor(rows[-1]["created_at"], rows[-1]["id"]) if has_more else None
+    }
+
+
+# ----- Hourly rollups -----
+
+def latency_bucket(execution_time_ms: float) -> int:
+    """Histogram slot for a duration: bucket i holds (LATENCY_BOUNDS[i-1], LATENCY_BOUNDS[i]]"""
+    return bisect_left(LATENCY_BOUNDS, execution_time_ms)
+
+
+def execution_histogram(execution_time_ms: Optional[float]) -> List[int]:
+    """The histogram contribution of one execution (all zeros if it wasn't timed)"""
+    histogram = [0] * HISTOGRAM_SIZE
+    if execution_time_ms is not None:
+        histogram[latency_bucket(execution_time_ms)] = 1
+    return histogram
+
+
+def merge_histograms(histograms: Iterable[Sequence[int]]) -> List[int]:
+    merged = [0] * HISTOGRAM_SIZE
+    for histogram in histograms:
+        for i, count in enumerate(histogram or ()):
+            if i < HISTOGRAM_SIZE:
+                merged[i] += count
+    return merged
+
+
+def histogram_percentile(histogram: Sequence[int], q: float,
+                         max_ms: Optional[float] = None) -> Optional[float]:
+    """Estimate the q-th quantile (0..1), interpolating linearly inside the bucket"""
+    total = sum(histogram)
+    if not total:
+        return None
+    rank = q * total
+    seen = 0
+    for i, count in enumerate(histogram):
+        if count and seen + count >= rank:
+            lower = LATENCY_BOUNDS[i - 1] if i > 0 else 0.0
+            upper = LATENCY_BOUNDS[i] if i < len(LATENCY_BOUNDS) else max(max_ms or lower, lower)
+            value = lower + (upper - lower) * max(rank - seen, 0) / count
+            if max_ms is not None:
+                value = min(value, max_ms)
+            return round(value, 1)
+        seen += count
+    return None
+
+
+def summarize_rollup(executions: int, errors: int, timed_executions: int, total_time_ms: int,
+                     max_time_ms: Optional[int], histogram: Sequence[int]) -> Dict[str, Any]:
+    return {
+        "executions": executions,
+        "errors": errors,
+        "error_rate": round(errors / executions, 4) if executions else 0.0,
+        "avg_execution_time_ms": round(total_time_ms / timed_executions, 1) if timed_executions else None,
+        "p50_execution_time_ms": histogram_percentile(histogram, 0.50, max_time_ms),
+        "p95_execution_time_ms": histogram_percentile(histogram, 0.95, max_time_ms),
+        "max_execution_time_ms": max_time_ms
+    }
+
+
+async def fetch_agent_execution_summary(conn, agent_id: str, hours: Any = 24) -> Dict[str, Any]:
+    """
+    Per-hour and overall counts, error rate and p50/p95 latency for the last
+    `hours` hours, read from agent_execution_rollups (maintained on every
+    logged execution) instead of scanning agent_executions.
+    """
+    try:
+        hours = max(1, min(int(hours), MAX_SUMMARY_HOURS))
+    except (TypeError, ValueError):
+        hours = 24
+    rows = await conn.fetch(SUMMARY_SQL, agent_id, hours)
+
+    buckets = []
+    for row in rows:
+        bucket = summarize_rollup(row["executions"], row["errors"], row["timed_executions"],
+                                  row["total_time_ms"], row["max_time_ms"], row["latency_histogram"])
+        buckets.append({"hour": row["bucket_start"].isoformat(), **bucket})
+
+    max_times = [row["max_time_ms"] for row in rows if row["max_time_ms"] is not None]
+    overall = summarize_rollup(
+        sum(row["executions"] for row in rows),
+        sum(row["errors"] for row in rows),
+        sum(row["timed_executions"] for row in rows),
+        sum(row["total_time_ms"] for row in rows),
+        max(max_times) if max_times else None,
+        merge_histograms(row["latency_histogram"] for row in rows)
+    )
+    return {"hours": hours, "overall": overall, "hourly": buckets}
@@ -0,0 +1,71 @@
+# backend/core/fan_out.py
+# Bounded-concurrency fan-out over items for loop / batch drivers
+
+import os
+import asyncio
+import itertools
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, List, Tuple
+
+# Sequential unless a loop asks for more, so existing workflows keep their iteration order and load
+DEFAULT_CONCURRENCY = int(os.getenv("LOOP_DEFAULT_CONCURRENCY", 1))
+MAX_CONCURRENCY = int(os.getenv("LOOP_MAX_CONCURRENCY", 100))
+
+
+def clamp_concurrency(value: Any) -> int:
+    try:
+        return max(1, min(int(value), MAX_CONCURRENCY))
+    except (TypeError, ValueError):
+        return DEFAULT_CONCURRENCY
+
+
+def batched(items: Iterable[Any], size: int) -> Iterable[List[Any]]:
+    iterator = iter(items)
+    size = max(1, int(size))
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+async def bounded_map(func: Callable[[int, Any], Awaitable[Any]], items: Iterable[Any],
+                      concurrency: int = DEFAULT_CONCURRENCY,
+                      ordered: bool = True) -> AsyncIterator[Tuple[int, Any]]:
+    """
+    Run func(index, item) with at most `concurrency` calls in flight and yield
+    (index, result) as results become available: in item order when ordered,
+    otherwise in completion order. Items are pulled lazily, so at most
+    `concurrency` results are ever buffered. If a call raises, the remaining
+    in-flight calls are cancelled and the exception propagates; the same
+    happens when the consumer stops iterating early.
+    """
+    items = enumerate(items)
+    pending = {}   # task -> index
+    done = {}      # index -> result, only used when ordered
+    next_index = 0
+
+    def launch():
+        # Out-of-order results waiting for an earlier item count against the window too
+        for index, item in itertools.islice(items, concurrency - len(pending) - len(done)):
+            pending[asyncio.ensure_future(func(index, item))] = index
+
+    try:
+        launch()
+        while pending:
+            finished, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in finished:
+                index = pending.pop(task)
+                result = task.result()
+                if ordered:
+                    done[index] = result
+                else:
+                    yield index, result
+            while next_index in done:
+                yield next_index, done.pop(next_index)
+                next_index += 1
+            launch()
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
@@ -0,0 +1,180 @@
+# backend/core/http_client.py
+# Shared keep-alive HTTP client for SaaS drivers and OAuth services
+
+import os
+import logging
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+try:
+    from core.rate_limiter import rate_limit_scheduler
+except ImportError:
+    from backend.core.rate_limiter import rate_limit_scheduler
+
+try:
+    from core.loop_local import LoopLocal
+except ImportError:
+    from backend.core.loop_local import LoopLocal
+
+
+class HTTPServiceMetrics:
+    """Counters for one driver/service using the shared client"""
+
+    def __init__(self):
+        self.requests_total = 0
+        self.errors_total = 0
+        self.connections_created = 0
+        self.connections_reused = 0
+        self.dns_cache_hits = 0
+        self.dns_cache_misses = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        connections = self.connections_created + self.connections_reused
+        return {
+            "requests_total": self.requests_total,
+            "errors_total": self.errors_total,
+            "connections_created": self.connections_created,
+            "connections_reused": self.connections_reused,
+            "connection_reuse_ratio": round(self.connections_reused / connections, 3) if connections else 0.0,
+            "dns_cache_hits": self.dns_cache_hits,
+            "dns_cache_misses": self.dns_cache_misses
+        }
+
+
+class HTTPClientManager:
+    """
+    One keep-alive connection pool per event loop, shared by every SaaS driver
+    and OAuth service. Each service gets its own lightweight ClientSession on
+    top of the shared connector, so connection caps (total and per host) and
+    the DNS cache are global while reuse counters stay per service.
+    """
+
+    def __init__(self):
+        self.max_connections = int(os.getenv("HTTP_MAX_CONNECTIONS", 100))
+        self.max_per_host = int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", 10))
+        self.keepalive_timeout = float(os.getenv("HTTP_KEEPALIVE_TIMEOUT", 30))
+        self.dns_cache_ttl = int(os.getenv("HTTP_DNS_CACHE_TTL", 300))
+        self.request_timeout = float(os.getenv("HTTP_REQUEST_TIMEOUT", 60))
+
+        self._connectors = LoopLocal()
+        self._sessions = LoopLocal()
+        self.metrics: Dict[str, HTTPServiceMetrics] = {}
+
+    def _metrics(self, service: str) -> HTTPServiceMetrics:
+        if service not in self.metrics:
+            self.metrics[service] = HTTPServiceMetrics()
+        return self.metrics[service]
+
+    def _connector(self):
+        connector = self._connectors.get("tcp")
+        if connector is None or connector.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.max_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                use_dns_cache=True,
+                ttl_dns_cache=self.dns_cache_ttl
+            )
+            self._connectors.set("tcp", connector)
+        return connector
+
+    def get_session(self, service: str):
+        """Shared session for a service on the running event loop (never close it)"""
+        if not AIOHTTP_AVAILABLE:
+            raise RuntimeError("aiohttp is not installed")
+
+        session = self._sessions.get(service)
+        if session is None or session.closed:
+            metrics = self._metrics(service)
+            trace_config = aiohttp.TraceConfig()
+
+            async def on_request_start(session, context, params):
+                metrics.requests_total += 1
+
+            async def on_request_exception(session, context, params):
+                metrics.errors_total += 1
+
+            async def on_connection_create_end(session, context, params):
+                metrics.connections_created += 1
+
+            async def on_connection_reuseconn(session, context, params):
+                metrics.connections_reused += 1
+
+            async def on_dns_cache_hit(session, context, params):
+                metrics.dns_cache_hits += 1
+
+            async def on_dns_cache_miss(session, context, params):
+                metrics.dns_cache_misses += 1
+
+            trace_config.on_request_start.append(on_request_start)
+            trace_config.on_request_exception.append(on_request_exception)
+            trace_config.on_connection_create_end.append(on_connection_create_end)
+            trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+            trace_config.on_dns_cache_hit.append(on_dns_cache_hit)
+            trace_config.on_dns_cache_miss.append(on_dns_cache_miss)
+
+            session = aiohttp.ClientSession(
+                connector=self._connector(),
+                connector_owner=False,
+                timeout=aiohttp.ClientTimeout(total=self.request_timeout),
+                trace_configs=[trace_config]
+            )
+            self._sessions.set(service, session)
+            logger.info(f"🔌 Created shared HTTP session for {service}")
+        return session
+
+    @asynccontextmanager
+    async def session(self, service: str, credential: Optional[str] = None):
+        """
+        Drop-in for `async with aiohttp.ClientSession() as session` that keeps the pool open.
+        With a credential, requests are paced by that credential's rate-limit bucket and
+        responses come back fully read.
+        """
+        session = self.get_session(service)
+        if credential:
+            yield rate_limit_scheduler.wrap(session, service, credential)
+        else:
+            yield session
+
+    def get_metrics(self) -> Dict[str, Any]:
+        connectors = [c for c in self._connectors.values() if not c.closed]
+        return {
+            "services": {name: metrics.to_dict() for name, metrics in self.metrics.items()},
+            "sessions": len(self._sessions),
+            "connection_pools": len(connectors),
+            "limits": {
+                "max_connections": self.max_connections,
+                "max_connections_per_host": self.max_per_host,
+                "keepalive_timeout": self.keepalive_timeout,
+                "dns_cache_ttl": self.dns_cache_ttl
+            },
+            "rate_limits": rate_limit_scheduler.get_stats()
+        }
+
+    async def close(self):
+        """Close all sessions and connection pools (called on application shutdown)"""
+        # Sessions first: they don't own the shared connectors
+        await self._sessions.close_all(_close_unless_closed)
+        await self._connectors.close_all(_close_unless_closed)
+        logger.info("✅ Shared HTTP client closed")
+
+
+async def _close_unless_closed(resource):
+    if not resource.closed:
+        await resource.close()
+
+
+# Global client manager instance
+http_client_manager = HTTPClientManager()
+
+
+def get_http_client_manager() -> HTTPClientManager:
+    return http_client_manager
@@ -0,0 +1,400 @@
+# backend/core/imap_sync.py
+# Incremental IMAP ingestion: per-credential connection pool, UID tracking and IDLE push
+
+import os
+import re
+import time
+import asyncio
+import hashlib
+import imaplib
+import logging
+import select
+from contextlib import asynccontextmanager
+from typing import Dict, Any, List, Optional, Tuple, AsyncIterator
+
+logger = logging.getLogger(__name__)
+
+IMAP_POOL_SIZE = int(os.getenv("IMAP_POOL_SIZE", 2))
+IMAP_CONNECT_TIMEOUT = float(os.getenv("IMAP_CONNECT_TIMEOUT", 30))
+# Pooled connections idle longer than this get a NOOP before reuse
+IMAP_HEALTH_CHECK_INTERVAL = float(os.getenv("IMAP_HEALTH_CHECK_INTERVAL", 60))
+# ... and are logged out once idle longer than this
+IMAP_CONNECTION_IDLE_TIMEOUT = float(os.getenv("IMAP_CONNECTION_IDLE_TIMEOUT", 600))
+IMAP_FETCH_BATCH = int(os.getenv("IMAP_FETCH_BATCH", 100))
+# RFC 2177: re-issue IDLE before the server's 30 minute inactivity timeout
+IMAP_IDLE_TIMEOUT = float(os.getenv("IMAP_IDLE_TIMEOUT", 25 * 60))
+
+HEADER_FIELDS = "FROM TO CC SUBJECT DATE MESSAGE-ID"
+
+UID_PATTERN = re.compile(rb"UID (\d+)")
+FLAGS_PATTERN = re.compile(rb"FLAGS \(([^)]*)\)")
+SIZE_PATTERN = re.compile(rb"RFC822\.SIZE (\d+)")
+
+
+def credential_key(credential: Dict[str, Any]) -> str:
+    """One pool per account: the password only enters the key as a short hash"""
+    secret = hashlib.sha256(str(credential.get("password", "")).encode("utf-8")).hexdigest()[:12]
+    return f"{credential['user']}@{credential['host']}:{credential.get('port', 993)}#{secret}"
+
+
+def quote_mailbox(mailbox: str) -> str:
+    if mailbox.startswith('"') or not re.search(r'[\s"\\(){%*]', mailbox):
+        return mailbox
+    return '"' + mailbox.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def uid_set(uids: List[int]) -> str:
+    """Compact sequence set: 1,2,3,7,8 -> 1:3,7:8"""
+    ranges = []
+    for uid in sorted(uids):
+        if ranges and uid == ranges[-1][1] + 1:
+            ranges[-1][1] = uid
+        else:
+            ranges.append([uid, uid])
+    return ','.join(str(low) if low == high else f"{low}:{high}" for low, high in ranges)
+
+
+def parse_fetch(data: list) -> Dict[int, Dict[str, Any]]:
+    """imaplib FETCH response -> {uid: {"flags", "size", "literal"}}"""
+    records = []
+    for part in data:
+        if isinstance(part, tuple):
+            records.append([part[0], part[1]])
+        elif isinstance(part, bytes) and records:
+            records[-1][0] += part  # items after the literal, e.g. b' UID 12)'
+    parsed = {}
+    for meta, literal in records:
+        uid = UID_PATTERN.search(meta)
+        if not uid:
+            continue
+        flags = FLAGS_PATTERN.search(meta)
+        size = SIZE_PATTERN.search(meta)
+        parsed[int(uid.group(1))] = {
+            "flags": flags.group(1).decode().split() if flags else [],
+            "size": int(size.group(1)) if size else None,
+            "literal": literal
+        }
+    return parsed
+
+
+# ---- Sync state ----
+
+class MemoryUidStore:
+    """Last seen UIDVALIDITY / UID per mailbox, kept in process (tests, single workers)"""
+
+    def __init__(self):
+        self._state: Dict[str, Tuple[int, int]] = {}
+
+    async def load(self, key: str) -> Optional[Tuple[int, int]]:
+        return self._state.get(key)
+
+    async def save(self, key: str, uidvalidity: int, last_uid: int):
+        self._state[key] = (uidvalidity, last_uid)
+
+
+class PostgresUidStore:
+    """Sync state in the imap_sync_state table (db/migrate_imap_sync_state.py)"""
+
+    def __init__(self, db_pool):
+        self.db_pool = db_pool
+
+    async def load(self, key: str) -> Optional[Tuple[int, int]]:
+        async with self.db_pool.acquire() as conn:
+            row = await conn.fetchrow(
+                "SELECT uidvalidity, last_uid FROM imap_sync_state WHERE sync_key = $1", key
+            )
+        return (row['uidvalidity'], row['last_uid']) if row else None
+
+    async def save(self, key: str, uidvalidity: int, last_uid: int):
+        async with self.db_pool.acquire() as conn:
+            await conn.execute("""
+                INSERT INTO imap_sync_state (sync_key, uidvalidity, last_uid, updated_at)
+                VALUES ($1, $2, $3, CURRENT_TIMESTAMP)
+                ON CONFLICT (sync_key) DO UPDATE
+                SET uidvalidity = EXCLUDED.uidvalidity, last_uid = EXCLUDED.last_uid, updated_at = CURRENT_TIMESTAMP
+            """, key, uidvalidity, last_uid)
+
+
+# ---- Connection pool ----
+
+class ImapConnectionPool:
+    """
+    Logged-in imaplib connections, at most IMAP_POOL_SIZE per account.
+    imaplib is blocking, so every command runs in a worker thread while the
+    connection is checked out by a single task.
+    """
+
+    def __init__(self, max_per_credential: int = IMAP_POOL_SIZE):
+        self.max_per_credential = max_per_credential
+        self._idle: Dict[str, List[Tuple[imaplib.IMAP4, float]]] = {}
+        self._slots: Dict[str, asyncio.Semaphore] = {}
+        self.stats = {"opened": 0, "reused": 0, "closed": 0, "health_check_failures": 0}
+
+    @staticmethod
+    def _open(credential: Dict[str, Any]) -> imaplib.IMAP4:
+        port = int(credential.get("port", 993))
+        if credential.get("ssl", port == 993):
+            conn = imaplib.IMAP4_SSL(credential["host"], port, timeout=IMAP_CONNECT_TIMEOUT)
+        else:
+            conn = imaplib.IMAP4(credential["host"], port, timeout=IMAP_CONNECT_TIMEOUT)
+        conn.login(credential["user"], credential["password"])
+        return conn
+
+    @staticmethod
+    def _logout(conn: imaplib.IMAP4):
+        try:
+            conn.logout()
+        except Exception:
+            pass
+
+    @asynccontextmanager
+    async def connection(self, credential: Dict[str, Any]):
+        key = credential_key(credential)
+        slots = self._slots.setdefault(key, asyncio.Semaphore(self.max_per_credential))
+        async with slots:
+            conn = await self._checkout(key, credential)
+            healthy = True
+            try:
+                yield conn
+            except imaplib.IMAP4.abort:
+                healthy = False
+                raise
+            except imaplib.IMAP4.error:
+                raise  # a NO / BAD reply leaves the session usable
+            except BaseException:
+                # Socket errors, or a cancellation while a worker thread may still be mid-command
+                healthy = False
+                raise
+            finally:
+                if healthy:
+                    self._idle.setdefault(key, []).append((conn, time.monotonic()))
+                else:
+                    # No LOGOUT: the session is broken or still in use by a thread
+                    self.stats["closed"] += 1
+                    try:
+                        conn.shutdown()
+                    except Exception:
+                        pass
+
+    async def _checkout(self, key: str, credential: Dict[str, Any]) -> imaplib.IMAP4:
+        idle = self._idle.get(key, [])
+        now = time.monotonic()
+        while idle:
+            conn, since = idle.pop()
+            if now - since > IMAP_CONNECTION_IDLE_TIMEOUT:
+                self.stats["closed"] += 1
+                await asyncio.to_thread(self._logout, conn)
+                continue
+            if now - since > IMAP_HEALTH_CHECK_INTERVAL:
+                try:
+                    await asyncio.to_thread(conn.noop)
+                except Exception as e:
+                    self.stats["health_check_failures"] += 1
+                    logger.warning(f"Dropping dead IMAP connection for {key.split('#')[0]}: {e}")
+                    await asyncio.to_thread(self._logout, conn)
+                    continue
+            self.stats["reused"] += 1
+            return conn
+        conn = await asyncio.to_thread(self._open, credential)
+        self.stats["opened"] += 1
+        return conn
+
+    async def close(self):
+        for connections in self._idle.values():
+            for conn, _ in connections:
+                await asyncio.to_thread(self._logout, conn)
+        self._idle.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "accounts": len(self._slots),
+            "idle_connections": sum(len(c) for c in self._idle.values()),
+            "max_per_account": self.max_per_credential
+        }
+
+
+# ---- Sync ----
+
+class ImapSync:
+    """
+    Incremental mailbox reader. Each fetch only asks for UIDs above the last
+    one seen (reset when the mailbox UIDVALIDITY changes), pulls headers for
+    the whole batch in one UID FETCH, and bodies only when asked for.
+    """
+
+    def __init__(self, pool: Optional[ImapConnectionPool] = None, store=None):
+        self.pool = pool or ImapConnectionPool()
+        self.store = store or MemoryUidStore()
+
+    @staticmethod
+    def state_key(credential: Dict[str, Any], mailbox: str, scope: str = "") -> str:
+        account = credential_key(credential).split('#')[0]
+        return f"{scope}:{account}/{mailbox}" if scope else f"{account}/{mailbox}"
+
+    # -- blocking helpers (worker thread) --
+
+    @staticmethod
+    def _select(conn: imaplib.IMAP4, mailbox: str, readonly: bool) -> int:
+        status, data = conn.select(quote_mailbox(mailbox), readonly=readonly)
+        if status != 'OK':
+            raise imaplib.IMAP4.error(f"Cannot select mailbox {mailbox}: {data}")
+        _, values = conn.response('UIDVALIDITY')
+        return int(values[0]) if values and values[0] else 0
+
+    @staticmethod
+    def _search(conn: imaplib.IMAP4, last_uid: int, criteria: str) -> List[int]:
+        query = f"UID {last_uid + 1}:* {criteria}" if last_uid else criteria
+        status, data = conn.uid('SEARCH', None, query.strip())
+        if status != 'OK':
+            raise imaplib.IMAP4.error(f"UID SEARCH failed: {data}")
+        # "n:*" always matches the newest message, even when its UID is below n
+        return sorted(uid for uid in map(int, (data[0] or b'').split()) if uid > last_uid)
+
+    @staticmethod
+    def _fetch(conn: imaplib.IMAP4, uids: List[int], items: str) -> Dict[int, Dict[str, Any]]:
+        fetched = {}
+        for start in range(0, len(uids), IMAP_FETCH_BATCH):
+            chunk = uids[start:start + IMAP_FETCH_BATCH]
+            status, data = conn.uid('FETCH', uid_set(chunk), items)
+            if status != 'OK':
+                raise imaplib.IMAP4.error(f"UID FETCH failed: {data}")
+            fetched.update(parse_fetch(data))
+        return fetched
+
+    @staticmethod
+    def _store(conn: imaplib.IMAP4, uids: List[int], flag: str, expunge: bool):
+        for start in range(0, len(uids), IMAP_FETCH_BATCH):
+            conn.uid('STORE', uid_set(uids[start:start + IMAP_FETCH_BATCH]), '+FLAGS.SILENT', f"({flag})")
+        if expunge:
+            conn.expunge()
+
+    @staticmethod
+    def _idle(conn: imaplib.IMAP4, timeout: float) -> bool:
+        """
+        RFC 2177 IDLE on a selected mailbox: True once the server pushes new
+        mail, False when the timeout passes first. Servers without IDLE are
+        polled with NOOP instead.
+        """
+        if 'IDLE' not in conn.capabilities:
+            # The EXISTS left over from SELECT is the baseline, not news
+            _, exists = conn.response('EXISTS')
+            count = int(exists[-1]) if exists and exists[-1] else 0
+            deadline = time.monotonic() + timeout
+            while time.monotonic() < deadline:
+                time.sleep(min(IMAP_HEALTH_CHECK_INTERVAL, max(0.0, deadline - time.monotonic())))
+                conn.noop()
+                _, exists = conn.response('EXISTS')
+                if exists and exists[-1]:
+                    current = int(exists[-1])
+                    if current > count:
+                        return True
+                    count = current  # expunges shrink the mailbox
+            return False
+
+        tag = conn._new_tag()
+        conn.send(tag + b' IDLE\r\n')
+        line = conn.readline()
+        if not line.startswith(b'+'):
+            raise imaplib.IMAP4.error(f"IDLE rejected: {line!r}")
+
+        pushed = False
+        deadline = time.monotonic() + timeout
+        while not pushed:
+            remaining = deadline - time.monotonic()
+            pending = getattr(conn.sock, 'pending', lambda: 0)()
+            if remaining <= 0 or (not pending and not select.select([conn.sock], [], [], remaining)[0]):
+                break
+            line = conn.readline()
+            if not line:
+                raise imaplib.IMAP4.abort("Connection closed during IDLE")
+            pushed = line.startswith(b'*') and (line.rstrip().endswith(b'EXISTS') or line.rstrip().endswith(b'RECENT'))
+
+        conn.send(b'DONE\r\n')
+        while True:
+            line = conn.readline()
+            if not line:
+                raise imaplib.IMAP4.abort("Connection closed ending IDLE")
+            if line.startswith(tag):
+                break
+            # Anything that arrived in the same packet as the continuation
+            pushed = pushed or (line.startswith(b'*') and line.rstrip().endswith(b'EXISTS'))
+        return pushed
+
+    # -- async API --
+
+    async def fetch_new(self, credential: Dict[str, Any], mailbox: str = "INBOX", criteria: str = "UNSEEN",
+                        fetch_bodies: bool = True, post_process: Optional[str] = None,
+                        scope: str = "", limit: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Messages that arrived since the previous call: headers (and bodies if
+        fetch_bodies) keyed by UID. post_process 'read' flags them \\Seen and
+        'delete' removes them, each with one UID STORE per batch.
+        """
+        key = self.state_key(credential, mailbox, scope)
+        state = await self.store.load(key)
+
+        async with self.pool.connection(credential) as conn:
+            uidvalidity = await asyncio.to_thread(self._select, conn, mailbox, post_process is None)
+            last_uid = state[1] if state and state[0] == uidvalidity else 0
+            if state and state[0] != uidvalidity:
+                logger.info(f"UIDVALIDITY changed for {key}; resyncing from scratch")
+
+            uids = await asyncio.to_thread(self._search, conn, last_uid, criteria)
+            if limit:
+                uids = uids[:int(limit)]
+            headers = await asyncio.to_thread(
+                self._fetch, conn, uids, f"(UID FLAGS RFC822.SIZE BODY.PEEK[HEADER.FIELDS ({HEADER_FIELDS})])"
+            ) if uids else {}
+            bodies = await asyncio.to_thread(self._fetch, conn, uids, "(UID BODY.PEEK[])") if uids and fetch_bodies else {}
+
+            if uids and post_process in ("read", "delete"):
+                flag = "\\Seen" if post_process == "read" else "\\Deleted"
+                await asyncio.to_thread(self._store, conn, uids, flag, post_process == "delete")
+
+        if uids:
+            await self.store.save(key, uidvalidity, max(uids))
+        elif not state or state[0] != uidvalidity:
+            await self.store.save(key, uidvalidity, last_uid)
+
+        messages = []
+        for uid in uids:
+            header = headers.get(uid, {})
+            messages.append({
+                "uid": uid,
+                "flags": header.get("flags", []),
+                "size": header.get("size"),
+                "headers": header.get("literal") or b"",
+                "raw": bodies.get(uid, {}).get("literal")
+            })
+        return {"uidvalidity": uidvalidity, "last_uid": max(uids) if uids else last_uid, "messages": messages}
+
+    async def fetch_bodies(self, credential: Dict[str, Any], mailbox: str, uids: List[int]) -> Dict[int, bytes]:
+        """Full RFC 822 bodies for selected UIDs, fetched on demand"""
+        async with self.pool.connection(credential) as conn:
+            await asyncio.to_thread(self._select, conn, mailbox, True)
+            fetched = await asyncio.to_thread(self._fetch, conn, sorted(uids), "(UID BODY.PEEK[])")
+        return {uid: record["literal"] for uid, record in fetched.items()}
+
+    async def wait_for_new(self, credential: Dict[str, Any], mailbox: str = "INBOX",
+                           timeout: float = IMAP_IDLE_TIMEOUT) -> bool:
+        """Block (without polling) until the server announces new mail or the timeout passes"""
+        async with self.pool.connection(credential) as conn:
+            await asyncio.to_thread(self._select, conn, mailbox, True)
+            return await asyncio.to_thread(self._idle, conn, timeout)
+
+    async def watch(self, credential: Dict[str, Any], mailbox: str = "INBOX",
+                    **fetch_options) -> AsyncIterator[Dict[str, Any]]:
+        """Yield each new message as it arrives: fetch what is new, then IDLE until pushed"""
+        while True:
+            result = await self.fetch_new(credential, mailbox, **fetch_options)
+            for message in result["messages"]:
+                yield message
+            if not result["messages"]:
+                await self.wait_for_new(credential, mailbox)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"pool": self.pool.get_stats(), "fetch_batch": IMAP_FETCH_BATCH, "idle_timeout": IMAP_IDLE_TIMEOUT}
+
+
+imap_connection_pool = ImapConnectionPool()
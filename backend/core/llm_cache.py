@@ -0,0 +1,342 @@
+# backend/core/llm_cache.py
+# Exact-match and semantic response cache in front of LLM completions
+
+import os
+import re
+import json
+import time
+import asyncio
+import hashlib
+import logging
+from array import array
+from math import sqrt
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple, Callable, Awaitable
+
+try:
+    from core.loop_local import LoopLocal
+except ImportError:
+    from backend.core.loop_local import LoopLocal
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+_WHITESPACE = re.compile(r"\s+")
+
+# Completion parameters that change the answer and therefore belong in the key
+KEY_PARAMS = ("temperature", "max_tokens", "top_p", "response_format", "stop", "presence_penalty",
+              "frequency_penalty", "tools", "tool_choice", "system_prompt")
+
+Embedder = Callable[[str], Awaitable[List[float]]]
+
+
+def normalize_text(text: Any) -> str:
+    """Collapse whitespace and case so trivially different prompts share an entry"""
+    return _WHITESPACE.sub(" ", str(text or "")).strip().casefold()
+
+
+def _digest(payload: Any) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def split_prompt(messages: List[Dict[str, Any]]) -> Tuple[List[Tuple[str, str]], str]:
+    """(normalized context messages, normalized last user message)"""
+    normalized = [(m.get("role", ""), normalize_text(m.get("content", ""))) for m in messages]
+    if normalized and normalized[-1][0] == "user":
+        return normalized[:-1], normalized[-1][1]
+    return normalized, ""
+
+
+class CacheEntry:
+    __slots__ = ("value", "expires_at", "partition", "scope", "cost", "vector_id")
+
+    def __init__(self, value: str, expires_at: float, partition: str, scope: Optional[str], cost: float):
+        self.value = value
+        self.expires_at = expires_at
+        self.partition = partition
+        self.scope = scope
+        self.cost = cost
+        self.vector_id: Optional[int] = None
+
+
+class VectorIndex:
+    """
+    Brute-force cosine index over unit vectors for one prompt partition.
+    Uses a numpy matrix when numpy is installed, flat float arrays otherwise;
+    partitions are small (one scope + model + system prompt) so a scan is enough.
+    """
+
+    def __init__(self, max_vectors: int):
+        self.max_vectors = max_vectors
+        self._ids: List[int] = []
+        self._keys: List[str] = []
+        self._vectors: List[array] = []
+        self._matrix = None
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @staticmethod
+    def _unit(vector: List[float]) -> array:
+        norm = sqrt(sum(v * v for v in vector)) or 1.0
+        return array("f", (v / norm for v in vector))
+
+    def add(self, vector_id: int, key: str, vector: List[float]):
+        self._ids.append(vector_id)
+        self._keys.append(key)
+        self._vectors.append(self._unit(vector))
+        if len(self._ids) > self.max_vectors:
+            self._ids.pop(0)
+            self._keys.pop(0)
+            self._vectors.pop(0)
+        self._matrix = None
+
+    def remove(self, vector_id: int):
+        if vector_id in self._ids:
+            position = self._ids.index(vector_id)
+            del self._ids[position], self._keys[position], self._vectors[position]
+            self._matrix = None
+
+    def nearest(self, vector: List[float]) -> Tuple[Optional[str], float]:
+        if not self._ids:
+            return None, 0.0
+        query = self._unit(vector)
+        if NUMPY_AVAILABLE:
+            if self._matrix is None:
+                self._matrix = np.vstack([np.frombuffer(v, dtype=np.float32) for v in self._vectors])
+            scores = self._matrix @ np.frombuffer(query, dtype=np.float32)
+            best = int(scores.argmax())
+            return self._keys[best], float(scores[best])
+        best, best_score = 0, -1.0
+        for position, candidate in enumerate(self._vectors):
+            score = sum(a * b for a, b in zip(candidate, query))
+            if score > best_score:
+                best, best_score = position, score
+        return self._keys[best], best_score
+
+
+class CacheMetrics:
+    def __init__(self):
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.saved_seconds = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        # Coalesced callers did not reach the model either
+        hits = self.exact_hits + self.semantic_hits + self.coalesced
+        lookups = hits + self.misses
+        return {
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            "estimated_seconds_saved": round(self.saved_seconds, 2)
+        }
+
+
+class LLMResponseCache:
+    """
+    Two-tier cache for completion text.
+
+    Exact tier: key = hash(scope, model, key params, normalized messages), kept
+    in one LRU with a TTL. Semantic tier (opt-in per call site): the last user
+    message is embedded and compared against earlier prompts that share
+    everything else (scope, model, params, system/context messages).
+
+    Scopes keep agents apart: "agent:<id>" entries are only ever served to the
+    same agent, and invalidate_scope() drops them when an agent changes.
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv("LLM_CACHE_ENABLED", "true").lower() != "false"
+        self.max_entries = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 2000))
+        self.default_ttl = float(os.getenv("LLM_CACHE_TTL", 3600))
+        self.semantic_enabled = os.getenv("LLM_SEMANTIC_CACHE", "false").lower() == "true"
+        self.semantic_threshold = float(os.getenv("LLM_SEMANTIC_THRESHOLD", 0.95))
+        self.semantic_max_vectors = int(os.getenv("LLM_SEMANTIC_MAX_VECTORS", 500))
+        self.embedding_model = os.getenv("LLM_CACHE_EMBEDDING_MODEL", "text-embedding-3-small")
+
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._indexes: Dict[str, VectorIndex] = {}
+        self._inflight = LoopLocal()
+        self._next_vector_id = 0
+        self.metrics: Dict[str, CacheMetrics] = {}
+
+    def _metrics(self, namespace: str) -> CacheMetrics:
+        if namespace not in self.metrics:
+            self.metrics[namespace] = CacheMetrics()
+        return self.metrics[namespace]
+
+    @staticmethod
+    def make_keys(messages: List[Dict[str, Any]], model: str, params: Dict[str, Any],
+                  scope: Optional[str]) -> Tuple[str, str, str]:
+        """(exact key, semantic partition, normalized query text)"""
+        context, query = split_prompt(messages)
+        key_params = {name: params[name] for name in KEY_PARAMS if params.get(name) is not None}
+        partition = _digest([scope or "global", model, key_params, context])
+        return _digest([partition, query]), partition, query
+
+    # ---- Exact tier ----
+
+    def _lookup(self, key: str) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at < time.monotonic():
+            self._evict(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._lookup(key)
+        return entry.value if entry is not None else None
+
+    def put(self, key: str, value: str, partition: str, scope: Optional[str] = None, ttl: Optional[float] = None,
+            vector: Optional[List[float]] = None, cost: float = 0.0):
+        if key in self._entries:
+            self._evict(key)
+        expires_at = time.monotonic() + (ttl if ttl is not None else self.default_ttl)
+        entry = CacheEntry(value, expires_at, partition, scope, cost)
+        if vector is not None:
+            entry.vector_id = self._next_vector_id
+            self._next_vector_id += 1
+            index = self._indexes.get(partition)
+            if index is None:
+                index = self._indexes[partition] = VectorIndex(self.semantic_max_vectors)
+            index.add(entry.vector_id, key, vector)
+        self._entries[key] = entry
+        while len(self._entries) > self.max_entries:
+            self._evict(next(iter(self._entries)))
+
+    def _evict(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None and entry.vector_id is not None:
+            index = self._indexes.get(entry.partition)
+            if index is not None:
+                index.remove(entry.vector_id)
+                if not len(index):
+                    del self._indexes[entry.partition]
+
+    # ---- Lookup / compute ----
+
+    async def get_or_compute(self, messages: List[Dict[str, Any]], model: str, params: Dict[str, Any],
+                             compute: Callable[[], Awaitable[Optional[str]]], namespace: str = "default",
+                             scope: Optional[str] = None, ttl: Optional[float] = None,
+                             embedder: Optional[Embedder] = None,
+                             cacheable: Optional[Callable[[str], bool]] = None) -> str:
+        """
+        Cached completion text. compute() is only called on a miss; results it
+        returns as None, raises, or that fail `cacheable` are never stored.
+        Identical concurrent prompts wait for the first one instead of calling
+        the model again.
+        """
+        if not self.enabled:
+            return await compute()
+
+        metrics = self._metrics(namespace)
+        key, partition, query = self.make_keys(messages, model, params, scope)
+
+        entry = self._lookup(key)
+        if entry is not None:
+            metrics.exact_hits += 1
+            metrics.saved_seconds += entry.cost
+            return entry.value
+
+        vector = None
+        if embedder is not None and self.semantic_enabled and query:
+            try:
+                vector = await embedder(query)
+            except Exception as e:
+                logger.warning(f"LLM cache embedding failed, using exact match only: {e}")
+            if vector is not None and partition in self._indexes:
+                similar_key, score = self._indexes[partition].nearest(vector)
+                entry = self._lookup(similar_key) if score >= self.semantic_threshold else None
+                if entry is not None:
+                    metrics.semantic_hits += 1
+                    metrics.saved_seconds += entry.cost
+                    return entry.value
+
+        inflight = self._inflight.current()
+        pending = inflight.get(key)
+        if pending is not None:
+            metrics.coalesced += 1
+            return await asyncio.shield(pending)
+
+        metrics.misses += 1
+        started = time.monotonic()
+        task = asyncio.ensure_future(compute())
+        inflight[key] = task
+        try:
+            value = await asyncio.shield(task)
+        finally:
+            inflight.pop(key, None)
+
+        if value is not None and (cacheable is None or cacheable(value)):
+            # Each later hit saves roughly what this call cost
+            self.put(key, value, partition, scope, ttl, vector, cost=time.monotonic() - started)
+        return value
+
+    async def chat_completion(self, client, namespace: str, scope: Optional[str] = None,
+                              ttl: Optional[float] = None, semantic: bool = False,
+                              cacheable: Optional[Callable[[str], bool]] = None, **create_kwargs) -> str:
+        """
+        Cached `client.chat.completions.create(**create_kwargs)` returning the
+        message content, for the OpenAI-compatible pooled clients.
+        """
+        model = create_kwargs.get("model", "")
+        messages = create_kwargs.get("messages", [])
+
+        async def compute() -> Optional[str]:
+            response = await client.chat.completions.create(**create_kwargs)
+            return response.choices[0].message.content
+
+        embedder = self.openai_embedder(client) if semantic else None
+        return await self.get_or_compute(messages, model, create_kwargs, compute, namespace, scope, ttl,
+                                         embedder, cacheable)
+
+    def openai_embedder(self, client) -> Embedder:
+        async def embed(text: str) -> List[float]:
+            response = await client.embeddings.create(model=self.embedding_model, input=text)
+            return response.data[0].embedding
+        return embed
+
+    # ---- Maintenance / reporting ----
+
+    def invalidate_scope(self, scope: str) -> int:
+        """Drop every entry of one scope (e.g. after an agent's configuration changed)"""
+        keys = [key for key, entry in self._entries.items() if entry.scope == scope]
+        for key in keys:
+            self._evict(key)
+        return len(keys)
+
+    def clear(self):
+        self._entries.clear()
+        self._indexes.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.default_ttl,
+            "semantic_enabled": self.semantic_enabled,
+            "semantic_partitions": len(self._indexes),
+            "namespaces": {name: metrics.to_dict() for name, metrics in self.metrics.items()}
+        }
+
+
+# Global cache shared by the agent engines, workflow selector and LLM router
+llm_cache = LLMResponseCache()
+
+
+def get_llm_cache() -> LLMResponseCache:
+    return llm_cache
@@ -0,0 +1,319 @@
+# backend/core/llm_client_pool.py
+# Process-wide registry of pooled LLM clients shared by every agent engine
+
+import os
+import time
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    from openai import AsyncOpenAI
+    import httpx
+    OPENAI_AVAILABLE = True
+except ImportError:
+    OPENAI_AVAILABLE = False
+
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+try:
+    from core.loop_local import LoopLocal
+except ImportError:
+    from backend.core.loop_local import LoopLocal
+
+
+class ProviderMetrics:
+    """Counters for one LLM provider"""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.queued = 0
+        self.requests_total = 0
+        self.errors_total = 0
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+        self.client_borrows = 0
+        self.clients_created = 0
+        self.connections_created = 0
+        self.connections_reused = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        requests = max(self.requests_total, 1)
+        connections = self.connections_created + self.connections_reused
+        return {
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "requests_total": self.requests_total,
+            "errors_total": self.errors_total,
+            "queue_wait_avg_ms": round(self.queue_wait_total / requests * 1000, 2),
+            "queue_wait_max_ms": round(self.queue_wait_max * 1000, 2),
+            "client_borrows": self.client_borrows,
+            "clients_created": self.clients_created,
+            "connections_created": self.connections_created,
+            "connections_reused": self.connections_reused,
+            "connection_reuse_ratio": round(self.connections_reused / connections, 3) if connections else 0.0
+        }
+
+
+class _ConnectionTrace:
+    """httpcore trace callback recording whether a request had to open a connection"""
+
+    CONNECT_EVENTS = ("connection.connect_tcp.complete", "connection.connect_unix_socket.complete")
+
+    def __init__(self):
+        self.connected = False
+
+    async def __call__(self, event_name: str, info: Dict[str, Any]):
+        if event_name in self.CONNECT_EVENTS:
+            self.connected = True
+
+
+class _LimitedCompletions:
+    """chat.completions facade that runs create() under the provider limit"""
+
+    def __init__(self, registry: "LLMClientRegistry", provider: str, client: "PooledOpenAIClient"):
+        self._registry = registry
+        self._provider = provider
+        self._client = client
+
+    async def create(self, *args, **kwargs):
+        async with self._registry.limit(self._provider):
+            return await self._client.current().chat.completions.create(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._client.current().chat.completions, name)
+
+
+class _LimitedChat:
+    def __init__(self, registry: "LLMClientRegistry", provider: str, client: "PooledOpenAIClient"):
+        self._client = client
+        self.completions = _LimitedCompletions(registry, provider, client)
+
+    def __getattr__(self, name):
+        return getattr(self._client.current().chat, name)
+
+
+class PooledOpenAIClient:
+    """
+    Shared handle for one credential. The AsyncOpenAI client behind it (and
+    its httpx connection pool) belongs to an event loop, so it is looked up
+    per running loop on every use; chat completions go through the registry
+    limiter.
+    """
+
+    def __init__(self, registry: "LLMClientRegistry", provider: str, key: str,
+                 factory: Callable[[], Any]):
+        self._registry = registry
+        self._key = key
+        self._factory = factory
+        self.chat = _LimitedChat(registry, provider, self)
+
+    def current(self):
+        """The running loop's AsyncOpenAI client for this credential"""
+        return self._registry._openai_client(self._key, self._factory)
+
+    def __getattr__(self, name):
+        return getattr(self.current(), name)
+
+
+class LLMClientRegistry:
+    """
+    One keep-alive connection pool per provider/credential for the whole process.
+    Engines borrow clients instead of constructing their own, and every request
+    is bounded by a per-provider concurrency limit.
+    """
+
+    def __init__(self):
+        self.max_connections = int(os.getenv("LLM_MAX_CONNECTIONS", 50))
+        self.max_keepalive = int(os.getenv("LLM_MAX_KEEPALIVE", 20))
+        self.keepalive_expiry = float(os.getenv("LLM_KEEPALIVE_EXPIRY", 30))
+        self.request_timeout = float(os.getenv("LLM_REQUEST_TIMEOUT", 60))
+        self.default_concurrency = int(os.getenv("LLM_MAX_CONCURRENCY", 16))
+        self.provider_concurrency = {
+            "openai": int(os.getenv("OPENAI_MAX_CONCURRENCY", self.default_concurrency)),
+            "deepseek": int(os.getenv("DEEPSEEK_MAX_CONCURRENCY", self.default_concurrency)),
+            "ollama": int(os.getenv("OLLAMA_MAX_CONCURRENCY", 4)),
+        }
+
+        self._openai_handles: Dict[str, PooledOpenAIClient] = {}
+        self._openai_clients = LoopLocal()
+        self._http_sessions = LoopLocal()
+        self._semaphores = LoopLocal()
+        self.metrics: Dict[str, ProviderMetrics] = {}
+
+    def _metrics(self, provider: str) -> ProviderMetrics:
+        if provider not in self.metrics:
+            self.metrics[provider] = ProviderMetrics()
+        return self.metrics[provider]
+
+    def _semaphore(self, provider: str) -> asyncio.Semaphore:
+        semaphore = self._semaphores.get(provider)
+        if semaphore is None:
+            limit = self.provider_concurrency.get(provider, self.default_concurrency)
+            semaphore = self._semaphores.set(provider, asyncio.Semaphore(limit))
+        return semaphore
+
+    @asynccontextmanager
+    async def limit(self, provider: str):
+        """Hold one of the provider's concurrency slots for the duration of a request"""
+        metrics = self._metrics(provider)
+        semaphore = self._semaphore(provider)
+
+        metrics.queued += 1
+        started = time.perf_counter()
+        try:
+            await semaphore.acquire()
+        finally:
+            metrics.queued -= 1
+        waited = time.perf_counter() - started
+        metrics.queue_wait_total += waited
+        metrics.queue_wait_max = max(metrics.queue_wait_max, waited)
+
+        metrics.in_flight += 1
+        metrics.requests_total += 1
+        try:
+            yield
+        except Exception:
+            metrics.errors_total += 1
+            raise
+        finally:
+            metrics.in_flight -= 1
+            semaphore.release()
+
+    def get_openai_client(self, api_key: Optional[str] = None, provider: str = "openai",
+                          base_url: Optional[str] = None) -> Optional[PooledOpenAIClient]:
+        """Borrow the shared AsyncOpenAI client for a credential (one per event loop)"""
+        if not OPENAI_AVAILABLE:
+            return None
+
+        api_key = api_key or os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            return None
+
+        self._metrics(provider).client_borrows += 1
+
+        cache_key = f"{provider}:{base_url or ''}:{api_key}"
+        handle = self._openai_handles.get(cache_key)
+        if handle is None:
+            handle = PooledOpenAIClient(
+                self, provider, cache_key, lambda: self._create_openai_client(provider, api_key, base_url))
+            self._openai_handles[cache_key] = handle
+        return handle
+
+    def _openai_client(self, key: str, factory: Callable[[], Any]):
+        client = self._openai_clients.get(key)
+        if client is None:
+            client = self._openai_clients.set(key, factory())
+        return client
+
+    def _create_openai_client(self, provider: str, api_key: str, base_url: Optional[str]):
+        metrics = self._metrics(provider)
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive,
+                keepalive_expiry=self.keepalive_expiry
+            ),
+            timeout=self.request_timeout,
+            event_hooks=self._connection_hooks(metrics)
+        )
+        kwargs = {"api_key": api_key, "http_client": http_client}
+        if base_url:
+            kwargs["base_url"] = base_url
+        client = AsyncOpenAI(**kwargs)
+        metrics.clients_created += 1
+        logger.info(f"🔌 Created pooled {provider} client ({len(self._openai_clients) + 1} total)")
+        return client
+
+    @staticmethod
+    def _connection_hooks(metrics: ProviderMetrics) -> Dict[str, list]:
+        """httpx event hooks counting new vs reused connections, like the aiohttp trace config"""
+
+        async def on_request(request):
+            request.extensions["trace"] = _ConnectionTrace()
+
+        async def on_response(response):
+            trace = response.request.extensions.get("trace")
+            if isinstance(trace, _ConnectionTrace):
+                if trace.connected:
+                    metrics.connections_created += 1
+                else:
+                    metrics.connections_reused += 1
+
+        return {"request": [on_request], "response": [on_response]}
+
+    def get_http_session(self, provider: str):
+        """Shared aiohttp session with a bounded keep-alive connector for raw HTTP providers"""
+        if not AIOHTTP_AVAILABLE:
+            raise RuntimeError("aiohttp is not installed")
+
+        metrics = self._metrics(provider)
+        metrics.client_borrows += 1
+
+        session = self._http_sessions.get(provider)
+        if session is None or session.closed:
+            trace_config = aiohttp.TraceConfig()
+
+            async def on_connection_create_end(session, context, params):
+                metrics.connections_created += 1
+
+            async def on_connection_reuseconn(session, context, params):
+                metrics.connections_reused += 1
+
+            trace_config.on_connection_create_end.append(on_connection_create_end)
+            trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.provider_concurrency.get(provider, self.default_concurrency),
+                keepalive_timeout=self.keepalive_expiry
+            )
+            session = aiohttp.ClientSession(connector=connector, trace_configs=[trace_config])
+            self._http_sessions.set(provider, session)
+            metrics.clients_created += 1
+            logger.info(f"🔌 Created pooled HTTP session for {provider}")
+        return session
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "providers": {name: metrics.to_dict() for name, metrics in self.metrics.items()},
+            "openai_clients": len(self._openai_clients),
+            "http_sessions": len(self._http_sessions),
+            "limits": {
+                "max_connections": self.max_connections,
+                "max_keepalive": self.max_keepalive,
+                "provider_concurrency": dict(self.provider_concurrency)
+            }
+        }
+
+    async def close(self):
+        """Close all pooled clients (called on application shutdown)"""
+        await self._openai_clients.close_all(_close_openai_client)
+        await self._http_sessions.close_all(_close_session)
+        self._semaphores.clear()
+        self._openai_handles.clear()
+        logger.info("✅ LLM client pool closed")
+
+
+async def _close_openai_client(client):
+    await client.close()
+
+
+async def _close_session(session):
+    if not session.closed:
+        await session.close()
+
+
+# Global registry instance
+llm_client_registry = LLMClientRegistry()
+
+
+def get_llm_client_registry() -> LLMClientRegistry:
+    return llm_client_registry
@@ -6,6 +6,9 @@ import requests
 import asyncio
 import aiohttp
 import logging
+import threading
+from .llm_client_pool import llm_client_registry
+from .llm_cache import llm_cache
 from typing import List, Dict, AsyncGenerator, Optional, Any
 from dataclasses import dataclass
 
@@ -103,7 +106,7 @@ class MCPLLMRouter:
             async for chunk in self._stream_ollama(provider_config, messages, config):
                 yield chunk
         elif provider in ["openai", "deepseek"]:
-            async for chunk in self._stream_openai_compatible(provider_config, messages, config):
+            async for chunk in self._stream_openai_compatible(provider, provider_config, messages, config):
                 yield chunk
         else:
             raise ValueError(f"Unsupported provider: {provider}")
@@ -153,7 +156,8 @@ class MCPLLMRouter:
             }
         }
         
-        async with aiohttp.ClientSession() as session:
+        session = llm_client_registry.get_http_session("ollama")
+        async with llm_client_registry.limit("ollama"):
             async with session.post(url, json=payload) as response:
                 if response.status != 200:
                     raise Exception(f"Ollama error: {response.status}")
@@ -169,7 +173,7 @@ class MCPLLMRouter:
                         except json.JSONDecodeError:
                             continue
     
-    async def _stream_openai_compatible(self, provider_config: Dict, messages: List[Dict[str, str]], config: LLMConfig) -> AsyncGenerator[str, None]:
+    async def _stream_openai_compatible(self, provider: str, provider_config: Dict, messages: List[Dict[str, str]], config: LLMConfig) -> AsyncGenerator[str, None]:
         """Stream from OpenAI-compatible API"""
         url = f"{provider_config['url']}{provider_config['endpoint']}"
         headers = {
@@ -186,7 +190,8 @@ class MCPLLMRouter:
             "top_p": config.top_p
         }
         
-        async with aiohttp.ClientSession() as session:
+        session = llm_client_registry.get_http_session(provider)
+        async with llm_client_registry.limit(provider):
             async with session.post(url, json=payload, headers=headers) as response:
                 if response.status != 200:
                     raise Exception(f"API error: {response.status}")
@@ -205,16 +210,31 @@ class MCPLLMRouter:
                             except json.JSONDecodeError:
                                 continue
 
-    async def complete(self, messages: List[Dict[str, str]], config: LLMConfig = None) -> str:
-        """Get a complete response from LLM (non-streaming)"""
+    async def complete(self, messages: List[Dict[str, str]], config: LLMConfig = None,
+                       cache_scope: Optional[str] = None) -> str:
+        """Get a complete response from LLM (non-streaming), served from the response cache when possible"""
         if config is None:
             config = LLMConfig()
-            
-        full_response = ""
-        try:
+        
+        async def generate() -> str:
+            full_response = ""
             async for chunk in self.stream_response(messages, config):
                 full_response += chunk
             return full_response
+        
+        params = {
+            "temperature": config.temperature,
+            "max_tokens": config.max_tokens,
+            "top_p": config.top_p,
+            "system_prompt": config.system_prompt
+        }
+        try:
+            return await llm_cache.get_or_compute(
+                messages, config.model, params, generate,
+                namespace="llm_router",
+                scope=cache_scope,
+                cacheable=lambda text: bool(text) and "[Error]" not in text
+            )
         except Exception as e:
             logger.error(f"LLM completion error: {e}")
             # Return a basic JSON response for automation to continue
@@ -228,6 +248,18 @@ class MCPLLMRouter:
 # Global router instance
 llm_router = MCPLLMRouter()
 
+# Sync callers share one long-lived loop, so the pooled sessions it creates are reused across calls
+_ask_loop: Optional[asyncio.AbstractEventLoop] = None
+_ask_loop_lock = threading.Lock()
+
+def _get_ask_loop() -> asyncio.AbstractEventLoop:
+    global _ask_loop
+    with _ask_loop_lock:
+        if _ask_loop is None or _ask_loop.is_closed():
+            _ask_loop = asyncio.new_event_loop()
+            threading.Thread(target=_ask_loop.run_forever, name="ask-mcp-loop", daemon=True).start()
+        return _ask_loop
+
 def ask_mcp(memory: List[Dict[str, str]], config: Optional[Dict[str, Any]] = None) -> str:
     """
     Enhanced synchronous LLM request with better error handling
@@ -237,22 +269,21 @@ def ask_mcp(memory: List[Dict[str, str]], config: Optional[Dict[str, Any]] = Non
         llm_config = LLMConfig(**(config or {}))
         llm_config.stream = False  # Force non-streaming for sync function
         
-        # Run async function in sync context
-        loop = None
+        # Run async function in sync context, on the shared loop
+        loop = _get_ask_loop()
         try:
-            loop = asyncio.get_event_loop()
+            running = asyncio.get_running_loop()
         except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
+            running = None
+        if running is loop:
+            raise RuntimeError("ask_mcp is synchronous; await _async_ask_mcp on the ask_mcp loop instead")
         
-        if loop.is_running():
-            # If loop is running, create a new thread
-            import concurrent.futures
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                future = executor.submit(asyncio.run, _async_ask_mcp(memory, llm_config))
-                return future.result(timeout=60)
-        else:
-            return loop.run_until_complete(_async_ask_mcp(memory, llm_config))
+        future = asyncio.run_coroutine_threadsafe(_async_ask_mcp(memory, llm_config), loop)
+        try:
+            return future.result(timeout=60)
+        except BaseException:
+            future.cancel()
+            raise
             
     except Exception as e:
         logger.error(f"❌ MCP LLM request failed: {e}")
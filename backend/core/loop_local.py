@@ -0,0 +1,98 @@
+# backend/core/loop_local.py
+# Per-event-loop storage for the asyncio objects owned by process-wide singletons
+
+import asyncio
+import logging
+import weakref
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class LoopLocal:
+    """
+    Values keyed by event loop, then by a caller key.
+
+    Sessions, connectors, semaphores, queues and pools are bound to the loop
+    that created them, while the registries holding them are shared by every
+    loop in the process (the application loop, the ask_mcp loop, tests).
+    Entries are held against the loop object itself, weakly, so a loop that
+    goes away takes its entries with it and a recycled id() can never hand
+    out an object bound to a dead loop. Entries of a loop that was closed
+    while still referenced are dropped on the next access and passed to
+    `on_discard` so blocking resources can be released.
+    """
+
+    def __init__(self, on_discard: Optional[Callable[[Any], None]] = None):
+        self._loops: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Hashable, Any]]" = \
+            weakref.WeakKeyDictionary()
+        self._on_discard = on_discard
+
+    def current(self) -> Dict[Hashable, Any]:
+        """The running loop's entries (a plain dict the caller may update)"""
+        loop = asyncio.get_running_loop()
+        self.sweep()
+        values = self._loops.get(loop)
+        if values is None:
+            values = self._loops[loop] = {}
+        return values
+
+    def of(self, loop: asyncio.AbstractEventLoop) -> Dict[Hashable, Any]:
+        """A given loop's entries, without creating a slot for it"""
+        return self._loops.get(loop, {})
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        return self.current().get(key, default)
+
+    def set(self, key: Hashable, value: Any) -> Any:
+        self.current()[key] = value
+        return value
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        return self.current().pop(key, default)
+
+    def items(self) -> Iterator[Tuple[asyncio.AbstractEventLoop, Hashable, Any]]:
+        """(loop, key, value) for every live entry on every loop"""
+        for loop, values in list(self._loops.items()):
+            for key, value in list(values.items()):
+                yield loop, key, value
+
+    def values(self) -> Iterator[Any]:
+        for _, _, value in self.items():
+            yield value
+
+    def __len__(self) -> int:
+        return sum(len(values) for values in list(self._loops.values()))
+
+    def sweep(self):
+        """Forget the entries of loops that have been closed"""
+        for loop in [loop for loop in list(self._loops.keys()) if loop.is_closed()]:
+            for value in self._loops.pop(loop, {}).values():
+                if self._on_discard is not None:
+                    try:
+                        self._on_discard(value)
+                    except Exception as e:
+                        logger.warning(f"Error discarding {type(value).__name__} of a closed loop: {e}")
+
+    def clear(self):
+        self._loops.clear()
+
+    async def close_all(self, closer: Callable[[Any], Awaitable[Any]]):
+        """
+        Close every entry on the loop that owns it, then forget them all.
+        Entries of another running loop are closed there; entries of a loop
+        that is no longer running can't be awaited and are discarded.
+        """
+        running = asyncio.get_running_loop()
+        for loop, values in list(self._loops.items()):
+            for value in values.values():
+                try:
+                    if loop is running:
+                        await closer(value)
+                    elif loop.is_running():
+                        await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(closer(value), loop))
+                    elif self._on_discard is not None:
+                        self._on_discard(value)
+                except Exception as e:
+                    logger.warning(f"Error closing {type(value).__name__}: {e}")
+        self._loops.clear()
@@ -0,0 +1,178 @@
+# backend/core/pagination.py
+# Auto-paginating async iterators for SaaS driver list operations
+
+import os
+import json
+import asyncio
+import logging
+import tempfile
+from typing import Dict, Any, List, Optional, Tuple, Callable, Awaitable, AsyncIterator
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = int(os.getenv("PAGINATION_BATCH_SIZE", 100))
+
+# fetch_page(cursor) -> (items, next_cursor); next_cursor None means last page
+PageFetcher = Callable[[Optional[Any]], Awaitable[Tuple[List[Any], Optional[Any]]]]
+
+
+class PageError(Exception):
+    """A page request failed; the message is the provider's error"""
+
+
+async def page_error(response, message: Callable[[Any], Optional[str]]) -> PageError:
+    """
+    PageError for a failed page response. The body is read as text so a
+    non-JSON error (a proxy's 502 page) still becomes a PageError;
+    message(data) picks the provider's error out of a JSON body.
+    """
+    body = await response.text()
+    try:
+        detail = message(json.loads(body) or {})
+    except (ValueError, TypeError, LookupError, AttributeError):
+        detail = None
+    return PageError(detail or f"HTTP {response.status}: {body.strip()[:200] or 'Unknown error'}")
+
+
+class PageIterator:
+    """
+    Follows a provider's cursor (starting_after, offset token, next_token, ...)
+    page by page. While the caller consumes one page the next one is already
+    being fetched, and only those two pages are held in memory.
+
+        async for customer in driver.iter_customers(api_key):
+            ...
+        async for batch in driver.iter_customers(api_key).batches(500):
+            ...
+    """
+
+    def __init__(self, fetch_page: PageFetcher, start_cursor: Optional[Any] = None,
+                 max_items: Optional[int] = None, prefetch: bool = True):
+        self.fetch_page = fetch_page
+        self.start_cursor = start_cursor
+        self.max_items = max_items
+        self.prefetch = prefetch
+        self.pages_fetched = 0
+        self.items_yielded = 0
+
+    async def pages(self) -> AsyncIterator[List[Any]]:
+        pending = asyncio.ensure_future(self.fetch_page(self.start_cursor))
+        try:
+            while pending is not None:
+                items, next_cursor = await pending
+                pending = None
+                self.pages_fetched += 1
+
+                if self.max_items is not None:
+                    items = items[:max(self.max_items - self.items_yielded, 0)]
+                    if self.items_yielded + len(items) >= self.max_items:
+                        next_cursor = None
+
+                if next_cursor is not None and self.prefetch:
+                    pending = asyncio.ensure_future(self.fetch_page(next_cursor))
+
+                if items:
+                    self.items_yielded += len(items)
+                    yield items
+
+                if next_cursor is not None and pending is None:
+                    pending = asyncio.ensure_future(self.fetch_page(next_cursor))
+        finally:
+            if pending is not None and not pending.done():
+                pending.cancel()
+
+    async def batches(self, size: int = DEFAULT_BATCH_SIZE) -> AsyncIterator[List[Any]]:
+        """Items regrouped into lists of at most `size`, independent of the provider's page size"""
+        size = max(int(size), 1)
+        buffer: List[Any] = []
+        async for page in self.pages():
+            buffer.extend(page)
+            while len(buffer) >= size:
+                yield buffer[:size]
+                buffer = buffer[size:]
+        if buffer:
+            yield buffer
+
+    async def __aiter__(self):
+        async for page in self.pages():
+            for item in page:
+                yield item
+
+
+def wants_all_pages(parameters: Dict[str, Any]) -> bool:
+    """n8n-style returnAll flag (also accepts return_all)"""
+    value = parameters.get("returnAll", parameters.get("return_all", False))
+    if isinstance(value, str):
+        return value.strip().lower() in ("true", "1", "yes")
+    return bool(value)
+
+
+def page_options(parameters: Dict[str, Any]) -> Dict[str, Any]:
+    """max_items / batch_size / output_file / streaming options shared by all list operations"""
+    max_items = parameters.get("max_items")
+    return {
+        "max_items": int(max_items) if max_items not in (None, "") else None,
+        "batch_size": int(parameters.get("batch_size", DEFAULT_BATCH_SIZE)),
+        "output_file": parameters.get("output_file"),
+        "streaming": bool(parameters.get("streaming", False))
+    }
+
+
+async def collect_pages(iterator: PageIterator, parameters: Dict[str, Any], label: str) -> Dict[str, Any]:
+    """
+    Drain a PageIterator into a driver result.
+
+    With output_file (or streaming=true) items are written as JSON lines batch
+    by batch and only the file path is returned, so memory stays constant no
+    matter how many records the provider has.
+    """
+    options = page_options(parameters)
+    count = 0
+    batches = 0
+
+    try:
+        if options["output_file"] or options["streaming"]:
+            output_path = options["output_file"]
+            if not output_path:
+                fd, output_path = tempfile.mkstemp(prefix=f"{label.replace(' ', '_')}_", suffix=".jsonl")
+                os.close(fd)
+
+            with open(output_path, "w", encoding="utf-8") as f:
+                async for batch in iterator.batches(options["batch_size"]):
+                    lines = "".join(json.dumps(item, default=str) + "\n" for item in batch)
+                    await asyncio.to_thread(f.write, lines)
+                    count += len(batch)
+                    batches += 1
+
+            return {
+                "success": True,
+                "file_path": output_path,
+                "format": "jsonl",
+                "count": count,
+                "batches": batches,
+                "pages": iterator.pages_fetched,
+                "message": f"{count} {label} written to {output_path}"
+            }
+
+        items: List[Any] = []
+        async for batch in iterator.batches(options["batch_size"]):
+            items.extend(batch)
+            batches += 1
+
+        return {
+            "success": True,
+            "data": items,
+            "count": len(items),
+            "batches": batches,
+            "pages": iterator.pages_fetched,
+            "message": f"{len(items)} {label} retrieved successfully"
+        }
+
+    except PageError as e:
+        logger.error(f"Paginated {label} listing stopped after {iterator.pages_fetched} pages: {e}")
+        return {
+            "success": False,
+            "error": str(e),
+            "count": iterator.items_yielded,
+            "pages": iterator.pages_fetched
+        }
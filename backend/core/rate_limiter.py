@@ -0,0 +1,403 @@
+# backend/core/rate_limiter.py
+# Rate-limit-aware request scheduling for third-party API drivers
+
+import os
+import json
+import time
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, Optional, Tuple
+
+try:
+    from core.loop_local import LoopLocal
+except ImportError:
+    from backend.core.loop_local import LoopLocal
+
+logger = logging.getLogger(__name__)
+
+# (burst capacity, requests per second) used until response headers say otherwise.
+# Override with RATE_LIMIT_<SERVICE>="<requests>/<seconds>", e.g. RATE_LIMIT_STRIPE="100/1"
+DEFAULT_LIMITS: Dict[str, Tuple[float, float]] = {
+    "stripe": (25, 25.0),       # test-mode limit; live mode allows 100/s
+    "twitter": (50, 1.0),       # per-endpoint 15 minute windows, learned from headers
+    "trello": (100, 10.0),      # 100 requests / 10 s per token
+    "asana": (150, 2.5),        # 150 requests / minute on the free tier
+    "hubspot": (100, 10.0),     # 100 requests / 10 s per private app
+}
+FALLBACK_LIMIT = (10, 5.0)
+
+# Header spellings used by the supported providers
+LIMIT_HEADERS = ("x-ratelimit-limit", "x-rate-limit-limit", "x-hubspot-ratelimit-max",
+                 "x-rate-limit-api-token-max")
+REMAINING_HEADERS = ("x-ratelimit-remaining", "x-rate-limit-remaining", "x-hubspot-ratelimit-remaining",
+                     "x-rate-limit-api-token-remaining")
+INTERVAL_MS_HEADERS = ("x-hubspot-ratelimit-interval-milliseconds", "x-rate-limit-api-token-interval-ms")
+RESET_HEADERS = ("x-ratelimit-reset", "x-rate-limit-reset")
+
+RETRYABLE_STATUSES = (429, 503)
+
+
+def _header(headers: Dict[str, str], names) -> Optional[float]:
+    for name in names:
+        value = headers.get(name)
+        if value is not None:
+            try:
+                return float(value)
+            except ValueError:
+                continue
+    return None
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After as seconds from now (delta-seconds or HTTP-date)"""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def credential_fingerprint(credential: str) -> str:
+    """Short stable id for a credential so raw keys are never stored or reported"""
+    return hashlib.sha256(credential.encode("utf-8")).hexdigest()[:12]
+
+
+class TokenBucket:
+    """
+    Token bucket that hands out reservations instead of rejecting: a request
+    always takes a token, and the deficit below zero is the time it has to
+    wait. Callers are therefore served in arrival order without a queue object,
+    which also keeps the bucket usable from several event loops.
+    """
+
+    def __init__(self, capacity: float, refill_rate: float):
+        self.capacity = float(capacity)
+        self.refill_rate = float(refill_rate)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.learned = False
+        self.waiting = 0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_rate)
+        self.updated = now
+
+    def reserve(self) -> float:
+        """Take one token; returns how long the caller must wait before sending"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= 1
+            wait = -self.tokens / self.refill_rate if self.tokens < 0 else 0.0
+            return max(wait, self.blocked_until - now, 0.0)
+
+    def block_for(self, seconds: float):
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.blocked_until = max(self.blocked_until, now + seconds)
+            # Whatever was left is not really available any more
+            self.tokens = min(self.tokens, 0.0)
+
+    def learn(self, headers: Dict[str, str]):
+        """Adopt the provider's limit, window and remaining budget from response headers"""
+        limit = _header(headers, LIMIT_HEADERS)
+        remaining = _header(headers, REMAINING_HEADERS)
+        interval_ms = _header(headers, INTERVAL_MS_HEADERS)
+        reset = _header(headers, RESET_HEADERS)
+        if limit is None and remaining is None:
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.learned = True
+            if limit and limit > 0:
+                self.capacity = limit
+                if interval_ms and interval_ms > 0:
+                    self.refill_rate = limit / (interval_ms / 1000.0)
+            if remaining is not None:
+                self.tokens = min(self.tokens, remaining)
+                if remaining <= 0 and reset is not None:
+                    # Reset is an epoch timestamp (Twitter, GitHub style) or seconds from now
+                    delay = reset - time.time() if reset > 1e9 else reset
+                    if delay > 0:
+                        self.blocked_until = max(self.blocked_until, now + delay)
+
+    def budget(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            return {
+                "remaining": max(int(self.tokens), 0),
+                "capacity": int(self.capacity),
+                "refill_per_second": round(self.refill_rate, 3),
+                "blocked_for_seconds": round(max(self.blocked_until - now, 0.0), 3),
+                "queued": self.waiting,
+                "learned_from_headers": self.learned
+            }
+
+    def estimate_wait(self, requests: int = 1) -> float:
+        """Seconds until `requests` more calls could be sent, without reserving them"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            deficit = requests - self.tokens
+            wait = deficit / self.refill_rate if deficit > 0 else 0.0
+            return max(wait, self.blocked_until - now, 0.0)
+
+
+class BufferedResponse:
+    """Fully read response; safe to hand to every caller of a coalesced request"""
+
+    def __init__(self, status: int, headers, body: bytes, reason: str = "", url: str = ""):
+        self.status = status
+        self.headers = headers
+        self.reason = reason
+        self.url = url
+        self._body = body
+
+    @property
+    def ok(self) -> bool:
+        return self.status < 400
+
+    async def read(self) -> bytes:
+        return self._body
+
+    async def text(self, encoding: str = "utf-8") -> str:
+        return self._body.decode(encoding, errors="replace")
+
+    async def json(self, **kwargs) -> Any:
+        text = self._body.decode("utf-8", errors="replace").strip()
+        return json.loads(text) if text else None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+class _ScheduledRequest:
+    """Awaitable context manager returned by RateLimitedSession.get/post/..."""
+
+    def __init__(self, session: "RateLimitedSession", method: str, url: str, kwargs: Dict[str, Any]):
+        self._session = session
+        self._method = method
+        self._url = url
+        self._kwargs = kwargs
+
+    def __await__(self):
+        return self._session._request(self._method, self._url, self._kwargs).__await__()
+
+    async def __aenter__(self) -> BufferedResponse:
+        return await self._session._request(self._method, self._url, self._kwargs)
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+class RateLimitedSession:
+    """Wraps a client session so every request goes through a credential's bucket"""
+
+    def __init__(self, session, scheduler: "RateLimitScheduler", service: str, credential: str):
+        self._session = session
+        self._scheduler = scheduler
+        self.service = service
+        self.credential_id = credential_fingerprint(credential)
+
+    def request(self, method: str, url: str, **kwargs) -> _ScheduledRequest:
+        return _ScheduledRequest(self, method.upper(), url, kwargs)
+
+    def get(self, url: str, **kwargs) -> _ScheduledRequest:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> _ScheduledRequest:
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url: str, **kwargs) -> _ScheduledRequest:
+        return self.request("PUT", url, **kwargs)
+
+    def patch(self, url: str, **kwargs) -> _ScheduledRequest:
+        return self.request("PATCH", url, **kwargs)
+
+    def delete(self, url: str, **kwargs) -> _ScheduledRequest:
+        return self.request("DELETE", url, **kwargs)
+
+    async def _request(self, method: str, url: str, kwargs: Dict[str, Any]) -> BufferedResponse:
+        return await self._scheduler.request(self._session, self.service, self.credential_id, method, url, kwargs)
+
+
+class ServiceRateStats:
+    def __init__(self):
+        self.requests = 0
+        self.throttled = 0
+        self.wait_seconds = 0.0
+        self.retries = 0
+        self.coalesced = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "throttled": self.throttled,
+            "wait_seconds": round(self.wait_seconds, 3),
+            "rate_limit_retries": self.retries,
+            "coalesced": self.coalesced
+        }
+
+
+class RateLimitScheduler:
+    """
+    Per-credential token buckets shared by the SaaS drivers.
+
+    Requests wait for their bucket instead of failing, limits are learned from
+    Retry-After / X-RateLimit-* headers, 429s are retried after the advertised
+    delay, and identical concurrent GETs for one credential share one call.
+    """
+
+    def __init__(self):
+        self.max_retries = int(os.getenv("RATE_LIMIT_MAX_RETRIES", 3))
+        self.max_buckets = int(os.getenv("RATE_LIMIT_MAX_BUCKETS", 1024))
+        self._buckets: "OrderedDict[Tuple[str, str], TokenBucket]" = OrderedDict()
+        self._buckets_lock = threading.Lock()
+        self._inflight = LoopLocal()
+        self.stats: Dict[str, ServiceRateStats] = {}
+
+    def _default_limit(self, service: str) -> Tuple[float, float]:
+        override = os.getenv(f"RATE_LIMIT_{service.upper()}")
+        if override:
+            try:
+                requests, seconds = override.split("/", 1)
+                return float(requests), float(requests) / float(seconds)
+            except (ValueError, ZeroDivisionError):
+                logger.warning(f"Ignoring invalid RATE_LIMIT_{service.upper()}={override!r}")
+        return DEFAULT_LIMITS.get(service, FALLBACK_LIMIT)
+
+    def _bucket(self, service: str, credential_id: str) -> TokenBucket:
+        key = (service, credential_id)
+        with self._buckets_lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = TokenBucket(*self._default_limit(service))
+                self._buckets[key] = bucket
+                if len(self._buckets) > self.max_buckets:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+            return bucket
+
+    def _stats(self, service: str) -> ServiceRateStats:
+        if service not in self.stats:
+            self.stats[service] = ServiceRateStats()
+        return self.stats[service]
+
+    def wrap(self, session, service: str, credential: str) -> RateLimitedSession:
+        return RateLimitedSession(session, self, service, credential)
+
+    async def acquire(self, service: str, credential_id: str):
+        """Wait for this credential's next slot"""
+        bucket = self._bucket(service, credential_id)
+        stats = self._stats(service)
+        wait = bucket.reserve()
+        if wait <= 0:
+            return
+        stats.throttled += 1
+        bucket.waiting += 1
+        try:
+            while wait > 0:
+                stats.wait_seconds += wait
+                await asyncio.sleep(wait)
+                # A 429 seen meanwhile may have pushed the bucket further out
+                wait = bucket.blocked_until - time.monotonic()
+        finally:
+            bucket.waiting -= 1
+
+    async def request(self, session, service: str, credential_id: str, method: str, url: str,
+                      kwargs: Dict[str, Any]) -> BufferedResponse:
+        if method != "GET":
+            return await self._send(session, service, credential_id, method, url, kwargs)
+
+        inflight = self._inflight.current()
+        key = (service, credential_id, url, json.dumps(kwargs.get("params"), sort_keys=True, default=str))
+        pending = inflight.get(key)
+        if pending is not None:
+            self._stats(service).coalesced += 1
+            return await asyncio.shield(pending)
+
+        task = asyncio.ensure_future(self._send(session, service, credential_id, method, url, kwargs))
+        inflight[key] = task
+        try:
+            return await asyncio.shield(task)
+        finally:
+            if task.done():
+                inflight.pop(key, None)
+            else:
+                task.add_done_callback(lambda _: inflight.pop(key, None))
+
+    async def _send(self, session, service: str, credential_id: str, method: str, url: str,
+                    kwargs: Dict[str, Any]) -> BufferedResponse:
+        bucket = self._bucket(service, credential_id)
+        stats = self._stats(service)
+
+        for attempt in range(self.max_retries + 1):
+            await self.acquire(service, credential_id)
+            stats.requests += 1
+            async with session.request(method, url, **kwargs) as response:
+                body = await response.read()
+                headers = {name.lower(): value for name, value in response.headers.items()}
+                buffered = BufferedResponse(response.status, response.headers, body,
+                                            getattr(response, "reason", "") or "", str(url))
+
+            bucket.learn(headers)
+            if response.status not in RETRYABLE_STATUSES:
+                return buffered
+
+            delay = parse_retry_after(headers.get("retry-after"))
+            if delay is None and response.status == 503:
+                return buffered
+            if attempt == self.max_retries:
+                logger.warning(f"⏳ {service} still rate limited after {attempt + 1} attempts")
+                return buffered
+
+            delay = delay if delay is not None else min(2 ** attempt, 30)
+            bucket.block_for(delay)
+            stats.retries += 1
+            logger.info(f"⏳ {service} rate limited ({response.status}); retrying in {delay:.1f}s")
+
+        return buffered
+
+    # ---- Budget reporting ----
+
+    def get_budget(self, service: str, credential: str) -> Dict[str, Any]:
+        """Current budget for a credential, for callers that want to pace themselves"""
+        return self._bucket(service, credential_fingerprint(credential)).budget()
+
+    def estimate_wait(self, service: str, credential: str, requests: int = 1) -> float:
+        return self._bucket(service, credential_fingerprint(credential)).estimate_wait(requests)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._buckets_lock:
+            buckets = list(self._buckets.items())
+        return {
+            "services": {name: stats.to_dict() for name, stats in self.stats.items()},
+            "buckets": {f"{service}:{credential_id}": bucket.budget() for (service, credential_id), bucket in buckets}
+        }
+
+
+# Global scheduler shared by all rate-limited drivers
+rate_limit_scheduler = RateLimitScheduler()
+
+
+def get_rate_limit_scheduler() -> RateLimitScheduler:
+    return rate_limit_scheduler
@@ -0,0 +1,150 @@
+# backend/core/request_queue.py
+# Ordered, bounded per-session request queue for the agent engines
+
+import os
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Callable, Awaitable
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_DEPTH = int(os.getenv("AGENT_QUEUE_MAX_DEPTH", 8))
+DEFAULT_WAIT_TIMEOUT = float(os.getenv("AGENT_QUEUE_WAIT_TIMEOUT", 120))
+# Submissions repeating an idempotency key within this window are treated as retries
+DEFAULT_DEDUPE_WINDOW = float(os.getenv("AGENT_QUEUE_DEDUPE_WINDOW", 5))
+
+
+class RequestQueueFull(Exception):
+    """The session already has max_depth requests waiting or running"""
+
+
+class RequestQueueTimeout(Exception):
+    """A request waited longer than wait_timeout for its turn"""
+
+
+def request_idempotency_key(user_input: str, request_data: Optional[dict] = None) -> Optional[str]:
+    """
+    The client-supplied idempotency key, if any. Keyless requests are never
+    coalesced: repeating the same text ("yes", "next") is a new request.
+    """
+    request_data = request_data or {}
+    explicit = request_data.get("idempotency_key") or request_data.get("request_id")
+    return f"key:{explicit}" if explicit else None
+
+
+class SessionRequestQueue:
+    """
+    Runs one session's requests one at a time, in arrival order.
+
+    Waiting requests queue on a FIFO lock, so nothing is rejected just because
+    another request is in progress; only when max_depth requests are already
+    waiting does submit() push back with RequestQueueFull. A submission whose
+    idempotency key matches one that is queued, running, or finished within the
+    dedupe window gets that request's result instead of running again.
+    """
+
+    def __init__(self, name: str = "", max_depth: int = DEFAULT_MAX_DEPTH,
+                 wait_timeout: float = DEFAULT_WAIT_TIMEOUT, dedupe_window: float = DEFAULT_DEDUPE_WINDOW):
+        self.name = name
+        self.max_depth = max_depth
+        self.wait_timeout = wait_timeout
+        self.dedupe_window = dedupe_window
+
+        self._lock: Optional[asyncio.Lock] = None
+        self._recent: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (future, finished_at)
+        self.depth = 0
+        self.running = False
+
+        self.processed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.coalesced = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _prune(self, now: float):
+        while self._recent:
+            key, (future, finished_at) = next(iter(self._recent.items()))
+            if finished_at is None or now - finished_at <= self.dedupe_window:
+                break
+            self._recent.popitem(last=False)
+
+    async def submit(self, handler: Callable[..., Awaitable[Any]], *args,
+                     idempotency_key: Optional[str] = None, **kwargs) -> Any:
+        now = time.monotonic()
+        self._prune(now)
+
+        if idempotency_key is not None:
+            recent = self._recent.get(idempotency_key)
+            if recent is not None and (recent[1] is None or now - recent[1] <= self.dedupe_window):
+                self.coalesced += 1
+                logger.info(f"[{self.name}] Coalesced duplicate submission")
+                return await asyncio.shield(recent[0])
+
+        if self.depth >= self.max_depth:
+            self.rejected += 1
+            raise RequestQueueFull(f"{self.depth} requests already queued")
+
+        future = asyncio.get_running_loop().create_future()
+        if idempotency_key is not None:
+            self._recent[idempotency_key] = (future, None)
+            self._recent.move_to_end(idempotency_key)
+
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        self.depth += 1
+        try:
+            queued_at = time.monotonic()
+            try:
+                await asyncio.wait_for(self._lock.acquire(), timeout=self.wait_timeout)
+            except asyncio.TimeoutError:
+                self.timed_out += 1
+                raise RequestQueueTimeout(f"waited {self.wait_timeout:.0f}s for earlier requests")
+
+            waited = time.monotonic() - queued_at
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+            self.running = True
+            try:
+                result = await handler(*args, **kwargs)
+                future.set_result(result)
+                return result
+            finally:
+                self.running = False
+                self.processed += 1
+                self._lock.release()
+
+        except BaseException as e:
+            if not future.done():
+                if isinstance(e, Exception):
+                    future.set_exception(e)
+                    future.exception()  # retrieved, so an unawaited future does not log a warning
+                else:
+                    future.cancel()
+            raise
+
+        finally:
+            self.depth -= 1
+            if idempotency_key is not None and idempotency_key in self._recent:
+                # Failed requests may be retried right away
+                if future.cancelled() or future.exception() is not None:
+                    self._recent.pop(idempotency_key, None)
+                else:
+                    self._recent[idempotency_key] = (future, time.monotonic())
+
+    def get_stats(self) -> Dict[str, Any]:
+        handled = max(self.processed, 1)
+        return {
+            "depth": self.depth,
+            "running": self.running,
+            "max_depth": self.max_depth,
+            "processed": self.processed,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "coalesced": self.coalesced,
+            "wait_avg_ms": round(self.wait_total / handled * 1000, 2),
+            "wait_max_ms": round(self.wait_max * 1000, 2)
+        }
@@ -0,0 +1,115 @@
+# backend/core/session_cache.py
+# Process-local TTL caches for the chat hot path: session -> user, agent rows, default agent
+
+import os
+import time
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+SESSION_CACHE_TTL = float(os.getenv("SESSION_CACHE_TTL", 30))
+AGENT_CACHE_TTL = float(os.getenv("AGENT_CACHE_TTL", 300))
+SESSION_CACHE_MAX_ENTRIES = int(os.getenv("SESSION_CACHE_MAX_ENTRIES", 10000))
+AGENT_CACHE_MAX_ENTRIES = int(os.getenv("AGENT_CACHE_MAX_ENTRIES", 5000))
+
+
+class TTLCache:
+    """
+    Small LRU with per-entry expiry. Values are row dicts; get() hands out a
+    shallow copy so callers that annotate the row do not alter the cached one.
+    Misses are not cached - an unknown session or agent always reaches the DB.
+    """
+
+    def __init__(self, name: str, ttl: float, max_entries: int):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, value)
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return dict(entry[1])
+
+    def set(self, key: str, value: Dict[str, Any], ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl, dict(value))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: str) -> bool:
+        if self._entries.pop(key, None) is not None:
+            self.invalidations += 1
+            return True
+        return False
+
+    def pop_where(self, predicate: Callable[[Dict[str, Any]], bool]) -> int:
+        """Drop every entry whose value matches predicate"""
+        keys = [key for key, (_, value) in self._entries.items() if predicate(value)]
+        for key in keys:
+            del self._entries[key]
+        self.invalidations += len(keys)
+        return len(keys)
+
+    def clear(self):
+        self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+        }
+
+
+def session_key(session_token: str) -> str:
+    """Tokens are kept hashed so the cache never holds a usable credential"""
+    return hashlib.sha256(session_token.encode("utf-8")).hexdigest()
+
+
+# session token hash -> user row
+session_cache = TTLCache("sessions", SESSION_CACHE_TTL, SESSION_CACHE_MAX_ENTRIES)
+# agent_id -> agent row as loaded by AgentProcessor
+agent_cache = TTLCache("agents", AGENT_CACHE_TTL, AGENT_CACHE_MAX_ENTRIES)
+# user_id -> the user's default assistant agent row
+default_agent_cache = TTLCache("default_agents", AGENT_CACHE_TTL, AGENT_CACHE_MAX_ENTRIES)
+
+
+def invalidate_user(user_id: Any) -> int:
+    """Forget cached sessions of a user (login, logout, credit changes)"""
+    user_id = str(user_id)
+    return session_cache.pop_where(lambda user: str(user.get("user_id")) == user_id)
+
+
+def invalidate_agent(agent_id: Any) -> int:
+    """Forget a cached agent after it was updated or deleted"""
+    agent_id = str(agent_id)
+    removed = int(agent_cache.pop(agent_id))
+    removed += default_agent_cache.pop_where(lambda agent: str(agent.get("agent_id")) == agent_id)
+    if removed:
+        logger.debug(f"Invalidated cached agent {agent_id}")
+    return removed
+
+
+def get_stats() -> Dict[str, Any]:
+    return {cache.name: cache.get_stats() for cache in (session_cache, agent_cache, default_agent_cache)}
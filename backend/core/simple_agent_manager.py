@@ -33,6 +33,10 @@ class AgentManager:
         """Get all agents for a user"""
         return await self.db_manager.get_user_agents(user_id)
     
+    async def get_agent_by_name(self, user_id: str, agent_name: str) -> Optional[Dict[str, Any]]:
+        """Get one of the user's agents by name with a single indexed query"""
+        return await self.db_manager.get_user_agent_by_name(user_id, agent_name)
+    
     async def get_agent_details(self, agent_id: str, user_id: str) -> Optional[Dict[str, Any]]:
         """Get agent details (for now, just get by ID)"""
         agent = await self.db_manager.get_agent_by_id(agent_id)
@@ -0,0 +1,314 @@
+# backend/core/timeseries.py
+# Fixed-memory time-series store with 1m / 1h / 1d rollups for driver-side metrics
+
+import os
+import json
+import time
+import logging
+from array import array
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Tuple, Iterator, Union
+
+logger = logging.getLogger(__name__)
+
+RAW_POINTS = int(os.getenv("TIMESERIES_RAW_POINTS", 1000))
+MAX_SERIES = int(os.getenv("TIMESERIES_MAX_SERIES", 1000))
+FLUSH_INTERVAL = float(os.getenv("TIMESERIES_FLUSH_INTERVAL", 30))
+
+# name -> (bucket width in seconds, buckets kept)
+ROLLUPS: Dict[str, Tuple[int, int]] = {
+    "1m": (60, 1440),   # one day of minutes
+    "1h": (3600, 720),  # thirty days of hours
+    "1d": (86400, 730)  # two years of days
+}
+
+ROLLUP_COLUMNS = ("count", "sum", "min", "max")
+
+Timestamp = Union[str, int, float, datetime, None]
+
+
+def to_epoch(timestamp: Timestamp) -> float:
+    """ISO string / datetime / epoch seconds -> epoch seconds; naive times are UTC"""
+    if timestamp is None or timestamp == "":
+        return time.time()
+    if isinstance(timestamp, (int, float)):
+        return float(timestamp)
+    if isinstance(timestamp, str):
+        timestamp = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.timestamp()
+
+
+def to_iso(epoch: float) -> str:
+    return datetime.fromtimestamp(epoch, tz=timezone.utc).replace(tzinfo=None).isoformat()
+
+
+class SortedRing:
+    """
+    Ring buffer of rows kept sorted by a float key, with numeric columns in
+    flat arrays and optional object columns in lists. Appends in key order are
+    O(1); a late (out-of-order) row is shifted into place. When full, the
+    oldest row is overwritten. Lookups are binary searches over the ring.
+    """
+
+    def __init__(self, capacity: int, columns: Tuple[str, ...], object_columns: Tuple[str, ...] = ()):
+        self.capacity = capacity
+        self.keys = array("d", bytes(8 * capacity))
+        self.columns = {name: array("d", bytes(8 * capacity)) for name in columns}
+        self.columns.update({name: [None] * capacity for name in object_columns})
+        self.start = 0
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def slot(self, position: int) -> int:
+        return (self.start + position) % self.capacity
+
+    def key(self, position: int) -> float:
+        return self.keys[self.slot(position)]
+
+    def get(self, name: str, position: int):
+        return self.columns[name][self.slot(position)]
+
+    def set(self, name: str, position: int, value):
+        self.columns[name][self.slot(position)] = value
+
+    def bisect_left(self, key: float) -> int:
+        low, high = 0, self.size
+        while low < high:
+            middle = (low + high) // 2
+            if self.key(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def bisect_right(self, key: float) -> int:
+        low, high = 0, self.size
+        while low < high:
+            middle = (low + high) // 2
+            if key < self.key(middle):
+                high = middle
+            else:
+                low = middle + 1
+        return low
+
+    def find(self, key: float) -> Optional[int]:
+        position = self.bisect_left(key)
+        if position < self.size and self.key(position) == key:
+            return position
+        return None
+
+    def span(self, start: Optional[float] = None, end: Optional[float] = None) -> range:
+        """Positions with start <= key <= end"""
+        low = 0 if start is None else self.bisect_left(start)
+        high = self.size if end is None else self.bisect_right(end)
+        return range(low, max(low, high))
+
+    def evict_oldest(self) -> Dict[str, Any]:
+        evicted = {name: column[self.start] for name, column in self.columns.items()}
+        self.start = (self.start + 1) % self.capacity
+        self.size -= 1
+        return evicted
+
+    def insert(self, key: float, values: Dict[str, Any]) -> Tuple[Optional[int], Optional[Dict[str, Any]]]:
+        """(position of the new row or None if it is older than everything kept, evicted row)"""
+        evicted = None
+        if self.size and key < self.key(self.size - 1):
+            position = self.bisect_right(key)
+            if self.size == self.capacity:
+                if position == 0:
+                    return None, None
+                evicted = self.evict_oldest()
+                position -= 1
+            # Shift the newer rows one slot to the right
+            for moving in range(self.size, position, -1):
+                source, target = self.slot(moving - 1), self.slot(moving)
+                self.keys[target] = self.keys[source]
+                for column in self.columns.values():
+                    column[target] = column[source]
+        else:
+            if self.size == self.capacity:
+                evicted = self.evict_oldest()
+            position = self.size
+
+        self.size += 1
+        target = self.slot(position)
+        self.keys[target] = key
+        for name, column in self.columns.items():
+            column[target] = values.get(name)
+        return position, evicted
+
+    def rows(self) -> Dict[str, list]:
+        """Column lists in key order (for persistence)"""
+        positions = [self.slot(position) for position in range(self.size)]
+        data = {"keys": [self.keys[slot] for slot in positions]}
+        for name, column in self.columns.items():
+            data[name] = [column[slot] for slot in positions]
+        return data
+
+
+class TimeSeries:
+    """Raw points of one metric plus pre-aggregated buckets at every rollup resolution"""
+
+    def __init__(self, raw_points: int = RAW_POINTS):
+        self.raw = SortedRing(raw_points, ("value",), ("tags",))
+        self.rollups = {name: SortedRing(keep, ROLLUP_COLUMNS) for name, (_, keep) in ROLLUPS.items()}
+        # Running totals over the retained raw points, so summaries never rescan
+        self.raw_sum = 0.0
+        self.total_count = 0
+
+    def add(self, timestamp: float, value: float, tags: Optional[Dict[str, Any]] = None):
+        self.total_count += 1
+        # A point older than every retained raw point only lands in the rollups
+        position, evicted = self.raw.insert(timestamp, {"value": value, "tags": tags or None})
+        if position is not None:
+            self.raw_sum += value - (evicted["value"] if evicted else 0.0)
+            if self.total_count % self.raw.capacity == 0:
+                # Re-sum once per buffer turnover so float drift cannot accumulate
+                self.raw_sum = sum(point for _, point, _ in self.points())
+
+        for name, (width, _) in ROLLUPS.items():
+            ring = self.rollups[name]
+            bucket = timestamp - timestamp % width
+            position = ring.find(bucket)
+            if position is None:
+                ring.insert(bucket, {"count": 1, "sum": value, "min": value, "max": value})
+                continue
+            ring.set("count", position, ring.get("count", position) + 1)
+            ring.set("sum", position, ring.get("sum", position) + value)
+            if value < ring.get("min", position):
+                ring.set("min", position, value)
+            if value > ring.get("max", position):
+                ring.set("max", position, value)
+
+    def points(self, start: Optional[float] = None, end: Optional[float] = None) -> Iterator[Tuple[float, float, Optional[dict]]]:
+        raw = self.raw
+        for position in raw.span(start, end):
+            yield raw.key(position), raw.get("value", position), raw.get("tags", position)
+
+    def buckets(self, rollup: str, start: Optional[float] = None,
+                end: Optional[float] = None) -> Iterator[Tuple[float, float, float, float, float]]:
+        """(bucket start, count, sum, min, max) for buckets overlapping [start, end]"""
+        ring = self.rollups[rollup]
+        width = ROLLUPS[rollup][0]
+        if start is not None:
+            start -= start % width
+        for position in ring.span(start, end):
+            yield (ring.key(position), ring.get("count", position), ring.get("sum", position),
+                   ring.get("min", position), ring.get("max", position))
+
+    def summary(self) -> Optional[Dict[str, Any]]:
+        if not len(self.raw):
+            return None
+        last = len(self.raw) - 1
+        return {
+            "latest_value": self.raw.get("value", last),
+            "average_value": self.raw_sum / len(self.raw),
+            "data_points": len(self.raw),
+            "total_tracked": self.total_count,
+            "latest_timestamp": to_iso(self.raw.key(last))
+        }
+
+
+class TimeSeriesStore:
+    """
+    Metric name -> TimeSeries, with a cap on the number of series so memory
+    stays fixed. If a path is given the store is loaded from and periodically
+    snapshotted to a JSON file; otherwise it is purely in memory.
+    """
+
+    def __init__(self, path: Optional[str] = None, raw_points: int = RAW_POINTS,
+                 max_series: int = MAX_SERIES, flush_interval: float = FLUSH_INTERVAL):
+        self.path = path
+        self.raw_points = raw_points
+        self.max_series = max_series
+        self.flush_interval = flush_interval
+        self.series: Dict[str, TimeSeries] = {}
+        self.dirty = False
+        self.last_flush = time.monotonic()
+        if path and os.path.exists(path):
+            self.load()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.series
+
+    def get(self, name: str) -> Optional[TimeSeries]:
+        return self.series.get(name)
+
+    def add(self, name: str, timestamp: Timestamp, value: float, tags: Optional[Dict[str, Any]] = None) -> float:
+        """Record a point; returns its epoch timestamp"""
+        series = self.series.get(name)
+        if series is None:
+            if len(self.series) >= self.max_series:
+                raise ValueError(f"Metric limit reached ({self.max_series} series)")
+            series = self.series[name] = TimeSeries(self.raw_points)
+        epoch = to_epoch(timestamp)
+        series.add(epoch, float(value), tags)
+        self.dirty = True
+        return epoch
+
+    # ---- Persistence ----
+
+    def flush_due(self) -> bool:
+        return bool(self.path) and self.dirty and time.monotonic() - self.last_flush >= self.flush_interval
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Copy of every series, taken on the caller's thread so writes can happen elsewhere"""
+        self.dirty = False
+        self.last_flush = time.monotonic()
+        return {
+            name: {
+                "raw": series.raw.rows(),
+                "rollups": {rollup: ring.rows() for rollup, ring in series.rollups.items()},
+                "total_count": series.total_count
+            }
+            for name, series in self.series.items()
+        }
+
+    def write_snapshot(self, snapshot: Dict[str, Any]):
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w") as handle:
+            json.dump({"version": 1, "series": snapshot}, handle)
+        os.replace(temp_path, self.path)
+
+    def save(self):
+        if self.path:
+            self.write_snapshot(self.snapshot())
+
+    def load(self):
+        try:
+            with open(self.path) as handle:
+                stored = json.load(handle).get("series", {})
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not load time series from {self.path}: {e}")
+            return
+
+        for name, data in list(stored.items())[:self.max_series]:
+            series = TimeSeries(self.raw_points)
+            raw = data["raw"]
+            for timestamp, value, tags in zip(raw["keys"], raw["value"], raw["tags"]):
+                # Re-adding raw points would double count the stored rollups, so fill rings directly
+                position, evicted = series.raw.insert(timestamp, {"value": value, "tags": tags})
+                if position is not None:
+                    series.raw_sum += value - (evicted["value"] if evicted else 0.0)
+            for rollup, rows in data["rollups"].items():
+                ring = series.rollups.get(rollup)
+                if ring is None:
+                    continue
+                for position, bucket in enumerate(rows["keys"]):
+                    ring.insert(bucket, {column: rows[column][position] for column in ROLLUP_COLUMNS})
+            series.total_count = data.get("total_count", len(series.raw))
+            self.series[name] = series
+        logger.info(f"Loaded {len(self.series)} time series from {self.path}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "series": len(self.series),
+            "max_series": self.max_series,
+            "raw_points_per_series": self.raw_points,
+            "rollups": {name: {"bucket_seconds": width, "buckets_kept": keep} for name, (width, keep) in ROLLUPS.items()},
+            "persistent": bool(self.path)
+        }
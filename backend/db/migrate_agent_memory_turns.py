@@ -0,0 +1,98 @@
+"""
+Database migration to move agent conversation history out of the agent_memory blob
+into the append-only agent_conversation_turns table
+"""
+
+import asyncio
+import asyncpg
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+async def migrate_agent_memory_turns():
+    """Create agent_conversation_turns and backfill it from agent_memory.memory_data"""
+
+    connection_config = {
+        'user': os.getenv('PGUSER', 'postgres'),
+        'password': os.getenv('PGPASSWORD', 'devhouse'),
+        'database': os.getenv('PGDATABASE', 'postgres'),
+        'host': os.getenv('PGHOST', 'localhost'),
+        'port': int(os.getenv('PGPORT', '5432'))
+    }
+
+    conn = await asyncpg.connect(**connection_config)
+
+    try:
+        await conn.execute('''
+            CREATE TABLE IF NOT EXISTS agent_conversation_turns (
+                id BIGSERIAL PRIMARY KEY,
+                agent_id UUID NOT NULL REFERENCES agents(agent_id) ON DELETE CASCADE,
+                user_id VARCHAR(255) NOT NULL DEFAULT 'system',
+                turn_data JSONB NOT NULL,
+                created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+            )
+        ''')
+
+        await conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_agent_conversation_turns_recent
+            ON agent_conversation_turns(agent_id, user_id, id DESC)
+        ''')
+
+        async with conn.transaction():
+            # Hold off new turns while ids are assigned, so the order below can't be interleaved
+            await conn.execute('LOCK TABLE agent_conversation_turns IN EXCLUSIVE MODE')
+            appended_before = await conn.fetchval('SELECT COALESCE(MAX(id), 0) FROM agent_conversation_turns')
+
+            # Explode each blob's history into one row per turn, preserving order.
+            # Rows whose history was already moved have no conversation_history key.
+            migrated = await conn.fetchval('''
+                WITH moved AS (
+                    INSERT INTO agent_conversation_turns (agent_id, user_id, turn_data, created_at)
+                    SELECT m.agent_id, m.user_id, turn.value,
+                           COALESCE((turn.value->>'timestamp')::timestamptz, m.updated_at)
+                    FROM agent_memory m
+                    CROSS JOIN LATERAL jsonb_array_elements(m.memory_data->'conversation_history')
+                        WITH ORDINALITY AS turn(value, position)
+                    WHERE jsonb_typeof(m.memory_data->'conversation_history') = 'array'
+                    ORDER BY m.agent_id, m.user_id, turn.position
+                    RETURNING 1
+                )
+                SELECT COUNT(*) FROM moved
+            ''')
+
+            # Turns appended since the new code shipped are newer than the whole blob history,
+            # but now have lower ids than it: re-append them, in their order, behind it
+            reordered = await conn.fetchval('''
+                WITH live AS (
+                    DELETE FROM agent_conversation_turns t
+                    USING agent_memory m
+                    WHERE t.agent_id = m.agent_id AND t.user_id = m.user_id
+                      AND jsonb_typeof(m.memory_data->'conversation_history') = 'array'
+                      AND t.id <= $1
+                    RETURNING t.id, t.agent_id, t.user_id, t.turn_data, t.created_at
+                ), moved AS (
+                    INSERT INTO agent_conversation_turns (agent_id, user_id, turn_data, created_at)
+                    SELECT agent_id, user_id, turn_data, created_at FROM live ORDER BY id
+                    RETURNING 1
+                )
+                SELECT COUNT(*) FROM moved
+            ''', appended_before)
+
+            # Keep only the compact rolling context in the blob
+            compacted = await conn.execute('''
+                UPDATE agent_memory
+                SET memory_data = memory_data - 'conversation_history'
+                WHERE memory_data ? 'conversation_history'
+            ''')
+
+        print(f"✅ Migrated {migrated} conversation turns, re-appended {reordered} newer turns ({compacted})")
+
+    except Exception as e:
+        print(f"❌ Error migrating agent memory: {e}")
+
+    finally:
+        await conn.close()
+
+if __name__ == "__main__":
+    asyncio.run(migrate_agent_memory_turns())
@@ -0,0 +1,54 @@
+"""
+Database migration adding credit_reservations: credits pre-authorized by
+long-running automations, held until they are settled, released or expire
+"""
+
+import asyncio
+import asyncpg
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+async def migrate_credit_reservations():
+    """Create the credit_reservations table"""
+
+    connection_config = {
+        'user': os.getenv('PGUSER', 'postgres'),
+        'password': os.getenv('PGPASSWORD', 'devhouse'),
+        'database': os.getenv('PGDATABASE', 'postgres'),
+        'host': os.getenv('PGHOST', 'localhost'),
+        'port': int(os.getenv('PGPORT', '5432'))
+    }
+
+    conn = await asyncpg.connect(**connection_config)
+
+    try:
+        await conn.execute('''
+            CREATE TABLE IF NOT EXISTS credit_reservations (
+                reservation_id UUID PRIMARY KEY,
+                user_id UUID NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+                amount INTEGER NOT NULL CHECK (amount >= 0),
+                reason TEXT,
+                service_used TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                expires_at TIMESTAMP NOT NULL
+            )
+        ''')
+
+        # The expiry sweep: DELETE ... WHERE expires_at <= CURRENT_TIMESTAMP
+        await conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_credit_reservations_expires_at
+            ON credit_reservations(expires_at)
+        ''')
+
+        print("✅ credit_reservations table created")
+
+    except Exception as e:
+        print(f"❌ Error creating credit_reservations table: {e}")
+
+    finally:
+        await conn.close()
+
+if __name__ == "__main__":
+    asyncio.run(migrate_credit_reservations())
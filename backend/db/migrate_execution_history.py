@@ -0,0 +1,102 @@
+"""
+Database migration for execution history: the keyset index behind cursor
+pagination of agent_executions, and agent_execution_rollups, the hourly
+counts / error totals / latency histograms served by the summary endpoint
+"""
+
+import asyncio
+import asyncpg
+import os
+import sys
+import logging
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.execution_history import HISTOGRAM_SIZE, latency_bucket
+
+logger = logging.getLogger(__name__)
+
+async def migrate_execution_history():
+    """Create idx_agent_executions_keyset and agent_execution_rollups, then backfill the rollups"""
+
+    connection_config = {
+        'user': os.getenv('PGUSER', 'postgres'),
+        'password': os.getenv('PGPASSWORD', 'devhouse'),
+        'database': os.getenv('PGDATABASE', 'postgres'),
+        'host': os.getenv('PGHOST', 'localhost'),
+        'port': int(os.getenv('PGPORT', '5432'))
+    }
+
+    conn = await asyncpg.connect(**connection_config)
+
+    try:
+        # WHERE agent_id = $1 AND (created_at, id) < ($2, $3) ORDER BY created_at DESC, id DESC
+        await conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_agent_executions_keyset
+            ON agent_executions(agent_id, created_at DESC, id DESC)
+        ''')
+        # Superseded by the keyset index, which has the same leading columns
+        await conn.execute('DROP INDEX IF EXISTS idx_agent_executions_agent')
+
+        # latency_histogram[i] counts executions in core.execution_history.LATENCY_BOUNDS bucket i
+        await conn.execute('''
+            CREATE TABLE IF NOT EXISTS agent_execution_rollups (
+                agent_id UUID NOT NULL REFERENCES agents(agent_id) ON DELETE CASCADE,
+                bucket_start TIMESTAMP WITH TIME ZONE NOT NULL,
+                executions INTEGER NOT NULL DEFAULT 0,
+                errors INTEGER NOT NULL DEFAULT 0,
+                timed_executions INTEGER NOT NULL DEFAULT 0,
+                total_time_ms BIGINT NOT NULL DEFAULT 0,
+                max_time_ms INTEGER,
+                latency_histogram INTEGER[] NOT NULL,
+                PRIMARY KEY (agent_id, bucket_start)
+            )
+        ''')
+
+        # Backfill from existing executions; rerunning recomputes the same totals
+        rows = await conn.fetch('''
+            SELECT agent_id, date_trunc('hour', created_at) AS bucket_start,
+                   (execution_status = 'error') AS is_error, execution_time_ms, COUNT(*) AS n
+            FROM agent_executions
+            WHERE created_at IS NOT NULL
+            GROUP BY 1, 2, 3, 4
+        ''')
+
+        rollups = {}
+        for row in rows:
+            key = (row['agent_id'], row['bucket_start'])
+            rollup = rollups.setdefault(key, [0, 0, 0, 0, None, [0] * HISTOGRAM_SIZE])
+            rollup[0] += row['n']
+            if row['is_error']:
+                rollup[1] += row['n']
+            ms = row['execution_time_ms']
+            if ms is not None:
+                rollup[2] += row['n']
+                rollup[3] += ms * row['n']
+                rollup[4] = ms if rollup[4] is None else max(rollup[4], ms)
+                rollup[5][latency_bucket(ms)] += row['n']
+
+        await conn.executemany('''
+            INSERT INTO agent_execution_rollups
+            (agent_id, bucket_start, executions, errors, timed_executions, total_time_ms,
+             max_time_ms, latency_histogram)
+            VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
+            ON CONFLICT (agent_id, bucket_start) DO UPDATE SET
+                executions = EXCLUDED.executions,
+                errors = EXCLUDED.errors,
+                timed_executions = EXCLUDED.timed_executions,
+                total_time_ms = EXCLUDED.total_time_ms,
+                max_time_ms = EXCLUDED.max_time_ms,
+                latency_histogram = EXCLUDED.latency_histogram
+        ''', [(agent_id, bucket_start, *rollup) for (agent_id, bucket_start), rollup in rollups.items()])
+
+        print(f"✅ Execution history index and rollups created ({len(rollups)} agent-hours backfilled)")
+
+    except Exception as e:
+        print(f"❌ Error migrating execution history: {e}")
+
+    finally:
+        await conn.close()
+
+if __name__ == "__main__":
+    asyncio.run(migrate_execution_history())
@@ -0,0 +1,49 @@
+"""
+Database migration adding the indexes behind the chat hot path:
+session-token lookups and the by-name default agent lookup
+"""
+
+import asyncio
+import asyncpg
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+async def migrate_hot_path_indexes():
+    """Create idx_users_session_token and idx_agents_user_name"""
+
+    connection_config = {
+        'user': os.getenv('PGUSER', 'postgres'),
+        'password': os.getenv('PGPASSWORD', 'devhouse'),
+        'database': os.getenv('PGDATABASE', 'postgres'),
+        'host': os.getenv('PGHOST', 'localhost'),
+        'port': int(os.getenv('PGPORT', '5432'))
+    }
+
+    conn = await asyncpg.connect(**connection_config)
+
+    try:
+        # get_user_by_session on a cold cache
+        await conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_users_session_token
+            ON users(session_token)
+            WHERE session_token IS NOT NULL AND session_token <> ''
+        ''')
+
+        # get_user_agent_by_name: WHERE user_id = $1 AND agent_name = $2 ORDER BY created_at DESC LIMIT 1
+        await conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_agents_user_name
+            ON agents(user_id, agent_name, created_at DESC)
+        ''')
+
+        print("✅ Hot path indexes created")
+
+    except Exception as e:
+        print(f"❌ Error creating hot path indexes: {e}")
+
+    finally:
+        await conn.close()
+
+if __name__ == "__main__":
+    asyncio.run(migrate_hot_path_indexes())
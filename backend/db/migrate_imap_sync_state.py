@@ -0,0 +1,46 @@
+"""
+Database migration adding imap_sync_state: the last seen UIDVALIDITY / UID
+per IMAP mailbox, so email triggers only fetch messages that are new
+"""
+
+import asyncio
+import asyncpg
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+async def migrate_imap_sync_state():
+    """Create the imap_sync_state table"""
+
+    connection_config = {
+        'user': os.getenv('PGUSER', 'postgres'),
+        'password': os.getenv('PGPASSWORD', 'devhouse'),
+        'database': os.getenv('PGDATABASE', 'postgres'),
+        'host': os.getenv('PGHOST', 'localhost'),
+        'port': int(os.getenv('PGPORT', '5432'))
+    }
+
+    conn = await asyncpg.connect(**connection_config)
+
+    try:
+        # sync_key: "<user_id>:<imap user>@<host>:<port>/<mailbox>"
+        await conn.execute('''
+            CREATE TABLE IF NOT EXISTS imap_sync_state (
+                sync_key TEXT PRIMARY KEY,
+                uidvalidity BIGINT NOT NULL,
+                last_uid BIGINT NOT NULL DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        print("✅ imap_sync_state table created")
+
+    except Exception as e:
+        print(f"❌ Error creating imap_sync_state table: {e}")
+
+    finally:
+        await conn.close()
+
+if __name__ == "__main__":
+    asyncio.run(migrate_imap_sync_state())
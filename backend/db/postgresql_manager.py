@@ -15,11 +15,22 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+try:
+    from core.session_cache import session_cache, session_key, invalidate_user, invalidate_agent
+except ImportError:
+    from backend.core.session_cache import session_cache, session_key, invalidate_user, invalidate_agent
+
+try:
+    from core.credits import CreditManager, RESERVATION_TTL
+except ImportError:
+    from backend.core.credits import CreditManager, RESERVATION_TTL
+
 class DatabaseManager:
     """Handles all database operations for the AutoFlow platform."""
     
     def __init__(self):
         self.pool = None
+        self.credits: Optional[CreditManager] = None
         self.connection_config = {
             'user': os.getenv('PGUSER', 'postgres'),
             'password': os.getenv('PGPASSWORD', 'devhouse'),
@@ -32,6 +43,8 @@ class DatabaseManager:
         """Initialize the database connection pool."""
         try:
             self.pool = await asyncpg.create_pool(**self.connection_config)
+            self.credits = CreditManager(self.pool)
+            self.credits.start()
             logger.info("Database connection pool initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize database pool: {e}")
@@ -39,6 +52,8 @@ class DatabaseManager:
     
     async def close(self):
         """Close the database connection pool."""
+        if self.credits:
+            await self.credits.close()  # Flush buffered credit_logs rows first
         if self.pool:
             await self.pool.close()
             logger.info("Database connection pool closed")
@@ -113,71 +128,62 @@ class DatabaseManager:
                 SET session_token = $1, session_expires = $2, updated_at = CURRENT_TIMESTAMP
                 WHERE user_id = $3
             """, session_token, expires_at, user_id)
-            
-            return result == "UPDATE 1"
+        
+        # The previous token (or the one just cleared on logout) must stop resolving
+        invalidate_user(user_id)
+        return result == "UPDATE 1"
     
     async def get_user_by_session(self, session_token: str) -> Optional[Dict[str, Any]]:
-        """Get user by session token if not expired."""
+        """Get user by session token if not expired (served from the session cache when warm)."""
+        cache_key = session_key(session_token)
+        cached = session_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         async with self.pool.acquire() as conn:
             user = await conn.fetchrow("""
                 SELECT user_id, email, first_name, last_name, username, 
                        organization, credits, memory_context, service_keys,
-                       created_at, updated_at
+                       created_at, updated_at,
+                       EXTRACT(EPOCH FROM (session_expires - CURRENT_TIMESTAMP)) AS session_ttl
                 FROM users 
                 WHERE session_token = $1 AND session_expires > CURRENT_TIMESTAMP
             """, session_token)
-            
-            return dict(user) if user else None
+        
+        if not user:
+            return None
+        user = dict(user)
+        # Never serve a session from cache past its expiry
+        session_cache.set(cache_key, user, ttl=float(user.pop('session_ttl')))
+        return user
     
     # Credit Management Methods
     async def add_credits(self, user_id: str, amount: int, reason: str, 
                          service_used: str = None) -> bool:
         """Add credits to user account."""
-        async with self.pool.acquire() as conn:
-            async with conn.transaction():
-                # Add to user's credit balance
-                await conn.execute("""
-                    UPDATE users SET credits = credits + $1, updated_at = CURRENT_TIMESTAMP
-                    WHERE user_id = $2
-                """, amount, user_id)
-                
-                # Log the credit change
-                await conn.execute("""
-                    INSERT INTO credit_logs (user_id, change, reason, service_used)
-                    VALUES ($1, $2, $3, $4)
-                """, user_id, amount, reason, service_used)
-        
-        return True
+        return await self.credits.add(user_id, amount, reason, service_used) is not None
     
     async def deduct_credits(self, user_id: str, amount: int, reason: str, 
                             service_used: str = None) -> bool:
         """Deduct credits from user account if sufficient balance."""
-        async with self.pool.acquire() as conn:
-            async with conn.transaction():
-                # Check current balance
-                current_credits = await conn.fetchval("""
-                    SELECT credits FROM users WHERE user_id = $1
-                """, user_id)
-                
-                if current_credits < amount:
-                    return False  # Insufficient credits
-                
-                # Deduct from user's credit balance
-                await conn.execute("""
-                    UPDATE users SET credits = credits - $1, updated_at = CURRENT_TIMESTAMP
-                    WHERE user_id = $2
-                """, amount, user_id)
-                
-                # Log the credit change
-                await conn.execute("""
-                    INSERT INTO credit_logs (user_id, change, reason, service_used)
-                    VALUES ($1, $2, $3, $4)
-                """, user_id, -amount, reason, service_used)
-        
-        return True
+        return await self.credits.deduct(user_id, amount, reason, service_used) is not None
+    
+    async def reserve_credits(self, user_id: str, amount: int, reason: str,
+                             service_used: str = None, ttl: float = RESERVATION_TTL) -> Optional[str]:
+        """Pre-authorize credits for a long-running job; returns a reservation id or None."""
+        return await self.credits.reserve(user_id, amount, reason, service_used, ttl)
+    
+    async def settle_credits(self, reservation_id: str, actual: int) -> Optional[Dict[str, Any]]:
+        """Charge the actual cost of a reservation and refund the rest."""
+        return await self.credits.settle(reservation_id, actual)
+    
+    async def release_credits(self, reservation_id: str) -> Optional[Dict[str, Any]]:
+        """Refund a reservation in full."""
+        return await self.credits.release(reservation_id)
     
     async def get_credit_history(self, user_id: str, limit: int = 50) -> List[Dict[str, Any]]:
         """Get user's credit transaction history."""
+        await self.credits.ledger.flush()  # Include rows still waiting in the ledger buffer
         async with self.pool.acquire() as conn:
             rows = await conn.fetch("""
                 SELECT id, change, reason, service_used, created_at
@@ -272,6 +278,20 @@ class DatabaseManager:
             
             return [dict(row) for row in rows]
     
+    async def get_user_agent_by_name(self, user_id: str, agent_name: str) -> Optional[Dict[str, Any]]:
+        """Get a user's agent by name (newest first), using idx_agents_user_name."""
+        async with self.pool.acquire() as conn:
+            agent = await conn.fetchrow("""
+                SELECT agent_id, user_id, agent_name, agent_role, agent_personality,
+                       agent_expectations, agent_memory_context, workflow_id, created_at, updated_at
+                FROM agents 
+                WHERE user_id = $1 AND agent_name = $2
+                ORDER BY created_at DESC
+                LIMIT 1
+            """, user_id, agent_name)
+            
+            return dict(agent) if agent else None
+    
     async def update_agent(self, agent_id: str, **kwargs) -> bool:
         """Update agent properties."""
         if not kwargs:
@@ -303,7 +323,9 @@ class DatabaseManager:
         
         async with self.pool.acquire() as conn:
             result = await conn.execute(query, *params)
-            return result == "UPDATE 1"
+        
+        invalidate_agent(agent_id)
+        return result == "UPDATE 1"
     
     async def delete_agent(self, agent_id: str) -> bool:
         """Delete an agent."""
@@ -311,7 +333,9 @@ class DatabaseManager:
             result = await conn.execute("""
                 DELETE FROM agents WHERE agent_id = $1
             """, agent_id)
-            return result == "DELETE 1"
+        
+        invalidate_agent(agent_id)
+        return result == "DELETE 1"
     
     # Workflow and Chat Methods
     async def create_workflow_request(self, user_id: str, input_prompt: str,
@@ -480,12 +504,16 @@ get_user_by_session = db_manager.get_user_by_session
 update_user_session = db_manager.update_user_session
 create_agent = db_manager.create_agent
 get_user_agents = db_manager.get_user_agents
+get_user_agent_by_name = db_manager.get_user_agent_by_name
 get_agent_by_id = db_manager.get_agent_by_id
 update_agent = db_manager.update_agent
 delete_agent = db_manager.delete_agent
 add_credits = db_manager.add_credits
 deduct_credits = db_manager.deduct_credits
 get_credit_history = db_manager.get_credit_history
+reserve_credits = db_manager.reserve_credits
+settle_credits = db_manager.settle_credits
+release_credits = db_manager.release_credits
 create_workflow_request = db_manager.create_workflow_request
 add_chat_message = db_manager.add_chat_message
 get_chat_history = db_manager.get_chat_history
@@ -41,7 +41,7 @@ class DriverRegistryReport:
         print("🔧 Initializing Universal Driver Manager...")
         
         self.manager = UniversalDriverManager()
-        await self.manager.load_all_drivers()
+        await self.manager.load_all_drivers(eager=True)
         
         driver_count = len(self.manager.loaded_drivers)
         print(f"✅ Loaded {driver_count} drivers successfully")
@@ -59,6 +59,16 @@ from db.postgresql_manager import (
 # Import email service
 from simple_email_service import EmailService
 
+# Shared LLM client pool
+from core.llm_client_pool import llm_client_registry
+from core.llm_cache import llm_cache
+from core.email_delivery import email_delivery
+from core.http_client import http_client_manager
+from core import session_cache
+from core.db_pool import postgres_pools, mysql_pools, close_driver_pools
+from core.imap_sync import imap_connection_pool
+from core.execution_history import fetch_agent_execution_page, fetch_agent_execution_summary
+
 # Configure detailed logging
 logging.getLogger('werkzeug').setLevel(logging.INFO)
 logger.setLevel(logging.DEBUG)
@@ -103,6 +113,7 @@ async def lifespan(app: FastAPI):
     
     # Initialize agent processor
     agent_processor = AgentProcessor(db_manager.pool, automation_engine)
+    await agent_processor.ensure_schema()  # Tables added after older databases were created
 
     logger.info("✅ Database connected with UUID support")
     logger.info("✅ AutomationEngine and AgentProcessor initialized.")
@@ -113,6 +124,11 @@ async def lifespan(app: FastAPI):
     # Shutdown: Cleanup
     logger.info("🔌 Shutting down AutoFlow Platform...")
     await close_db()  # Close the database pool
+    await llm_client_registry.close()  # Close pooled LLM clients
+    await email_delivery.close()  # Close pooled SMTP sessions
+    await http_client_manager.close()  # Close shared driver/service HTTP pools
+    await close_driver_pools()  # Close Postgres/MySQL driver connection pools
+    await imap_connection_pool.close()  # Log out pooled IMAP sessions
         
     logger.info("✅ Database connections closed")
     logger.info("👋 AutoFlow AI Platform shut down gracefully")
@@ -229,11 +245,15 @@ AUTOMATION PROTOCOLS:
 - Support background email sending with proper status reporting
 - Showcase Roomify's technology capabilities in communications"""
 
-    user_agents = await agent_manager_instance.get_user_agents(user_id)
-    for agent in user_agents:
-        if agent['agent_name'] == default_agent_name:
-            logger.info(f"Found existing default agent for user {user_id}: {agent['agent_id']}")
-            return agent
+    cached_agent = session_cache.default_agent_cache.get(user_id)
+    if cached_agent is not None:
+        return cached_agent
+    
+    agent = await agent_manager_instance.get_agent_by_name(user_id, default_agent_name)
+    if agent:
+        logger.info(f"Found existing default agent for user {user_id}: {agent['agent_id']}")
+        session_cache.default_agent_cache.set(user_id, agent)
+        return agent
     
     # If not found, create it
     logger.info(f"Creating new default agent for user {user_id}: {default_agent_name}")
@@ -246,6 +266,7 @@ AUTOMATION PROTOCOLS:
     )
     if not new_agent:
         raise HTTPException(status_code=500, detail="Failed to create default agent.")
+    session_cache.default_agent_cache.set(user_id, new_agent)
     return new_agent
 
 
@@ -266,6 +287,65 @@ async def health():
         "timestamp": datetime.utcnow().isoformat()
     }
 
+@app.get("/health/llm")
+async def llm_pool_health():
+    """In-flight requests, queue wait and connection reuse for the shared LLM client pool, plus response cache hit rates."""
+    return {
+        "status": "ok",
+        "llm_client_pool": llm_client_registry.get_metrics(),
+        "llm_response_cache": llm_cache.get_stats(),
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+@app.get("/health/email")
+async def email_delivery_health():
+    """Queue depth, session reuse and retry counters for the shared SMTP delivery service, plus pooled IMAP sessions."""
+    return {
+        "status": "ok",
+        "email_delivery": email_delivery.get_stats(),
+        "imap_pool": imap_connection_pool.get_stats(),
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+@app.get("/health/http")
+async def http_client_health():
+    """Connection reuse and DNS cache counters for the shared SaaS driver HTTP client."""
+    return {
+        "status": "ok",
+        "http_client": http_client_manager.get_metrics(),
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+@app.get("/health/session-cache")
+async def session_cache_health():
+    """Hit rates of the process-local session, agent and default-agent caches on the chat hot path."""
+    return {
+        "status": "ok",
+        "session_cache": session_cache.get_stats(),
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+@app.get("/health/db-drivers")
+async def db_driver_pool_health():
+    """Pool sizes, acquire waits, health checks and statement cache hits for the Postgres/MySQL workflow drivers."""
+    return {
+        "status": "ok",
+        "postgres": postgres_pools.get_stats(),
+        "mysql": mysql_pools.get_stats(),
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+@app.get("/health/credits")
+async def credits_health():
+    """Credit charges, reservations and the buffered credit_logs writer."""
+    if db_manager.credits is None:
+        return {"status": "not_initialized", "timestamp": datetime.utcnow().isoformat()}
+    return {
+        "status": "ok",
+        **db_manager.credits.get_stats(),
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
 # ===== AUTHENTICATION ENDPOINTS =====
 
 @app.post("/api/auth/signup")
@@ -954,6 +1034,7 @@ async def delete_agent_endpoint(agent_id: str, current_user: dict = Depends(get_
         # AgentManager handles RLS, so it will only delete if owned by user or if user is admin
         success = await agent_manager_instance.delete_agent(agent_id, str(current_user['user_id']))
         if success:
+            llm_cache.invalidate_scope(f"agent:{agent_id}")
             logger.info(f"✅ Agent deleted: {agent_id} for user {current_user['email']}")
             return {"success": True, "message": "Agent deleted successfully"}
         else:
@@ -1595,7 +1676,7 @@ async def send_email_directly(
         logger.info(f"Sending email to {to_email} from user {current_user['email']}")
         
         # Send the email
-        result = email_service.send_email(to_email, subject, content)
+        result = await email_service.send_email_async(to_email, subject, content)
         
         if result.get('success'):
             logger.info(f"✅ Email sent successfully to {to_email}")
@@ -2429,10 +2510,16 @@ async def trigger_agent_manually(
 async def get_agent_executions(
     agent_id: str,
     limit: int = 50,
-    offset: int = 0,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
     current_user: dict = Depends(get_current_user)
 ):
-    """Get execution history for an agent."""
+    """
+    Get execution history for an agent, newest first.
+
+    Pass the returned next_cursor to get the following page. input_data and
+    output_data are only returned when named in `fields` (comma-separated).
+    """
     try:
         # Verify agent ownership
         agent = await agent_manager_instance.get_agent_details(agent_id, str(current_user['user_id']))
@@ -2441,36 +2528,19 @@ async def get_agent_executions(
         
         # Get executions from database
         async with agent_manager_instance.db_pool.acquire() as conn:
-            query = """
-                SELECT id, user_id, trigger_type, input_data, output_data, 
-                       execution_status, execution_time_ms, error_message, created_at
-                FROM agent_executions 
-                WHERE agent_id = $1 
-                ORDER BY created_at DESC 
-                LIMIT $2 OFFSET $3
-            """
-            rows = await conn.fetch(query, agent_id, limit, offset)
-            
-            executions = []
-            for row in rows:
-                executions.append({
-                    "id": str(row['id']),
-                    "user_id": row['user_id'],
-                    "trigger_type": row['trigger_type'],
-                    "input_data": row['input_data'],
-                    "output_data": row['output_data'],
-                    "execution_status": row['execution_status'],
-                    "execution_time_ms": row['execution_time_ms'],
-                    "error_message": row['error_message'],
-                    "created_at": row['created_at'].isoformat() if row['created_at'] else None
-                })
+            try:
+                page = await fetch_agent_execution_page(conn, agent_id, limit, cursor, fields)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
         
         return {
             "success": True,
-            "executions": executions,
-            "total": len(executions),
-            "limit": limit,
-            "offset": offset
+            "executions": page["executions"],
+            "total": len(page["executions"]),
+            "limit": page["limit"],
+            "fields": page["fields"],
+            "has_more": page["has_more"],
+            "next_cursor": page["next_cursor"]
         }
         
     except HTTPException:
@@ -2479,6 +2549,34 @@ async def get_agent_executions(
         logger.error(f"Error getting agent executions: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to get executions: {str(e)}")
 
+@app.get("/api/agents/{agent_id}/executions/summary")
+async def get_agent_execution_summary(
+    agent_id: str,
+    hours: int = 24,
+    current_user: dict = Depends(get_current_user)
+):
+    """Hourly execution counts, error rate and p50/p95 execution time for an agent."""
+    try:
+        # Verify agent ownership
+        agent = await agent_manager_instance.get_agent_details(agent_id, str(current_user['user_id']))
+        if not agent:
+            raise HTTPException(status_code=404, detail="Agent not found or access denied")
+        
+        async with agent_manager_instance.db_pool.acquire() as conn:
+            summary = await fetch_agent_execution_summary(conn, agent_id, hours)
+        
+        return {
+            "success": True,
+            "agent_id": agent_id,
+            **summary
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting agent execution summary: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to get execution summary: {str(e)}")
+
 @app.post("/api/test/openai")
 async def test_openai_driver(current_user: dict = Depends(get_current_user)):
     """Test OpenAI driver with the workflow JSON structure."""
@@ -134,8 +134,16 @@ class AgentEngineManager:
                 }
             }
             
+            queue_totals = {'queued': 0, 'processed': 0, 'rejected': 0, 'timed_out': 0, 'coalesced': 0, 'wait_max_ms': 0.0}
+            
             for key, instance_info in self._instances.items():
                 engine = instance_info['engine']
+                queue_stats = engine.request_queue.get_stats()
+                queue_totals['queued'] += queue_stats['depth']
+                queue_totals['wait_max_ms'] = max(queue_totals['wait_max_ms'], queue_stats['wait_max_ms'])
+                for counter in ('processed', 'rejected', 'timed_out', 'coalesced'):
+                    queue_totals[counter] += queue_stats[counter]
+                
                 status['instances'][key] = {
                     'agent_id': instance_info['agent_id'],
                     'session_id': instance_info['session_id'],
@@ -143,9 +151,11 @@ class AgentEngineManager:
                     'created': instance_info['created'].isoformat(),
                     'last_accessed': instance_info['last_accessed'].isoformat(),
                     'engine_instance_id': engine.instance_id,
-                    'memory_status': engine.get_memory_status()
+                    'memory_status': engine.get_memory_status(),
+                    'request_queue': queue_stats
                 }
             
+            status['manager_stats']['request_queues'] = queue_totals
             return status
 
     def force_cleanup_all(self) -> int:
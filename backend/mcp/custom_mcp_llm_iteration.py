@@ -13,6 +13,15 @@ from typing import Dict, Any, Optional, List
 # Configure logging
 logger = logging.getLogger(__name__)
 
+try:
+    from core.llm_cache import llm_cache
+    from core.request_queue import SessionRequestQueue, RequestQueueFull, RequestQueueTimeout, request_idempotency_key
+except ImportError:
+    from backend.core.llm_cache import llm_cache
+    from backend.core.request_queue import SessionRequestQueue, RequestQueueFull, RequestQueueTimeout, request_idempotency_key
+
+from .intent_classifier import classify, extract_subject, format_history
+
 # OpenAI integration
 try:
     import openai
@@ -96,7 +105,8 @@ class CustomMCPLLMIterationEngine:
             
         self.agent_expectations = agent_expectations or ""
         self.openai_client = None
-        self._processing_lock = False
+        # Requests from this session run one at a time, in order
+        self.request_queue = SessionRequestQueue(name=f"agent_{agent_id}_{session_id}")
         
         # Initialize conversation memory with AGENT-SPECIFIC isolation - THIS IS THE KEY FIX!
         self.agent_memory = self.agent_context.get('memory', {}) if agent_context else {}
@@ -127,8 +137,9 @@ class CustomMCPLLMIterationEngine:
                 # Use provided API key or environment variable
                 api_key = openai_api_key or os.getenv('OPENAI_API_KEY')
                 if api_key:
-                    self.openai_client = AsyncOpenAI(api_key=api_key)
-                    logger.info("OpenAI client initialized successfully")
+                    from core.llm_client_pool import llm_client_registry
+                    self.openai_client = llm_client_registry.get_openai_client(api_key)
+                    logger.info("OpenAI client borrowed from shared pool")
             except Exception as e:
                 logger.error(f"Failed to initialize OpenAI client: {e}")
         
@@ -177,6 +188,18 @@ class CustomMCPLLMIterationEngine:
         return True
 
     async def process_user_request(self, user_input: str, request_data: dict = None) -> Dict[str, Any]:
+        """Queue the request behind earlier ones from this session; duplicates share one result"""
+        try:
+            return await self.request_queue.submit(
+                self._process_user_request, user_input, request_data,
+                idempotency_key=request_idempotency_key(user_input, request_data)
+            )
+        except RequestQueueFull:
+            return self._instant_response("You already have several requests in progress. Please wait for them to finish and try again.")
+        except RequestQueueTimeout:
+            return self._instant_response("I'm still working on your earlier requests. Please try again in a moment.")
+
+    async def _process_user_request(self, user_input: str, request_data: dict = None) -> Dict[str, Any]:
         """Process user request with conversation memory"""
         
         logger.info(f"🔥 PROCESSING REQUEST: {user_input[:100]}...")
@@ -184,11 +207,6 @@ class CustomMCPLLMIterationEngine:
         
         start_time = datetime.now()
         
-        if self._processing_lock:
-            return self._instant_response("I'm currently processing another request. Please wait a moment and try again.")
-        
-        self._processing_lock = True
-        
         try:
             # PRIORITY: Handle approved email sending first
             if user_input.startswith("SEND_APPROVED_EMAIL:"):
@@ -205,34 +223,30 @@ class CustomMCPLLMIterationEngine:
             
             # Check conversation context for continuation from THIS AGENT ONLY
             recent_messages = self.current_conversation['conversation_history'][-5:]  # Last 5 messages
-            conversation_context = "\n".join([f"{msg['role']}: {msg['content']}" for msg in recent_messages])
             
-            user_lower = user_input.lower()
+            # Single classification pass; every routing decision below reads from it
+            intent = classify(user_input)
+            user_lower = intent.lower
             
             # Check for service selection response (e.g., "service:inhouse" or just "inhouse")
             # But ONLY if there's a legitimate automation request in conversation history
-            if user_input.startswith('service:') or user_lower in ['inhouse', 'openai', 'claude']:
-                if user_input.startswith('service:'):
-                    service_type = user_input.split(':', 1)[1].strip().lower()
-                else:
-                    service_type = user_lower
+            if intent.service_choice is not None:
+                service_type = intent.service_choice
                 
                 # Get the original automation request from conversation history
                 # ONLY look for EXPLICIT automation requests, not just keywords
                 original_request = None
                 for msg in reversed(recent_messages):
                     if msg['role'] == 'user':
-                        msg_content = msg.get('content', '').lower()
+                        msg_intent = classify(msg.get('content', ''))
                         # Check for EMAIL automation with recipient
-                        if ('@' in msg.get('content', '') and 
-                            any(action in msg_content for action in ['send email', 'email to', 'draft email', 'compose email'])):
-                            original_request = msg.get('content', '')
+                        if msg_intent.is_explicit_email_request:
+                            original_request = msg_intent.text
                             logger.info(f"🎯 SERVICE SELECTION: Found legitimate email automation request")
                             break
                         # Check for WEB SEARCH automation
-                        elif (any(search_term in msg_content for search_term in ['find', 'search', 'research', 'look up', 'locate']) and
-                              any(search_context in msg_content for search_context in ['web', 'internet', 'google', 'investors', 'companies', 'contacts', 'information'])):
-                            original_request = msg.get('content', '')
+                        elif msg_intent.is_web_search:
+                            original_request = msg_intent.text
                             logger.info(f"🔍 SERVICE SELECTION: Found legitimate web search automation request")
                             break
                 
@@ -241,23 +255,20 @@ class CustomMCPLLMIterationEngine:
                     logger.info(f"💬 SERVICE SELECTION: No automation request found - treating as conversation")
                     # Fall through to normal conversation flow below
                 else:
+                    request_intent = classify(original_request)
+                    
                     # Check if this is ZOOM MEETING automation
-                    original_request_lower = original_request.lower()
-                    is_zoom_meeting = (any(zoom_term in original_request_lower for zoom_term in ['zoom', 'meeting', 'schedule', 'set up meeting', 'setup meeting']) and
-                                     any(meeting_context in original_request_lower for meeting_context in ['meeting', 'zoom', 'link', 'oauth', 'authorization', 'connect']))
+                    is_zoom_meeting = request_intent.is_zoom_meeting
                     
                     # Check if this is WEB SEARCH automation
-                    is_web_search = (any(search_term in original_request_lower for search_term in ['find', 'search', 'research', 'look up', 'locate']) and
-                                   any(search_context in original_request_lower for search_context in ['web', 'internet', 'google', 'investors', 'companies', 'contacts', 'information']))
+                    is_web_search = request_intent.is_web_search
                     
                     if is_zoom_meeting and ZOOM_AVAILABLE:
                         # ZOOM MEETING AUTOMATION: Handle OAuth flow and meeting creation
                         logger.info(f"🔗 SERVICE SELECTION: Processing Zoom meeting automation")
                         try:
                             # Extract recipient email from original request
-                            import re
-                            email_match = re.search(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', original_request)
-                            recipient_email = email_match.group() if email_match else "slakshanand1105@gmail.com"
+                            recipient_email = classify(original_request).recipient_email or "slakshanand1105@gmail.com"
                             
                             # Generate OAuth URL for Zoom
                             oauth_url = zoom_service.get_oauth_url(state=f"meeting_for_{recipient_email}")
@@ -337,9 +348,7 @@ class CustomMCPLLMIterationEngine:
                             search_results = await web_search_service.search_comprehensive(search_query)
                             
                             # Extract recipient email from original request
-                            import re
-                            email_match = re.search(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', original_request)
-                            recipient_email = email_match.group() if email_match else "slakshanand1105@gmail.com"
+                            recipient_email = classify(original_request).recipient_email or "slakshanand1105@gmail.com"
                             
                             # Generate email content with search results
                             if OPENAI_AVAILABLE and self.openai_client:
@@ -369,7 +378,10 @@ INSTRUCTIONS:
 
 Format the email professionally and include all the search findings."""
                                 
-                                workflow_response = await self.openai_client.chat.completions.create(
+                                generated_content = await llm_cache.chat_completion(
+                                    self.openai_client,
+                                    namespace="email_generation",
+                                    scope=f"agent:{self.agent_id}",
                                     model="gpt-4",
                                     messages=[
                                         {"role": "system", "content": "You are a business research assistant. Create professional emails that include comprehensive web search results. Always include all the search findings with their links and contact information. Format everything clearly and be helpful with business research requests."},
@@ -379,11 +391,8 @@ Format the email professionally and include all the search findings."""
                                     temperature=0.3
                                 )
                                 
-                                generated_content = workflow_response.choices[0].message.content
-                                
                                 # Extract email subject from generated content
-                                subject_match = re.search(r'Subject:\s*(.+)', generated_content)
-                                email_subject = subject_match.group(1).strip() if subject_match else f"Web Search Results: {search_query}"
+                                email_subject = extract_subject(generated_content, f"Web Search Results: {search_query}")
                                 
                                 # Create structured workflow preview for web search + email
                                 workflow_preview_data = {
@@ -439,16 +448,14 @@ Format the email professionally and include all the search findings."""
                             return self._instant_response(f"❌ Web search automation failed: {str(e)}")
                     
                     # Check if this is CALENDAR INTEGRATION automation
-                    is_calendar_integration = (has_calendar_request and has_calendar_action)
+                    is_calendar_integration = request_intent.is_calendar_integration
                     
                     if is_calendar_integration:
                         # CALENDAR INTEGRATION AUTOMATION: Handle OAuth flows for multiple calendar services
                         logger.info(f"📅 SERVICE SELECTION: Processing calendar integration automation")
                         try:
                             # Extract recipient email from original request
-                            import re
-                            email_match = re.search(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', original_request)
-                            recipient_email = email_match.group() if email_match else "slakshanand1105@gmail.com"
+                            recipient_email = classify(original_request).recipient_email or "slakshanand1105@gmail.com"
                             
                             # Determine which calendar service(s) to offer
                             calendar_services = []
@@ -539,15 +546,15 @@ Format the email professionally and include all the search findings."""
                     if OPENAI_AVAILABLE and self.openai_client:
                         try:
                             # Build conversation context including company information
-                            conversation_context = ""
-                            for msg in recent_messages:
-                                if msg['role'] in ['user', 'assistant']:
-                                    conversation_context += f"{msg['role']}: {msg['content']}\n"
+                            conversation_context = format_history(recent_messages)
                             
                             # Generate content based on original request AND conversation context
                             workflow_prompt = f"Conversation Context:\n{conversation_context}\n\nCurrent Request: {original_request}\n\nPlease create detailed email content using the company information and context provided above. Generate professional, personalized content that incorporates the company details from the conversation."
                             
-                            workflow_response = await self.openai_client.chat.completions.create(
+                            generated_content = await llm_cache.chat_completion(
+                                self.openai_client,
+                                namespace="email_generation",
+                                scope=f"agent:{self.agent_id}",
                                 model="gpt-4",
                                 messages=[
                                     {"role": "system", "content": f"You are a professional email automation assistant. Generate high-quality, personalized email content using {service_type} AI service. Use any company information, achievements, or details from the conversation context to create relevant, specific content."},
@@ -557,16 +564,11 @@ Format the email professionally and include all the search findings."""
                                 temperature=0.7
                             )
                             
-                            generated_content = workflow_response.choices[0].message.content
-                            
                             # Extract email subject from generated content
-                            import re
-                            subject_match = re.search(r'Subject:\s*(.+)', generated_content)
-                            email_subject = subject_match.group(1).strip() if subject_match else "DXTR Labs - Professional Email"
+                            email_subject = extract_subject(generated_content, "DXTR Labs - Professional Email")
                             
                             # Extract recipient email from original request
-                            email_match = re.search(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', original_request)
-                            recipient_email = email_match.group() if email_match else "slakshanand1105@gmail.com"
+                            recipient_email = classify(original_request).recipient_email or "slakshanand1105@gmail.com"
                             
                             # Create structured workflow preview for editable email interface
                             workflow_preview_data = {
@@ -643,106 +645,52 @@ Format the email professionally and include all the search findings."""
             
             # Continue with normal automation detection and conversation flow...
             
-            # Define automation and informational keywords for proper detection
-            
-            # Enhanced automation detection - ONLY trigger on clear ACTION requests, not informational content
-            automation_action_keywords = [
-                # Clear email actions
-                'send email', 'email to', 'send to', 'draft email', 'compose email',
-                'email about', 'send message', 'notify via email', 'email blast', 'send outreach',
-                
-                # Clear research actions  
-                'search for', 'find and email', 'look up and send', 'investigate and email',
-                'gather data and send', 'collect contacts and email', 'get details and send',
-                
-                # Clear workflow actions
-                'create workflow', 'automate this', 'schedule email', 'set up automation',
-                'execute automation', 'run workflow', 'process and send',
-                
-                # Clear business actions
-                'find top 10 and email', 'research investors and email', 'cold email to',
-                'send sales outreach', 'execute marketing campaign'
-            ]
-            
-            # Informational keywords that should NOT trigger automation
-            informational_keywords = [
-                'company info', 'about us', 'our company', 'company overview', 'pitch summary',
-                'competitor research', 'market stats', 'funding info', 'company profiles',
-                'investor pitch data', 'market size', 'positioning'
-            ]
-            
-            user_lower = user_input.lower()
-            
-            # Check if this is just informational content (should be conversational)
-            is_informational = any(keyword in user_lower for keyword in informational_keywords)
-            
-            # Check for clear automation actions
-            is_clear_automation = any(keyword in user_lower for keyword in automation_action_keywords)
-            
-            # Check for email with recipient (definitely automation)
-            has_email_recipient = '@' in user_input
-            has_email_action = any(word in user_lower for word in ['send', 'email to', 'notify', 'contact via email'])
-            
-            # Check for Zoom meeting requests (definitely automation)
-            has_zoom_request = any(word in user_lower for word in ['zoom', 'meeting', 'schedule', 'set up meeting', 'setup meeting', 'create meeting'])
-            has_meeting_action = any(word in user_lower for word in ['setup', 'set up', 'create', 'schedule', 'arrange', 'organize'])
-            
-            # Check for calendar integration requests (definitely automation)
-            has_calendar_request = any(word in user_lower for word in ['calendar', 'google calendar', 'outlook', 'calendly', 'scheduling'])
-            has_calendar_action = any(word in user_lower for word in ['connect', 'integrate', 'oauth', 'authorize', 'link', 'setup', 'send'])
+            # Automation detection - ONLY trigger on clear ACTION requests, not informational content
+            has_email_recipient = intent.has_email_recipient
+            has_email_action = intent.has('email_action')
             
             logger.info(f"🔥 EMAIL DETECTION: has_email_recipient={has_email_recipient}, has_email_action={has_email_action}")
-            logger.info(f"🔥 ZOOM DETECTION: has_zoom_request={has_zoom_request}, has_meeting_action={has_meeting_action}")
-            logger.info(f"🔥 CALENDAR DETECTION: has_calendar_request={has_calendar_request}, has_calendar_action={has_calendar_action}")
-            logger.info(f"🔥 EMAIL DETECTION: @ in input: {'@' in user_input}, user_lower: {user_lower}")
+            logger.info(f"🔥 ZOOM DETECTION: has_zoom_request={intent.has('zoom_request')}, has_meeting_action={intent.has('meeting_action')}")
+            logger.info(f"🔥 CALENDAR DETECTION: has_calendar_request={intent.has('calendar_request')}, has_calendar_action={intent.has('calendar_action')}")
             
             # Determine if this is automation or conversation
-            if has_email_recipient and has_email_action:
-                is_automation = True
+            is_automation = intent.is_automation
+            if intent.kind == "email":
                 logger.info(f"🎯 EMAIL AUTOMATION: Recipient + action detected")
-            elif has_zoom_request and has_meeting_action:
-                is_automation = True
+            elif intent.kind == "zoom":
                 logger.info(f"🎯 ZOOM AUTOMATION: Meeting request detected")
-            elif has_calendar_request and has_calendar_action:
-                is_automation = True
+            elif intent.kind == "calendar":
                 logger.info(f"🎯 CALENDAR AUTOMATION: Calendar integration request detected")
-            elif is_clear_automation and not is_informational:
-                is_automation = True  
+            elif intent.kind == "action":
                 logger.info(f"🎯 ACTION AUTOMATION: Clear action request detected")
-            elif is_informational and not is_clear_automation:
-                is_automation = False
+            elif intent.kind == "informational":
                 logger.info(f"💬 INFORMATIONAL: Company info/context provided - being conversational")
             else:
                 # Default to conversation for ambiguous cases
-                is_automation = False
                 logger.info(f"💬 CONVERSATION: Ambiguous request - defaulting to conversational")
                 
             # Check for continuation keywords
-            continuation_keywords = ['sure', 'yes', 'proceed', 'continue', 'go ahead', 'do it', 
-                                   'confirm', 'execute', 'run it', 'start']
-            is_continuation = any(keyword in user_lower for keyword in continuation_keywords)
+            is_continuation = intent.has('continuation')
             
             # DIRECT EMAIL AUTOMATION SHORTCUT - Skip service selection for immediate preview
-            if has_email_recipient and has_email_action and not user_lower.startswith('service:'):
+            if intent.is_email_automation and not user_lower.startswith('service:'):
                 logger.info(f"🚀 DIRECT EMAIL AUTOMATION: Generating immediate preview for {user_input}")
                 
                 # Extract recipient email
-                import re
-                email_match = re.search(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', user_input)
-                recipient_email = email_match.group() if email_match else "slakshanand1105@gmail.com"
+                recipient_email = intent.recipient_email or "slakshanand1105@gmail.com"
                 
                 # Generate content immediately using OpenAI
                 if OPENAI_AVAILABLE and self.openai_client:
                     try:
                         # Build conversation context
-                        conversation_context = ""
-                        for msg in recent_messages:
-                            if msg['role'] in ['user', 'assistant']:
-                                conversation_context += f"{msg['role']}: {msg['content']}\n"
+                        conversation_context = format_history(recent_messages)
                         
                         workflow_prompt = f"Conversation Context:\n{conversation_context}\n\nCurrent Request: {user_input}\n\nPlease create detailed email content using the company information and context provided above. Generate professional email content incorporating the company details from the conversation."
                         
-                        workflow_response = await self.openai_client.chat.completions.create(
+                        generated_content = await llm_cache.chat_completion(
+                            self.openai_client,
+                            namespace="email_generation",
+                            scope=f"agent:{self.agent_id}",
                             model="gpt-4",
                             messages=[
                                 {"role": "system", "content": "You are a professional email automation assistant. Generate high-quality, personalized email content using any company information, achievements, or details from the conversation context to create relevant, specific content."},
@@ -752,11 +700,8 @@ Format the email professionally and include all the search findings."""
                             temperature=0.7
                         )
                         
-                        generated_content = workflow_response.choices[0].message.content
-                        
                         # Extract email subject
-                        subject_match = re.search(r'Subject:\s*(.+)', generated_content)
-                        email_subject = subject_match.group(1).strip() if subject_match else "DXTR Labs - Professional Email"
+                        email_subject = extract_subject(generated_content, "DXTR Labs - Professional Email")
                         
                         # Create workflow preview
                         workflow_preview_data = {
@@ -842,16 +787,11 @@ Format the email professionally and include all the search findings."""
                         break
                 
                 if last_assistant_msg:
-                    content_lower = last_assistant_msg.get('content', '').lower()
                     # Only consider pending if last assistant message was asking for confirmation/approval
-                    has_pending_workflow = ('confirm' in content_lower or 
-                                          'approve' in content_lower or
-                                          'proceed' in content_lower or
-                                          'ready to' in content_lower) and ('workflow' in content_lower or 'automation' in content_lower)
+                    has_pending_workflow = classify(last_assistant_msg.get('content', '')).is_pending_confirmation
             
             # Check if previous conversation mentioned AI investors
-            conversation_about_investors = any('investor' in msg.get('content', '').lower() or
-                                             'ai' in msg.get('content', '').lower()
+            conversation_about_investors = any(classify(msg.get('content', '')).has('investor_topic')
                                              for msg in recent_messages)
             
             # Check for service selection response
@@ -871,15 +811,15 @@ Format the email professionally and include all the search findings."""
                     if OPENAI_AVAILABLE and self.openai_client:
                         try:
                             # Build conversation context including company information
-                            conversation_context = ""
-                            for msg in recent_messages:
-                                if msg['role'] in ['user', 'assistant']:
-                                    conversation_context += f"{msg['role']}: {msg['content']}\n"
+                            conversation_context = format_history(recent_messages)
                             
                             # Generate content based on original request AND conversation context
                             workflow_prompt = f"Conversation Context:\n{conversation_context}\n\nCurrent Request: {original_request}\n\nPlease create detailed workflow content using the company information and context provided above. Generate the actual content that would be used (email content, search results, etc.). Be specific and actionable, incorporating the company details from the conversation."
                             
-                            workflow_response = await self.openai_client.chat.completions.create(
+                            generated_content = await llm_cache.chat_completion(
+                                self.openai_client,
+                                namespace="email_generation",
+                                scope=f"agent:{self.agent_id}",
                                 model="gpt-4",
                                 messages=[
                                     {"role": "system", "content": f"You are a professional automation assistant. Generate high-quality, personalized content for the user's request using {service_choice} AI service. Use any company information, achievements, or details from the conversation context to create relevant, specific content."},
@@ -889,16 +829,11 @@ Format the email professionally and include all the search findings."""
                                 temperature=0.7
                             )
                             
-                            generated_content = workflow_response.choices[0].message.content
-                            
                             # Extract email subject from generated content
-                            import re
-                            subject_match = re.search(r'Subject:\s*(.+)', generated_content)
-                            email_subject = subject_match.group(1).strip() if subject_match else "DXTR Labs - Company Overview and Achievements"
+                            email_subject = extract_subject(generated_content, "DXTR Labs - Company Overview and Achievements")
                             
                             # Extract recipient email from original request
-                            email_match = re.search(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', original_request)
-                            recipient_email = email_match.group() if email_match else "slakshanand1105@gmail.com"
+                            recipient_email = classify(original_request).recipient_email or "slakshanand1105@gmail.com"
                             
                             # Create structured workflow preview for editable email interface
                             workflow_preview_data = {
@@ -1050,27 +985,15 @@ Format the email professionally and include all the search findings."""
             # PRIORITY: Email automation requests ALWAYS go to preview mode
             if (has_email_recipient and has_email_action) or OPENAI_AVAILABLE and self.openai_client:
                 try:
-                    # Use the same improved automation detection logic
                     # Only trigger automation on clear ACTION requests, not informational content
-                    clear_action_phrases = [
-                        'send email', 'email to', 'send to', 'email about', 'send message',
-                        'search for and email', 'find and send', 'look up and email', 'investigate and send',
-                        'create workflow', 'automate this', 'schedule', 'set up automation',
-                        'process and send', 'analyze and email', 'generate and send', 'find top 10 and email',
-                        'draft email', 'compose email', 'write and send', 'cold email', 'send outreach'
-                    ]
-                    
                     # Check if user is providing company info (should be conversational)
-                    providing_company_info = any(phrase in user_lower for phrase in [
-                        'company info', 'our company', 'about us', 'company overview', 'pitch summary',
-                        'company details', 'company is', 'we are', 'our business'
-                    ])
+                    providing_company_info = intent.has('company_info')
                     
                     # Enhanced detection: ANY mention of email + recipient = automation
-                    has_email_and_recipient = '@' in user_input and any(word in user_lower for word in ['email', 'send', 'contact'])
+                    has_email_and_recipient = intent.has_email_recipient and intent.has('email_contact')
                     
                     # Clear action request detection
-                    has_clear_action = any(phrase in user_lower for phrase in clear_action_phrases)
+                    has_clear_action = intent.has('clear_action')
                     
                     # Determine final automation status
                     if has_email_and_recipient:
@@ -1212,19 +1135,15 @@ Format the email professionally and include all the search findings."""
                     # Fall back to simple response
                 
                 # Simple fallback conversational response with context awareness
-                greetings = ['hello', 'hi', 'hey', 'good morning', 'good afternoon', 'good evening']
-                questions = ['what', 'how', 'why', 'when', 'where', 'who']
-                thanks = ['thank', 'thanks', 'appreciate']
-                
                 # Context-aware responses
-                if any(greeting in user_lower for greeting in greetings):
+                if intent.has('greeting'):
                     if len(self.current_conversation['conversation_history']) > 1:
                         response = f"Hello again! I'm {self.agent_data.get('agent_name', 'your assistant')}. How can I continue helping you?"
                     else:
                         response = f"Hello! I'm {self.agent_data.get('agent_name', 'your assistant')}. How can I help you today?"
-                elif any(question in user_lower for question in questions):
+                elif intent.has('question'):
                     response = "That's a great question! I'm here to help you with information and automation tasks. What specifically would you like to know more about?"
-                elif any(thank in user_lower for thank in thanks):
+                elif intent.has('thanks'):
                     response = "You're very welcome! I'm happy to help. Is there anything else you'd like assistance with?"
                 else:
                     # Check if this might be a follow-up to previous conversation
@@ -1261,7 +1180,6 @@ Format the email professionally and include all the search findings."""
             }
         
         finally:
-            self._processing_lock = False
             processing_time = (datetime.now() - start_time).total_seconds()
             logger.info(f"Request processed in {processing_time:.3f}s")
 
@@ -1432,7 +1350,6 @@ Format the email professionally and include all the search findings."""
     async def _send_email_directly(self, recipient: str, subject: str, content: str, service_type: str = "inhouse") -> bool:
         """Send email directly using SMTP configuration from .env.local"""
         try:
-            import smtplib
             import os
             from email.mime.text import MIMEText
             from email.mime.multipart import MIMEMultipart
@@ -1472,16 +1389,15 @@ Format the email professionally and include all the search findings."""
             
             msg.attach(MIMEText(html_content, 'html'))
             
-            # Send email
+            # Send email through the shared pooled delivery service
             logger.info(f"🚀 Attempting to send email via SMTP: {smtp_host}:{smtp_port}")
             
-            server = smtplib.SMTP(smtp_host, smtp_port)
-            server.starttls()
-            server.login(company_email, company_password)
-            
-            text = msg.as_string()
-            server.sendmail(company_email, recipient, text)
-            server.quit()
+            from core.email_delivery import email_delivery, SMTPCredential
+            credential = SMTPCredential(smtp_host, smtp_port, company_email, company_password)
+            delivery = await email_delivery.send(credential, msg, from_addr=company_email, to_addrs=[recipient])
+            if not delivery["success"]:
+                logger.error(f"❌ Direct email sending failed after {delivery['attempts']} attempts: {delivery['error']}")
+                return False
             
             logger.info(f"✅ Email successfully sent to {recipient}")
             return True
@@ -1536,7 +1452,7 @@ Format the email professionally and include all the search findings."""
             if self.email_service:
                 try:
                     # Use the global email service instead of direct SMTP
-                    result = self.email_service.send_email(recipient, subject, email_content)
+                    result = await self.email_service.send_email_async(recipient, subject, email_content)
                     
                     if result.get('success', False):
                         logger.info(f"✅ EMAIL SENT: Successfully sent to {recipient}")
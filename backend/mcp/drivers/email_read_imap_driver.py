@@ -1,18 +1,24 @@
-import imaplib
 import email
+import hashlib
+import json
 from email.header import decode_header
 import logging
 import os
 import sys
-import sys
 
 # Add the backend directory to the path for imports
 backend_dir = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
 sys.path.append(backend_dir)
 
 from mcp.drivers.base_driver import BaseDriver
+from core.imap_sync import ImapSync, MemoryUidStore, PostgresUidStore, imap_connection_pool
 
 class EmailReadImapDriver(BaseDriver):
+    def __init__(self, db_pool):
+        super().__init__(db_pool)
+        # Connections are shared per IMAP account; last seen UIDs persist in imap_sync_state
+        self.sync = ImapSync(imap_connection_pool, PostgresUidStore(db_pool))
+
     async def execute(self, parameters: dict, input_data: dict, user_id: str, engine_instance=None) -> dict:
         logging.info(f"EmailReadImapDriver: Executing for user {user_id}")
 
@@ -28,6 +34,9 @@ class EmailReadImapDriver(BaseDriver):
         output_format = parameters["format"] # 'simple' or 'resolved'
         download_attachments = parameters.get("downloadAttachments", False)
         options = parameters.get("options", {}) # Custom IMAP search options
+        incremental = parameters.get("incremental", True) # Only messages newer than the last run
+        fetch_bodies = parameters.get("fetchBodies", True) # False: headers only, bodies on demand
+        wait_for_new = float(parameters.get("waitForNew", 0)) # Seconds to IDLE when nothing is new
 
         # 2. Retrieve Credentials
         try:
@@ -36,6 +45,7 @@ class EmailReadImapDriver(BaseDriver):
             imap_port = imap_credentials.get("port", int(os.getenv("IMAP_PORT", 993)))
             imap_user = imap_credentials.get("user", os.getenv("IMAP_USER"))
             imap_pass = imap_credentials.get("password", os.getenv("IMAP_PASSWORD"))
+            imap_ssl = imap_credentials.get("ssl", os.getenv("IMAP_SSL", "true").lower() != "false")
 
             if not all([imap_host, imap_user, imap_pass]):
                 raise ValueError("IMAP credentials (host, user, password) are not fully configured.")
@@ -43,85 +53,123 @@ class EmailReadImapDriver(BaseDriver):
             logging.error(f"EmailReadImapDriver: Failed to retrieve IMAP credentials: {e}")
             return {"status": "failed", "error": f"Failed to retrieve IMAP credentials: {e}"}
 
-        emails_data = []
+        credential = {"host": imap_host, "port": int(imap_port), "user": imap_user,
+                      "password": imap_pass, "ssl": imap_ssl}
+        # Without incremental sync every run starts from an empty state, like the old UNSEEN scan
+        sync = self.sync if incremental else ImapSync(imap_connection_pool, MemoryUidStore())
+        fetch_options = {
+            "criteria": self._search_criteria(options),
+            "fetch_bodies": fetch_bodies,
+            "post_process": post_process_action if post_process_action in ("read", "delete") else None,
+            "scope": self._sync_scope(parameters, input_data, user_id),
+            "limit": parameters.get("limit")
+        }
+
         try:
-            # Connect to IMAP server
-            mail = imaplib.IMAP4_SSL(imap_host, imap_port)
-            mail.login(imap_user, imap_pass)
-            mail.select(mailbox)
-
-            # Build search criteria
-            search_criteria = 'UNSEEN' # Default to unread
-            if options.get("customEmailConfig"):
-                # This is a very simplified handling. Real IMAP search is complex.
-                # The LLM's output for customEmailConfig needs to be carefully structured.
-                try:
-                    # Assuming customEmailConfig is a JSON string of a list, e.g., '["SUBJECT", "invoice"]'
-                    # Or more complex: '["UNSEEN", ["SUBJECT", "invoice"]]'
-                    custom_config = json.loads(options["customEmailConfig"])
-                    if isinstance(custom_config, list):
-                        search_criteria = ' '.join(map(str, custom_config)) # Simple join, needs robust parsing
-                    else:
-                        logging.warning(f"EmailReadImapDriver: Invalid customEmailConfig format: {options['customEmailConfig']}")
-                except json.JSONDecodeError:
-                    logging.warning(f"EmailReadImapDriver: customEmailConfig is not valid JSON: {options['customEmailConfig']}")
-                except Exception as e:
-                    logging.warning(f"EmailReadImapDriver: Error parsing customEmailConfig: {e}")
-            
-            # Search for emails
-            status, email_ids = mail.search(None, search_criteria)
-            email_id_list = email_ids[0].split()
-
-            for email_id in email_id_list:
-                status, msg_data = mail.fetch(email_id, '(RFC822)') # Fetch the email content
-                for response_part in msg_data:
-                    if isinstance(response_part, tuple):
-                        msg = email.message_from_bytes(response_part[1])
-                        
-                        email_info = {
-                            "id": email_id.decode(),
-                            "from": msg.get("From"),
-                            "to": msg.get("To"),
-                            "subject": ''.join(part.decode(charset or 'utf-8') for part, charset in decode_header(msg.get("Subject"))),
-                            "date": msg.get("Date"),
-                            "body_plain": "",
-                            "body_html": "",
-                            "attachments": []
-                        }
-
-                        # Extract body
-                        if msg.is_multipart():
-                            for part in msg.walk():
-                                ctype = part.get_content_type()
-                                cdisp = str(part.get("Content-Disposition"))
-
-                                if ctype == "text/plain" and "attachment" not in cdisp:
-                                    email_info["body_plain"] = part.get_payload(decode=True).decode(errors='ignore')
-                                elif ctype == "text/html" and "attachment" not in cdisp:
-                                    email_info["body_html"] = part.get_payload(decode=True).decode(errors='ignore')
-                                elif download_attachments and "attachment" in cdisp:
-                                    filename = part.get_filename()
-                                    if filename:
-                                        # In a real scenario, you'd save this to a temp file or cloud storage
-                                        email_info["attachments"].append({"filename": filename, "size": len(part.get_payload(decode=True))})
-                        else:
-                            email_info["body_plain"] = msg.get_payload(decode=True).decode(errors='ignore')
-                        
-                        emails_data.append(email_info)
-
-                # Mark as read or delete based on postProcessAction
-                if post_process_action == "read":
-                    mail.store(email_id, '+FLAGS', '\\Seen')
-                elif post_process_action == "delete":
-                    mail.store(email_id, '+FLAGS', '\\Deleted')
-            
-            if post_process_action == "delete":
-                mail.expunge() # Permanently remove deleted messages
-
-            mail.logout()
+            result = await sync.fetch_new(credential, mailbox, **fetch_options)
+            if not result["messages"] and wait_for_new > 0:
+                # IDLE: the server pushes new mail instead of us polling for it
+                if await sync.wait_for_new(credential, mailbox, timeout=wait_for_new):
+                    result = await sync.fetch_new(credential, mailbox, **fetch_options)
+
+            emails_data = [self._format_email(message, download_attachments) for message in result["messages"]]
             logging.info(f"EmailReadImapDriver: Successfully read {len(emails_data)} emails from {mailbox}.")
-            return {"status": "success", "emails": emails_data}
+            return {
+                "status": "success",
+                "emails": emails_data,
+                "uidvalidity": result["uidvalidity"],
+                "last_uid": result["last_uid"]
+            }
 
         except Exception as e:
             logging.error(f"EmailReadImapDriver: Error reading emails from IMAP: {e}", exc_info=True)
             return {"status": "failed", "error": str(e)}
+
+    @staticmethod
+    def _sync_scope(parameters: dict, input_data: dict, user_id: str) -> str:
+        """
+        Key for the persisted UID cursor: one per workflow node, so two workflows
+        reading the same inbox each see every new message
+        """
+        input_data = input_data if isinstance(input_data, dict) else {}
+        consumer = parameters.get("syncKey")
+        if not consumer:
+            workflow_id = parameters.get("workflowId") or input_data.get("workflow_id")
+            node_id = parameters.get("nodeId") or input_data.get("node_id") or input_data.get("node_name")
+            consumer = ":".join(str(part) for part in (workflow_id, node_id) if part)
+        if not consumer:
+            # No workflow/node id: fall back to the node's configuration
+            logging.warning("EmailReadImapDriver: no workflow/node id for incremental sync; "
+                            "identically configured nodes of this user will share a UID cursor")
+            consumer = "cfg-" + hashlib.sha256(json.dumps(
+                [parameters.get("mailbox"), parameters.get("postProcessAction"), parameters.get("options", {})],
+                sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+        return f"{user_id}:{consumer}"
+
+    @staticmethod
+    def _search_criteria(options: dict) -> str:
+        search_criteria = 'UNSEEN' # Default to unread
+        if options.get("customEmailConfig"):
+            # This is a very simplified handling. Real IMAP search is complex.
+            # The LLM's output for customEmailConfig needs to be carefully structured.
+            try:
+                # Assuming customEmailConfig is a JSON string of a list, e.g., '["SUBJECT", "invoice"]'
+                # Or more complex: '["UNSEEN", ["SUBJECT", "invoice"]]'
+                custom_config = json.loads(options["customEmailConfig"])
+                if isinstance(custom_config, list):
+                    search_criteria = ' '.join(map(str, custom_config)) # Simple join, needs robust parsing
+                else:
+                    logging.warning(f"EmailReadImapDriver: Invalid customEmailConfig format: {options['customEmailConfig']}")
+            except json.JSONDecodeError:
+                logging.warning(f"EmailReadImapDriver: customEmailConfig is not valid JSON: {options['customEmailConfig']}")
+            except Exception as e:
+                logging.warning(f"EmailReadImapDriver: Error parsing customEmailConfig: {e}")
+        return search_criteria
+
+    @staticmethod
+    def _decode_subject(subject) -> str:
+        if not subject:
+            return ""
+        return ''.join(part.decode(charset or 'utf-8', errors='ignore') if isinstance(part, bytes) else part
+                       for part, charset in decode_header(subject))
+
+    def _format_email(self, message: dict, download_attachments: bool) -> dict:
+        # Headers always come from the batched header fetch; bodies only if they were fetched
+        msg = email.message_from_bytes(message["raw"] or message["headers"])
+        email_info = {
+            "id": str(message["uid"]),
+            "uid": message["uid"],
+            "from": msg.get("From"),
+            "to": msg.get("To"),
+            "subject": self._decode_subject(msg.get("Subject")),
+            "date": msg.get("Date"),
+            "message_id": msg.get("Message-ID"),
+            "flags": message["flags"],
+            "size": message["size"],
+            "body_fetched": message["raw"] is not None,
+            "body_plain": "",
+            "body_html": "",
+            "attachments": []
+        }
+        if message["raw"] is None:
+            return email_info
+
+        # Extract body
+        if msg.is_multipart():
+            for part in msg.walk():
+                ctype = part.get_content_type()
+                cdisp = str(part.get("Content-Disposition"))
+
+                if ctype == "text/plain" and "attachment" not in cdisp:
+                    email_info["body_plain"] = part.get_payload(decode=True).decode(errors='ignore')
+                elif ctype == "text/html" and "attachment" not in cdisp:
+                    email_info["body_html"] = part.get_payload(decode=True).decode(errors='ignore')
+                elif download_attachments and "attachment" in cdisp:
+                    filename = part.get_filename()
+                    if filename:
+                        # In a real scenario, you'd save this to a temp file or cloud storage
+                        email_info["attachments"].append({"filename": filename, "size": len(part.get_payload(decode=True))})
+        else:
+            payload = msg.get_payload(decode=True)
+            email_info["body_plain"] = payload.decode(errors='ignore') if payload else ""
+        return email_info
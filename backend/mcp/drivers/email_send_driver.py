@@ -1,4 +1,3 @@
-import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import logging
@@ -11,6 +10,11 @@ sys.path.append(backend_dir)
 
 from mcp.drivers.base_driver import BaseDriver
 
+try:
+    from core.email_delivery import email_delivery, SMTPCredential
+except ImportError:
+    from backend.core.email_delivery import email_delivery, SMTPCredential
+
 class EmailSendDriver(BaseDriver):
     async def execute(self, parameters: dict, input_data: dict, user_id: str, engine_instance=None) -> dict:
         logging.info(f"EmailSendDriver: Executing for user {user_id}")
@@ -170,10 +174,11 @@ class EmailSendDriver(BaseDriver):
             
             logging.info(f"EmailSendDriver: Sending to {len(recipients)} recipients: {recipients}")
             
-            with smtplib.SMTP(smtp_host, smtp_port) as server:
-                server.starttls() # Secure the connection
-                server.login(smtp_user, smtp_pass)
-                server.send_message(msg, to_addrs=recipients)
+            # Send through the shared pooled delivery service (STARTTLS, retries)
+            credential = SMTPCredential(smtp_host, int(smtp_port), smtp_user, smtp_pass)
+            delivery = await email_delivery.send(credential, msg, to_addrs=recipients)
+            if not delivery["success"]:
+                raise RuntimeError(f"{delivery['error']} (after {delivery['attempts']} attempts)")
             
             logging.info(f"EmailSendDriver: Email sent successfully to {to_email} (and {len(recipients)-1} additional recipients)")
             return {
@@ -7,6 +7,14 @@ backend_dir = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
 sys.path.append(backend_dir)
 
 from mcp.drivers.base_driver import BaseDriver
+from core.fan_out import bounded_map, batched, clamp_concurrency, DEFAULT_CONCURRENCY
+
+
+class LoopIterationError(Exception):
+    def __init__(self, index: int, node: str, error: str):
+        super().__init__(f"Loop iteration {index + 1} failed: {error}")
+        self.index = index
+        self.node = node
 
 class LoopItemsDriver(BaseDriver):
     def __init__(self, db_pool, engine_instance):
@@ -23,7 +31,6 @@ class LoopItemsDriver(BaseDriver):
             return {"status": "failed", "error": f"Missing required parameter: {required_params}"}
 
         items_expression = parameters["items"]
-        loop_body_nodes = parameters["loopBody"]
         
         # 2. Resolve Items List (CRITICAL: Implement securely!)
         # This is similar to condition evaluation. You need to safely extract the list
@@ -45,24 +52,46 @@ class LoopItemsDriver(BaseDriver):
             logging.error(f"LoopItemsDriver: Error resolving items expression '{items_expression}': {e}", exc_info=True)
             return {"status": "failed", "error": f"Error resolving items for loop: {e}"}
 
-        # 3. Execute Loop Body for each item
+        # 3. Execute Loop Body for each item, up to `concurrency` iterations in flight.
+        # Results are not streamed to downstream nodes: node outputs are handed over
+        # whole, so every item's output is collected into loop_results. Python callers
+        # that want outputs as they finish can iterate iter_results() directly.
         loop_results = []
-        for i, item in enumerate(items_to_loop):
-            logging.info(f"LoopItemsDriver: Processing item {i+1}/{len(items_to_loop)}")
-            # The 'input_data' for each iteration of the loop body is the current item.
-            # You might want to merge it with the original input_data if needed.
-            iteration_input_data = {"current_item": item, **input_data} # Merge current item with original input
+        try:
+            async for _, item_output in self.iter_results(parameters, items_to_loop, input_data, user_id):
+                loop_results.append(item_output)
+        except LoopIterationError as e:
+            logging.error(f"LoopItemsDriver: Node in loopBody failed for item {e.index + 1}: {e.node}")
+            return {"status": "failed", "error": str(e), "processed_count": len(loop_results)}
+
+        logging.info(f"LoopItemsDriver: Loop completed. Processed {len(loop_results)} items.")
+        return {"status": "success", "loop_results": loop_results}
+
+    async def iter_results(self, parameters: dict, items, input_data: dict, user_id: str):
+        """
+        Yield (item index, loop body output) as iterations finish. Parameters:
+        concurrency (in-flight iterations), ordered (item order vs completion
+        order) and batchSize (items handed to one iteration as current_batch).
+        """
+        loop_body_nodes = parameters["loopBody"]
+        concurrency = clamp_concurrency(parameters.get("concurrency", DEFAULT_CONCURRENCY))
+        ordered = parameters.get("ordered", True)
+        batch_size = parameters.get("batchSize")
+        units = batched(items, batch_size) if batch_size else items
 
-            item_output = iteration_input_data # Initialize output for this item
+        async def run_iteration(index: int, unit):
+            # The 'input_data' for each iteration of the loop body is the current item (or batch).
+            if batch_size:
+                item_output = {"current_batch": unit, **input_data}
+            else:
+                item_output = {"current_item": unit, **input_data} # Merge current item with original input
             for node_def in loop_body_nodes:
                 # Recursively call the engine's _execute_node for nested nodes
                 item_output = await self.engine._execute_node(node_def, item_output, user_id)
                 if item_output.get("status") == "failed":
-                    logging.error(f"LoopItemsDriver: Node in loopBody failed for item {i+1}: {node_def.get('node')}")
-                    # Decide if you want to stop the whole loop or just log and continue
-                    return {"status": "failed", "error": f"Loop iteration {i+1} failed: {item_output.get('error')}"}
-            loop_results.append(item_output)
+                    raise LoopIterationError(index, node_def.get('node'), item_output.get('error'))
+            return item_output
 
-        logging.info(f"LoopItemsDriver: Loop completed. Processed {len(items_to_loop)} items.")
-        return {"status": "success", "loop_results": loop_results}
+        async for index, item_output in bounded_map(run_iteration, units, concurrency, ordered):
+            yield index, item_output
 
@@ -5,10 +5,10 @@ Supports: Google Analytics, custom metrics, performance tracking
 
 import logging
 import asyncio
-import aiohttp
 from typing import Dict, Any, List, Optional, Union
 import json
-from datetime import datetime, timedelta
+from collections import deque
+from datetime import datetime, timedelta, timezone
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
@@ -19,6 +19,21 @@ mcp_dir = os.path.join(backend_dir, 'mcp')
 sys.path.append(mcp_dir)
 
 from mcp.universal_driver_manager import BaseUniversalDriver
+from core.http_client import http_client_manager
+from core.timeseries import TimeSeriesStore, to_epoch, to_iso
+
+# Recent events / pageviews kept per driver instance
+EVENT_LOG_SIZE = int(os.getenv("ANALYTICS_EVENT_LOG_SIZE", 1000))
+
+# Time formats of the aggregate buckets, and the rollup each group_by reads from
+GROUP_BY_FORMATS = {
+    'minute': '%Y-%m-%d %H:%M:00',
+    'hour': '%Y-%m-%d %H:00:00',
+    'day': '%Y-%m-%d',
+    'week': '%Y-W%W',
+    'month': '%Y-%m'
+}
+GROUP_BY_ROLLUPS = {'minute': '1m', 'hour': '1h', 'day': '1d', 'week': '1d', 'month': '1d'}
 
 class AnalyticsDriver(BaseUniversalDriver):
     """Universal driver for analytics and monitoring operations"""
@@ -36,7 +51,12 @@ class AnalyticsDriver(BaseUniversalDriver):
         ]
         self.ga_base_url = "https://analyticsreporting.googleapis.com/v4/reports:batchGet"
         self.ga4_base_url = "https://analyticsdata.googleapis.com/v1beta"
-        self.metrics_store = {}
+        # Custom metrics live in a fixed-size store; set ANALYTICS_TIMESERIES_PATH to persist them
+        self.timeseries = TimeSeriesStore(path=os.getenv('ANALYTICS_TIMESERIES_PATH') or None)
+        self.metrics_store = {
+            'events': deque(maxlen=EVENT_LOG_SIZE),
+            'pageviews': deque(maxlen=EVENT_LOG_SIZE)
+        }
     
     def get_supported_node_types(self) -> List[str]:
         return self.supported_node_types
@@ -242,7 +262,7 @@ class AnalyticsDriver(BaseUniversalDriver):
             ]
         }
         
-        async with aiohttp.ClientSession() as session:
+        async with http_client_manager.session("analytics") as session:
             async with session.post(self.ga_base_url, headers=headers, json=request_body) as response:
                 if response.status == 200:
                     data = await response.json()
@@ -303,7 +323,7 @@ class AnalyticsDriver(BaseUniversalDriver):
             'dimensions': ','.join([f'rt:{dimension}' for dimension in dimensions])
         }
         
-        async with aiohttp.ClientSession() as session:
+        async with http_client_manager.session("analytics") as session:
             async with session.get('https://www.googleapis.com/analytics/v3/data/realtime', 
                                  headers=headers, params=params) as response:
                 if response.status == 200:
@@ -335,21 +355,17 @@ class AnalyticsDriver(BaseUniversalDriver):
                 "error": "Metric name is required"
             }
         
-        # Store metric in memory (in production, use a proper database)
-        if metric_name not in self.metrics_store:
-            self.metrics_store[metric_name] = []
-        
-        metric_data = {
-            'value': value,
-            'timestamp': timestamp,
-            'tags': tags
-        }
-        
-        self.metrics_store[metric_name].append(metric_data)
+        try:
+            self.timeseries.add(metric_name, timestamp, value, tags)
+        except (TypeError, ValueError) as e:
+            return {
+                "success": False,
+                "error": f"Invalid metric point: {e}"
+            }
         
-        # Keep only last 1000 entries per metric
-        if len(self.metrics_store[metric_name]) > 1000:
-            self.metrics_store[metric_name] = self.metrics_store[metric_name][-1000:]
+        if self.timeseries.flush_due():
+            snapshot = self.timeseries.snapshot()
+            await asyncio.to_thread(self.timeseries.write_snapshot, snapshot)
         
         return {
             "success": True,
@@ -373,25 +389,21 @@ class AnalyticsDriver(BaseUniversalDriver):
                 "error": "Metric name is required"
             }
         
-        if metric_name not in self.metrics_store:
+        series = self.timeseries.get(metric_name)
+        if series is None:
             return {
                 "success": False,
                 "error": f"Metric '{metric_name}' not found"
             }
         
-        metrics = self.metrics_store[metric_name]
-        
-        # Filter by time range if provided
-        if start_time or end_time:
-            filtered_metrics = []
-            for metric in metrics:
-                metric_time = metric['timestamp']
-                if start_time and metric_time < start_time:
-                    continue
-                if end_time and metric_time > end_time:
-                    continue
-                filtered_metrics.append(metric)
-            metrics = filtered_metrics
+        # Binary search for the time range if provided
+        metrics = [
+            {'value': value, 'timestamp': to_iso(timestamp), 'tags': tags or {}}
+            for timestamp, value, tags in series.points(
+                to_epoch(start_time) if start_time else None,
+                to_epoch(end_time) if end_time else None
+            )
+        ]
         
         return {
             "success": True,
@@ -406,20 +418,11 @@ class AnalyticsDriver(BaseUniversalDriver):
         
         metrics_summary = {}
         
-        for metric_name, data in self.metrics_store.items():
-            if data:
-                latest_value = data[-1]['value']
-                count = len(data)
-                
-                # Calculate average
-                avg_value = sum(item['value'] for item in data) / count
-                
-                metrics_summary[metric_name] = {
-                    'latest_value': latest_value,
-                    'average_value': avg_value,
-                    'data_points': count,
-                    'latest_timestamp': data[-1]['timestamp']
-                }
+        for metric_name, series in self.timeseries.series.items():
+            # Averages are kept as running totals, so this is O(1) per metric
+            summary = series.summary()
+            if summary:
+                metrics_summary[metric_name] = summary
         
         return {
             "success": True,
@@ -441,47 +444,55 @@ class AnalyticsDriver(BaseUniversalDriver):
                 "error": "Metric name is required"
             }
         
-        if metric_name not in self.metrics_store:
+        series = self.timeseries.get(metric_name)
+        if series is None:
             return {
                 "success": False,
                 "error": f"Metric '{metric_name}' not found"
             }
         
-        metrics = self.metrics_store[metric_name]
+        start_time = parameters.get('start_time')
+        end_time = parameters.get('end_time')
+        start = to_epoch(start_time) if start_time else None
+        end = to_epoch(end_time) if end_time else None
         
-        # Group metrics by time period
+        # Group pre-aggregated buckets by time period: (count, sum, min, max) per key
         grouped_data = {}
-        for metric in metrics:
-            timestamp = datetime.fromisoformat(metric['timestamp'].replace('Z', '+00:00'))
-            
-            if group_by == 'hour':
-                key = timestamp.strftime('%Y-%m-%d %H:00:00')
-            elif group_by == 'day':
-                key = timestamp.strftime('%Y-%m-%d')
-            elif group_by == 'week':
-                key = timestamp.strftime('%Y-W%W')
-            elif group_by == 'month':
-                key = timestamp.strftime('%Y-%m')
+        if group_by in GROUP_BY_ROLLUPS:
+            key_format = GROUP_BY_FORMATS[group_by]
+            buckets = series.buckets(GROUP_BY_ROLLUPS[group_by], start, end)
+        else:
+            key_format = None
+            buckets = ((timestamp, 1, value, value, value) for timestamp, value, _ in series.points(start, end))
+        
+        for bucket_start, count, total, low, high in buckets:
+            if key_format:
+                key = datetime.fromtimestamp(bucket_start, tz=timezone.utc).strftime(key_format)
             else:
-                key = timestamp.isoformat()
+                key = to_iso(bucket_start)
             
-            if key not in grouped_data:
-                grouped_data[key] = []
-            grouped_data[key].append(metric['value'])
+            group = grouped_data.get(key)
+            if group is None:
+                grouped_data[key] = [count, total, low, high]
+            else:
+                group[0] += count
+                group[1] += total
+                group[2] = min(group[2], low)
+                group[3] = max(group[3], high)
         
         # Apply aggregation
         aggregated_data = {}
-        for key, values in grouped_data.items():
+        for key, (count, total, low, high) in grouped_data.items():
             if aggregation_type == 'sum':
-                aggregated_data[key] = sum(values)
+                aggregated_data[key] = total
             elif aggregation_type == 'avg':
-                aggregated_data[key] = sum(values) / len(values)
+                aggregated_data[key] = total / count
             elif aggregation_type == 'min':
-                aggregated_data[key] = min(values)
+                aggregated_data[key] = low
             elif aggregation_type == 'max':
-                aggregated_data[key] = max(values)
+                aggregated_data[key] = high
             elif aggregation_type == 'count':
-                aggregated_data[key] = len(values)
+                aggregated_data[key] = int(count)
         
         return {
             "success": True,
@@ -518,16 +529,9 @@ class AnalyticsDriver(BaseUniversalDriver):
             'timestamp': datetime.utcnow().isoformat()
         }
         
-        # Store event (in production, send to analytics service)
-        if 'events' not in self.metrics_store:
-            self.metrics_store['events'] = []
-        
+        # Store event (in production, send to analytics service); the log is bounded
         self.metrics_store['events'].append(event_data)
         
-        # Keep only last 1000 events
-        if len(self.metrics_store['events']) > 1000:
-            self.metrics_store['events'] = self.metrics_store['events'][-1000:]
-        
         return {
             "success": True,
             "event_data": event_data,
@@ -558,16 +562,9 @@ class AnalyticsDriver(BaseUniversalDriver):
             'timestamp': datetime.utcnow().isoformat()
         }
         
-        # Store pageview (in production, send to analytics service)
-        if 'pageviews' not in self.metrics_store:
-            self.metrics_store['pageviews'] = []
-        
+        # Store pageview (in production, send to analytics service); the log is bounded
         self.metrics_store['pageviews'].append(pageview_data)
         
-        # Keep only last 1000 pageviews
-        if len(self.metrics_store['pageviews']) > 1000:
-            self.metrics_store['pageviews'] = self.metrics_store['pageviews'][-1000:]
-        
         return {
             "success": True,
             "pageview_data": pageview_data,
@@ -5,7 +5,6 @@ Supports: projects, tasks, teams, users, attachments
 
 import logging
 import asyncio
-import aiohttp
 from typing import Dict, Any, List, Optional, Union
 import json
 from datetime import datetime
@@ -19,6 +18,9 @@ mcp_dir = os.path.join(backend_dir, 'mcp')
 sys.path.append(mcp_dir)
 
 from mcp.universal_driver_manager import BaseUniversalDriver
+from core.http_client import http_client_manager
+from core.rate_limiter import rate_limit_scheduler
+from core.pagination import PageIterator, page_error, collect_pages, wants_all_pages, page_options
 
 class AsanaDriver(BaseUniversalDriver):
     """Universal driver for Asana project management operations"""
@@ -63,17 +65,22 @@ class AsanaDriver(BaseUniversalDriver):
             operation = parameters.get('operation', 'get')
             
             if resource == 'project':
-                return await self._handle_project_operations(operation, parameters, api_token, context)
+                result = await self._handle_project_operations(operation, parameters, api_token, context)
             elif resource == 'task':
-                return await self._handle_task_operations(operation, parameters, api_token, context)
+                result = await self._handle_task_operations(operation, parameters, api_token, context)
             elif resource == 'team':
-                return await self._handle_team_operations(operation, parameters, api_token, context)
+                result = await self._handle_team_operations(operation, parameters, api_token, context)
             elif resource == 'user':
-                return await self._handle_user_operations(operation, parameters, api_token, context)
+                result = await self._handle_user_operations(operation, parameters, api_token, context)
             elif resource == 'attachment':
-                return await self._handle_attachment_operations(operation, parameters, api_token, context)
+                result = await self._handle_attachment_operations(operation, parameters, api_token, context)
             else:
-                return await self._handle_task_operations(operation, parameters, api_token, context)
+                result = await self._handle_task_operations(operation, parameters, api_token, context)
+            
+            # Let the workflow engine pace bulk runs against the remaining API budget
+            if isinstance(result, dict):
+                result["rate_limit"] = rate_limit_scheduler.get_budget("asana", api_token)
+            return result
                 
         except Exception as e:
             return {
@@ -222,7 +229,7 @@ class AsanaDriver(BaseUniversalDriver):
             'Content-Type': 'application/json'
         }
         
-        async with aiohttp.ClientSession() as session:
+        async with http_client_manager.session("asana", credential=api_token) as session:
             async with session.get(f"{self.base_url}/projects/{project_id}", headers=headers) as response:
                 if response.status == 200:
                     data = await response.json()
@@ -254,7 +261,11 @@ class AsanaDriver(BaseUniversalDriver):
         if team_id:
             params['team'] = team_id
         
-        async with aiohttp.ClientSession() as session:
+        if wants_all_pages(parameters):
+            iterator = self.paginate(api_token, 'projects', params=params, max_items=page_options(parameters)['max_items'])
+            return await collect_pages(iterator, parameters, "projects")
+        
+        async with http_client_manager.session("asana", credential=api_token) as session:
             async with session.get(f"{self.base_url}/projects", headers=headers, params=params) as response:
                 if response.status == 200:
                     data = await response.json()
@@ -303,7 +314,7 @@ class AsanaDriver(BaseUniversalDriver):
         if team_id:
             data['data']['team'] = team_id
         
-        async with aiohttp.ClientSession() as session:
+        async with http_client_manager.session("asana", credential=api_token) as session:
             async with session.post(f"{self.base_url}/projects", headers=headers, json=data) as response:
                 if response.status == 201:
                     response_data = await response.json()
@@ -345,7 +356,7 @@ class AsanaDriver(BaseUniversalDriver):
         if color:
             data['data']['color'] = color
         
-        async with aiohttp.ClientSession() as session:
+        async with http_client_manager.session("asana", credential=api_token) as session:
             async with session.put(f"{self.base_url}/projects/{project_id}", headers=headers, json=data) as response:
                 if response.status == 200:
                     response_data = await response.json()
@@ -376,7 +387,7 @@ class AsanaDriver(BaseUniversalDriver):
             'Content-Type': 'application/json'
         }
         
-        async with aiohttp.ClientSession() as session:
+        async with http_client_manager.session("asana", credential=api_token) as session:
             async with session.delete(f"{self.base_url}/projects/{project_id}", headers=headers) as response:
                 if response.status == 200:
                     return {
@@ -423,7 +434,7 @@ class AsanaDriver(BaseUniversalDriver):
         if due_date:
             data['data']['due_on'] = due_date
         
-        async with aiohttp.ClientSession() as session:
+        async with http_client_manager.session("asana", credential=api_token) as session:
             async with session.post(f"{self.base_url}/tasks", headers=headers, json=data) as response:
                 if response.status == 201:
                     response_data = await response.json()
@@ -454,7 +465,7 @@ class AsanaDriver(BaseUniversalDriver):
             'Content-Type': 'application/json'
         }
         
-        async with aiohttp.ClientSession() as session:
+        async with http_client_manager.session("asana", credential=api_token) as session:
             async with session.get(f"{self.base_url}/tasks/{task_id}", headers=headers) as response:
                 if response.status == 200:
                     data = await response.json()
@@ -489,7 +500,11 @@ class AsanaDriver(BaseUniversalDriver):
         if workspace_id:
             params['workspace'] = workspace_id
         
-        async with aiohttp.ClientSession() as session:
+        if wants_all_pages(parameters):
+            iterator = self.paginate(api_token, 'tasks', params=params, max_items=page_options(parameters)['max_items'])
+            return await collect_pages(iterator, parameters, "tasks")
+        
+        async with http_client_manager.session("asana", credential=api_token) as session:
             async with session.get(f"{self.base_url}/tasks", headers=headers, params=params) as response:
                 if response.status == 200:
                     data = await response.json()
@@ -538,7 +553,7 @@ class AsanaDriver(BaseUniversalDriver):
         if completed is not None:
             data['data']['completed'] = completed
         
-        async with aiohttp.ClientSession() as session:
+        async with http_client_manager.session("asana", credential=api_token) as session:
             async with session.put(f"{self.base_url}/tasks/{task_id}", headers=headers, json=data) as response:
                 if response.status == 200:
                     response_data = await response.json()
@@ -569,7 +584,7 @@ class AsanaDriver(BaseUniversalDriver):
             'Content-Type': 'application/json'
         }
         
-        async with aiohttp.ClientSession() as session:
+        async with http_client_manager.session("asana", credential=api_token) as session:
             async with session.delete(f"{self.base_url}/tasks/{task_id}", headers=headers) as response:
                 if response.status == 200:
                     return {
@@ -607,7 +622,7 @@ class AsanaDriver(BaseUniversalDriver):
         if workspace_id:
             params['workspace'] = workspace_id
         
-        async with aiohttp.ClientSession() as session:
+        async with http_client_manager.session("asana", credential=api_token) as session:
             async with session.get(f"{self.base_url}/search", headers=headers, params=params) as response:
                 if response.status == 200:
                     data = await response.json()
@@ -632,7 +647,7 @@ class AsanaDriver(BaseUniversalDriver):
             'Content-Type': 'application/json'
         }
         
-        async with aiohttp.ClientSession() as session:
+        async with http_client_manager.session("asana", credential=api_token) as session:
             async with session.get(f"{self.base_url}/users/me", headers=headers) as response:
                 if response.status == 200:
                     data = await response.json()
@@ -648,6 +663,32 @@ class AsanaDriver(BaseUniversalDriver):
                         "error": error_data.get('errors', [{'message': 'Unknown error'}])[0]['message']
                     }
     
+    def paginate(self, api_token: str, resource: str, params: Dict[str, Any] = None, max_items: int = None,
+                 page_size: int = 100) -> PageIterator:
+        """Iterate an Asana collection across pages, following next_page.offset"""
+        headers = {'Authorization': f'Bearer {api_token}'}
+        base_params = dict(params or {}, limit=min(int(page_size), 100))
+        
+        async def fetch_page(cursor):
+            page_params = dict(base_params)
+            if cursor:
+                page_params['offset'] = cursor
+            async with http_client_manager.session("asana", credential=api_token) as session:
+                async with session.get(f"{self.base_url}/{resource}", headers=headers, params=page_params) as response:
+                    if response.status != 200:
+                        raise await page_error(response, lambda data: data['errors'][0]['message'])
+                    data = await response.json() or {}
+            next_page = data.get('next_page') or {}
+            return data.get('data', []), next_page.get('offset')
+        
+        return PageIterator(fetch_page, None, max_items)
+    
+    def iter_tasks(self, api_token: str, **kwargs) -> PageIterator:
+        return self.paginate(api_token, 'tasks', **kwargs)
+    
+    def iter_projects(self, api_token: str, **kwargs) -> PageIterator:
+        return self.paginate(api_token, 'projects', **kwargs)
+    
     def _get_api_token(self, parameters: Dict[str, Any], context: Dict[str, Any] = None) -> Optional[str]:
         """Get Asana API token"""
         
@@ -7,7 +7,13 @@ import logging
 import asyncio
 import csv
 import os
-from typing import Dict, Any, List, Optional, Union
+import itertools
+import tempfile
+import heapq
+import shutil
+import zlib
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Union, Callable, Iterator
 import io
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
@@ -25,8 +31,28 @@ try:
 except ImportError:
     PANDAS_AVAILABLE = False
 
+# Rows handed to csv.writer per writerows() call in streaming mode
+DEFAULT_STREAM_CHUNK_SIZE = 10000
+
+# Memory a join may use for its in-memory hash table before spilling to disk
+DEFAULT_JOIN_MEMORY_MB = int(os.getenv('CSV_JOIN_MEMORY_MB', 256))
+# Parsed rows in dicts take several times their on-disk CSV size
+JOIN_MEMORY_OVERHEAD = 4
+# Sorted runs (open files) a sort-merge join reads at once; more runs are merged in passes
+DEFAULT_MERGE_FAN_IN = int(os.getenv('CSV_MERGE_FAN_IN', 64))
+JOIN_TYPES = ('inner', 'left', 'right', 'outer')
+
 class CsvDriver(BaseUniversalDriver):
-    """Universal driver for CSV file operations"""
+    """Universal driver for CSV file operations
+
+    Every operation except write/append accepts ``streaming: true``. Streaming
+    operations run as generator pipelines in a worker thread with memory bounded
+    by ``chunk_size`` and return a ``cursor`` (file path, headers, row count)
+    plus summary stats instead of a ``data`` list. Streaming operations that
+    write a file need an explicit ``output_path``; the caller owns that file.
+    Streaming reads return one page plus ``next_position``, a byte position to
+    pass back as ``position`` (with ``offset`` = ``next_offset``) for the next.
+    """
     
     def __init__(self):
         super().__init__()
@@ -105,6 +131,10 @@ class CsvDriver(BaseUniversalDriver):
             encoding = parameters.get('encoding', 'utf-8')
             has_header = parameters.get('has_header', True)
             max_rows = parameters.get('max_rows', None)
+            streaming = parameters.get('streaming', False)
+            offset = parameters.get('offset', 0)
+            position = parameters.get('position', None)
+            chunk_size = parameters.get('chunk_size', DEFAULT_STREAM_CHUNK_SIZE)
             
             # Handle data from context
             if context and 'input_data' in context:
@@ -115,6 +145,10 @@ class CsvDriver(BaseUniversalDriver):
                     encoding = input_data.get('encoding', encoding)
                     has_header = input_data.get('has_header', has_header)
                     max_rows = input_data.get('max_rows', max_rows)
+                    streaming = input_data.get('streaming', streaming)
+                    offset = input_data.get('offset', offset)
+                    position = input_data.get('position', position)
+                    chunk_size = input_data.get('chunk_size', chunk_size)
             
             if not file_path:
                 return {
@@ -128,6 +162,12 @@ class CsvDriver(BaseUniversalDriver):
                     "error": f"File not found: {file_path}"
                 }
             
+            if streaming:
+                return await asyncio.to_thread(
+                    self._stream_read, file_path, delimiter, encoding, has_header, int(offset or 0),
+                    int(chunk_size), position, max_rows
+                )
+            
             # Read CSV
             data = []
             headers = []
@@ -318,6 +358,7 @@ class CsvDriver(BaseUniversalDriver):
             file_path = parameters.get('file_path', '')
             filter_conditions = parameters.get('filter_conditions', {})
             output_path = parameters.get('output_path', '')
+            streaming = parameters.get('streaming', False)
             
             # Handle data from context
             if context and 'input_data' in context:
@@ -326,6 +367,7 @@ class CsvDriver(BaseUniversalDriver):
                     file_path = input_data.get('file_path', file_path)
                     filter_conditions = input_data.get('filter_conditions', filter_conditions)
                     output_path = input_data.get('output_path', output_path)
+                    streaming = input_data.get('streaming', streaming)
             
             if not file_path:
                 return {
@@ -339,6 +381,22 @@ class CsvDriver(BaseUniversalDriver):
                     "error": "Filter conditions are required"
                 }
             
+            predicate = self._compile_filter(filter_conditions)
+            
+            if streaming:
+                result = await asyncio.to_thread(
+                    self._stream_rows_to_file, file_path, output_path, parameters,
+                    lambda row: row if predicate(row) else None
+                )
+                if result['success']:
+                    result.update({
+                        "filter_conditions": filter_conditions,
+                        "original_count": result['input_rows'],
+                        "filtered_count": result['output_rows'],
+                        "message": f"Successfully filtered {result['input_rows']} rows to {result['output_rows']} rows"
+                    })
+                return result
+            
             # Read CSV data first
             read_result = await self.read_csv({'file_path': file_path}, context)
             if not read_result['success']:
@@ -348,38 +406,7 @@ class CsvDriver(BaseUniversalDriver):
             headers = read_result['headers']
             
             # Apply filters
-            filtered_data = []
-            for row in data:
-                match = True
-                for column, condition in filter_conditions.items():
-                    if column not in row:
-                        match = False
-                        break
-                    
-                    value = row[column]
-                    
-                    # Simple condition checking
-                    if isinstance(condition, dict):
-                        if 'equals' in condition and value != condition['equals']:
-                            match = False
-                            break
-                        if 'contains' in condition and condition['contains'] not in str(value):
-                            match = False
-                            break
-                        if 'greater_than' in condition and float(value) <= float(condition['greater_than']):
-                            match = False
-                            break
-                        if 'less_than' in condition and float(value) >= float(condition['less_than']):
-                            match = False
-                            break
-                    else:
-                        # Direct value comparison
-                        if value != condition:
-                            match = False
-                            break
-                
-                if match:
-                    filtered_data.append(row)
+            filtered_data = [row for row in data if predicate(row)]
             
             # Write filtered data if output path provided
             if output_path:
@@ -417,6 +444,7 @@ class CsvDriver(BaseUniversalDriver):
             file_path = parameters.get('file_path', '')
             transformations = parameters.get('transformations', {})
             output_path = parameters.get('output_path', '')
+            streaming = parameters.get('streaming', False)
             
             # Handle data from context
             if context and 'input_data' in context:
@@ -425,6 +453,7 @@ class CsvDriver(BaseUniversalDriver):
                     file_path = input_data.get('file_path', file_path)
                     transformations = input_data.get('transformations', transformations)
                     output_path = input_data.get('output_path', output_path)
+                    streaming = input_data.get('streaming', streaming)
             
             if not file_path:
                 return {
@@ -438,6 +467,20 @@ class CsvDriver(BaseUniversalDriver):
                     "error": "Transformations are required"
                 }
             
+            transform_row = self._compile_transform(transformations)
+            
+            if streaming:
+                result = await asyncio.to_thread(
+                    self._stream_rows_to_file, file_path, output_path, parameters, transform_row
+                )
+                if result['success']:
+                    result.update({
+                        "transformations": transformations,
+                        "row_count": result['output_rows'],
+                        "message": f"Successfully transformed {result['output_rows']} rows"
+                    })
+                return result
+            
             # Read CSV data first
             read_result = await self.read_csv({'file_path': file_path}, context)
             if not read_result['success']:
@@ -447,41 +490,7 @@ class CsvDriver(BaseUniversalDriver):
             headers = read_result['headers']
             
             # Apply transformations
-            transformed_data = []
-            for row in data:
-                transformed_row = row.copy()
-                
-                for column, transformation in transformations.items():
-                    if column in transformed_row:
-                        value = transformed_row[column]
-                        
-                        if transformation == 'upper':
-                            transformed_row[column] = str(value).upper()
-                        elif transformation == 'lower':
-                            transformed_row[column] = str(value).lower()
-                        elif transformation == 'strip':
-                            transformed_row[column] = str(value).strip()
-                        elif transformation == 'float':
-                            try:
-                                transformed_row[column] = float(value)
-                            except ValueError:
-                                transformed_row[column] = 0.0
-                        elif transformation == 'int':
-                            try:
-                                transformed_row[column] = int(float(value))
-                            except ValueError:
-                                transformed_row[column] = 0
-                        elif isinstance(transformation, dict):
-                            if 'replace' in transformation:
-                                old_val = transformation['replace']['old']
-                                new_val = transformation['replace']['new']
-                                transformed_row[column] = str(value).replace(old_val, new_val)
-                            elif 'prefix' in transformation:
-                                transformed_row[column] = transformation['prefix'] + str(value)
-                            elif 'suffix' in transformation:
-                                transformed_row[column] = str(value) + transformation['suffix']
-                
-                transformed_data.append(transformed_row)
+            transformed_data = [transform_row(row) for row in data]
             
             # Write transformed data if output path provided
             if output_path:
@@ -519,6 +528,8 @@ class CsvDriver(BaseUniversalDriver):
             output_path = parameters.get('output_path', 'merged.csv')
             merge_type = parameters.get('merge_type', 'concat')  # concat, join
             join_column = parameters.get('join_column', '')
+            join_type = parameters.get('join_type', 'left')  # inner, left, right, outer
+            streaming = parameters.get('streaming', False)
             
             # Handle data from context
             if context and 'input_data' in context:
@@ -530,6 +541,8 @@ class CsvDriver(BaseUniversalDriver):
                     output_path = input_data.get('output_path', output_path)
                     merge_type = input_data.get('merge_type', merge_type)
                     join_column = input_data.get('join_column', join_column)
+                    join_type = input_data.get('join_type', join_type)
+                    streaming = input_data.get('streaming', streaming)
             
             if not file_paths or len(file_paths) < 2:
                 return {
@@ -545,6 +558,47 @@ class CsvDriver(BaseUniversalDriver):
                         "error": f"File not found: {file_path}"
                     }
             
+            if merge_type == 'join':
+                if not join_column:
+                    return {
+                        "success": False,
+                        "error": "Join column is required for join merge type"
+                    }
+                if join_type not in JOIN_TYPES:
+                    return {
+                        "success": False,
+                        "error": f"Unsupported join type: {join_type}",
+                        "supported_join_types": list(JOIN_TYPES)
+                    }
+                
+                result = await asyncio.to_thread(
+                    self._join_files, file_paths, output_path, join_column, join_type, parameters
+                )
+                if result['success']:
+                    result.update({
+                        "input_files": file_paths,
+                        "merged_files_count": len(file_paths),
+                        "total_rows": result['output_rows'],
+                        "merge_type": merge_type,
+                        "join_column": join_column,
+                        "join_type": join_type,
+                        "message": f"Successfully merged {len(file_paths)} CSV files into {result['output_file']}"
+                    })
+                return result
+            
+            if streaming and merge_type == 'concat':
+                result = await asyncio.to_thread(self._stream_concat, file_paths, output_path, parameters)
+                if result['success']:
+                    result.update({
+                        "input_files": file_paths,
+                        "merged_files_count": len(file_paths),
+                        "total_rows": result['output_rows'],
+                        "merge_type": merge_type,
+                        "join_column": None,
+                        "message": f"Successfully merged {len(file_paths)} CSV files into {result['output_file']}"
+                    })
+                return result
+            
             merged_data = []
             all_headers = set()
             
@@ -568,44 +622,11 @@ class CsvDriver(BaseUniversalDriver):
                         if header not in row:
                             row[header] = ''
             
-            elif merge_type == 'join' and join_column:
-                # Join files on specified column
-                if not join_column:
-                    return {
-                        "success": False,
-                        "error": "Join column is required for join merge type"
-                    }
-                
-                # Read first file as base
-                read_result = await self.read_csv({'file_path': file_paths[0]}, context)
-                if not read_result['success']:
-                    return read_result
-                
-                merged_data = read_result['data']
-                all_headers.update(read_result['headers'])
-                
-                # Join with other files
-                for file_path in file_paths[1:]:
-                    read_result = await self.read_csv({'file_path': file_path}, context)
-                    if not read_result['success']:
-                        return read_result
-                    
-                    join_data = read_result['data']
-                    join_headers = read_result['headers']
-                    all_headers.update(join_headers)
-                    
-                    # Create lookup dict for join
-                    join_lookup = {row[join_column]: row for row in join_data if join_column in row}
-                    
-                    # Merge data
-                    for row in merged_data:
-                        if join_column in row and row[join_column] in join_lookup:
-                            join_row = join_lookup[row[join_column]]
-                            for key, value in join_row.items():
-                                if key != join_column:
-                                    row[key] = value
-                
-                final_headers = list(all_headers)
+            else:
+                return {
+                    "success": False,
+                    "error": f"Unknown merge type: {merge_type}"
+                }
             
             # Write merged data
             write_result = await self.write_csv({
@@ -623,7 +644,7 @@ class CsvDriver(BaseUniversalDriver):
                 "merged_files_count": len(file_paths),
                 "total_rows": len(merged_data),
                 "merge_type": merge_type,
-                "join_column": join_column if merge_type == 'join' else None,
+                "join_column": None,
                 "message": f"Successfully merged {len(file_paths)} CSV files into {output_path}"
             }
             
@@ -644,6 +665,7 @@ class CsvDriver(BaseUniversalDriver):
             rows_per_file = parameters.get('rows_per_file', 1000)
             split_column = parameters.get('split_column', '')
             output_dir = parameters.get('output_dir', 'split_files')
+            streaming = parameters.get('streaming', False)
             
             # Handle data from context
             if context and 'input_data' in context:
@@ -654,6 +676,7 @@ class CsvDriver(BaseUniversalDriver):
                     rows_per_file = input_data.get('rows_per_file', rows_per_file)
                     split_column = input_data.get('split_column', split_column)
                     output_dir = input_data.get('output_dir', output_dir)
+                    streaming = input_data.get('streaming', streaming)
             
             if not file_path:
                 return {
@@ -661,6 +684,25 @@ class CsvDriver(BaseUniversalDriver):
                     "error": "File path is required"
                 }
             
+            if streaming:
+                if not os.path.exists(file_path):
+                    return {
+                        "success": False,
+                        "error": f"File not found: {file_path}"
+                    }
+                result = await asyncio.to_thread(
+                    self._stream_split, file_path, output_dir, split_type, rows_per_file, split_column, parameters
+                )
+                if result['success']:
+                    result.update({
+                        "input_file": file_path,
+                        "output_directory": output_dir,
+                        "split_type": split_type,
+                        "split_files_count": len(result['output_files']),
+                        "message": f"Successfully split CSV into {len(result['output_files'])} files"
+                    })
+                return result
+            
             # Read CSV data first
             read_result = await self.read_csv({'file_path': file_path}, context)
             if not read_result['success']:
@@ -747,6 +789,7 @@ class CsvDriver(BaseUniversalDriver):
             file_path = parameters.get('file_path', '')
             required_columns = parameters.get('required_columns', [])
             data_types = parameters.get('data_types', {})
+            streaming = parameters.get('streaming', False)
             
             # Handle data from context
             if context and 'input_data' in context:
@@ -755,6 +798,7 @@ class CsvDriver(BaseUniversalDriver):
                     file_path = input_data.get('file_path', file_path)
                     required_columns = input_data.get('required_columns', required_columns)
                     data_types = input_data.get('data_types', data_types)
+                    streaming = input_data.get('streaming', streaming)
             
             if not file_path:
                 return {
@@ -762,6 +806,24 @@ class CsvDriver(BaseUniversalDriver):
                     "error": "File path is required"
                 }
             
+            if streaming:
+                if not os.path.exists(file_path):
+                    return {
+                        "success": False,
+                        "error": f"File not found: {file_path}"
+                    }
+                result = await asyncio.to_thread(
+                    self._stream_validate, file_path, required_columns, data_types, parameters
+                )
+                if result['success']:
+                    result.update({
+                        "file_path": file_path,
+                        "required_columns": required_columns,
+                        "data_types": data_types,
+                        "message": f"CSV validation {'passed' if result['is_valid'] else 'failed'}"
+                    })
+                return result
+            
             # Read CSV data first
             read_result = await self.read_csv({'file_path': file_path}, context)
             if not read_result['success']:
@@ -821,6 +883,681 @@ class CsvDriver(BaseUniversalDriver):
                 "error": str(e)
             }
     
+    # ---- Compiled row operations (shared by in-memory and streaming modes) ----
+    
+    @staticmethod
+    def _compile_filter(filter_conditions: Dict[str, Any]) -> Callable[[Dict[str, Any]], bool]:
+        """Compile filter conditions once into a row predicate"""
+        compiled = []
+        for column, condition in filter_conditions.items():
+            tests = []
+            if isinstance(condition, dict):
+                if 'equals' in condition:
+                    tests.append(lambda value, expected=condition['equals']: value == expected)
+                if 'contains' in condition:
+                    tests.append(lambda value, needle=condition['contains']: needle in str(value))
+                if 'greater_than' in condition:
+                    tests.append(lambda value, bound=float(condition['greater_than']): float(value) > bound)
+                if 'less_than' in condition:
+                    tests.append(lambda value, bound=float(condition['less_than']): float(value) < bound)
+            else:
+                # Direct value comparison
+                tests.append(lambda value, expected=condition: value == expected)
+            compiled.append((column, tuple(tests)))
+        
+        def predicate(row: Dict[str, Any]) -> bool:
+            for column, tests in compiled:
+                if column not in row:
+                    return False
+                value = row[column]
+                for test in tests:
+                    if not test(value):
+                        return False
+            return True
+        
+        return predicate
+    
+    @staticmethod
+    def _compile_transform(transformations: Dict[str, Any]) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+        """Compile column transformations once into a row function"""
+        
+        def to_float(value):
+            try:
+                return float(value)
+            except ValueError:
+                return 0.0
+        
+        def to_int(value):
+            try:
+                return int(float(value))
+            except ValueError:
+                return 0
+        
+        steps = []
+        for column, transformation in transformations.items():
+            step = None
+            if transformation == 'upper':
+                step = lambda value: str(value).upper()
+            elif transformation == 'lower':
+                step = lambda value: str(value).lower()
+            elif transformation == 'strip':
+                step = lambda value: str(value).strip()
+            elif transformation == 'float':
+                step = to_float
+            elif transformation == 'int':
+                step = to_int
+            elif isinstance(transformation, dict):
+                if 'replace' in transformation:
+                    old_val = transformation['replace']['old']
+                    new_val = transformation['replace']['new']
+                    step = lambda value, old_val=old_val, new_val=new_val: str(value).replace(old_val, new_val)
+                elif 'prefix' in transformation:
+                    step = lambda value, prefix=transformation['prefix']: prefix + str(value)
+                elif 'suffix' in transformation:
+                    step = lambda value, suffix=transformation['suffix']: str(value) + suffix
+            if step:
+                steps.append((column, step))
+        
+        def transform_row(row: Dict[str, Any]) -> Dict[str, Any]:
+            transformed_row = row.copy()
+            for column, step in steps:
+                if column in transformed_row:
+                    transformed_row[column] = step(transformed_row[column])
+            return transformed_row
+        
+        return transform_row
+    
+    # ---- Streaming engine (runs in a worker thread via asyncio.to_thread) ----
+    
+    @staticmethod
+    def _stream_options(parameters: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "delimiter": parameters.get('delimiter', ','),
+            "encoding": parameters.get('encoding', 'utf-8'),
+            "chunk_size": int(parameters.get('chunk_size', DEFAULT_STREAM_CHUNK_SIZE))
+        }
+    
+    @staticmethod
+    def _iter_dict_rows(reader, headers: List[str]) -> Iterator[Dict[str, Any]]:
+        for row in reader:
+            yield dict(zip(headers, row))
+    
+    @staticmethod
+    def _iter_chunks(rows, chunk_size: int) -> Iterator[List[Any]]:
+        iterator = iter(rows)
+        while True:
+            chunk = list(itertools.islice(iterator, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+    
+    @staticmethod
+    def _stream_output_path(output_path: str) -> str:
+        """The requested output path, with its directory created"""
+        directory = os.path.dirname(output_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        return output_path
+    
+    @staticmethod
+    def _cursor(file_path: str, headers: List[str], delimiter: str, encoding: str, row_count: int) -> Dict[str, Any]:
+        """Handle a downstream node can page through with read + streaming + position"""
+        return {
+            "file_path": file_path,
+            "headers": headers,
+            "delimiter": delimiter,
+            "encoding": encoding,
+            "has_header": True,
+            "row_count": row_count
+        }
+    
+    def _stream_read(self, file_path: str, delimiter: str, encoding: str, has_header: bool,
+                     offset: int, chunk_size: int, position: Optional[int] = None,
+                     max_rows: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Return one page of rows. `position` is the byte position returned as
+        next_position by the previous page, so paging never re-reads earlier
+        rows; `offset` counts the rows before it. Without a position the first
+        `offset` rows are skipped by reading them.
+        """
+        limit = chunk_size
+        if max_rows:
+            limit = max(0, min(chunk_size, int(max_rows) - offset))
+        
+        with open(file_path, 'r', encoding=encoding, newline='') as f:
+            # readline() rather than iteration keeps f.tell() usable
+            reader = csv.reader(iter(f.readline, ''), delimiter=delimiter)
+            headers = next(reader, []) if has_header else []
+            if position:
+                f.seek(position)
+            elif offset:
+                for _ in itertools.islice(reader, offset):
+                    pass
+            rows = self._iter_dict_rows(reader, headers) if has_header else reader
+            
+            page = list(itertools.islice(rows, limit))
+            next_position = f.tell()
+            has_more = bool(page) and len(page) == limit and next(reader, None) is not None
+        
+        if max_rows and offset + len(page) >= int(max_rows):
+            has_more = False
+        next_offset = offset + len(page) if has_more else None
+        
+        return {
+            "success": True,
+            "file_path": file_path,
+            "data": page,
+            "headers": headers,
+            "row_count": len(page),
+            "offset": offset,
+            "next_offset": next_offset,
+            "next_position": next_position if has_more else None,
+            "has_more": has_more,
+            "delimiter": delimiter,
+            "encoding": encoding,
+            "has_header": has_header,
+            "streaming": True,
+            "message": f"Read {len(page)} rows from CSV starting at row {offset}"
+        }
+    
+    def _stream_rows_to_file(self, file_path: str, output_path: str, parameters: Dict[str, Any],
+                             row_fn: Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]) -> Dict[str, Any]:
+        """Pipe rows through row_fn (None drops the row) into an output file chunk by chunk"""
+        options = self._stream_options(parameters)
+        if not os.path.exists(file_path):
+            return {"success": False, "error": f"File not found: {file_path}"}
+        if not output_path:
+            return {"success": False, "error": "output_path is required in streaming mode"}
+        
+        output_file = self._stream_output_path(output_path)
+        input_rows = 0
+        output_rows = 0
+        
+        with open(file_path, 'r', encoding=options['encoding'], newline='') as source, \
+                open(output_file, 'w', encoding=options['encoding'], newline='') as target:
+            reader = csv.reader(source, delimiter=options['delimiter'])
+            headers = next(reader, [])
+            writer = csv.DictWriter(target, fieldnames=headers, delimiter=options['delimiter'],
+                                    restval='', extrasaction='ignore')
+            writer.writeheader()
+            
+            for chunk in self._iter_chunks(self._iter_dict_rows(reader, headers), options['chunk_size']):
+                input_rows += len(chunk)
+                results = [result for result in map(row_fn, chunk) if result is not None]
+                output_rows += len(results)
+                writer.writerows(results)
+        
+        return {
+            "success": True,
+            "streaming": True,
+            "input_file": file_path,
+            "output_file": output_file,
+            "input_rows": input_rows,
+            "output_rows": output_rows,
+            "cursor": self._cursor(output_file, headers, options['delimiter'], options['encoding'], output_rows)
+        }
+    
+    def _stream_concat(self, file_paths: List[str], output_path: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        """Concatenate files into one output with the union of their headers"""
+        options = self._stream_options(parameters)
+        if not output_path:
+            return {"success": False, "error": "output_path is required in streaming mode"}
+        
+        # Only header lines are read up front; order of first appearance is kept
+        headers: List[str] = []
+        for file_path in file_paths:
+            with open(file_path, 'r', encoding=options['encoding'], newline='') as f:
+                for header in next(csv.reader(f, delimiter=options['delimiter']), []):
+                    if header not in headers:
+                        headers.append(header)
+        
+        output_file = self._stream_output_path(output_path)
+        output_rows = 0
+        
+        with open(output_file, 'w', encoding=options['encoding'], newline='') as target:
+            writer = csv.DictWriter(target, fieldnames=headers, delimiter=options['delimiter'],
+                                    restval='', extrasaction='ignore')
+            writer.writeheader()
+            for file_path in file_paths:
+                with open(file_path, 'r', encoding=options['encoding'], newline='') as source:
+                    reader = csv.reader(source, delimiter=options['delimiter'])
+                    file_headers = next(reader, [])
+                    for chunk in self._iter_chunks(self._iter_dict_rows(reader, file_headers), options['chunk_size']):
+                        writer.writerows(chunk)
+                        output_rows += len(chunk)
+        
+        return {
+            "success": True,
+            "streaming": True,
+            "output_file": output_file,
+            "output_rows": output_rows,
+            "cursor": self._cursor(output_file, headers, options['delimiter'], options['encoding'], output_rows)
+        }
+    
+    def _stream_split(self, file_path: str, output_dir: str, split_type: str, rows_per_file: int,
+                      split_column: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        """Write shards incrementally; column splits keep a bounded set of open files"""
+        options = self._stream_options(parameters)
+        max_open_files = int(parameters.get('max_open_files', 64))
+        os.makedirs(output_dir, exist_ok=True)
+        
+        output_files: List[str] = []
+        shard_rows: Dict[str, int] = {}
+        total_rows = 0
+        
+        with open(file_path, 'r', encoding=options['encoding'], newline='') as source:
+            reader = csv.reader(source, delimiter=options['delimiter'])
+            headers = next(reader, [])
+            
+            def open_shard(path: str, mode: str):
+                handle = open(path, mode, encoding=options['encoding'], newline='')
+                writer = csv.writer(handle, delimiter=options['delimiter'])
+                if mode == 'w':
+                    writer.writerow(headers)
+                return handle, writer
+            
+            if split_type == 'rows':
+                for index, chunk in enumerate(self._iter_chunks(reader, int(rows_per_file))):
+                    output_file = os.path.join(output_dir, f"chunk_{index + 1}.csv")
+                    handle, writer = open_shard(output_file, 'w')
+                    with handle:
+                        writer.writerows(chunk)
+                    output_files.append(output_file)
+                    shard_rows[output_file] = len(chunk)
+                    total_rows += len(chunk)
+            
+            elif split_type == 'column_value' and split_column:
+                if split_column not in headers:
+                    return {
+                        "success": False,
+                        "error": f"Split column '{split_column}' not found in headers"
+                    }
+                column_index = headers.index(split_column)
+                open_shards: "OrderedDict[str, tuple]" = OrderedDict()
+                
+                try:
+                    for row in reader:
+                        value = row[column_index] if column_index < len(row) else ''
+                        safe_filename = str(value).replace('/', '_').replace('\\', '_')
+                        output_file = os.path.join(output_dir, f"{split_column}_{safe_filename}.csv")
+                        
+                        shard = open_shards.pop(output_file, None)
+                        if shard is None:
+                            if len(open_shards) >= max_open_files:
+                                _, (evicted_handle, _) = open_shards.popitem(last=False)
+                                evicted_handle.close()
+                            is_new = output_file not in shard_rows
+                            shard = open_shard(output_file, 'w' if is_new else 'a')
+                            if is_new:
+                                output_files.append(output_file)
+                                shard_rows[output_file] = 0
+                        open_shards[output_file] = shard
+                        
+                        shard[1].writerow(row)
+                        shard_rows[output_file] += 1
+                        total_rows += 1
+                finally:
+                    for handle, _ in open_shards.values():
+                        handle.close()
+        
+        return {
+            "success": True,
+            "streaming": True,
+            "output_files": output_files,
+            "total_rows": total_rows,
+            "shards": [
+                self._cursor(path, headers, options['delimiter'], options['encoding'], shard_rows[path])
+                for path in output_files
+            ]
+        }
+    
+    def _stream_validate(self, file_path: str, required_columns: List[str], data_types: Dict[str, str],
+                         parameters: Dict[str, Any]) -> Dict[str, Any]:
+        """Validate row by row, keeping only the first max_errors messages"""
+        options = self._stream_options(parameters)
+        max_errors = int(parameters.get('max_errors', 100))
+        validation_errors: List[str] = []
+        error_count = 0
+        total_rows = 0
+        
+        def report(message: str):
+            nonlocal error_count
+            error_count += 1
+            if len(validation_errors) < max_errors:
+                validation_errors.append(message)
+        
+        with open(file_path, 'r', encoding=options['encoding'], newline='') as f:
+            reader = csv.reader(f, delimiter=options['delimiter'])
+            headers = next(reader, [])
+            
+            for column in required_columns:
+                if column not in headers:
+                    report(f"Required column '{column}' not found")
+            
+            checks = []
+            for column, expected_type in data_types.items():
+                if column not in headers:
+                    report(f"Data type column '{column}' not found")
+                    continue
+                checks.append((column, headers.index(column), expected_type))
+            
+            for row_idx, row in enumerate(reader):
+                total_rows += 1
+                for column, column_index, expected_type in checks:
+                    value = row[column_index] if column_index < len(row) else ''
+                    if value == '':
+                        continue
+                    try:
+                        if expected_type == 'int':
+                            int(value)
+                        elif expected_type == 'float':
+                            float(value)
+                        elif expected_type == 'date':
+                            if not any(char in value for char in ['-', '/', '.']):
+                                report(f"Row {row_idx + 1}: '{column}' is not a valid date")
+                    except ValueError:
+                        report(f"Row {row_idx + 1}: '{column}' is not a valid {expected_type}")
+        
+        return {
+            "success": True,
+            "streaming": True,
+            "is_valid": error_count == 0,
+            "validation_errors": validation_errors,
+            "error_count": error_count,
+            "errors_truncated": error_count > len(validation_errors),
+            "total_rows": total_rows,
+            "headers": headers
+        }
+    
+    # ---- Join engine (runs in a worker thread via asyncio.to_thread) ----
+    # Files are joined pairwise left to right. Each pair uses an in-memory hash
+    # join when the right side fits the memory budget, a partitioned (grace)
+    # hash join that spills both sides to disk when only the left side fits,
+    # and an external sort-merge join when both sides exceed the budget.
+    
+    def _join_files(self, file_paths: List[str], output_path: str, join_column: str,
+                    join_type: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        """Join a list of CSV files on join_column"""
+        options = self._stream_options(parameters)
+        options['memory_budget'] = max(1, int(float(parameters.get('memory_budget_mb', DEFAULT_JOIN_MEMORY_MB)) * 1024 * 1024))
+        options['strategy'] = parameters.get('join_strategy', 'auto')  # auto, hash, sort_merge
+        options['merge_fan_in'] = max(2, int(parameters.get('merge_fan_in', DEFAULT_MERGE_FAN_IN)))
+        
+        work_dir = tempfile.mkdtemp(prefix='csv_join_')
+        steps = []
+        try:
+            left_path = file_paths[0]
+            for index, right_path in enumerate(file_paths[1:], start=1):
+                is_last = index == len(file_paths) - 1
+                step_output = self._stream_output_path(output_path) if is_last \
+                    else os.path.join(work_dir, f"step_{index}.csv")
+                step = self._join_pair(left_path, right_path, step_output, join_column, join_type, options, work_dir)
+                if not step['success']:
+                    return step
+                steps.append(step)
+                left_path = step_output
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+        
+        headers = steps[-1]['headers']
+        output_rows = steps[-1]['output_rows']
+        return {
+            "success": True,
+            "output_file": left_path,
+            "output_rows": output_rows,
+            "join_strategy": [step['strategy'] for step in steps],
+            "join_stats": [
+                {key: value for key, value in step.items() if key not in ('success', 'headers')}
+                for step in steps
+            ],
+            "cursor": self._cursor(left_path, headers, options['delimiter'], options['encoding'], output_rows)
+        }
+    
+    @staticmethod
+    def _keyed_rows(reader, key_index: int) -> Iterator[List[str]]:
+        """Skip blank or truncated lines that have no join key"""
+        return (row for row in reader if len(row) > key_index)
+    
+    def _read_headers(self, file_path: str, options: Dict[str, Any]) -> List[str]:
+        with open(file_path, 'r', encoding=options['encoding'], newline='') as f:
+            return next(csv.reader(f, delimiter=options['delimiter']), [])
+    
+    def _join_pair(self, left_path: str, right_path: str, output_file: str, join_column: str,
+                   join_type: str, options: Dict[str, Any], work_dir: str) -> Dict[str, Any]:
+        left_headers = self._read_headers(left_path, options)
+        right_headers = self._read_headers(right_path, options)
+        for path, headers in ((left_path, left_headers), (right_path, right_headers)):
+            if join_column not in headers:
+                return {
+                    "success": False,
+                    "error": f"Join column '{join_column}' not found in {path}"
+                }
+        
+        budget = options['memory_budget']
+        left_estimate = os.path.getsize(left_path) * JOIN_MEMORY_OVERHEAD
+        right_estimate = os.path.getsize(right_path) * JOIN_MEMORY_OVERHEAD
+        
+        strategy = options['strategy']
+        if strategy == 'auto':
+            if right_estimate <= budget:
+                strategy = 'hash'
+            elif left_estimate <= budget:
+                strategy = 'grace_hash'
+            else:
+                strategy = 'sort_merge'
+        elif strategy == 'hash' and right_estimate > budget:
+            strategy = 'grace_hash'
+        
+        # Right-hand values win on name collisions, matching the previous enrichment behaviour
+        output_headers = left_headers + [h for h in right_headers if h not in left_headers]
+        left_key = left_headers.index(join_column)
+        right_key = right_headers.index(join_column)
+        
+        def combine(left_row: Optional[List[str]], right_row: Optional[List[str]]) -> Dict[str, str]:
+            row = dict(zip(left_headers, left_row)) if left_row is not None else {}
+            if right_row is not None:
+                for header, value in zip(right_headers, right_row):
+                    if header != join_column or left_row is None:
+                        row[header] = value
+            return row
+        
+        stats = {"strategy": strategy, "left_rows": 0, "right_rows": 0, "output_rows": 0, "spill_files": 0,
+                 "merge_passes": 0}
+        
+        with open(output_file, 'w', encoding=options['encoding'], newline='') as target:
+            writer = csv.DictWriter(target, fieldnames=output_headers, delimiter=options['delimiter'],
+                                    restval='', extrasaction='ignore')
+            writer.writeheader()
+            
+            def emit(rows):
+                for chunk in self._iter_chunks(rows, options['chunk_size']):
+                    writer.writerows(chunk)
+                    stats['output_rows'] += len(chunk)
+            
+            if strategy == 'hash':
+                with open(left_path, 'r', encoding=options['encoding'], newline='') as left_file, \
+                        open(right_path, 'r', encoding=options['encoding'], newline='') as right_file:
+                    left_rows = csv.reader(left_file, delimiter=options['delimiter'])
+                    right_rows = csv.reader(right_file, delimiter=options['delimiter'])
+                    next(left_rows, None)
+                    next(right_rows, None)
+                    emit(self._hash_join(self._keyed_rows(left_rows, left_key),
+                                         self._keyed_rows(right_rows, right_key), left_key, right_key, join_type, combine, stats))
+            
+            elif strategy == 'grace_hash':
+                partitions = max(2, -(-right_estimate // budget) + 1)
+                left_parts = self._partition_file(left_path, left_key, partitions, options, work_dir, 'left')
+                right_parts = self._partition_file(right_path, right_key, partitions, options, work_dir, 'right')
+                stats['spill_files'] = 2 * partitions
+                for left_part, right_part in zip(left_parts, right_parts):
+                    with open(left_part, 'r', encoding=options['encoding'], newline='') as left_file, \
+                            open(right_part, 'r', encoding=options['encoding'], newline='') as right_file:
+                        emit(self._hash_join(
+                            csv.reader(left_file, delimiter=options['delimiter']),
+                            csv.reader(right_file, delimiter=options['delimiter']),
+                            left_key, right_key, join_type, combine, stats
+                        ))
+                    os.remove(left_part)
+                    os.remove(right_part)
+            
+            elif strategy == 'sort_merge':
+                # The final merge reads both sides together, so each gets half the fan-in
+                max_runs = max(1, options['merge_fan_in'] // 2)
+                left_runs = self._sort_runs(left_path, left_key, options, work_dir, 'left', max_runs, stats)
+                right_runs = self._sort_runs(right_path, right_key, options, work_dir, 'right', max_runs, stats)
+                run_files = [open(run, 'r', encoding=options['encoding'], newline='') for run in left_runs + right_runs]
+                try:
+                    readers = [csv.reader(f, delimiter=options['delimiter']) for f in run_files]
+                    left_sorted = heapq.merge(*readers[:len(left_runs)], key=lambda row: row[left_key])
+                    right_sorted = heapq.merge(*readers[len(left_runs):], key=lambda row: row[right_key])
+                    emit(self._merge_join(left_sorted, right_sorted, left_key, right_key, join_type, combine, stats))
+                finally:
+                    for f in run_files:
+                        f.close()
+                    for run in left_runs + right_runs:
+                        os.remove(run)
+            
+            else:
+                return {
+                    "success": False,
+                    "error": f"Unknown join strategy: {strategy}"
+                }
+        
+        self.logger.info(f"Joined {os.path.basename(left_path)} with {os.path.basename(right_path)} "
+                         f"using {strategy}: {stats['output_rows']} rows")
+        return {"success": True, "headers": output_headers, **stats}
+    
+    @staticmethod
+    def _hash_join(left_rows, right_rows, left_key: int, right_key: int, join_type: str,
+                   combine: Callable, stats: Dict[str, Any]) -> Iterator[Dict[str, str]]:
+        """Build on the right side, probe with the left; duplicates on both sides multiply"""
+        table: Dict[str, List[List[str]]] = {}
+        for row in right_rows:
+            stats['right_rows'] += 1
+            table.setdefault(row[right_key], []).append(row)
+        
+        matched_keys = set()
+        keep_left = join_type in ('left', 'outer')
+        for row in left_rows:
+            stats['left_rows'] += 1
+            matches = table.get(row[left_key])
+            if matches:
+                matched_keys.add(row[left_key])
+                for match in matches:
+                    yield combine(row, match)
+            elif keep_left:
+                yield combine(row, None)
+        
+        if join_type in ('right', 'outer'):
+            for key, matches in table.items():
+                if key not in matched_keys:
+                    for match in matches:
+                        yield combine(None, match)
+    
+    @staticmethod
+    def _merge_join(left_sorted, right_sorted, left_key: int, right_key: int, join_type: str,
+                    combine: Callable, stats: Dict[str, Any]) -> Iterator[Dict[str, str]]:
+        """Join two key-sorted row streams; only one key group per side is held in memory"""
+        keep_left = join_type in ('left', 'outer')
+        keep_right = join_type in ('right', 'outer')
+        left_groups = itertools.groupby(left_sorted, key=lambda row: row[left_key])
+        right_groups = itertools.groupby(right_sorted, key=lambda row: row[right_key])
+        
+        left_group = next(left_groups, None)
+        right_group = next(right_groups, None)
+        while left_group is not None or right_group is not None:
+            if right_group is None or (left_group is not None and left_group[0] < right_group[0]):
+                for row in left_group[1]:
+                    stats['left_rows'] += 1
+                    if keep_left:
+                        yield combine(row, None)
+                left_group = next(left_groups, None)
+            elif left_group is None or right_group[0] < left_group[0]:
+                for row in right_group[1]:
+                    stats['right_rows'] += 1
+                    if keep_right:
+                        yield combine(None, row)
+                right_group = next(right_groups, None)
+            else:
+                matches = list(right_group[1])
+                stats['right_rows'] += len(matches)
+                for row in left_group[1]:
+                    stats['left_rows'] += 1
+                    for match in matches:
+                        yield combine(row, match)
+                left_group = next(left_groups, None)
+                right_group = next(right_groups, None)
+    
+    def _partition_file(self, file_path: str, key_index: int, partitions: int,
+                        options: Dict[str, Any], work_dir: str, side: str) -> List[str]:
+        """Spill a file into hash partitions on the join key (headerless CSV)"""
+        paths = [os.path.join(work_dir, f"{side}_part_{n}.csv") for n in range(partitions)]
+        handles = [open(path, 'w', encoding=options['encoding'], newline='') for path in paths]
+        try:
+            writers = [csv.writer(handle, delimiter=options['delimiter']) for handle in handles]
+            with open(file_path, 'r', encoding=options['encoding'], newline='') as source:
+                reader = csv.reader(source, delimiter=options['delimiter'])
+                next(reader, None)
+                for row in self._keyed_rows(reader, key_index):
+                    bucket = zlib.crc32(row[key_index].encode('utf-8')) % partitions
+                    writers[bucket].writerow(row)
+        finally:
+            for handle in handles:
+                handle.close()
+        return paths
+    
+    def _sort_runs(self, file_path: str, key_index: int, options: Dict[str, Any],
+                   work_dir: str, side: str, max_runs: int, stats: Dict[str, Any]) -> List[str]:
+        """
+        External sort phase: write key-sorted runs of at most chunk_size rows,
+        then merge them merge_fan_in at a time until at most max_runs are left
+        """
+        runs = []
+        with open(file_path, 'r', encoding=options['encoding'], newline='') as source:
+            reader = csv.reader(source, delimiter=options['delimiter'])
+            next(reader, None)
+            for index, chunk in enumerate(self._iter_chunks(self._keyed_rows(reader, key_index), options['chunk_size'])):
+                chunk.sort(key=lambda row: row[key_index])
+                run_path = os.path.join(work_dir, f"{side}_run_{index}.csv")
+                with open(run_path, 'w', encoding=options['encoding'], newline='') as run_file:
+                    csv.writer(run_file, delimiter=options['delimiter']).writerows(chunk)
+                runs.append(run_path)
+        stats['spill_files'] += len(runs)
+        
+        fan_in = options['merge_fan_in']
+        merge_pass = 0
+        while len(runs) > max_runs:
+            merge_pass += 1
+            merged = []
+            for start in range(0, len(runs), fan_in):
+                group = runs[start:start + fan_in]
+                if len(group) == 1:
+                    merged.append(group[0])
+                    continue
+                run_path = os.path.join(work_dir, f"{side}_merge_{merge_pass}_{len(merged)}.csv")
+                self._merge_runs(group, run_path, key_index, options)
+                merged.append(run_path)
+            stats['spill_files'] += len(merged)
+            stats['merge_passes'] = max(stats['merge_passes'], merge_pass)
+            runs = merged
+        return runs
+    
+    def _merge_runs(self, runs: List[str], output_path: str, key_index: int, options: Dict[str, Any]):
+        """Merge sorted runs into one sorted run and delete the inputs"""
+        run_files = [open(run, 'r', encoding=options['encoding'], newline='') for run in runs]
+        try:
+            readers = [csv.reader(f, delimiter=options['delimiter']) for f in run_files]
+            with open(output_path, 'w', encoding=options['encoding'], newline='') as target:
+                writer = csv.writer(target, delimiter=options['delimiter'])
+                merged = heapq.merge(*readers, key=lambda row: row[key_index])
+                for chunk in self._iter_chunks(merged, options['chunk_size']):
+                    writer.writerows(chunk)
+        finally:
+            for f in run_files:
+                f.close()
+        for run in runs:
+            os.remove(run)
+    
     def get_supported_operations(self) -> List[str]:
         """Get list of supported operations"""
         return ['read', 'write', 'append', 'filter', 'transform', 'merge', 'split', 'validate']
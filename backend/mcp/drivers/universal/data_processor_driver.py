@@ -10,6 +10,7 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from universal_driver_manager import BaseUniversalDriver
+from core.fan_out import batched
 
 class DataProcessorDriverDriver(BaseUniversalDriver):
     """Universal driver for data_processor_driver service"""
@@ -28,6 +29,8 @@ class DataProcessorDriverDriver(BaseUniversalDriver):
         # Default required parameters - override in specific implementations
         common_params = {"url", "endpoint", "method", "data", "headers", "auth"}
         
+        if node_type == 'n8n-nodes-base.splitInBatches':
+            return []  # items may also arrive as the upstream node's output
         if node_type in self.supported_node_types:
             return list(common_params.intersection(self._get_common_params(node_type)))
         return []
@@ -179,18 +182,58 @@ class DataProcessorDriverDriver(BaseUniversalDriver):
                 "message": f"n8n-nodes-base.splitOut execution failed"
             }
     async def execute_splitInBatches(self, parameters: Dict[str, Any], context: Dict[str, Any] = None) -> Dict[str, Any]:
-        """Execute n8n-nodes-base.splitInBatches node"""
+        """
+        Execute n8n-nodes-base.splitInBatches node.
+        
+        Like n8n, each run emits one batch of batchSize items starting at
+        batchIndex, with next_batch_index / done so the workflow can loop back
+        for the next one. returnAll=true emits every batch at once instead.
+        """
         self.logger.info(f"Executing n8n-nodes-base.splitInBatches with parameters: {list(parameters.keys())}")
         
         try:
-            # TODO: Implement actual n8n-nodes-base.splitInBatches logic
-            result = {
-                "success": True,
-                "node_type": "n8n-nodes-base.splitInBatches",
-                "message": f"Executed n8n-nodes-base.splitInBatches successfully",
-                "data": parameters,
-                "output": f"Mock output for n8n-nodes-base.splitInBatches"
-            }
+            items = parameters.get('items', parameters.get('data'))
+            if items is None and context and context.get('input_data') is not None:
+                upstream = context['input_data']
+                # The automation engine passes the node's own parameters as input_data; they aren't items
+                if not (isinstance(upstream, list) and upstream == [parameters or {}]):
+                    items = upstream
+            if isinstance(items, dict):
+                items = items.get('data', items.get('items', [items]))
+            items = list(items or [])
+            
+            batch_size = max(1, int(parameters.get('batchSize', 10)))
+            batch_count = (len(items) + batch_size - 1) // batch_size
+            
+            if parameters.get('returnAll', False):
+                batches = list(batched(items, batch_size))
+                result = {
+                    "success": True,
+                    "node_type": "n8n-nodes-base.splitInBatches",
+                    "message": f"Split {len(items)} items into {batch_count} batches of {batch_size}",
+                    "batches": batches,
+                    "batch_count": batch_count,
+                    "batch_size": batch_size,
+                    "item_count": len(items),
+                    "done": True
+                }
+            else:
+                batch_index = max(0, int(parameters.get('batchIndex', 0)))
+                start = batch_index * batch_size
+                batch = items[start:start + batch_size]
+                done = start + batch_size >= len(items)
+                result = {
+                    "success": True,
+                    "node_type": "n8n-nodes-base.splitInBatches",
+                    "message": f"Batch {batch_index + 1} of {batch_count} ({len(batch)} items)",
+                    "data": batch,
+                    "batch_index": batch_index,
+                    "next_batch_index": None if done else batch_index + 1,
+                    "batch_count": batch_count,
+                    "batch_size": batch_size,
+                    "item_count": len(items),
+                    "done": done
+                }
             
             self.logger.info(f"✅ n8n-nodes-base.splitInBatches completed successfully")
             return result
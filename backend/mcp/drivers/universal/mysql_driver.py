@@ -7,6 +7,7 @@ import logging
 import asyncio
 import aiomysql
 import json
+import time
 from typing import Dict, Any, List, Optional, Union
 import sys
 import os
@@ -18,6 +19,8 @@ mcp_dir = os.path.join(backend_dir, 'mcp')
 sys.path.append(mcp_dir)
 
 from mcp.universal_driver_manager import BaseUniversalDriver
+from core.db_pool import mysql_pools
+from core.bulk_load import RowBatches, bulk_rows_source, conflict_options, BULK_BATCH_SIZE
 
 class MysqlDriver(BaseUniversalDriver):
     """Universal driver for MySQL database operations"""
@@ -33,7 +36,8 @@ class MysqlDriver(BaseUniversalDriver):
             'mysql.update',
             'mysql.delete'
         ]
-        self.connections = {}
+        # Connections come from per-credential pools shared by all driver instances
+        self.pools = mysql_pools
     
     def get_supported_node_types(self) -> List[str]:
         return self.supported_node_types
@@ -77,27 +81,25 @@ class MysqlDriver(BaseUniversalDriver):
                     "error": "MySQL connection configuration not found"
                 }
             
-            # Get or create connection
-            connection = await self._get_connection(connection_config)
-            
             operation = parameters.get('operation', 'executeQuery')
-            
-            if operation == 'executeQuery':
-                return await self._execute_query(connection, parameters, context)
-            elif operation == 'insert':
-                return await self._insert_data(connection, parameters, context)
-            elif operation == 'update':
-                return await self._update_data(connection, parameters, context)
-            elif operation == 'delete':
-                return await self._delete_data(connection, parameters, context)
-            elif operation == 'select':
-                return await self._select_data(connection, parameters, context)
-            else:
+            handlers = {
+                'executeQuery': self._execute_query,
+                'insert': self._insert_data,
+                'update': self._update_data,
+                'delete': self._delete_data,
+                'select': self._select_data,
+                'bulkInsert': self._bulk_insert
+            }
+            if operation not in handlers:
                 return {
                     "success": False,
                     "error": f"Unknown operation: {operation}"
                 }
             
+            # Borrow a pooled connection for the duration of the operation
+            async with self.pools.connection(connection_config) as connection:
+                return await handlers[operation](connection, parameters, context)
+            
         except Exception as e:
             self.logger.error(f"MySQL operation failed: {e}")
             return {
@@ -219,10 +221,12 @@ class MysqlDriver(BaseUniversalDriver):
         
         try:
             async with connection.cursor() as cursor:
-                # Build insert query
-                placeholders = ', '.join(['%s'] * len(columns))
-                column_names = ', '.join(columns)
-                query = f"INSERT INTO {table_name} ({column_names}) VALUES ({placeholders})"
+                # Build insert query (same table and columns -> same statement text)
+                query = self.pools.statements.get(
+                    ('insert', table_name, tuple(columns)),
+                    lambda: f"INSERT INTO {table_name} ({', '.join(columns)}) "
+                            f"VALUES ({', '.join(['%s'] * len(columns))})"
+                )
                 
                 # Execute insert
                 if isinstance(values[0], list):
@@ -253,6 +257,82 @@ class MysqlDriver(BaseUniversalDriver):
                 "table": table_name
             }
     
+    async def _bulk_insert(self, connection: aiomysql.Connection, parameters: Dict[str, Any], context: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        Bulk-load rows with one multi-row INSERT per batch, all in a single
+        transaction. onConflict 'ignore' uses INSERT IGNORE and 'update' uses
+        ON DUPLICATE KEY UPDATE (MySQL matches on the table's unique keys).
+        """
+        
+        table_name = parameters.get('table', parameters.get('tableName', ''))
+        if not table_name:
+            return {
+                "success": False,
+                "error": "Table name is required for bulk insert"
+            }
+        
+        started = time.monotonic()
+        batches = RowBatches(
+            bulk_rows_source(parameters, context),
+            columns=parameters.get('columns'),
+            batch_size=parameters.get('batchSize', BULK_BATCH_SIZE),
+            empty_as_null=parameters.get('emptyAsNull', False)
+        )
+        
+        try:
+            columns = await batches.prepare()
+            if not columns:
+                return {
+                    "success": True,
+                    "inserted_count": 0,
+                    "table": table_name,
+                    "message": f"No rows to load into {table_name}"
+                }
+            action, _, update_columns = conflict_options(parameters, columns)
+            
+            def build_query(row_count: int) -> str:
+                row_placeholder = f"({', '.join(['%s'] * len(columns))})"
+                query = (f"INSERT {'IGNORE ' if action == 'ignore' else ''}INTO {table_name} "
+                         f"({', '.join(columns)}) VALUES {', '.join([row_placeholder] * row_count)}")
+                if action == 'update':
+                    query += " ON DUPLICATE KEY UPDATE " + ', '.join(f"{column} = VALUES({column})" for column in update_columns)
+                return query
+            
+            affected_count = 0
+            async with connection.cursor() as cursor:
+                async for batch in batches:
+                    query = self.pools.statements.get(
+                        ('bulkInsert', table_name, tuple(columns), len(batch), action, tuple(update_columns)),
+                        lambda: build_query(len(batch))
+                    )
+                    await cursor.execute(query, [value for row in batch for value in row])
+                    affected_count += cursor.rowcount
+            await connection.commit()
+            
+            elapsed = time.monotonic() - started
+            return {
+                "success": True,
+                "inserted_count": batches.row_count,
+                "affected_count": affected_count,
+                "batches": batches.batch_count,
+                "table": table_name,
+                "columns": columns,
+                "on_conflict": action,
+                "duration_ms": round(elapsed * 1000, 1),
+                "rows_per_second": round(batches.row_count / elapsed) if elapsed else batches.row_count,
+                "message": f"Bulk loaded {batches.row_count} rows into {table_name}"
+            }
+            
+        except Exception as e:
+            await connection.rollback()
+            self.logger.error(f"Bulk insert failed after {batches.row_count} rows: {e}")
+            return {
+                "success": False,
+                "error": str(e),
+                "table": table_name,
+                "rows_read": batches.row_count
+            }
+    
     async def _update_data(self, connection: aiomysql.Connection, parameters: Dict[str, Any], context: Dict[str, Any] = None) -> Dict[str, Any]:
         """Update data in table"""
         
@@ -390,28 +470,31 @@ class MysqlDriver(BaseUniversalDriver):
         
         try:
             async with connection.cursor(aiomysql.DictCursor) as cursor:
-                # Build select query
                 column_list = ', '.join(columns) if isinstance(columns, list) else columns
-                query = f"SELECT {column_list} FROM {table_name}"
-                params = []
-                
-                # Add WHERE clause
-                if where_clause:
-                    where_parts = []
-                    for column, value in where_clause.items():
-                        where_parts.append(f"{column} = %s")
-                        params.append(value)
-                    query += f" WHERE {' AND '.join(where_parts)}"
-                
-                # Add ORDER BY
-                if order_by:
-                    query += f" ORDER BY {order_by}"
-                
-                # Add LIMIT and OFFSET
+                where_columns = tuple(where_clause)
+                params = list(where_clause.values())
+                # LIMIT / OFFSET are bound as parameters so paging reuses one statement
                 if limit:
-                    query += f" LIMIT {limit}"
+                    params.append(int(limit))
                 if offset:
-                    query += f" OFFSET {offset}"
+                    params.append(int(offset))
+                
+                def build_query() -> str:
+                    query = f"SELECT {column_list} FROM {table_name}"
+                    if where_columns:
+                        query += " WHERE " + ' AND '.join(f"{column} = %s" for column in where_columns)
+                    if order_by:
+                        query += f" ORDER BY {order_by}"
+                    if limit:
+                        query += " LIMIT %s"
+                    if offset:
+                        query += " OFFSET %s"
+                    return query
+                
+                query = self.pools.statements.get(
+                    ('select', table_name, column_list, where_columns, order_by, bool(limit), bool(offset)),
+                    build_query
+                )
                 
                 # Execute select
                 await cursor.execute(query, params)
@@ -446,28 +529,6 @@ class MysqlDriver(BaseUniversalDriver):
                 "table": table_name
             }
     
-    async def _get_connection(self, config: Dict[str, Any]) -> aiomysql.Connection:
-        """Get or create database connection"""
-        
-        connection_key = f"{config['host']}:{config['port']}:{config['database']}"
-        
-        if connection_key not in self.connections:
-            try:
-                connection = await aiomysql.connect(
-                    host=config['host'],
-                    port=config['port'],
-                    db=config['database'],
-                    user=config['user'],
-                    password=config['password'],
-                    autocommit=False
-                )
-                self.connections[connection_key] = connection
-            except Exception as e:
-                self.logger.error(f"Failed to connect to MySQL: {e}")
-                raise
-        
-        return self.connections[connection_key]
-    
     def _get_connection_config(self, parameters: Dict[str, Any], context: Dict[str, Any] = None) -> Optional[Dict[str, Any]]:
         """Get MySQL connection configuration"""
         
@@ -507,21 +568,18 @@ class MysqlDriver(BaseUniversalDriver):
         return None
     
     async def close_connections(self):
-        """Close all database connections"""
-        for connection in self.connections.values():
-            try:
-                await connection.ensure_closed()
-            except Exception as e:
-                self.logger.warning(f"Error closing connection: {e}")
-        self.connections.clear()
+        """Close all pooled database connections"""
+        await self.pools.close()
     
     def get_supported_operations(self) -> List[str]:
         """Get list of supported operations"""
-        return ['executeQuery', 'insert', 'update', 'delete', 'select']
+        return ['executeQuery', 'insert', 'update', 'delete', 'select', 'bulkInsert']
     
     def get_connection_info(self) -> Dict[str, Any]:
-        """Get information about current connections"""
+        """Get information about current connection pools"""
+        stats = self.pools.get_stats()
         return {
-            "active_connections": len(self.connections),
-            "connection_keys": list(self.connections.keys())
+            "active_connections": sum(pool["size"] for pool in stats["pools"].values()),
+            "connection_keys": list(stats["pools"].keys()),
+            **stats
         }
@@ -7,6 +7,9 @@ import logging
 import asyncio
 import asyncpg
 import json
+import time
+import uuid
+from datetime import date, datetime
 from typing import Dict, Any, List, Optional, Union
 import sys
 import os
@@ -18,6 +21,8 @@ mcp_dir = os.path.join(backend_dir, 'mcp')
 sys.path.append(mcp_dir)
 
 from mcp.universal_driver_manager import BaseUniversalDriver
+from core.db_pool import postgres_pools
+from core.bulk_load import RowBatches, bulk_rows_source, conflict_options, BULK_BATCH_SIZE
 
 class PostgresDriver(BaseUniversalDriver):
     """Universal driver for PostgreSQL database operations"""
@@ -33,7 +38,8 @@ class PostgresDriver(BaseUniversalDriver):
             'postgres.update',
             'postgres.delete'
         ]
-        self.connections = {}
+        # Connections come from per-credential pools shared by all driver instances
+        self.pools = postgres_pools
     
     def get_supported_node_types(self) -> List[str]:
         return self.supported_node_types
@@ -77,27 +83,25 @@ class PostgresDriver(BaseUniversalDriver):
                     "error": "PostgreSQL connection configuration not found"
                 }
             
-            # Get or create connection
-            connection = await self._get_connection(connection_config)
-            
             operation = parameters.get('operation', 'executeQuery')
-            
-            if operation == 'executeQuery':
-                return await self._execute_query(connection, parameters, context)
-            elif operation == 'insert':
-                return await self._insert_data(connection, parameters, context)
-            elif operation == 'update':
-                return await self._update_data(connection, parameters, context)
-            elif operation == 'delete':
-                return await self._delete_data(connection, parameters, context)
-            elif operation == 'select':
-                return await self._select_data(connection, parameters, context)
-            else:
+            handlers = {
+                'executeQuery': self._execute_query,
+                'insert': self._insert_data,
+                'update': self._update_data,
+                'delete': self._delete_data,
+                'select': self._select_data,
+                'bulkInsert': self._bulk_insert
+            }
+            if operation not in handlers:
                 return {
                     "success": False,
                     "error": f"Unknown operation: {operation}"
                 }
             
+            # Borrow a pooled connection for the duration of the operation
+            async with self.pools.connection(connection_config) as connection:
+                return await handlers[operation](connection, parameters, context)
+            
         except Exception as e:
             self.logger.error(f"PostgreSQL operation failed: {e}")
             return {
@@ -207,10 +211,12 @@ class PostgresDriver(BaseUniversalDriver):
             }
         
         try:
-            # Build insert query
-            placeholders = ', '.join([f'${i+1}' for i in range(len(columns))])
-            column_names = ', '.join(columns)
-            query = f"INSERT INTO {table_name} ({column_names}) VALUES ({placeholders})"
+            # Build insert query (same table and columns -> same statement text)
+            query = self.pools.statements.get(
+                ('insert', table_name, tuple(columns)),
+                lambda: f"INSERT INTO {table_name} ({', '.join(columns)}) "
+                        f"VALUES ({', '.join(f'${i+1}' for i in range(len(columns)))})"
+            )
             
             # Execute insert
             if isinstance(values[0], list):
@@ -238,6 +244,125 @@ class PostgresDriver(BaseUniversalDriver):
                 "table": table_name
             }
     
+    async def _bulk_insert(self, connection: asyncpg.Connection, parameters: Dict[str, Any], context: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        Bulk-load rows with COPY FROM STDIN. Rows are streamed to the server as
+        CSV text, so string values (e.g. from CSVDriver) are cast by Postgres
+        itself. With onConflict 'ignore' / 'update' the rows are copied into a
+        temporary staging table and merged with one INSERT ... ON CONFLICT.
+        """
+        
+        table_name = parameters.get('table', parameters.get('tableName', ''))
+        if not table_name:
+            return {
+                "success": False,
+                "error": "Table name is required for bulk insert"
+            }
+        
+        started = time.monotonic()
+        batches = RowBatches(
+            bulk_rows_source(parameters, context),
+            columns=parameters.get('columns'),
+            batch_size=parameters.get('batchSize', BULK_BATCH_SIZE),
+            empty_as_null=parameters.get('emptyAsNull', False)
+        )
+        
+        try:
+            columns = await batches.prepare()
+            if not columns:
+                return {
+                    "success": True,
+                    "inserted_count": 0,
+                    "table": table_name,
+                    "message": f"No rows to load into {table_name}"
+                }
+            action, conflict_columns, update_columns = conflict_options(parameters, columns)
+            if action == 'update' and not conflict_columns:
+                return {
+                    "success": False,
+                    "error": "conflictColumns are required for onConflict 'update'"
+                }
+            
+            schema_name, _, table = table_name.rpartition('.')
+            column_list = ', '.join(columns)
+            
+            async with connection.transaction():
+                if action == 'error':
+                    await connection.copy_to_table(
+                        table, schema_name=schema_name or None, columns=columns,
+                        source=self._copy_source(batches), format='csv'
+                    )
+                    affected_count = batches.row_count
+                else:
+                    stage = f"bulk_stage_{uuid.uuid4().hex[:12]}"
+                    await connection.execute(
+                        f"CREATE TEMP TABLE {stage} ON COMMIT DROP AS "
+                        f"SELECT {column_list} FROM {table_name} WITH NO DATA"
+                    )
+                    await connection.copy_to_table(
+                        stage, columns=columns, source=self._copy_source(batches), format='csv'
+                    )
+                    
+                    keys = ', '.join(conflict_columns)
+                    if action == 'update':
+                        # Last row wins when the load itself repeats a key
+                        select = (f"SELECT DISTINCT ON ({keys}) {column_list} FROM {stage} "
+                                  f"ORDER BY {keys}, ctid DESC")
+                        on_conflict = (f"ON CONFLICT ({keys}) DO UPDATE SET " +
+                                       ', '.join(f"{column} = EXCLUDED.{column}" for column in update_columns))
+                    else:
+                        select = f"SELECT {column_list} FROM {stage}"
+                        on_conflict = f"ON CONFLICT ({keys}) DO NOTHING" if keys else "ON CONFLICT DO NOTHING"
+                    
+                    result = await connection.execute(f"INSERT INTO {table_name} ({column_list}) {select} {on_conflict}")
+                    affected_count = int(result.split()[-1]) if result.split()[-1].isdigit() else 0
+            
+            elapsed = time.monotonic() - started
+            return {
+                "success": True,
+                "inserted_count": batches.row_count,
+                "affected_count": affected_count,
+                "batches": batches.batch_count,
+                "table": table_name,
+                "columns": columns,
+                "on_conflict": action,
+                "duration_ms": round(elapsed * 1000, 1),
+                "rows_per_second": round(batches.row_count / elapsed) if elapsed else batches.row_count,
+                "message": f"Bulk loaded {batches.row_count} rows into {table_name}"
+            }
+            
+        except Exception as e:
+            self.logger.error(f"Bulk insert failed after {batches.row_count} rows: {e}")
+            return {
+                "success": False,
+                "error": str(e),
+                "table": table_name,
+                "rows_read": batches.row_count
+            }
+    
+    @classmethod
+    async def _copy_source(cls, batches: RowBatches):
+        """COPY ... FORMAT csv payload, one chunk per batch"""
+        async for batch in batches:
+            yield ''.join(','.join(map(cls._copy_value, row)) + '\n' for row in batch).encode('utf-8')
+    
+    @staticmethod
+    def _copy_value(value: Any) -> str:
+        # Unquoted empty field is NULL in CSV COPY; everything else is quoted
+        if value is None:
+            return ''
+        if isinstance(value, bool):
+            text = 'true' if value else 'false'
+        elif isinstance(value, (dict, list)):
+            text = json.dumps(value, default=str)
+        elif isinstance(value, (datetime, date)):
+            text = value.isoformat()
+        elif isinstance(value, (bytes, bytearray)):
+            text = '\\x' + bytes(value).hex()
+        else:
+            text = str(value)
+        return '"' + text.replace('"', '""') + '"'
+    
     async def _update_data(self, connection: asyncpg.Connection, parameters: Dict[str, Any], context: Dict[str, Any] = None) -> Dict[str, Any]:
         """Update data in table"""
         
@@ -375,30 +500,34 @@ class PostgresDriver(BaseUniversalDriver):
             }
         
         try:
-            # Build select query
             column_list = ', '.join(columns) if isinstance(columns, list) else columns
-            query = f"SELECT {column_list} FROM {table_name}"
-            params = []
+            where_columns = tuple(where_clause)
+            params = list(where_clause.values())
+            # LIMIT / OFFSET are bound as parameters so paging reuses one statement
+            if limit:
+                params.append(int(limit))
+            if offset:
+                params.append(int(offset))
             
-            # Add WHERE clause
-            if where_clause:
-                where_parts = []
+            def build_query() -> str:
+                query = f"SELECT {column_list} FROM {table_name}"
                 param_idx = 1
-                for column, value in where_clause.items():
-                    where_parts.append(f"{column} = ${param_idx}")
-                    params.append(value)
+                if where_columns:
+                    query += " WHERE " + ' AND '.join(f"{column} = ${param_idx + i}" for i, column in enumerate(where_columns))
+                    param_idx += len(where_columns)
+                if order_by:
+                    query += f" ORDER BY {order_by}"
+                if limit:
+                    query += f" LIMIT ${param_idx}"
                     param_idx += 1
-                query += f" WHERE {' AND '.join(where_parts)}"
+                if offset:
+                    query += f" OFFSET ${param_idx}"
+                return query
             
-            # Add ORDER BY
-            if order_by:
-                query += f" ORDER BY {order_by}"
-            
-            # Add LIMIT and OFFSET
-            if limit:
-                query += f" LIMIT {limit}"
-            if offset:
-                query += f" OFFSET {offset}"
+            query = self.pools.statements.get(
+                ('select', table_name, column_list, where_columns, order_by, bool(limit), bool(offset)),
+                build_query
+            )
             
             # Execute select
             result = await connection.fetch(query, *params)
@@ -425,27 +554,6 @@ class PostgresDriver(BaseUniversalDriver):
                 "table": table_name
             }
     
-    async def _get_connection(self, config: Dict[str, Any]) -> asyncpg.Connection:
-        """Get or create database connection"""
-        
-        connection_key = f"{config['host']}:{config['port']}:{config['database']}"
-        
-        if connection_key not in self.connections:
-            try:
-                connection = await asyncpg.connect(
-                    host=config['host'],
-                    port=config['port'],
-                    database=config['database'],
-                    user=config['user'],
-                    password=config['password']
-                )
-                self.connections[connection_key] = connection
-            except Exception as e:
-                self.logger.error(f"Failed to connect to PostgreSQL: {e}")
-                raise
-        
-        return self.connections[connection_key]
-    
     def _get_connection_config(self, parameters: Dict[str, Any], context: Dict[str, Any] = None) -> Optional[Dict[str, Any]]:
         """Get PostgreSQL connection configuration"""
         
@@ -485,21 +593,18 @@ class PostgresDriver(BaseUniversalDriver):
         return None
     
     async def close_connections(self):
-        """Close all database connections"""
-        for connection in self.connections.values():
-            try:
-                await connection.close()
-            except Exception as e:
-                self.logger.warning(f"Error closing connection: {e}")
-        self.connections.clear()
+        """Close all pooled database connections"""
+        await self.pools.close()
     
     def get_supported_operations(self) -> List[str]:
         """Get list of supported operations"""
-        return ['executeQuery', 'insert', 'update', 'delete', 'select']
+        return ['executeQuery', 'insert', 'update', 'delete', 'select', 'bulkInsert']
     
     def get_connection_info(self) -> Dict[str, Any]:
-        """Get information about current connections"""
+        """Get information about current connection pools"""
+        stats = self.pools.get_stats()
         return {
-            "active_connections": len(self.connections),
-            "connection_keys": list(self.connections.keys())
+            "active_connections": sum(pool["size"] for pool in stats["pools"].values()),
+            "connection_keys": list(stats["pools"].keys()),
+            **stats
         }
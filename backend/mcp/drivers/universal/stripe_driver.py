@@ -5,7 +5,6 @@ Supports: customers, payments, subscriptions, invoices, products
 
 import logging
 import asyncio
-import aiohttp
 from typing import Dict, Any, List, Optional, Union
 import json
 from datetime import datetime
@@ -19,6 +18,9 @@ mcp_dir = os.path.join(backend_dir, 'mcp')
 sys.path.append(mcp_dir)
 
 from mcp.universal_driver_manager import BaseUniversalDriver
+from core.http_client import http_client_manager
+from core.rate_limiter import rate_limit_scheduler
+from core.pagination import PageIterator, page_error, collect_pages, wants_all_pages, page_options
 
 class StripeDriver(BaseUniversalDriver):
     """Universal driver for Stripe payment processing operations"""
@@ -64,19 +66,24 @@ class StripeDriver(BaseUniversalDriver):
             operation = parameters.get('operation', 'get')
             
             if resource == 'customer':
-                return await self._handle_customer_operations(operation, parameters, api_key, context)
+                result = await self._handle_customer_operations(operation, parameters, api_key, context)
             elif resource == 'payment':
-                return await self._handle_payment_operations(operation, parameters, api_key, context)
+                result = await self._handle_payment_operations(operation, parameters, api_key, context)
             elif resource == 'subscription':
-                return await self._handle_subscription_operations(operation, parameters, api_key, context)
+                result = await self._handle_subscription_operations(operation, parameters, api_key, context)
             elif resource == 'invoice':
-                return await self._handle_invoice_operations(operation, parameters, api_key, context)
+                result = await self._handle_invoice_operations(operation, parameters, api_key, context)
             elif resource == 'product':
-                return await self._handle_product_operations(operation, parameters, api_key, context)
+                result = await self._handle_product_operations(operation, parameters, api_key, context)
             elif resource == 'charge':
-                return await self._handle_charge_operations(operation, parameters, api_key, context)
+                result = await self._handle_charge_operations(operation, parameters, api_key, context)
             else:
-                return await self._handle_customer_operations(operation, parameters, api_key, context)
+                result = await self._handle_customer_operations(operation, parameters, api_key, context)
+            
+            # Let the workflow engine pace bulk runs against the remaining API budget
+            if isinstance(result, dict):
+                result["rate_limit"] = rate_limit_scheduler.get_budget("stripe", api_key)
+            return result
                 
         except Exception as e:
             return {
@@ -273,7 +280,7 @@ class StripeDriver(BaseUniversalDriver):
         for key, value in metadata.items():
             data[f'metadata[{key}]'] = value
         
-        async with aiohttp.ClientSession() as session:
+        async with http_client_manager.session("stripe", credential=api_key) as session:
             async with session.post(f"{self.base_url}/customers", headers=headers, data=data) as response:
                 if response.status == 200:
                     response_data = await response.json()
@@ -304,7 +311,7 @@ class StripeDriver(BaseUniversalDriver):
             'Content-Type': 'application/json'
         }
         
-        async with aiohttp.ClientSession() as session:
+        async with http_client_manager.session("stripe", credential=api_key) as session:
             async with session.get(f"{self.base_url}/customers/{customer_id}", headers=headers) as response:
                 if response.status == 200:
                     data = await response.json()
@@ -325,6 +332,11 @@ class StripeDriver(BaseUniversalDriver):
         limit = parameters.get('limit', 10)
         starting_after = parameters.get('starting_after', '')
         
+        if wants_all_pages(parameters):
+            iterator = self.iter_customers(api_key, max_items=page_options(parameters)['max_items'],
+                                           starting_after=starting_after or None)
+            return await collect_pages(iterator, parameters, "customers")
+        
         headers = {
             'Authorization': f'Bearer {api_key}',
             'Content-Type': 'application/json'
@@ -337,7 +349,7 @@ class StripeDriver(BaseUniversalDriver):
         if starting_after:
             params['starting_after'] = starting_after
         
-        async with aiohttp.ClientSession() as session:
+        async with http_client_manager.session("stripe", credential=api_key) as session:
             async with session.get(f"{self.base_url}/customers", headers=headers, params=params) as response:
                 if response.status == 200:
                     data = await response.json()
@@ -384,7 +396,7 @@ class StripeDriver(BaseUniversalDriver):
         if payment_method:
             data['payment_method'] = payment_method
         
-        async with aiohttp.ClientSession() as session:
+        async with http_client_manager.session("stripe", credential=api_key) as session:
             async with session.post(f"{self.base_url}/payment_intents", headers=headers, data=data) as response:
                 if response.status == 200:
                     response_data = await response.json()
@@ -415,7 +427,7 @@ class StripeDriver(BaseUniversalDriver):
             'Content-Type': 'application/json'
         }
         
-        async with aiohttp.ClientSession() as session:
+        async with http_client_manager.session("stripe", credential=api_key) as session:
             async with session.get(f"{self.base_url}/payment_intents/{payment_intent_id}", headers=headers) as response:
                 if response.status == 200:
                     data = await response.json()
@@ -451,7 +463,7 @@ class StripeDriver(BaseUniversalDriver):
         if payment_method:
             data['payment_method'] = payment_method
         
-        async with aiohttp.ClientSession() as session:
+        async with http_client_manager.session("stripe", credential=api_key) as session:
             async with session.post(f"{self.base_url}/payment_intents/{payment_intent_id}/confirm", headers=headers, data=data) as response:
                 if response.status == 200:
                     response_data = await response.json()
@@ -498,7 +510,7 @@ class StripeDriver(BaseUniversalDriver):
         if trial_period_days:
             data['trial_period_days'] = trial_period_days
         
-        async with aiohttp.ClientSession() as session:
+        async with http_client_manager.session("stripe", credential=api_key) as session:
             async with session.post(f"{self.base_url}/subscriptions", headers=headers, data=data) as response:
                 if response.status == 200:
                     response_data = await response.json()
@@ -529,7 +541,7 @@ class StripeDriver(BaseUniversalDriver):
             'Content-Type': 'application/json'
         }
         
-        async with aiohttp.ClientSession() as session:
+        async with http_client_manager.session("stripe", credential=api_key) as session:
             async with session.get(f"{self.base_url}/subscriptions/{subscription_id}", headers=headers) as response:
                 if response.status == 200:
                     data = await response.json()
@@ -560,7 +572,7 @@ class StripeDriver(BaseUniversalDriver):
             'Content-Type': 'application/json'
         }
         
-        async with aiohttp.ClientSession() as session:
+        async with http_client_manager.session("stripe", credential=api_key) as session:
             async with session.delete(f"{self.base_url}/subscriptions/{subscription_id}", headers=headers) as response:
                 if response.status == 200:
                     data = await response.json()
@@ -612,7 +624,7 @@ class StripeDriver(BaseUniversalDriver):
         if customer_id:
             data['customer'] = customer_id
         
-        async with aiohttp.ClientSession() as session:
+        async with http_client_manager.session("stripe", credential=api_key) as session:
             async with session.post(f"{self.base_url}/charges", headers=headers, data=data) as response:
                 if response.status == 200:
                     response_data = await response.json()
@@ -628,6 +640,72 @@ class StripeDriver(BaseUniversalDriver):
                         "error": error_data.get('error', {}).get('message', 'Unknown error')
                     }
     
+    async def _get_all_charges(self, parameters: Dict[str, Any], api_key: str, context: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Get all charges, optionally for one customer"""
+        limit = parameters.get('limit', 10)
+        starting_after = parameters.get('starting_after', '')
+        customer_id = parameters.get('customer_id', '')
+        
+        filters = {'customer': customer_id} if customer_id else {}
+        
+        if wants_all_pages(parameters):
+            iterator = self.iter_charges(api_key, params=filters, max_items=page_options(parameters)['max_items'],
+                                         starting_after=starting_after or None)
+            return await collect_pages(iterator, parameters, "charges")
+        
+        headers = {
+            'Authorization': f'Bearer {api_key}',
+            'Content-Type': 'application/json'
+        }
+        
+        params = dict(filters, limit=min(limit, 100))
+        
+        if starting_after:
+            params['starting_after'] = starting_after
+        
+        async with http_client_manager.session("stripe", credential=api_key) as session:
+            async with session.get(f"{self.base_url}/charges", headers=headers, params=params) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    return {
+                        "success": True,
+                        "data": data,
+                        "count": len(data.get('data', [])),
+                        "message": "Charges retrieved successfully"
+                    }
+                else:
+                    error_data = await response.json()
+                    return {
+                        "success": False,
+                        "error": error_data.get('error', {}).get('message', 'Unknown error')
+                    }
+    
+    def paginate(self, api_key: str, resource: str, params: Dict[str, Any] = None, max_items: int = None,
+                 page_size: int = 100, starting_after: str = None) -> PageIterator:
+        """Iterate a Stripe list endpoint across pages, following starting_after/has_more"""
+        headers = {'Authorization': f'Bearer {api_key}'}
+        base_params = dict(params or {}, limit=min(int(page_size), 100))
+        
+        async def fetch_page(cursor):
+            page_params = dict(base_params)
+            if cursor:
+                page_params['starting_after'] = cursor
+            async with http_client_manager.session("stripe", credential=api_key) as session:
+                async with session.get(f"{self.base_url}/{resource}", headers=headers, params=page_params) as response:
+                    if response.status != 200:
+                        raise await page_error(response, lambda data: data.get('error', {}).get('message'))
+                    data = await response.json() or {}
+            items = data.get('data', [])
+            return items, (items[-1]['id'] if data.get('has_more') and items else None)
+        
+        return PageIterator(fetch_page, starting_after, max_items)
+    
+    def iter_customers(self, api_key: str, **kwargs) -> PageIterator:
+        return self.paginate(api_key, 'customers', **kwargs)
+    
+    def iter_charges(self, api_key: str, **kwargs) -> PageIterator:
+        return self.paginate(api_key, 'charges', **kwargs)
+    
     def _get_api_key(self, parameters: Dict[str, Any], context: Dict[str, Any] = None) -> Optional[str]:
         """Get Stripe API key"""
         
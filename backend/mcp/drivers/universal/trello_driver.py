@@ -5,7 +5,6 @@ Supports: boards, lists, cards, members, attachments
 
 import logging
 import asyncio
-import aiohttp
 from typing import Dict, Any, List, Optional, Union
 import json
 from datetime import datetime
@@ -19,6 +18,9 @@ mcp_dir = os.path.join(backend_dir, 'mcp')
 sys.path.append(mcp_dir)
 
 from mcp.universal_driver_manager import BaseUniversalDriver
+from core.http_client import http_client_manager
+from core.rate_limiter import rate_limit_scheduler
+from core.pagination import PageIterator, page_error, collect_pages, wants_all_pages, page_options
 
 class TrelloDriver(BaseUniversalDriver):
     """Universal driver for Trello project management operations"""
@@ -63,17 +65,22 @@ class TrelloDriver(BaseUniversalDriver):
             operation = parameters.get('operation', 'get')
             
             if resource == 'board':
-                return await self._handle_board_operations(operation, parameters, api_key, api_token, context)
+                result = await self._handle_board_operations(operation, parameters, api_key, api_token, context)
             elif resource == 'list':
-                return await self._handle_list_operations(operation, parameters, api_key, api_token, context)
+                result = await self._handle_list_operations(operation, parameters, api_key, api_token, context)
             elif resource == 'card':
-                return await self._handle_card_operations(operation, parameters, api_key, api_token, context)
+                result = await self._handle_card_operations(operation, parameters, api_key, api_token, context)
             elif resource == 'member':
-                return await self._handle_member_operations(operation, parameters, api_key, api_token, context)
+                result = await self._handle_member_operations(operation, parameters, api_key, api_token, context)
             elif resource == 'attachment':
-                return await self._handle_attachment_operations(operation, parameters, api_key, api_token, context)
+                result = await self._handle_attachment_operations(operation, parameters, api_key, api_token, context)
             else:
-                return await self._handle_card_operations(operation, parameters, api_key, api_token, context)
+                result = await self._handle_card_operations(operation, parameters, api_key, api_token, context)
+            
+            # Let the workflow engine pace bulk runs against the remaining API budget
+            if isinstance(result, dict):
+                result["rate_limit"] = rate_limit_scheduler.get_budget("trello", api_token)
+            return result
                 
         except Exception as e:
             return {
@@ -226,7 +233,7 @@ class TrelloDriver(BaseUniversalDriver):
             'token': api_token
         }
         
-        async with aiohttp.ClientSession() as session:
+        async with http_client_manager.session("trello", credential=api_token) as session:
             async with session.get(f"{self.base_url}/boards/{board_id}", params=params) as response:
                 if response.status == 200:
                     data = await response.json()
@@ -251,7 +258,7 @@ class TrelloDriver(BaseUniversalDriver):
             'token': api_token
         }
         
-        async with aiohttp.ClientSession() as session:
+        async with http_client_manager.session("trello", credential=api_token) as session:
             async with session.get(f"{self.base_url}/members/{member_id}/boards", params=params) as response:
                 if response.status == 200:
                     data = await response.json()
@@ -288,7 +295,7 @@ class TrelloDriver(BaseUniversalDriver):
             'prefs_permissionLevel': visibility
         }
         
-        async with aiohttp.ClientSession() as session:
+        async with http_client_manager.session("trello", credential=api_token) as session:
             async with session.post(f"{self.base_url}/boards", params=params) as response:
                 if response.status == 200:
                     data = await response.json()
@@ -326,7 +333,7 @@ class TrelloDriver(BaseUniversalDriver):
         if desc:
             params['desc'] = desc
         
-        async with aiohttp.ClientSession() as session:
+        async with http_client_manager.session("trello", credential=api_token) as session:
             async with session.put(f"{self.base_url}/boards/{board_id}", params=params) as response:
                 if response.status == 200:
                     data = await response.json()
@@ -357,7 +364,7 @@ class TrelloDriver(BaseUniversalDriver):
             'token': api_token
         }
         
-        async with aiohttp.ClientSession() as session:
+        async with http_client_manager.session("trello", credential=api_token) as session:
             async with session.delete(f"{self.base_url}/boards/{board_id}", params=params) as response:
                 if response.status == 200:
                     return {
@@ -397,7 +404,7 @@ class TrelloDriver(BaseUniversalDriver):
             'pos': position
         }
         
-        async with aiohttp.ClientSession() as session:
+        async with http_client_manager.session("trello", credential=api_token) as session:
             async with session.post(f"{self.base_url}/lists", params=params) as response:
                 if response.status == 200:
                     data = await response.json()
@@ -428,7 +435,7 @@ class TrelloDriver(BaseUniversalDriver):
             'token': api_token
         }
         
-        async with aiohttp.ClientSession() as session:
+        async with http_client_manager.session("trello", credential=api_token) as session:
             async with session.get(f"{self.base_url}/boards/{board_id}/lists", params=params) as response:
                 if response.status == 200:
                     data = await response.json()
@@ -475,7 +482,7 @@ class TrelloDriver(BaseUniversalDriver):
         if due_date:
             params['due'] = due_date
         
-        async with aiohttp.ClientSession() as session:
+        async with http_client_manager.session("trello", credential=api_token) as session:
             async with session.post(f"{self.base_url}/cards", params=params) as response:
                 if response.status == 200:
                     data = await response.json()
@@ -506,7 +513,7 @@ class TrelloDriver(BaseUniversalDriver):
             'token': api_token
         }
         
-        async with aiohttp.ClientSession() as session:
+        async with http_client_manager.session("trello", credential=api_token) as session:
             async with session.get(f"{self.base_url}/cards/{card_id}", params=params) as response:
                 if response.status == 200:
                     data = await response.json()
@@ -538,12 +545,17 @@ class TrelloDriver(BaseUniversalDriver):
             'token': api_token
         }
         
+        if wants_all_pages(parameters):
+            iterator = self.iter_cards(api_key, api_token, board_id=board_id, list_id=list_id,
+                                       max_items=page_options(parameters)['max_items'])
+            return await collect_pages(iterator, parameters, "cards")
+        
         if list_id:
             url = f"{self.base_url}/lists/{list_id}/cards"
         else:
             url = f"{self.base_url}/boards/{board_id}/cards"
         
-        async with aiohttp.ClientSession() as session:
+        async with http_client_manager.session("trello", credential=api_token) as session:
             async with session.get(url, params=params) as response:
                 if response.status == 200:
                     data = await response.json()
@@ -588,7 +600,7 @@ class TrelloDriver(BaseUniversalDriver):
         if list_id:
             params['idList'] = list_id
         
-        async with aiohttp.ClientSession() as session:
+        async with http_client_manager.session("trello", credential=api_token) as session:
             async with session.put(f"{self.base_url}/cards/{card_id}", params=params) as response:
                 if response.status == 200:
                     data = await response.json()
@@ -619,7 +631,7 @@ class TrelloDriver(BaseUniversalDriver):
             'token': api_token
         }
         
-        async with aiohttp.ClientSession() as session:
+        async with http_client_manager.session("trello", credential=api_token) as session:
             async with session.delete(f"{self.base_url}/cards/{card_id}", params=params) as response:
                 if response.status == 200:
                     return {
@@ -640,7 +652,7 @@ class TrelloDriver(BaseUniversalDriver):
             'token': api_token
         }
         
-        async with aiohttp.ClientSession() as session:
+        async with http_client_manager.session("trello", credential=api_token) as session:
             async with session.get(f"{self.base_url}/members/me", params=params) as response:
                 if response.status == 200:
                     data = await response.json()
@@ -656,6 +668,37 @@ class TrelloDriver(BaseUniversalDriver):
                         "error": error_data.get('message', 'Unknown error')
                     }
     
+    def iter_cards(self, api_key: str, api_token: str, board_id: str = '', list_id: str = '',
+                   max_items: int = None, page_size: int = 1000) -> PageIterator:
+        """
+        Iterate the cards of a board (or list). Board cards are paged with
+        limit/before, using the oldest card id of each page as the cursor;
+        the list endpoint is not paged by Trello and arrives as one page.
+        """
+        if list_id:
+            url = f"{self.base_url}/lists/{list_id}/cards"
+        else:
+            url = f"{self.base_url}/boards/{board_id}/cards"
+        page_size = min(int(page_size), 1000)
+        
+        async def fetch_page(cursor):
+            params = {'key': api_key, 'token': api_token}
+            if not list_id:
+                params['limit'] = page_size
+                if cursor:
+                    params['before'] = cursor
+            async with http_client_manager.session("trello", credential=api_token) as session:
+                async with session.get(url, params=params) as response:
+                    if response.status != 200:
+                        raise await page_error(response, lambda data: data.get('message'))
+                    cards = await response.json() or []
+            if list_id or len(cards) < page_size:
+                return cards, None
+            # Card ids start with their creation timestamp, so the smallest id is the oldest card
+            return cards, min(card['id'] for card in cards)
+        
+        return PageIterator(fetch_page, None, max_items)
+    
     def _get_api_credentials(self, parameters: Dict[str, Any], context: Dict[str, Any] = None) -> tuple:
         """Get Trello API credentials"""
         
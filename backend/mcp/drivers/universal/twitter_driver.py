@@ -5,7 +5,6 @@ Supports: tweets, users, followers, media, direct messages
 
 import logging
 import asyncio
-import aiohttp
 from typing import Dict, Any, List, Optional, Union
 import json
 from datetime import datetime
@@ -19,6 +18,9 @@ mcp_dir = os.path.join(backend_dir, 'mcp')
 sys.path.append(mcp_dir)
 
 from mcp.universal_driver_manager import BaseUniversalDriver
+from core.http_client import http_client_manager
+from core.rate_limiter import rate_limit_scheduler
+from core.pagination import PageIterator, page_error, collect_pages, wants_all_pages, page_options
 
 class TwitterDriver(BaseUniversalDriver):
     """Universal driver for Twitter/X social media operations"""
@@ -64,19 +66,24 @@ class TwitterDriver(BaseUniversalDriver):
             operation = parameters.get('operation', 'get')
             
             if resource == 'tweet':
-                return await self._handle_tweet_operations(operation, parameters, bearer_token, context)
+                result = await self._handle_tweet_operations(operation, parameters, bearer_token, context)
             elif resource == 'user':
-                return await self._handle_user_operations(operation, parameters, bearer_token, context)
+                result = await self._handle_user_operations(operation, parameters, bearer_token, context)
             elif resource == 'follower':
-                return await self._handle_follower_operations(operation, parameters, bearer_token, context)
+                result = await self._handle_follower_operations(operation, parameters, bearer_token, context)
             elif resource == 'media':
-                return await self._handle_media_operations(operation, parameters, bearer_token, context)
+                result = await self._handle_media_operations(operation, parameters, bearer_token, context)
             elif resource == 'dm':
-                return await self._handle_dm_operations(operation, parameters, bearer_token, context)
+                result = await self._handle_dm_operations(operation, parameters, bearer_token, context)
             elif resource == 'search':
-                return await self._handle_search_operations(operation, parameters, bearer_token, context)
+                result = await self._handle_search_operations(operation, parameters, bearer_token, context)
             else:
-                return await self._handle_tweet_operations(operation, parameters, bearer_token, context)
+                result = await self._handle_tweet_operations(operation, parameters, bearer_token, context)
+            
+            # Let the workflow engine pace bulk runs against the remaining API budget
+            if isinstance(result, dict):
+                result["rate_limit"] = rate_limit_scheduler.get_budget("twitter", bearer_token)
+            return result
                 
         except Exception as e:
             return {
@@ -182,7 +189,7 @@ class TwitterDriver(BaseUniversalDriver):
             'expansions': 'author_id'
         }
         
-        async with aiohttp.ClientSession() as session:
+        async with http_client_manager.session("twitter", credential=bearer_token) as session:
             async with session.get(f"{self.base_url}/tweets/{tweet_id}", headers=headers, params=params) as response:
                 if response.status == 200:
                     data = await response.json()
@@ -229,7 +236,7 @@ class TwitterDriver(BaseUniversalDriver):
                 'media_ids': media_ids
             }
         
-        async with aiohttp.ClientSession() as session:
+        async with http_client_manager.session("twitter", credential=bearer_token) as session:
             async with session.post(f"{self.base_url}/tweets", headers=headers, json=data) as response:
                 if response.status == 201:
                     response_data = await response.json()
@@ -260,7 +267,7 @@ class TwitterDriver(BaseUniversalDriver):
             'Content-Type': 'application/json'
         }
         
-        async with aiohttp.ClientSession() as session:
+        async with http_client_manager.session("twitter", credential=bearer_token) as session:
             async with session.delete(f"{self.base_url}/tweets/{tweet_id}", headers=headers) as response:
                 if response.status == 200:
                     return {
@@ -294,7 +301,7 @@ class TwitterDriver(BaseUniversalDriver):
             'tweet_id': tweet_id
         }
         
-        async with aiohttp.ClientSession() as session:
+        async with http_client_manager.session("twitter", credential=bearer_token) as session:
             async with session.post(f"{self.base_url}/users/{user_id}/likes", headers=headers, json=data) as response:
                 if response.status == 200:
                     response_data = await response.json()
@@ -330,7 +337,7 @@ class TwitterDriver(BaseUniversalDriver):
             'tweet_id': tweet_id
         }
         
-        async with aiohttp.ClientSession() as session:
+        async with http_client_manager.session("twitter", credential=bearer_token) as session:
             async with session.post(f"{self.base_url}/users/{user_id}/retweets", headers=headers, json=data) as response:
                 if response.status == 200:
                     response_data = await response.json()
@@ -371,7 +378,13 @@ class TwitterDriver(BaseUniversalDriver):
         if exclude_retweets:
             params['exclude'] = 'retweets'
         
-        async with aiohttp.ClientSession() as session:
+        if wants_all_pages(parameters):
+            params['max_results'] = 100
+            iterator = self.paginate(bearer_token, f"users/{user_id}/tweets", params, 'pagination_token',
+                                     max_items=page_options(parameters)['max_items'])
+            return await collect_pages(iterator, parameters, "tweets")
+        
+        async with http_client_manager.session("twitter", credential=bearer_token) as session:
             async with session.get(f"{self.base_url}/users/{user_id}/tweets", headers=headers, params=params) as response:
                 if response.status == 200:
                     data = await response.json()
@@ -407,7 +420,7 @@ class TwitterDriver(BaseUniversalDriver):
             'user.fields': 'created_at,description,public_metrics,verified'
         }
         
-        async with aiohttp.ClientSession() as session:
+        async with http_client_manager.session("twitter", credential=bearer_token) as session:
             async with session.get(f"{self.base_url}/users/{user_id}", headers=headers, params=params) as response:
                 if response.status == 200:
                     data = await response.json()
@@ -442,7 +455,7 @@ class TwitterDriver(BaseUniversalDriver):
             'user.fields': 'created_at,description,public_metrics,verified'
         }
         
-        async with aiohttp.ClientSession() as session:
+        async with http_client_manager.session("twitter", credential=bearer_token) as session:
             async with session.get(f"{self.base_url}/users/by/username/{username}", headers=headers, params=params) as response:
                 if response.status == 200:
                     data = await response.json()
@@ -469,7 +482,7 @@ class TwitterDriver(BaseUniversalDriver):
             'user.fields': 'created_at,description,public_metrics,verified'
         }
         
-        async with aiohttp.ClientSession() as session:
+        async with http_client_manager.session("twitter", credential=bearer_token) as session:
             async with session.get(f"{self.base_url}/users/me", headers=headers, params=params) as response:
                 if response.status == 200:
                     data = await response.json()
@@ -505,7 +518,7 @@ class TwitterDriver(BaseUniversalDriver):
             'target_user_id': target_user_id
         }
         
-        async with aiohttp.ClientSession() as session:
+        async with http_client_manager.session("twitter", credential=bearer_token) as session:
             async with session.post(f"{self.base_url}/users/{user_id}/following", headers=headers, json=data) as response:
                 if response.status == 200:
                     response_data = await response.json()
@@ -544,7 +557,13 @@ class TwitterDriver(BaseUniversalDriver):
             'max_results': min(max_results, 100)
         }
         
-        async with aiohttp.ClientSession() as session:
+        if wants_all_pages(parameters):
+            params['max_results'] = 100
+            iterator = self.paginate(bearer_token, "tweets/search/recent", params, 'next_token',
+                                     max_items=page_options(parameters)['max_items'])
+            return await collect_pages(iterator, parameters, "tweets")
+        
+        async with http_client_manager.session("twitter", credential=bearer_token) as session:
             async with session.get(f"{self.base_url}/tweets/search/recent", headers=headers, params=params) as response:
                 if response.status == 200:
                     data = await response.json()
@@ -562,6 +581,28 @@ class TwitterDriver(BaseUniversalDriver):
                         "error": error_data.get('detail', 'Unknown error')
                     }
     
+    def paginate(self, bearer_token: str, endpoint: str, params: Dict[str, Any], token_param: str,
+                 max_items: int = None) -> PageIterator:
+        """
+        Iterate a v2 timeline/search endpoint across pages. The cursor comes back
+        as meta.next_token and is sent as `pagination_token` (timelines) or
+        `next_token` (search).
+        """
+        headers = {'Authorization': f'Bearer {bearer_token}'}
+        
+        async def fetch_page(cursor):
+            page_params = dict(params)
+            if cursor:
+                page_params[token_param] = cursor
+            async with http_client_manager.session("twitter", credential=bearer_token) as session:
+                async with session.get(f"{self.base_url}/{endpoint}", headers=headers, params=page_params) as response:
+                    if response.status != 200:
+                        raise await page_error(response, lambda data: data.get('detail'))
+                    data = await response.json() or {}
+            return data.get('data', []), data.get('meta', {}).get('next_token')
+        
+        return PageIterator(fetch_page, None, max_items)
+    
     def _get_bearer_token(self, parameters: Dict[str, Any], context: Dict[str, Any] = None) -> Optional[str]:
         """Get Twitter Bearer token"""
         
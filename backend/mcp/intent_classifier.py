@@ -0,0 +1,252 @@
+"""
+Compiled Intent Classifier
+Turns a chat message into a structured Intent in a single pass: every keyword
+list the agent engines used to scan one by one is compiled into one
+Aho-Corasick automaton, and the email / subject patterns are precompiled.
+Matching keeps the old substring semantics (`keyword in text.lower()`), so
+classification results are unchanged - only computed once per message.
+"""
+
+import re
+from collections import deque
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+EMAIL_PATTERN = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+SUBJECT_PATTERN = re.compile(r'Subject:\s*(.+)')
+
+# Keyword groups, as used by the engine's routing decisions
+KEYWORD_GROUPS: Dict[str, Tuple[str, ...]] = {
+    # Explicit email requests looked up when the user picks an AI service
+    "email_request": ('send email', 'email to', 'draft email', 'compose email'),
+    "search_terms": ('find', 'search', 'research', 'look up', 'locate'),
+    "search_context": ('web', 'internet', 'google', 'investors', 'companies', 'contacts', 'information'),
+    "zoom_terms": ('zoom', 'meeting', 'schedule', 'set up meeting', 'setup meeting'),
+    "zoom_context": ('meeting', 'zoom', 'link', 'oauth', 'authorization', 'connect'),
+    "automation_action": (
+        'send email', 'email to', 'send to', 'draft email', 'compose email',
+        'email about', 'send message', 'notify via email', 'email blast', 'send outreach',
+        'search for', 'find and email', 'look up and send', 'investigate and email',
+        'gather data and send', 'collect contacts and email', 'get details and send',
+        'create workflow', 'automate this', 'schedule email', 'set up automation',
+        'execute automation', 'run workflow', 'process and send',
+        'find top 10 and email', 'research investors and email', 'cold email to',
+        'send sales outreach', 'execute marketing campaign'
+    ),
+    "informational": (
+        'company info', 'about us', 'our company', 'company overview', 'pitch summary',
+        'competitor research', 'market stats', 'funding info', 'company profiles',
+        'investor pitch data', 'market size', 'positioning'
+    ),
+    "email_action": ('send', 'email to', 'notify', 'contact via email'),
+    "zoom_request": ('zoom', 'meeting', 'schedule', 'set up meeting', 'setup meeting', 'create meeting'),
+    "meeting_action": ('setup', 'set up', 'create', 'schedule', 'arrange', 'organize'),
+    "calendar_request": ('calendar', 'google calendar', 'outlook', 'calendly', 'scheduling'),
+    "calendar_action": ('connect', 'integrate', 'oauth', 'authorize', 'link', 'setup', 'send'),
+    "continuation": ('sure', 'yes', 'proceed', 'continue', 'go ahead', 'do it',
+                     'confirm', 'execute', 'run it', 'start'),
+    # Second-stage workflow detection
+    "clear_action": (
+        'send email', 'email to', 'send to', 'email about', 'send message',
+        'search for and email', 'find and send', 'look up and email', 'investigate and send',
+        'create workflow', 'automate this', 'schedule', 'set up automation',
+        'process and send', 'analyze and email', 'generate and send', 'find top 10 and email',
+        'draft email', 'compose email', 'write and send', 'cold email', 'send outreach'
+    ),
+    "company_info": ('company info', 'our company', 'about us', 'company overview', 'pitch summary',
+                     'company details', 'company is', 'we are', 'our business'),
+    "email_contact": ('email', 'send', 'contact'),
+    # Conversational fallbacks
+    "greeting": ('hello', 'hi', 'hey', 'good morning', 'good afternoon', 'good evening'),
+    "question": ('what', 'how', 'why', 'when', 'where', 'who'),
+    "thanks": ('thank', 'thanks', 'appreciate'),
+    "investor_topic": ('investor', 'ai'),
+    # Assistant prompts that leave a workflow waiting for the user
+    "confirmation_prompt": ('confirm', 'approve', 'proceed', 'ready to'),
+    "workflow_topic": ('workflow', 'automation'),
+}
+
+SERVICE_CHOICES = ('inhouse', 'openai', 'claude')
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton over lowercase phrases, compiled to a DFA so the
+    scan is one dict lookup per character. Each state carries the labels of
+    every phrase ending there (including via failure links).
+    """
+
+    def __init__(self, phrases: Dict[str, Iterable[str]]):
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[set] = [set()]
+        for phrase, labels in phrases.items():
+            state = 0
+            for char in phrase:
+                if char not in goto[state]:
+                    goto.append({})
+                    outputs.append(set())
+                    goto[state][char] = len(goto) - 1
+                state = goto[state][char]
+            outputs[state].update(labels)
+
+        # Breadth-first failure links
+        fail = [0] * len(goto)
+        order = []
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            order.append(state)
+            for char, child in goto[state].items():
+                queue.append(child)
+                fallback = fail[state]
+                while fallback and char not in goto[fallback]:
+                    fallback = fail[fallback]
+                target = goto[fallback].get(char, 0)
+                fail[child] = target if target != child else 0
+                outputs[child] |= outputs[fail[child]]
+
+        # Fold failure links into full transitions over the phrase alphabet
+        alphabet = {char for phrase in phrases for char in phrase}
+        delta: List[Dict[str, int]] = [dict() for _ in goto]
+        delta[0] = {char: goto[0].get(char, 0) for char in alphabet}
+        for state in order:
+            for char in alphabet:
+                child = goto[state].get(char)
+                delta[state][char] = child if child is not None else delta[fail[state]][char]
+
+        self._delta = delta
+        self._outputs = [frozenset(labels) if labels else None for labels in outputs]
+
+    def scan(self, text: str) -> FrozenSet[str]:
+        """Labels of all phrases occurring anywhere in text"""
+        delta = self._delta
+        outputs = self._outputs
+        found = set()
+        state = 0
+        for char in text:
+            state = delta[state].get(char, 0)
+            labels = outputs[state]
+            if labels is not None:
+                found |= labels
+        return frozenset(found)
+
+
+def _phrase_labels() -> Dict[str, set]:
+    phrases: Dict[str, set] = {}
+    for group, keywords in KEYWORD_GROUPS.items():
+        for keyword in keywords:
+            phrases.setdefault(keyword, set()).add(group)
+    return phrases
+
+
+_AUTOMATON = KeywordAutomaton(_phrase_labels())
+
+
+@dataclass(frozen=True)
+class Intent:
+    """Structured classification of one message"""
+
+    text: str
+    lower: str
+    groups: FrozenSet[str]
+    emails: Tuple[str, ...]
+
+    def has(self, group: str) -> bool:
+        return group in self.groups
+
+    @property
+    def recipient_email(self) -> Optional[str]:
+        return self.emails[0] if self.emails else None
+
+    @property
+    def has_email_recipient(self) -> bool:
+        return '@' in self.text
+
+    @property
+    def service_choice(self) -> Optional[str]:
+        """'inhouse' / 'openai' / 'claude' for service-selection replies"""
+        if self.text.startswith('service:'):
+            return self.text.split(':', 1)[1].strip().lower()
+        if self.lower in SERVICE_CHOICES:
+            return self.lower
+        return None
+
+    # ---- First-stage routing ----
+
+    @property
+    def is_email_automation(self) -> bool:
+        return self.has_email_recipient and self.has('email_action')
+
+    @property
+    def is_zoom_automation(self) -> bool:
+        return self.has('zoom_request') and self.has('meeting_action')
+
+    @property
+    def is_calendar_integration(self) -> bool:
+        return self.has('calendar_request') and self.has('calendar_action')
+
+    @property
+    def is_explicit_email_request(self) -> bool:
+        return self.has_email_recipient and self.has('email_request')
+
+    @property
+    def is_zoom_meeting(self) -> bool:
+        return self.has('zoom_terms') and self.has('zoom_context')
+
+    @property
+    def is_web_search(self) -> bool:
+        return self.has('search_terms') and self.has('search_context')
+
+    @property
+    def kind(self) -> str:
+        """email | zoom | calendar | action | informational | conversation"""
+        if self.is_email_automation:
+            return "email"
+        if self.is_zoom_automation:
+            return "zoom"
+        if self.is_calendar_integration:
+            return "calendar"
+        clear_automation = self.has('automation_action')
+        informational = self.has('informational')
+        if clear_automation and not informational:
+            return "action"
+        if informational and not clear_automation:
+            return "informational"
+        return "conversation"
+
+    @property
+    def is_automation(self) -> bool:
+        return self.kind in ("email", "zoom", "calendar", "action")
+
+    # ---- Second-stage workflow detection ----
+
+    @property
+    def is_automation_request(self) -> bool:
+        if self.has_email_recipient and self.has('email_contact'):
+            return True
+        return self.has('clear_action') and not self.has('company_info')
+
+    @property
+    def is_pending_confirmation(self) -> bool:
+        """For assistant messages: asks the user to confirm a workflow"""
+        return self.has('confirmation_prompt') and self.has('workflow_topic')
+
+
+@lru_cache(maxsize=1024)
+def classify(text: str) -> Intent:
+    """Classify a message; repeated texts (conversation history) are served from cache"""
+    text = text or ""
+    lower = text.lower()
+    emails = tuple(EMAIL_PATTERN.findall(text)) if '@' in text else ()
+    return Intent(text=text, lower=lower, groups=_AUTOMATON.scan(lower), emails=emails)
+
+
+def extract_subject(content: str, default: str) -> str:
+    match = SUBJECT_PATTERN.search(content or "")
+    return match.group(1).strip() if match else default
+
+
+def format_history(messages: List[Dict[str, str]]) -> str:
+    """'role: content' lines for the user/assistant messages, as used in generation prompts"""
+    return "".join(f"{msg['role']}: {msg['content']}\n" for msg in messages if msg['role'] in ('user', 'assistant'))
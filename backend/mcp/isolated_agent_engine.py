@@ -15,6 +15,13 @@ from typing import Dict, Any, Optional, List
 # Configure logging
 logger = logging.getLogger(__name__)
 
+try:
+    from core.llm_cache import llm_cache
+    from core.request_queue import SessionRequestQueue, RequestQueueFull, RequestQueueTimeout, request_idempotency_key
+except ImportError:
+    from backend.core.llm_cache import llm_cache
+    from backend.core.request_queue import SessionRequestQueue, RequestQueueFull, RequestQueueTimeout, request_idempotency_key
+
 # OpenAI integration
 try:
     import openai
@@ -54,7 +61,8 @@ class IsolatedAgentEngine:
             
         self.agent_expectations = agent_expectations or ""
         self.openai_client = None
-        self._processing_lock = False
+        # Requests from this session run one at a time, in order
+        self.request_queue = SessionRequestQueue(name=self.instance_id)
         
         # ISOLATED MEMORY - Each agent instance gets completely separate memory
         self.agent_memory = {
@@ -74,8 +82,10 @@ class IsolatedAgentEngine:
                 # Use provided API key or environment variable
                 api_key = openai_api_key or os.getenv('OPENAI_API_KEY')
                 if api_key:
-                    self.openai_client = AsyncOpenAI(api_key=api_key)
-                    logger.info(f"OpenAI client initialized for agent instance: {self.instance_id}")
+                    # Borrow the process-wide pooled client instead of opening a new pool per instance
+                    from core.llm_client_pool import llm_client_registry
+                    self.openai_client = llm_client_registry.get_openai_client(api_key)
+                    logger.info(f"OpenAI client borrowed from shared pool for agent instance: {self.instance_id}")
             except Exception as e:
                 logger.error(f"Failed to initialize OpenAI client for {self.instance_id}: {e}")
         
@@ -116,17 +126,24 @@ class IsolatedAgentEngine:
         }
 
     async def process_user_request(self, user_input: str, request_data: dict = None) -> Dict[str, Any]:
+        """Queue the request behind earlier ones from this session; retries with the same idempotency key share one result"""
+        try:
+            return await self.request_queue.submit(
+                self._process_user_request, user_input, request_data,
+                idempotency_key=request_idempotency_key(user_input, request_data)
+            )
+        except RequestQueueFull:
+            return self._instant_response("You already have several requests in progress. Please wait for them to finish and try again.")
+        except RequestQueueTimeout:
+            return self._instant_response("I'm still working on your earlier requests. Please try again in a moment.")
+
+    async def _process_user_request(self, user_input: str, request_data: dict = None) -> Dict[str, Any]:
         """Process user request with completely isolated memory per agent"""
         
         logger.info(f"[{self.instance_id}] Processing request: {user_input[:100]}...")
         
         start_time = datetime.now()
         
-        if self._processing_lock:
-            return self._instant_response("I'm currently processing another request. Please wait a moment and try again.")
-        
-        self._processing_lock = True
-        
         try:
             # Add user message to THIS AGENT'S isolated conversation history
             self.agent_memory['conversation_history'].append({
@@ -277,15 +294,16 @@ class IsolatedAgentEngine:
                                 "content": msg['content']
                             })
                     
-                    response = await self.openai_client.chat.completions.create(
+                    ai_response = await llm_cache.chat_completion(
+                        self.openai_client,
+                        namespace="agent_chat",
+                        scope=f"agent:{self.agent_id}",
                         model="gpt-4",
                         messages=messages,
                         max_tokens=500,
                         temperature=0.7
                     )
                     
-                    ai_response = response.choices[0].message.content
-                    
                     # Add assistant response to THIS AGENT'S history
                     self.agent_memory['conversation_history'].append({
                         "role": "assistant",
@@ -351,7 +369,6 @@ class IsolatedAgentEngine:
             }
         
         finally:
-            self._processing_lock = False
             processing_time = (datetime.now() - start_time).total_seconds()
             logger.info(f"[{self.instance_id}] Request processed in {processing_time:.3f}s")
 
@@ -474,7 +491,6 @@ class IsolatedAgentEngine:
     async def _send_email_directly(self, recipient: str, subject: str, content: str, service_type: str = "inhouse", instance_id: str = None) -> bool:
         """Send email directly using SMTP configuration from .env.local"""
         try:
-            import smtplib
             import os
             from email.mime.text import MIMEText
             from email.mime.multipart import MIMEMultipart
@@ -516,16 +532,15 @@ class IsolatedAgentEngine:
             
             msg.attach(MIMEText(html_content, 'html'))
             
-            # Send email
+            # Send email through the shared pooled delivery service
             logger.info(f"[{instance_id}] Sending email via SMTP: {smtp_host}:{smtp_port}")
             
-            server = smtplib.SMTP(smtp_host, smtp_port)
-            server.starttls()
-            server.login(company_email, company_password)
-            
-            text = msg.as_string()
-            server.sendmail(company_email, recipient, text)
-            server.quit()
+            from core.email_delivery import email_delivery, SMTPCredential
+            credential = SMTPCredential(smtp_host, smtp_port, company_email, company_password)
+            delivery = await email_delivery.send(credential, msg, from_addr=company_email, to_addrs=[recipient])
+            if not delivery["success"]:
+                logger.error(f"[{instance_id}] ❌ Direct email sending failed after {delivery['attempts']} attempts: {delivery['error']}")
+                return False
             
             logger.info(f"[{instance_id}] ✅ Email successfully sent to {recipient}")
             return True
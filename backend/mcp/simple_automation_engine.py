@@ -10,20 +10,44 @@ import os
 import importlib
 import importlib.util
 import sys
-import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 import uuid
+import re
 import time
-import threading
+from collections import ChainMap
 
 # Import universal driver system
 from .universal_driver_manager import universal_driver_manager, initialize_universal_drivers
+from .trigger_scheduler import TriggerScheduler
+from .template_engine import template_cache
+
+try:
+    from core.email_delivery import email_delivery, SMTPCredential
+except ImportError:
+    from backend.core.email_delivery import email_delivery, SMTPCredential
+
+try:
+    from core.execution_history import encode_cursor, decode_cursor, clamp_page_size, project_fields
+except ImportError:
+    from backend.core.execution_history import encode_cursor, decode_cursor, clamp_page_size, project_fields
 
 logger = logging.getLogger(__name__)
 
+# History field -> workflow_executions column; trigger_data and results are opt-in blobs
+WORKFLOW_EXECUTION_FIELDS = {
+    "execution_id": "execution_id",
+    "trigger_type": "trigger_type",
+    "status": "execution_status",
+    "trigger_data": "trigger_data",
+    "results": "execution_results",
+    "created_at": "created_at",
+    "completed_at": "completed_at"
+}
+WORKFLOW_EXECUTION_BLOBS = ("trigger_data", "results")
+
 class AutomationEngine:
     """Enhanced Automation Engine with Universal Driver System Integration"""
     
@@ -49,9 +73,12 @@ class AutomationEngine:
         self.universal_driver_manager = universal_driver_manager
         self.universal_drivers_loaded = False
         
+        # Parallel node execution (per-workflow override via "max_concurrency")
+        self.max_node_concurrency = int(os.getenv('WORKFLOW_MAX_CONCURRENCY', 4))
+        
         # Trigger monitoring
         self.trigger_monitoring = True
-        self.trigger_thread = None
+        self.trigger_scheduler = TriggerScheduler(self._fire_scheduled_trigger)
         
         # Initialize database tables
         self._init_automation_tables()
@@ -95,6 +122,12 @@ class AutomationEngine:
                 )
             ''')
             
+            # Keyset index for execution history pages
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_workflow_executions_history
+                ON workflow_executions(workflow_id, created_at DESC, execution_id DESC)
+            ''')
+            
             # Triggers table
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS workflow_triggers (
@@ -152,90 +185,43 @@ class AutomationEngine:
             logger.error(f"Failed to initialize universal drivers: {e}")
     
     def _start_trigger_monitoring(self):
-        """Start trigger monitoring in background thread"""
-        if self.trigger_thread is None or not self.trigger_thread.is_alive():
-            self.trigger_thread = threading.Thread(target=self._monitor_triggers, daemon=True)
-            self.trigger_thread.start()
-            logger.info("🔄 Trigger monitoring started")
-    
-    def _monitor_triggers(self):
-        """Monitor triggers in background thread"""
-        while self.trigger_monitoring:
-            try:
-                self._check_and_execute_triggers()
-                time.sleep(5)  # Check every 5 seconds
-            except Exception as e:
-                logger.error(f"Trigger monitoring error: {e}")
-                time.sleep(10)  # Wait longer on error
-    
-    def _check_and_execute_triggers(self):
-        """Check for triggers and execute corresponding workflows"""
+        """Load active timed triggers once and start the event-driven scheduler"""
         if not self.db_connection:
             return
             
         try:
             cursor = self.db_connection.cursor()
-            
-            # Get active triggers
             cursor.execute(
-                "SELECT trigger_id, workflow_id, trigger_type, trigger_config FROM workflow_triggers WHERE status = 'active'"
+                "SELECT trigger_id, workflow_id, trigger_type, trigger_config, last_triggered "
+                "FROM workflow_triggers WHERE status = 'active' AND trigger_type IN ('schedule', 'interval', 'cron')"
             )
-            
-            triggers = cursor.fetchall()
-            
-            for trigger_id, workflow_id, trigger_type, trigger_config_json in triggers:
-                trigger_config = json.loads(trigger_config_json)
-                
-                # Check if trigger condition is met
-                if self._check_trigger_condition(trigger_type, trigger_config):
-                    logger.info(f"🎯 Trigger {trigger_id} fired for workflow {workflow_id}")
-                    
-                    # Execute workflow
-                    asyncio.create_task(self._execute_triggered_workflow(workflow_id, trigger_id, trigger_config))
-                    
-                    # Update last triggered
-                    cursor.execute(
-                        "UPDATE workflow_triggers SET last_triggered = ? WHERE trigger_id = ?",
-                        (datetime.now().isoformat(), trigger_id)
-                    )
-                    self.db_connection.commit()
-                    
+            self.trigger_scheduler.load([
+                (trigger_id, workflow_id, trigger_type, json.loads(trigger_config), last_triggered)
+                for trigger_id, workflow_id, trigger_type, trigger_config, last_triggered in cursor.fetchall()
+            ])
         except Exception as e:
-            logger.error(f"Failed to check triggers: {e}")
+            logger.error(f"Failed to load triggers: {e}")
+        
+        if self.trigger_scheduler.start():
+            logger.info("🔄 Trigger monitoring started")
     
-    def _check_trigger_condition(self, trigger_type: str, trigger_config: Dict[str, Any]) -> bool:
-        """Check if trigger condition is met"""
+    async def _fire_scheduled_trigger(self, trigger, scheduled_for: datetime):
+        """Scheduler callback: record the firing and execute the workflow"""
         
-        if trigger_type == "webhook":
-            # Webhook triggers are handled by API endpoints
-            return False
-            
-        elif trigger_type == "schedule":
-            # Check schedule trigger
-            schedule_time = trigger_config.get("schedule_time")
-            if schedule_time:
-                current_time = datetime.now().strftime("%H:%M")
-                return current_time == schedule_time
-                
-        elif trigger_type == "interval":
-            # Check interval trigger
-            interval_minutes = trigger_config.get("interval_minutes", 60)
-            last_triggered = trigger_config.get("last_triggered")
-            
-            if not last_triggered:
-                return True
-                
-            last_time = datetime.fromisoformat(last_triggered)
-            current_time = datetime.now()
-            time_diff = (current_time - last_time).total_seconds() / 60
-            
-            return time_diff >= interval_minutes
-            
-        elif trigger_type == "email":
-            # Check email trigger (would integrate with email API)
-            return False
-            
-        return False
+        try:
+            cursor = self.db_connection.cursor()
+            cursor.execute(
+                "UPDATE workflow_triggers SET last_triggered = ? WHERE trigger_id = ?",
+                (trigger.last_triggered.isoformat(), trigger.trigger_id)
+            )
+            self.db_connection.commit()
+        except Exception as e:
+            logger.error(f"Failed to update last_triggered for {trigger.trigger_id}: {e}")
+        
+        trigger_data = dict(trigger.trigger_config)
+        trigger_data.setdefault("type", trigger.trigger_type)
+        trigger_data["scheduled_for"] = scheduled_for.isoformat()
+        await self._execute_triggered_workflow(trigger.workflow_id, trigger.trigger_id, trigger_data)
     
     async def _execute_triggered_workflow(self, workflow_id: str, trigger_id: str, trigger_data: Dict[str, Any]):
         """Execute workflow triggered by trigger"""
@@ -409,8 +395,18 @@ class AutomationEngine:
                 "node_type": node_type
             }
     
-    async def execute_workflow_nodes(self, workflow: Dict[str, Any], trigger_data: Dict[str, Any] = None) -> Dict[str, Any]:
-        """Execute workflow nodes in sequence using drivers"""
+    async def execute_workflow_nodes(self, workflow: Dict[str, Any], trigger_data: Dict[str, Any] = None,
+                                     execution_mode: Optional[str] = None) -> Dict[str, Any]:
+        """Execute workflow nodes using drivers
+        
+        Nodes run in list order by default. With execution_mode "parallel" (or
+        workflow["execution_mode"] == "parallel") independent branches of the
+        dependency graph run concurrently, see _execute_workflow_nodes_parallel.
+        """
+        
+        execution_mode = execution_mode or workflow.get("execution_mode", "sequential")
+        if execution_mode == "parallel":
+            return await self._execute_workflow_nodes_parallel(workflow, trigger_data)
         
         try:
             workflow_id = workflow.get("workflow_id", "unknown")
@@ -430,7 +426,9 @@ class AutomationEngine:
                 logger.info(f"📋 Executing node {i+1}/{len(nodes)}: {node_type} ({node_id})")
                 
                 # Replace template variables in parameters with workflow context
-                resolved_parameters = self._resolve_parameters(node_parameters, workflow_context)
+                resolved_parameters = self._resolve_parameters(
+                    node_parameters, workflow_context, self._template_cache_key(workflow, node_id)
+                )
                 
                 # Execute node using appropriate driver
                 node_result = await self.execute_json_script_to_api(node_type, node_script, resolved_parameters)
@@ -470,20 +468,225 @@ class AutomationEngine:
                 "execution_results": execution_results if 'execution_results' in locals() else []
             }
     
-    def _resolve_parameters(self, parameters: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
-        """Resolve template variables in parameters using workflow context"""
+    async def _execute_workflow_nodes_parallel(self, workflow: Dict[str, Any],
+                                               trigger_data: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Execute workflow nodes concurrently following their dependency graph
+        
+        A node starts once every node it depends on (via connections or a
+        {{<node_id>_output}} reference) has succeeded. At most max_concurrency
+        nodes run at once. Outputs are merged into the workflow context and
+        execution_results are reported in node list order, so the result does
+        not depend on completion order.
+        """
         
-        resolved = {}
+        workflow_id = workflow.get("workflow_id", "unknown")
+        nodes = workflow.get("nodes", [])
+        workflow_context = trigger_data or {}
+        results_by_index: Dict[int, Dict[str, Any]] = {}
+        node_outputs: Dict[str, Any] = {}
         
-        for key, value in parameters.items():
-            if isinstance(value, str) and value.startswith("{{") and value.endswith("}}"):
-                # Template variable
-                var_name = value[2:-2].strip()
-                resolved[key] = context.get(var_name, value)
-            else:
-                resolved[key] = value
+        try:
+            node_ids = [node.get("id", f"node_{i}") for i, node in enumerate(nodes)]
+            dependencies = self._build_node_dependencies(workflow)
+            if dependencies is None:
+                logger.warning(f"⚠️ Workflow {workflow_id} has a dependency cycle, running sequentially")
+                return await self.execute_workflow_nodes(workflow, trigger_data, execution_mode="sequential")
+            
+            max_concurrency = max(1, int(workflow.get("max_concurrency") or self.max_node_concurrency))
+            semaphore = asyncio.Semaphore(max_concurrency)
+            resolve_context = ChainMap(node_outputs, workflow_context)
+            
+            logger.info(f"🔄 Executing workflow {workflow_id} with {len(nodes)} nodes "
+                        f"(parallel, max_concurrency={max_concurrency})")
+            
+            async def run_node(index: int) -> Dict[str, Any]:
+                node = nodes[index]
+                node_id = node_ids[index]
+                node_type = node.get("type", "unknown")
+                async with semaphore:
+                    logger.info(f"📋 Executing node {index+1}/{len(nodes)}: {node_type} ({node_id})")
+                    resolved_parameters = self._resolve_parameters(
+                        node.get("parameters", {}), resolve_context, self._template_cache_key(workflow, node_id)
+                    )
+                    node_result = await self.execute_json_script_to_api(node_type, node.get("script", {}), resolved_parameters)
+                return {
+                    "node_id": node_id,
+                    "node_type": node_type,
+                    "success": node_result.get("success", False),
+                    "result": node_result,
+                    "timestamp": datetime.now().isoformat()
+                }
+            
+            remaining = {i: set(deps) for i, deps in enumerate(dependencies)}
+            running: Dict[asyncio.Task, int] = {}
+            failed = False
+            
+            while remaining or running:
+                if not failed:
+                    ready = sorted(i for i, deps in remaining.items() if not deps)
+                    for index in ready:
+                        del remaining[index]
+                        running[asyncio.create_task(run_node(index))] = index
+                if not running:
+                    break
+                
+                done, _ = await asyncio.wait(running.keys(), return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    index = running.pop(task)
+                    record = task.result()
+                    results_by_index[index] = record
+                    node_result = record["result"]
+                    
+                    if not record["success"]:
+                        logger.error(f"❌ Node {record['node_id']} failed, not starting further nodes")
+                        failed = True
+                        continue
+                    
+                    if "output" in node_result:
+                        node_outputs[f"{record['node_id']}_output"] = node_result["output"]
+                    for deps in remaining.values():
+                        deps.discard(index)
+            
+            execution_results = [results_by_index[i] for i in sorted(results_by_index)]
+            for record in execution_results:
+                key = f"{record['node_id']}_output"
+                if key in node_outputs:
+                    workflow_context[key] = node_outputs[key]
+            
+            return {
+                "success": not failed and len(execution_results) == len(nodes),
+                "workflow_id": workflow_id,
+                "nodes_executed": len(execution_results),
+                "execution_results": execution_results,
+                "execution_mode": "parallel",
+                "completed_at": datetime.now().isoformat()
+            }
+            
+        except Exception as e:
+            logger.error(f"Failed to execute workflow nodes: {e}")
+            return {
+                "success": False,
+                "error": str(e),
+                "execution_results": [results_by_index[i] for i in sorted(results_by_index)]
+            }
+    
+    def _build_node_dependencies(self, workflow: Dict[str, Any]) -> Optional[List[set]]:
+        """Build the list of predecessor indexes for every node
+        
+        Edges come from the workflow-level n8n "connections" map, a node-level
+        "connections" entry and {{<node_id>_output}} references in parameters.
+        Nodes may be referenced by id or name. Returns None on a cycle.
+        """
         
-        return resolved
+        nodes = workflow.get("nodes", [])
+        index_by_key: Dict[str, int] = {}
+        for i, node in enumerate(nodes):
+            index_by_key.setdefault(node.get("id", f"node_{i}"), i)
+            if node.get("name"):
+                index_by_key.setdefault(node["name"], i)
+        
+        dependencies: List[set] = [set() for _ in nodes]
+        
+        def add_edges(source: int, targets: Any):
+            for target in self._connection_targets(targets):
+                target_index = index_by_key.get(target)
+                if target_index is not None and target_index != source:
+                    dependencies[target_index].add(source)
+        
+        for source_key, targets in (workflow.get("connections") or {}).items():
+            source_index = index_by_key.get(source_key)
+            if source_index is not None:
+                add_edges(source_index, targets)
+        
+        for i, node in enumerate(nodes):
+            if node.get("connections"):
+                add_edges(i, node["connections"])
+            for reference in self._find_output_references(node.get("parameters", {})):
+                source_index = index_by_key.get(reference)
+                if source_index is not None and source_index != i:
+                    dependencies[i].add(source_index)
+        
+        # Kahn's algorithm, only to reject cycles up front
+        in_degree = [len(deps) for deps in dependencies]
+        successors: List[List[int]] = [[] for _ in nodes]
+        for i, deps in enumerate(dependencies):
+            for dep in deps:
+                successors[dep].append(i)
+        queue = [i for i, degree in enumerate(in_degree) if degree == 0]
+        visited = 0
+        while queue:
+            current = queue.pop()
+            visited += 1
+            for successor in successors[current]:
+                in_degree[successor] -= 1
+                if in_degree[successor] == 0:
+                    queue.append(successor)
+        
+        return dependencies if visited == len(nodes) else None
+    
+    def _connection_targets(self, targets: Any) -> List[str]:
+        """Flatten the connection formats used by our workflows into target node keys
+        
+        Accepts n8n's {"main": [[{"node": "X"}]]}, the shorter {"main": [["X"]]}
+        and {"main": [{"node": "X"}]} variants, and plain lists of names.
+        """
+        
+        if isinstance(targets, str):
+            return [targets]
+        if isinstance(targets, dict):
+            if "node" in targets:
+                return [targets["node"]]
+            flattened = []
+            for value in targets.values():
+                flattened.extend(self._connection_targets(value))
+            return flattened
+        if isinstance(targets, list):
+            flattened = []
+            for value in targets:
+                flattened.extend(self._connection_targets(value))
+            return flattened
+        return []
+    
+    _OUTPUT_REFERENCE = re.compile(r"\{\{\s*([\w\-]+)_output\b")
+    
+    def _find_output_references(self, value: Any) -> set:
+        """Collect node ids referenced as {{<node_id>_output}} anywhere in parameters"""
+        
+        if isinstance(value, str):
+            return set(self._OUTPUT_REFERENCE.findall(value)) if "{{" in value else set()
+        references = set()
+        if isinstance(value, dict):
+            for item in value.values():
+                references |= self._find_output_references(item)
+        elif isinstance(value, list):
+            for item in value:
+                references |= self._find_output_references(item)
+        return references
+    
+    def _resolve_parameters(self, parameters: Dict[str, Any], context: Dict[str, Any],
+                            cache_key: Optional[tuple] = None) -> Dict[str, Any]:
+        """Resolve template variables in parameters using workflow context
+        
+        Nested, embedded ("Hi {{name}}") and dotted-path ({{node_1_output.id}})
+        expressions are supported. Parameters are compiled once per cache_key
+        and then only evaluated against the context.
+        """
+        
+        return template_cache.render(parameters, context, cache_key)
+    
+    @staticmethod
+    def _template_cache_key(workflow: Dict[str, Any], node_id: str) -> Optional[tuple]:
+        """Cache key for a node's compiled parameters
+        
+        Only versioned workflows are cached, since an unversioned workflow id
+        may be executed again with different node parameters.
+        """
+        
+        version = workflow.get("version") or workflow.get("updated_at")
+        workflow_id = workflow.get("workflow_id") or workflow.get("id")
+        if version is None or workflow_id is None:
+            return None
+        return ("automation", workflow_id, version, node_id)
     
     async def register_workflow_trigger(self, workflow_id: str, trigger_type: str, 
                                       trigger_config: Dict[str, Any]) -> str:
@@ -506,6 +709,8 @@ class AutomationEngine:
             ))
             self.db_connection.commit()
             
+            self.trigger_scheduler.add(trigger_id, workflow_id, trigger_type, trigger_config)
+            
             logger.info(f"✅ Registered {trigger_type} trigger {trigger_id} for workflow {workflow_id}")
             return trigger_id
             
@@ -623,10 +828,10 @@ class AutomationEngine:
             msg['Subject'] = subject
             msg.attach(MIMEText(body, 'plain'))
             
-            with smtplib.SMTP(smtp_host, smtp_port) as server:
-                server.starttls()
-                server.login(smtp_user, smtp_password)
-                server.send_message(msg)
+            credential = SMTPCredential(smtp_host, int(smtp_port), smtp_user, smtp_password)
+            delivery = await email_delivery.send(credential, msg)
+            if not delivery["success"]:
+                raise RuntimeError(f"{delivery['error']} (after {delivery['attempts']} attempts)")
             
             logger.info(f"✅ Real email sent successfully to {to_email}")
             
@@ -719,11 +924,6 @@ class AutomationEngine:
         Send email using SMTP with the processed content
         """
         try:
-            import smtplib
-            import os
-            from email.mime.text import MIMEText
-            from email.mime.multipart import MIMEMultipart
-            
             smtp_host = os.getenv('SMTP_HOST', 'mail.privateemail.com')
             smtp_port = int(os.getenv('SMTP_PORT', 587))
             smtp_user = os.getenv('SMTP_USER')
@@ -745,11 +945,11 @@ class AutomationEngine:
             # Add content
             msg.attach(MIMEText(content, 'plain'))
             
-            # Send email
-            with smtplib.SMTP(smtp_host, smtp_port) as server:
-                server.starttls()
-                server.login(smtp_user, smtp_password)
-                server.send_message(msg)
+            # Send email through the shared pooled delivery service
+            credential = SMTPCredential(smtp_host, smtp_port, smtp_user, smtp_password)
+            delivery = await email_delivery.send(credential, msg)
+            if not delivery["success"]:
+                raise RuntimeError(f"{delivery['error']} (after {delivery['attempts']} attempts)")
             
             logger.info(f"✅ Email sent successfully to {to_email}")
             
@@ -1087,38 +1287,63 @@ class AutomationEngine:
                 "error": str(e)
             }
     
-    async def get_workflow_execution_history(self, workflow_id: str, limit: int = 50) -> List[Dict[str, Any]]:
+    async def get_workflow_execution_history(self, workflow_id: str, limit: int = 50,
+                                             cursor: str = None, fields=None) -> List[Dict[str, Any]]:
         """Get execution history for a workflow"""
+        page = await self.get_workflow_execution_page(workflow_id, limit, cursor, fields)
+        return page["executions"]
+    
+    async def get_workflow_execution_page(self, workflow_id: str, limit: int = 50,
+                                          cursor: str = None, fields=None) -> Dict[str, Any]:
+        """
+        One page of a workflow's executions, newest first, seeking on
+        (created_at, execution_id) instead of OFFSET. trigger_data and results
+        are only included when requested in `fields`. Raises ValueError for a
+        bad cursor or unknown field.
+        """
+        limit = clamp_page_size(limit)
+        names = project_fields(fields, list(WORKFLOW_EXECUTION_FIELDS), WORKFLOW_EXECUTION_BLOBS,
+                               ("execution_id", "created_at"))
+        params: List[Any] = [workflow_id]
+        after = ""
+        if cursor:
+            created_at, execution_id = decode_cursor(cursor)
+            after = "AND (created_at < ? OR (created_at = ? AND execution_id < ?))"
+            params += [created_at, created_at, execution_id]
+        params.append(limit + 1)  # one extra row tells whether another page exists
         
+        empty = {"executions": [], "fields": names, "limit": limit, "has_more": False, "next_cursor": None}
         try:
-            cursor = self.db_connection.cursor()
-            cursor.execute('''
-                SELECT execution_id, trigger_type, execution_status, execution_results, 
-                       created_at, completed_at
+            db_cursor = self.db_connection.cursor()
+            db_cursor.execute(f'''
+                SELECT {', '.join(WORKFLOW_EXECUTION_FIELDS[name] for name in names)}
                 FROM workflow_executions 
-                WHERE workflow_id = ?
-                ORDER BY created_at DESC
+                WHERE workflow_id = ? {after}
+                ORDER BY created_at DESC, execution_id DESC
                 LIMIT ?
-            ''', (workflow_id, limit))
-            
-            executions = []
-            for row in cursor.fetchall():
-                execution_id, trigger_type, status, results, created_at, completed_at = row
-                
-                executions.append({
-                    "execution_id": execution_id,
-                    "trigger_type": trigger_type,
-                    "status": status,
-                    "results": json.loads(results) if results else None,
-                    "created_at": created_at,
-                    "completed_at": completed_at
-                })
-            
-            return executions
+            ''', params)
+            rows = db_cursor.fetchall()
             
         except Exception as e:
             logger.error(f"Failed to get execution history for {workflow_id}: {e}")
-            return []
+            return empty
+        
+        has_more = len(rows) > limit
+        executions = []
+        for row in rows[:limit]:
+            execution = dict(zip(names, row))
+            for blob in WORKFLOW_EXECUTION_BLOBS:
+                if blob in execution:
+                    execution[blob] = json.loads(execution[blob]) if execution[blob] else None
+            executions.append(execution)
+        
+        last = executions[-1] if has_more else None
+        return {
+            **empty,
+            "executions": executions,
+            "has_more": has_more,
+            "next_cursor": encode_cursor(last["created_at"], last["execution_id"]) if last else None
+        }
     
     async def pause_workflow_trigger(self, trigger_id: str) -> bool:
         """Pause a workflow trigger"""
@@ -1131,6 +1356,8 @@ class AutomationEngine:
             )
             self.db_connection.commit()
             
+            self.trigger_scheduler.remove(trigger_id)
+            
             logger.info(f"⏸️ Paused trigger {trigger_id}")
             return True
             
@@ -1149,6 +1376,15 @@ class AutomationEngine:
             )
             self.db_connection.commit()
             
+            cursor.execute(
+                "SELECT workflow_id, trigger_type, trigger_config, last_triggered FROM workflow_triggers WHERE trigger_id = ?",
+                (trigger_id,)
+            )
+            row = cursor.fetchone()
+            if row:
+                workflow_id, trigger_type, trigger_config, last_triggered = row
+                self.trigger_scheduler.add(trigger_id, workflow_id, trigger_type, json.loads(trigger_config), last_triggered)
+            
             logger.info(f"▶️ Resumed trigger {trigger_id}")
             return True
             
@@ -1164,6 +1400,8 @@ class AutomationEngine:
             cursor.execute("DELETE FROM workflow_triggers WHERE trigger_id = ?", (trigger_id,))
             self.db_connection.commit()
             
+            self.trigger_scheduler.remove(trigger_id)
+            
             logger.info(f"🗑️ Deleted trigger {trigger_id}")
             return True
             
@@ -1205,8 +1443,8 @@ class AutomationEngine:
     def stop_trigger_monitoring(self):
         """Stop trigger monitoring"""
         self.trigger_monitoring = False
-        if self.trigger_thread:
-            logger.info("🛑 Stopping trigger monitoring")
+        if hasattr(self, 'trigger_scheduler'):
+            self.trigger_scheduler.stop()
     
     def __del__(self):
         """Cleanup when engine is destroyed"""
@@ -1224,10 +1462,11 @@ def get_automation_engine():
         automation_engine = AutomationEngine()
     return automation_engine
 
-async def execute_workflow_with_engine(workflow_data: Dict[str, Any], trigger_data: Dict[str, Any] = None) -> Dict[str, Any]:
+async def execute_workflow_with_engine(workflow_data: Dict[str, Any], trigger_data: Dict[str, Any] = None,
+                                       execution_mode: Optional[str] = None) -> Dict[str, Any]:
     """Execute workflow using automation engine"""
     engine = get_automation_engine()
-    return await engine.execute_workflow_nodes(workflow_data, trigger_data)
+    return await engine.execute_workflow_nodes(workflow_data, trigger_data, execution_mode)
 
 async def register_workflow_trigger(workflow_id: str, trigger_type: str, trigger_config: Dict[str, Any]) -> str:
     """Register workflow trigger"""
@@ -1239,10 +1478,11 @@ async def execute_webhook_trigger(webhook_id: str, payload: Dict[str, Any]) -> D
     engine = get_automation_engine()
     return await engine.execute_webhook_trigger(webhook_id, payload)
 
-async def get_trigger_execution_history(workflow_id: str, limit: int = 50) -> List[Dict[str, Any]]:
+async def get_trigger_execution_history(workflow_id: str, limit: int = 50, cursor: str = None,
+                                        fields=None) -> List[Dict[str, Any]]:
     """Get execution history for triggers"""
     engine = get_automation_engine()
-    return await engine.get_workflow_execution_history(workflow_id, limit)
+    return await engine.get_workflow_execution_history(workflow_id, limit, cursor, fields)
 
 async def manage_trigger(trigger_id: str, action: str) -> bool:
     """Manage trigger (pause/resume/delete)"""
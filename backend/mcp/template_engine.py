@@ -0,0 +1,205 @@
+"""
+Workflow Parameter Template Engine
+Compiles {{...}} expressions in nested workflow parameters into accessor
+closures once, so resolving parameters for an execution is a single
+evaluation pass with no string serialisation or re-parsing.
+
+Supported forms:
+    "{{recipient}}"                 whole value, keeps the context value's type
+    "Hello {{user.name}}!"          embedded, rendered as text
+    "{{node_1_output.items.0.id}}"  dotted paths through dicts, lists and attributes
+
+Unresolvable expressions are left in place unchanged.
+"""
+
+import os
+import re
+import logging
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Callable, Hashable, Mapping
+
+logger = logging.getLogger(__name__)
+
+_EXPRESSION = re.compile(r"\{\{\s*(.*?)\s*\}\}")
+_PATH_SEGMENT = re.compile(r"[^.\[\]]+")
+
+_MISSING = object()
+
+
+def _compile_lookup(expression: str) -> Callable[[Mapping], Any]:
+    """Accessor for a (possibly dotted) context path"""
+
+    segments = _PATH_SEGMENT.findall(expression)
+    head, rest = (segments[0], segments[1:]) if segments else (expression, [])
+    rest = [int(segment) if segment.isdigit() else segment for segment in rest]
+
+    def lookup(context: Mapping) -> Any:
+        # Flat keys win, so context entries whose names contain dots still resolve
+        value = context.get(expression, _MISSING)
+        if value is not _MISSING or not rest:
+            return value
+        value = context.get(head, _MISSING)
+        for segment in rest:
+            if value is _MISSING:
+                return _MISSING
+            if isinstance(value, Mapping):
+                value = value[segment] if segment in value else value.get(str(segment), _MISSING)
+            elif isinstance(value, (list, tuple)) and isinstance(segment, int):
+                value = value[segment] if -len(value) <= segment < len(value) else _MISSING
+            else:
+                value = getattr(value, str(segment), _MISSING)
+        return value
+
+    return lookup
+
+
+def _compile_string(text: str):
+    """Returns (evaluator, expressions) for a string value"""
+
+    matches = list(_EXPRESSION.finditer(text))
+    if not matches:
+        return (lambda context: text), []
+
+    expressions = [match.group(1) for match in matches]
+
+    if len(matches) == 1 and matches[0].span() == (0, len(text)):
+        lookup = _compile_lookup(expressions[0])
+
+        def evaluate_whole(context: Mapping) -> Any:
+            value = lookup(context)
+            return text if value is _MISSING else value
+
+        return evaluate_whole, expressions
+
+    # Alternating literal text and (lookup, original placeholder) pairs
+    parts: List[Any] = []
+    position = 0
+    for match in matches:
+        if match.start() > position:
+            parts.append(text[position:match.start()])
+        parts.append((_compile_lookup(match.group(1)), match.group(0)))
+        position = match.end()
+    if position < len(text):
+        parts.append(text[position:])
+
+    def evaluate_embedded(context: Mapping) -> str:
+        rendered = []
+        for part in parts:
+            if isinstance(part, str):
+                rendered.append(part)
+            else:
+                value = part[0](context)
+                rendered.append(part[1] if value is _MISSING else str(value))
+        return "".join(rendered)
+
+    return evaluate_embedded, expressions
+
+
+def _copy_tree(value: Any) -> Any:
+    """Copy the dicts and lists of a parameter structure; leaves are shared"""
+    if isinstance(value, dict):
+        return {key: _copy_tree(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copy_tree(item) for item in value]
+    return value
+
+
+def _compile_value(value: Any, expressions: List[str]):
+    """Returns (evaluator, is_constant); constant containers are snapshotted and copied per render"""
+    if isinstance(value, dict):
+        compiled = [(key, _compile_value(item, expressions)) for key, item in value.items()]
+        if all(constant for _, (_, constant) in compiled):
+            snapshot = _copy_tree(value)
+            return (lambda context: _copy_tree(snapshot)), True
+        items = [(key, evaluate) for key, (evaluate, _) in compiled]
+        return (lambda context: {key: evaluate(context) for key, evaluate in items}), False
+    if isinstance(value, list):
+        compiled = [_compile_value(item, expressions) for item in value]
+        if all(constant for _, constant in compiled):
+            snapshot = _copy_tree(value)
+            return (lambda context: _copy_tree(snapshot)), True
+        evaluators = [evaluate for evaluate, _ in compiled]
+        return (lambda context: [evaluate(context) for evaluate in evaluators]), False
+    if isinstance(value, str):
+        evaluate, found = _compile_string(value)
+        expressions.extend(found)
+        return evaluate, not found
+    return (lambda context: value), True
+
+
+class CompiledTemplate:
+    """A parameter structure compiled into accessors
+
+    Every render returns fresh dicts and lists: containers without
+    expressions are copied from a snapshot taken at compile time, so a
+    caller mutating its result can't change the cached template (or the
+    source it was compiled from). Leaf values are shared.
+    """
+
+    __slots__ = ("_evaluate", "expressions")
+
+    def __init__(self, value: Any):
+        self.expressions: List[str] = []
+        self._evaluate, _ = _compile_value(value, self.expressions)
+
+    @property
+    def has_expressions(self) -> bool:
+        return bool(self.expressions)
+
+    def render(self, context: Mapping) -> Any:
+        return self._evaluate(context)
+
+
+def compile_template(value: Any) -> CompiledTemplate:
+    return CompiledTemplate(value)
+
+
+class TemplateCache:
+    """LRU of compiled templates keyed by (workflow id, workflow version, part)"""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._templates: "OrderedDict[Hashable, CompiledTemplate]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Optional[Hashable], value: Any) -> CompiledTemplate:
+        """Compiled template for value; without a key it is compiled uncached"""
+        if key is None:
+            return compile_template(value)
+
+        template = self._templates.get(key)
+        if template is not None:
+            self.hits += 1
+            self._templates.move_to_end(key)
+            return template
+
+        self.misses += 1
+        template = compile_template(value)
+        self._templates[key] = template
+        if len(self._templates) > self.maxsize:
+            self._templates.popitem(last=False)
+        return template
+
+    def render(self, value: Any, context: Mapping, key: Optional[Hashable] = None) -> Any:
+        return self.get(key, value).render(context)
+
+    def clear(self):
+        self._templates.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "compiled_templates": len(self._templates),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+        }
+
+
+# Global cache shared by the automation engine and workflow selector
+template_cache = TemplateCache(int(os.getenv("TEMPLATE_CACHE_SIZE", 1024)))
+
+
+def get_template_cache() -> TemplateCache:
+    return template_cache
@@ -0,0 +1,329 @@
+"""
+Event-driven Trigger Scheduler
+Keeps time-based workflow triggers in a min-heap of next-fire times and sleeps
+until the earliest one is due instead of polling the triggers table.
+"""
+import logging
+import asyncio
+import heapq
+import itertools
+from functools import lru_cache
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional, List, Callable, Awaitable
+
+logger = logging.getLogger(__name__)
+
+TIMED_TRIGGER_TYPES = ("schedule", "interval", "cron")
+
+
+class CronExpression:
+    """Minimal 5-field cron expression (minute hour day-of-month month day-of-week)"""
+
+    _RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 6)]
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression must have 5 fields: {expression!r}")
+
+        self.expression = expression
+        parsed = [self._parse_field(field, low, high) for field, (low, high) in zip(fields, self._RANGES)]
+        self.minutes, self.hours, self.days, self.months, self.weekdays = parsed
+        self.sorted_minutes = sorted(self.minutes)
+        self.sorted_hours = sorted(self.hours)
+        # Standard cron: when both day fields are restricted, either may match
+        self.days_restricted = fields[2] != "*"
+        self.weekdays_restricted = fields[4] != "*"
+
+    @staticmethod
+    def _parse_field(field: str, low: int, high: int) -> set:
+        values = set()
+        for part in field.split(","):
+            step = 1
+            if "/" in part:
+                part, step_text = part.split("/", 1)
+                step = int(step_text)
+            if part == "*":
+                start, end = low, high
+            elif "-" in part:
+                start_text, end_text = part.split("-", 1)
+                start, end = int(start_text), int(end_text)
+            else:
+                start = int(part)
+                end = high if step > 1 else start
+            # Day of week also accepts 7 for Sunday
+            upper = 7 if high == 6 else high
+            if start < low or end > upper:
+                raise ValueError(f"Cron field {field!r} out of range {low}-{high}")
+            values.update(range(start, end + 1, step))
+        if 7 in values:
+            values.discard(7)
+            values.add(0)
+        return values
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day_ok = moment.day in self.days
+        weekday_ok = (moment.weekday() + 1) % 7 in self.weekdays
+        if self.days_restricted and self.weekdays_restricted:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+
+    def next_after(self, moment: datetime) -> Optional[datetime]:
+        """Return the first matching minute strictly after moment"""
+
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + timedelta(days=366 * 5)
+
+        while candidate < limit:
+            if candidate.month not in self.months:
+                year, month = (candidate.year + 1, 1) if candidate.month == 12 else (candidate.year, candidate.month + 1)
+                candidate = candidate.replace(year=year, month=month, day=1, hour=0, minute=0)
+                continue
+            if not self._day_matches(candidate):
+                candidate = (candidate + timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+            if candidate.hour not in self.hours:
+                next_hour = next((h for h in self.sorted_hours if h > candidate.hour), None)
+                if next_hour is None:
+                    candidate = (candidate + timedelta(days=1)).replace(hour=0, minute=0)
+                else:
+                    candidate = candidate.replace(hour=next_hour, minute=0)
+                continue
+            if candidate.minute not in self.minutes:
+                next_minute = next((m for m in self.sorted_minutes if m > candidate.minute), None)
+                if next_minute is None:
+                    candidate = candidate.replace(minute=0) + timedelta(hours=1)
+                else:
+                    candidate = candidate.replace(minute=next_minute)
+                continue
+            return candidate
+
+        return None
+
+
+@lru_cache(maxsize=4096)
+def compile_cron(expression: str) -> CronExpression:
+    """Shared parsed expression; most triggers reuse a handful of schedules"""
+    return CronExpression(expression)
+
+
+def cron_from_trigger_times(trigger_times: List[Dict[str, Any]]) -> List[CronExpression]:
+    """Convert n8n-style triggerTimes entries into cron expressions"""
+
+    expressions = []
+    for entry in trigger_times:
+        weekday = str(entry.get("weekday", "*"))
+        if weekday not in ("*", ""):
+            weekday = ",".join(str(int(day) % 7) for day in weekday.split(","))
+        fields = [
+            str(entry.get("minute", 0)),
+            str(entry.get("hour", "*")),
+            str(entry.get("dayOfMonth", "*")),
+            str(entry.get("month", "*")),
+            weekday or "*"
+        ]
+        expressions.append(compile_cron(" ".join(fields)))
+    return expressions
+
+
+class ScheduledTrigger:
+    """A time-based trigger tracked by the scheduler"""
+
+    __slots__ = ("trigger_id", "workflow_id", "trigger_type", "trigger_config",
+                 "last_triggered", "next_fire", "generation", "_crons")
+
+    def __init__(self, trigger_id: str, workflow_id: str, trigger_type: str,
+                 trigger_config: Dict[str, Any], last_triggered: Optional[datetime] = None):
+        self.trigger_id = trigger_id
+        self.workflow_id = workflow_id
+        self.trigger_type = trigger_type
+        self.trigger_config = trigger_config
+        self.last_triggered = last_triggered
+        self.next_fire: Optional[datetime] = None
+        self.generation = 0
+        self._crons = self._compile_crons()
+
+    def _compile_crons(self) -> List[CronExpression]:
+        config = self.trigger_config
+        if self.trigger_type == "schedule" and config.get("schedule_time"):
+            hour, minute = config["schedule_time"].split(":")[:2]
+            return [compile_cron(f"{int(minute)} {int(hour)} * * *")]
+        if self.trigger_type == "cron":
+            expression = config.get("cron_expression") or config.get("interval")
+            if isinstance(expression, str):
+                return [compile_cron(expression.strip())]
+            if config.get("triggerTimes"):
+                return cron_from_trigger_times(config["triggerTimes"])
+        return []
+
+    def compute_next_fire(self, after: datetime) -> Optional[datetime]:
+        """Next fire time at or after the given moment (strictly after for cron schedules)"""
+
+        if self.trigger_type == "interval":
+            interval = timedelta(minutes=float(self.trigger_config.get("interval_minutes", 60)))
+            if self.last_triggered is None:
+                return after
+            next_fire = self.last_triggered + interval
+            return next_fire if next_fire > after else after
+
+        candidates = [cron.next_after(after) for cron in self._crons]
+        candidates = [c for c in candidates if c is not None]
+        return min(candidates) if candidates else None
+
+
+class TriggerScheduler:
+    """Asyncio scheduler firing time-based triggers from a min-heap
+
+    Triggers are loaded once and then kept in sync through add()/remove().
+    The run loop sleeps until the earliest next-fire time, or until a newly
+    added trigger becomes the earliest one.
+    """
+
+    def __init__(self, on_fire: Callable[[ScheduledTrigger, datetime], Awaitable[None]]):
+        self.on_fire = on_fire
+        self.triggers: Dict[str, ScheduledTrigger] = {}
+        self._heap: List[tuple] = []
+        self._sequence = itertools.count()
+        # Scheduler-wide, so a trigger removed and added again never reuses a generation
+        self._generations = itertools.count(1)
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._running = False
+        self.fired_count = 0
+
+    def load(self, rows: List[tuple]):
+        """Load (trigger_id, workflow_id, trigger_type, trigger_config, last_triggered) rows"""
+
+        for trigger_id, workflow_id, trigger_type, trigger_config, last_triggered in rows:
+            self.add(trigger_id, workflow_id, trigger_type, trigger_config, last_triggered, wake=False)
+        logger.info(f"⏰ Trigger scheduler loaded {len(self.triggers)} timed triggers")
+        self._wake()
+
+    def add(self, trigger_id: str, workflow_id: str, trigger_type: str,
+            trigger_config: Dict[str, Any], last_triggered: Any = None, wake: bool = True) -> Optional[datetime]:
+        """Add or replace a trigger and return its next fire time"""
+
+        if trigger_type not in TIMED_TRIGGER_TYPES:
+            return None
+
+        if isinstance(last_triggered, str):
+            try:
+                last_triggered = datetime.fromisoformat(last_triggered)
+            except ValueError:
+                last_triggered = None
+
+        try:
+            trigger = ScheduledTrigger(trigger_id, workflow_id, trigger_type, trigger_config, last_triggered)
+        except (ValueError, TypeError, AttributeError) as e:
+            logger.error(f"Invalid {trigger_type} trigger {trigger_id}: {e}")
+            return None
+
+        trigger.generation = next(self._generations)
+        self.triggers[trigger_id] = trigger
+
+        next_fire = trigger.compute_next_fire(datetime.now())
+        self._push(trigger, next_fire)
+        if wake and self._heap and self._heap[0][2] == trigger_id:
+            self._wake()
+        return next_fire
+
+    def remove(self, trigger_id: str) -> bool:
+        """Stop scheduling a trigger; its heap entry is discarded lazily"""
+        return self.triggers.pop(trigger_id, None) is not None
+
+    def next_fire_time(self) -> Optional[datetime]:
+        self._discard_stale()
+        return datetime.fromtimestamp(self._heap[0][0]) if self._heap else None
+
+    def _push(self, trigger: ScheduledTrigger, next_fire: Optional[datetime]):
+        trigger.next_fire = next_fire
+        if next_fire is not None:
+            heapq.heappush(self._heap, (next_fire.timestamp(), next(self._sequence),
+                                        trigger.trigger_id, trigger.generation))
+
+    def _discard_stale(self):
+        while self._heap:
+            _, _, trigger_id, generation = self._heap[0]
+            trigger = self.triggers.get(trigger_id)
+            if trigger is not None and trigger.generation == generation:
+                return
+            heapq.heappop(self._heap)
+
+    def _wake(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def start(self) -> bool:
+        """Start the run loop on the current event loop"""
+
+        if self._task and not self._task.done():
+            return True
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            logger.warning("⚠️ No running event loop, trigger scheduler not started")
+            return False
+
+        self._running = True
+        self._wakeup = asyncio.Event()
+        self._task = loop.create_task(self._run())
+        logger.info("🔄 Trigger scheduler started")
+        return True
+
+    def stop(self):
+        self._running = False
+        if self._task and not self._task.done():
+            self._task.cancel()
+            logger.info("🛑 Trigger scheduler stopped")
+
+    async def _run(self):
+        while self._running:
+            self._discard_stale()
+            timeout = None
+            if self._heap:
+                timeout = max(0.0, self._heap[0][0] - datetime.now().timestamp())
+
+            if timeout is None or timeout > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            self._fire_due()
+
+    def _fire_due(self):
+        now = datetime.now()
+        now_ts = now.timestamp()
+
+        while self._heap and self._heap[0][0] <= now_ts:
+            fire_ts, _, trigger_id, generation = heapq.heappop(self._heap)
+            trigger = self.triggers.get(trigger_id)
+            if trigger is None or trigger.generation != generation:
+                continue
+
+            scheduled_for = datetime.fromtimestamp(fire_ts)
+            trigger.last_triggered = now
+            self.fired_count += 1
+            logger.info(f"🎯 Trigger {trigger_id} fired for workflow {trigger.workflow_id}")
+
+            task = asyncio.get_running_loop().create_task(self.on_fire(trigger, scheduled_for))
+            task.add_done_callback(self._log_fire_error)
+
+            # Always schedule from max(scheduled, now) so a late loop fires once, not a burst
+            self._push(trigger, trigger.compute_next_fire(max(scheduled_for, now)))
+
+    @staticmethod
+    def _log_fire_error(task: asyncio.Task):
+        if not task.cancelled() and task.exception():
+            logger.error(f"Trigger execution failed: {task.exception()}")
+
+    def get_status(self) -> Dict[str, Any]:
+        next_fire = self.next_fire_time()
+        return {
+            "running": bool(self._task and not self._task.done()),
+            "scheduled_triggers": len(self.triggers),
+            "next_fire": next_fire.isoformat() if next_fire else None,
+            "fired_count": self.fired_count
+        }
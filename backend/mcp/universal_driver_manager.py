@@ -3,7 +3,9 @@ Universal Driver Manager for DXTR AutoFlow
 Manages all 476+ node types and 406+ services from workflows
 """
 
+import ast
 import json
+import hashlib
 import logging
 import importlib
 import importlib.util
@@ -15,6 +17,25 @@ from abc import ABC, abstractmethod
 
 logger = logging.getLogger(__name__)
 
+MANIFEST_VERSION = 1
+
+# Legacy drivers in the main drivers folder that load_all_drivers also scans
+EXISTING_DRIVER_FILES = [
+    'base_driver.py',
+    'email_send_driver.py', 
+    'http_request_driver.py',
+    'openai_driver.py',
+    'claude_driver.py',
+    'twilio_driver.py',
+    'web_hook_driver.py',
+    'mcp_llm_driver.py',
+    'if_else_driver.py',
+    'loop_items_driver.py',
+    'cron_driver.py',
+    'database_query_driver.py',
+    'email_read_imap_driver.py'
+]
+
 @dataclass
 class DriverInfo:
     """Information about a driver"""
@@ -65,6 +86,11 @@ class UniversalDriverManager:
         self.service_to_driver: Dict[str, str] = {}
         self.driver_registry: Dict[str, DriverInfo] = {}
         
+        # Lazy loading: service name -> manifest entry, imported on first use
+        self.manifest_path = os.path.join(self.universal_drivers_path, 'driver_manifest.json')
+        self.driver_manifest: Dict[str, Dict[str, Any]] = {}
+        self.lazy_loading = False
+        
         # Ensure universal drivers directory exists
         os.makedirs(self.universal_drivers_path, exist_ok=True)
         
@@ -148,8 +174,21 @@ class UniversalDriverManager:
         
         self.node_type_to_driver.update(self.core_mappings)
     
-    async def load_all_drivers(self) -> Dict[str, DriverInfo]:
-        """Load all available drivers"""
+    async def load_all_drivers(self, eager: Optional[bool] = None) -> Dict[str, DriverInfo]:
+        """Load all available drivers
+        
+        By default only the driver manifest is read and each driver module is
+        imported the first time one of its node types executes. Pass eager=True
+        (or set UNIVERSAL_DRIVERS_EAGER=true) to import every driver up front.
+        """
+        if eager is None:
+            eager = os.getenv('UNIVERSAL_DRIVERS_EAGER', 'false').lower() == 'true'
+        
+        if not eager:
+            self._load_manifest()
+            logger.info(f"✅ Registered {len(self.driver_manifest)} universal drivers from manifest (lazy)")
+            return self.driver_registry
+        
         logger.info("🔧 Loading all universal drivers...")
         
         # Load existing drivers
@@ -166,23 +205,7 @@ class UniversalDriverManager:
     
     async def _load_existing_drivers(self):
         """Load existing drivers from main drivers folder"""
-        driver_files = [
-            'base_driver.py',
-            'email_send_driver.py', 
-            'http_request_driver.py',
-            'openai_driver.py',
-            'claude_driver.py',
-            'twilio_driver.py',
-            'web_hook_driver.py',
-            'mcp_llm_driver.py',
-            'if_else_driver.py',
-            'loop_items_driver.py',
-            'cron_driver.py',
-            'database_query_driver.py',
-            'email_read_imap_driver.py'
-        ]
-        
-        for driver_file in driver_files:
+        for driver_file in EXISTING_DRIVER_FILES:
             if os.path.exists(os.path.join(self.drivers_path, driver_file)):
                 await self._load_driver_file(driver_file, self.drivers_path)
     
@@ -230,6 +253,157 @@ class UniversalDriverManager:
         except Exception as e:
             logger.error(f"Failed to load driver {driver_file}: {e}")
     
+    def _driver_source_files(self) -> List[str]:
+        """Driver files covered by the manifest, in eager load order"""
+        files = [
+            os.path.join(self.drivers_path, driver_file) for driver_file in EXISTING_DRIVER_FILES
+            if os.path.exists(os.path.join(self.drivers_path, driver_file))
+        ]
+        if os.path.exists(self.universal_drivers_path):
+            files.extend(
+                os.path.join(self.universal_drivers_path, file)
+                for file in sorted(os.listdir(self.universal_drivers_path))
+                if file.endswith('_driver.py')
+            )
+        return files
+    
+    def _compute_drivers_checksum(self, files: List[str]) -> Dict[str, str]:
+        """sha256 per driver file, keyed by path relative to the drivers folder"""
+        hashes = {}
+        for path in files:
+            with open(path, 'rb') as f:
+                hashes[os.path.relpath(path, self.drivers_path).replace(os.sep, '/')] = hashlib.sha256(f.read()).hexdigest()
+        return hashes
+    
+    @staticmethod
+    def _combine_checksums(file_hashes: Dict[str, str]) -> str:
+        combined = hashlib.sha256()
+        for relative_path in sorted(file_hashes):
+            combined.update(f"{relative_path}:{file_hashes[relative_path]}\n".encode())
+        return combined.hexdigest()
+    
+    def _scan_driver_file(self, path: str) -> Optional[Dict[str, Any]]:
+        """Read class name, node types and description from a driver without importing it"""
+        with open(path, 'r', encoding='utf-8') as f:
+            tree = ast.parse(f.read(), filename=path)
+        
+        for node in tree.body:
+            if not isinstance(node, ast.ClassDef):
+                continue
+            if not any(getattr(base, 'id', getattr(base, 'attr', None)) == 'BaseUniversalDriver' for base in node.bases):
+                continue
+            
+            node_types: List[str] = []
+            for child in ast.walk(node):
+                if (isinstance(child, ast.Assign) and
+                    any(isinstance(target, ast.Attribute) and target.attr == 'supported_node_types' for target in child.targets)):
+                    try:
+                        node_types = list(ast.literal_eval(child.value))
+                    except ValueError:
+                        node_types = []
+            
+            docstring = ast.get_docstring(tree) or ast.get_docstring(node) or ''
+            return {
+                "class_name": node.name,
+                "node_types": node_types,
+                "description": docstring.strip().split('\n')[0]
+            }
+        return None
+    
+    def build_driver_manifest(self, write: bool = True) -> Dict[str, Any]:
+        """Statically scan driver files into a manifest of node type -> module/class"""
+        files = self._driver_source_files()
+        file_hashes = self._compute_drivers_checksum(files)
+        
+        drivers = {}
+        node_types = {}
+        for path in files:
+            try:
+                entry = self._scan_driver_file(path)
+            except (SyntaxError, UnicodeDecodeError) as e:
+                logger.error(f"Failed to scan driver {path}: {e}")
+                continue
+            if not entry:
+                continue
+            
+            relative_path = os.path.relpath(path, self.drivers_path).replace(os.sep, '/')
+            service_name = os.path.basename(path)[:-3].replace('_driver', '')
+            entry.update({"file": relative_path, "sha256": file_hashes[relative_path]})
+            drivers[service_name] = entry
+            for node_type in entry["node_types"]:
+                node_types[node_type] = service_name
+        
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "checksum": self._combine_checksums(file_hashes),
+            "drivers": drivers,
+            "node_types": node_types
+        }
+        
+        if write:
+            try:
+                with open(self.manifest_path, 'w', encoding='utf-8') as f:
+                    json.dump(manifest, f, indent=2, sort_keys=True)
+                    f.write('\n')
+                logger.info(f"📝 Wrote driver manifest with {len(drivers)} drivers")
+            except OSError as e:
+                logger.warning(f"Could not write driver manifest: {e}")
+        
+        return manifest
+    
+    def _load_manifest(self):
+        """Register node types from the manifest, rebuilding it if the driver files changed"""
+        manifest = None
+        if os.path.exists(self.manifest_path):
+            try:
+                with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                    manifest = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Driver manifest unreadable, rebuilding: {e}")
+        
+        current_checksum = self._combine_checksums(self._compute_drivers_checksum(self._driver_source_files()))
+        if not manifest or manifest.get("version") != MANIFEST_VERSION or manifest.get("checksum") != current_checksum:
+            logger.info("🔄 Driver manifest missing or stale, rebuilding")
+            manifest = self.build_driver_manifest()
+        
+        self.lazy_loading = True
+        self.driver_manifest = manifest["drivers"]
+        self.node_type_to_driver.update(manifest["node_types"])
+        
+        for service_name, entry in self.driver_manifest.items():
+            self.driver_registry[service_name] = DriverInfo(
+                name=service_name,
+                node_types=entry["node_types"],
+                service_name=service_name,
+                file_path=os.path.join(self.drivers_path, entry["file"]),
+                class_name=entry["class_name"],
+                description=entry["description"],
+                capabilities=[],
+                required_params=[],
+                optional_params=[]
+            )
+    
+    async def _load_manifest_driver(self, service_name: str) -> Optional[BaseUniversalDriver]:
+        """Import and instantiate a single driver listed in the manifest"""
+        entry = self.driver_manifest.get(service_name)
+        if not entry:
+            return None
+        
+        # Generated drivers import universal_driver_manager from the mcp folder; in
+        # eager mode an earlier hand-written driver happened to put it on sys.path
+        mcp_dir = os.path.dirname(self.drivers_path)
+        if mcp_dir not in sys.path:
+            sys.path.append(mcp_dir)
+        
+        driver_path = os.path.join(self.drivers_path, entry["file"])
+        driver_file = os.path.basename(driver_path)
+        await self._load_driver_file(driver_file, os.path.dirname(driver_path))
+        
+        driver = self.loaded_drivers.get(service_name)
+        if driver:
+            logger.info(f"⚡ Lazily loaded driver: {service_name}")
+        return driver
+    
     async def _create_missing_drivers(self):
         """Create drivers for missing services"""
         missing_services = set()
@@ -418,6 +592,8 @@ class {class_name}(BaseUniversalDriver):
         driver_name = self.node_type_to_driver.get(node_type)
         if driver_name and driver_name in self.loaded_drivers:
             return self.loaded_drivers[driver_name]
+        if driver_name and driver_name in self.driver_manifest:
+            return await self._load_manifest_driver(driver_name)
         
         # Fallback: try to determine service from node type
         if node_type.startswith('n8n-nodes-base.'):
@@ -427,6 +603,8 @@ class {class_name}(BaseUniversalDriver):
         else:
             service = node_type.split('.')[0] if '.' in node_type else node_type
         
+        if service not in self.loaded_drivers and service in self.driver_manifest:
+            return await self._load_manifest_driver(service)
         return self.loaded_drivers.get(service)
     
     async def execute_node(self, node_type: str, parameters: Dict[str, Any], context: Dict[str, Any] = None) -> Dict[str, Any]:
@@ -449,6 +627,8 @@ class {class_name}(BaseUniversalDriver):
         """Get statistics about loaded drivers"""
         return {
             "total_drivers": len(self.loaded_drivers),
+            "available_drivers": len(set(self.loaded_drivers) | set(self.driver_manifest)),
+            "lazy_loading": self.lazy_loading,
             "total_node_types": len(self.node_type_to_driver),
             "drivers": list(self.loaded_drivers.keys()),
             "coverage": {
@@ -461,9 +641,9 @@ class {class_name}(BaseUniversalDriver):
 # Global instance
 universal_driver_manager = UniversalDriverManager()
 
-async def initialize_universal_drivers():
+async def initialize_universal_drivers(eager: Optional[bool] = None):
     """Initialize all universal drivers"""
-    return await universal_driver_manager.load_all_drivers()
+    return await universal_driver_manager.load_all_drivers(eager=eager)
 
 async def execute_workflow_node(node_type: str, parameters: Dict[str, Any], context: Dict[str, Any] = None) -> Dict[str, Any]:
     """Execute a workflow node using the universal driver system"""
@@ -0,0 +1,308 @@
+"""
+Persisted Inverted Index for Workflow Templates
+Ranks workflow templates with BM25 over names, node types, keywords, category
+and description. The index is built once from the workflow files, saved next
+to a postings file, and reopened with mmap so startup never parses workflow
+bodies and top-k queries only touch the postings of the query terms.
+"""
+
+import os
+import re
+import json
+import mmap
+import heapq
+import array
+import hashlib
+import logging
+from math import log
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple, Callable, Iterable
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+META_FILE = "workflow_index.json"
+POSTINGS_FILE = "workflow_postings.bin"
+
+# Term frequencies are weighted per field (BM25F-style) before scoring
+FIELD_WEIGHTS = {
+    "name": 3.0,
+    "node_types": 2.0,
+    "keywords": 2.0,
+    "category": 1.5,
+    "description": 1.0
+}
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Tokens every n8n node type carries; they would match every document
+NODE_TYPE_NOISE = {"n8n", "nodes", "base", "langchain"}
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+_CAMEL_BOUNDARY = re.compile(r"(?<=[a-z0-9])(?=[A-Z])")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens, splitting camelCase words"""
+    if not text:
+        return []
+    return _TOKEN_PATTERN.findall(_CAMEL_BOUNDARY.sub(" ", str(text)).lower())
+
+
+def metadata_terms(metadata: Dict[str, Any]) -> Dict[str, float]:
+    """Field-weighted term frequencies for one workflow"""
+    terms: Dict[str, float] = {}
+
+    def add(tokens: Iterable[str], weight: float):
+        for token in tokens:
+            terms[token] = terms.get(token, 0.0) + weight
+
+    add(tokenize(metadata.get("name", "")), FIELD_WEIGHTS["name"])
+    add(tokenize(metadata.get("description", "")), FIELD_WEIGHTS["description"])
+    add(tokenize(metadata.get("category", "")), FIELD_WEIGHTS["category"])
+    for keyword in metadata.get("keywords", []):
+        add(tokenize(keyword), FIELD_WEIGHTS["keywords"])
+    for node_type in set(metadata.get("node_types", [])):
+        short_name = node_type.split(".")[-1]
+        tokens = [t for t in tokenize(short_name) if t not in NODE_TYPE_NOISE]
+        if short_name.lower() not in tokens:
+            tokens.append(short_name.lower())
+        add(tokens, FIELD_WEIGHTS["node_types"])
+    return terms
+
+
+def source_signature(file_path: Path) -> List[Any]:
+    stat = file_path.stat()
+    return [str(file_path), stat.st_mtime_ns, stat.st_size]
+
+
+class WorkflowIndex:
+    """
+    Inverted index with precomputed BM25 impacts.
+
+    Postings are stored as two flat arrays - uint32 document numbers and
+    float32 scores - and each term maps to an (offset, count) slice of them.
+    Scores are final BM25 contributions, so a query just sums the slices of
+    its terms.
+    """
+
+    def __init__(self, documents: List[Dict[str, Any]], terms: Dict[str, List[int]],
+                 doc_numbers, scores, fingerprint: str = ""):
+        # documents[i] = {"id", "file_path", "metadata", "source"}
+        self.documents = documents
+        self.terms = terms
+        self.fingerprint = fingerprint
+        self._doc_numbers = doc_numbers
+        self._scores = scores
+        self._mmap: Optional[mmap.mmap] = None
+        self._file = None
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    @classmethod
+    def build(cls, documents: List[Dict[str, Any]], fingerprint: str = "") -> "WorkflowIndex":
+        """Build an in-memory index from documents with id/file_path/metadata"""
+
+        doc_terms = [metadata_terms(doc["metadata"]) for doc in documents]
+        doc_lengths = [sum(terms.values()) for terms in doc_terms]
+        avg_length = (sum(doc_lengths) / len(doc_lengths)) if doc_lengths else 1.0
+        avg_length = avg_length or 1.0
+
+        postings: Dict[str, List[Tuple[int, float]]] = {}
+        for doc_number, terms in enumerate(doc_terms):
+            for term, frequency in terms.items():
+                postings.setdefault(term, []).append((doc_number, frequency))
+
+        total = len(documents)
+        doc_numbers = array.array("I")
+        scores = array.array("f")
+        term_table: Dict[str, List[int]] = {}
+        for term in sorted(postings):
+            entries = postings[term]
+            idf = log(1 + (total - len(entries) + 0.5) / (len(entries) + 0.5))
+            term_table[term] = [len(doc_numbers), len(entries)]
+            for doc_number, frequency in entries:
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_lengths[doc_number] / avg_length)
+                doc_numbers.append(doc_number)
+                scores.append(idf * frequency * (BM25_K1 + 1) / (frequency + norm))
+
+        return cls(documents, term_table, doc_numbers, scores, fingerprint)
+
+    def search(self, query: Iterable[str], limit: int = 10) -> List[Tuple[str, float]]:
+        """Top-k (workflow_id, bm25_score) for the query tokens"""
+
+        slices = [self.terms[term] for term in set(query) if term in self.terms]
+        if not slices:
+            return []
+
+        postings = [
+            zip(self._doc_numbers[offset:offset + count].tolist(), self._scores[offset:offset + count].tolist())
+            for offset, count in slices
+        ]
+
+        # Dense queries accumulate into a flat list, sparse ones into a dict
+        if sum(count for _, count in slices) * 4 >= len(self.documents):
+            totals = [0.0] * len(self.documents)
+            for entries in postings:
+                for doc_number, score in entries:
+                    totals[doc_number] += score
+            top_numbers = heapq.nlargest(limit, range(len(totals)), key=totals.__getitem__)
+            top = [(doc_number, totals[doc_number]) for doc_number in top_numbers if totals[doc_number] > 0]
+        else:
+            accumulator: Dict[int, float] = {}
+            for entries in postings:
+                for doc_number, score in entries:
+                    accumulator[doc_number] = accumulator.get(doc_number, 0.0) + score
+            top = heapq.nlargest(limit, accumulator.items(), key=lambda item: item[1])
+
+        return [(self.documents[doc_number]["id"], score) for doc_number, score in top]
+
+    # ---- Persistence ----
+
+    def save(self, index_dir: Path):
+        """Write metadata and postings atomically"""
+
+        index_dir.mkdir(parents=True, exist_ok=True)
+        postings_path = index_dir / POSTINGS_FILE
+        meta_path = index_dir / META_FILE
+
+        tmp_postings = postings_path.with_suffix(".tmp")
+        with open(tmp_postings, "wb") as f:
+            f.write(self._doc_numbers)
+            f.write(self._scores)
+
+        meta = {
+            "version": INDEX_VERSION,
+            "fingerprint": self.fingerprint,
+            "postings_count": len(self._doc_numbers),
+            "documents": self.documents,
+            "terms": self.terms
+        }
+        tmp_meta = meta_path.with_suffix(".tmp")
+        with open(tmp_meta, "w", encoding="utf-8") as f:
+            json.dump(meta, f, separators=(",", ":"))
+
+        os.replace(tmp_postings, postings_path)
+        os.replace(tmp_meta, meta_path)
+        logger.info(f"💾 Saved workflow index ({len(self.documents)} workflows, {len(self.terms)} terms) to {index_dir}")
+
+    @classmethod
+    def load(cls, index_dir: Path) -> Optional["WorkflowIndex"]:
+        """Open a saved index; postings are memory-mapped, not read"""
+
+        meta_path = index_dir / META_FILE
+        postings_path = index_dir / POSTINGS_FILE
+        if not meta_path.exists() or not postings_path.exists():
+            return None
+
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("version") != INDEX_VERSION:
+                return None
+
+            count = meta["postings_count"]
+            postings_file = open(postings_path, "rb")
+            if count == 0:
+                postings_file.close()
+                index = cls(meta["documents"], meta["terms"], array.array("I"), array.array("f"), meta["fingerprint"])
+                return index
+
+            mapped = mmap.mmap(postings_file.fileno(), 0, access=mmap.ACCESS_READ)
+            view = memoryview(mapped)
+            doc_numbers = view[:count * 4].cast("I")
+            scores = view[count * 4:count * 8].cast("f")
+
+            index = cls(meta["documents"], meta["terms"], doc_numbers, scores, meta["fingerprint"])
+            index._mmap = mapped
+            index._file = postings_file
+            return index
+
+        except Exception as e:
+            logger.warning(f"Could not load workflow index from {index_dir}: {e}")
+            return None
+
+    def close(self):
+        if self._mmap is not None:
+            self._doc_numbers.release()
+            self._scores.release()
+            self._mmap.close()
+            self._file.close()
+            self._mmap = None
+
+    # ---- Build from workflow files ----
+
+    @staticmethod
+    def compute_fingerprint(signatures: List[List[Any]]) -> str:
+        digest = hashlib.sha256()
+        for signature in sorted(signatures):
+            digest.update(json.dumps(signature).encode("utf-8"))
+        return digest.hexdigest()
+
+    @classmethod
+    def load_or_build(cls, workflow_files: List[Path], index_dir: Path,
+                      extract_metadata: Callable[[Dict[str, Any], Path], Dict[str, Any]]) -> "WorkflowIndex":
+        """
+        Reuse the saved index when no workflow file changed; otherwise rebuild,
+        parsing only new or modified files.
+        """
+
+        signatures = {}
+        for workflow_file in workflow_files:
+            try:
+                signatures[str(workflow_file)] = source_signature(workflow_file)
+            except OSError:
+                continue
+        fingerprint = cls.compute_fingerprint(list(signatures.values()))
+
+        previous = cls.load(index_dir)
+        if previous is not None and previous.fingerprint == fingerprint:
+            logger.info(f"📇 Loaded workflow index with {len(previous)} workflows from {index_dir}")
+            return previous
+
+        # Unchanged files keep their extracted metadata from the previous index
+        reusable = {}
+        if previous is not None:
+            for doc in previous.documents:
+                reusable[tuple(doc["source"])] = doc
+            previous.close()
+
+        documents: Dict[str, Dict[str, Any]] = {}
+        parsed = 0
+        for path_text, signature in signatures.items():
+            cached = reusable.get(tuple(signature))
+            if cached is not None:
+                documents[cached["id"]] = cached
+                continue
+
+            workflow_file = Path(path_text)
+            try:
+                with open(workflow_file, "r", encoding="utf-8") as f:
+                    workflow_data = json.load(f)
+            except Exception as e:
+                logger.error(f"Error loading workflow {workflow_file}: {e}")
+                continue
+            if not isinstance(workflow_data, dict) or not isinstance(workflow_data.get("nodes"), list):
+                continue
+
+            parsed += 1
+            workflow_id = str(workflow_data.get("id", workflow_file.stem))
+            documents[workflow_id] = {
+                "id": workflow_id,
+                "file_path": path_text,
+                "metadata": extract_metadata(workflow_data, workflow_file),
+                "source": signature
+            }
+
+        index = cls.build(list(documents.values()), fingerprint)
+        logger.info(f"📇 Built workflow index: {len(index)} workflows ({parsed} parsed, "
+                    f"{len(index) - parsed} reused)")
+        try:
+            index.save(index_dir)
+        except OSError as e:
+            logger.warning(f"Could not persist workflow index to {index_dir}: {e}")
+            return index
+
+        # Serve from the mapped copy so the build arrays can be released
+        return cls.load(index_dir) or index
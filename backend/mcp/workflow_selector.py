@@ -10,8 +10,16 @@ import asyncio
 from typing import Dict, Any, List, Optional, Tuple
 from pathlib import Path
 import re
+from collections import OrderedDict
 from datetime import datetime
 
+try:
+    from .workflow_index import WorkflowIndex, tokenize
+    from .template_engine import template_cache
+except ImportError:
+    from workflow_index import WorkflowIndex, tokenize
+    from template_engine import template_cache
+
 # OpenAI for intelligent workflow matching
 try:
     from openai import AsyncOpenAI
@@ -21,6 +29,22 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+try:
+    from core.llm_cache import llm_cache
+except ImportError:
+    from backend.core.llm_cache import llm_cache
+
+WORKFLOW_INDEX_DIR = Path(os.getenv("WORKFLOW_INDEX_DIR", Path(__file__).parent / ".workflow_index"))
+# Parsed workflow bodies kept in memory (loaded lazily by id)
+WORKFLOW_BODY_CACHE_SIZE = int(os.getenv("WORKFLOW_BODY_CACHE_SIZE", 64))
+
+def _is_json_object(content: str) -> bool:
+    try:
+        return isinstance(json.loads(content), dict)
+    except (TypeError, ValueError):
+        return False
+
+
 class WorkflowSelector:
     """
     Intelligent workflow selection system that:
@@ -39,68 +63,66 @@ class WorkflowSelector:
         self.workflow_catalog = {}
         self.workflow_categories = {}
         self.workflow_patterns = {}
+        self.workflow_index: Optional[WorkflowIndex] = None
+        self._workflow_bodies: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
         
         # Initialize workflow indexing
         self._load_workflow_catalog()
         
         logger.info(f"🔍 WorkflowSelector initialized with {len(self.workflow_catalog)} workflows")
     
+    def _discover_workflow_files(self) -> List[Path]:
+        """Find workflow JSON files in the known workflow directories"""
+        workflow_paths = [
+            Path(__file__).parent.parent.parent / "workflows",
+            Path(__file__).parent.parent / "workflows", 
+            Path(__file__).parent / "workflows",
+            Path("workflows")
+        ]
+        
+        workflow_files = []
+        seen = set()
+        for path in workflow_paths:
+            if path.exists():
+                # Find JSON workflow files
+                json_files = [f for f in path.glob("**/*.json") if f.resolve() not in seen]
+                seen.update(f.resolve() for f in json_files)
+                workflow_files.extend(json_files)
+                logger.info(f"Found {len(json_files)} workflow files in {path}")
+        
+        # The working directory itself is only scanned at the top level
+        for json_file in Path(".").glob("*.json"):
+            if json_file.resolve() not in seen:
+                seen.add(json_file.resolve())
+                workflow_files.append(json_file)
+        
+        return workflow_files
+    
     def _load_workflow_catalog(self):
-        """Load and index all available workflows for quick selection"""
+        """Load the persisted workflow index (rebuilding it if workflow files changed)"""
         try:
-            # Look for workflow files in multiple locations
-            workflow_paths = [
-                Path(__file__).parent.parent.parent / "workflows",
-                Path(__file__).parent.parent / "workflows", 
-                Path(__file__).parent / "workflows",
-                Path("workflows"),
-                Path(".")
-            ]
-            
-            workflow_files = []
-            for path in workflow_paths:
-                if path.exists():
-                    # Find JSON workflow files
-                    json_files = list(path.glob("**/*.json"))
-                    workflow_files.extend(json_files)
-                    logger.info(f"Found {len(json_files)} workflow files in {path}")
+            workflow_files = self._discover_workflow_files()
             
             if not workflow_files:
                 logger.warning("No workflow files found - creating sample catalog")
                 self._create_sample_catalog()
                 return
             
-            # Index workflows by type, keywords, and patterns
-            for workflow_file in workflow_files:
-                try:
-                    with open(workflow_file, 'r', encoding='utf-8') as f:
-                        workflow_data = json.load(f)
-                    
-                    workflow_id = workflow_data.get('id', workflow_file.stem)
-                    
-                    # Extract workflow metadata
-                    metadata = self._extract_workflow_metadata(workflow_data, workflow_file)
-                    
-                    self.workflow_catalog[workflow_id] = {
-                        "file_path": str(workflow_file),
-                        "workflow_data": workflow_data,
-                        "metadata": metadata
-                    }
-                    
-                    # Index by category
-                    category = metadata.get('category', 'general')
-                    if category not in self.workflow_categories:
-                        self.workflow_categories[category] = []
-                    self.workflow_categories[category].append(workflow_id)
-                    
-                    # Index by patterns/keywords
-                    for keyword in metadata.get('keywords', []):
-                        if keyword not in self.workflow_patterns:
-                            self.workflow_patterns[keyword] = []
-                        self.workflow_patterns[keyword].append(workflow_id)
-                        
-                except Exception as e:
-                    logger.error(f"Error loading workflow {workflow_file}: {e}")
+            self.workflow_index = WorkflowIndex.load_or_build(
+                workflow_files, WORKFLOW_INDEX_DIR, self._extract_workflow_metadata
+            )
+            if not len(self.workflow_index):
+                logger.warning("No valid workflow files found - creating sample catalog")
+                self._create_sample_catalog()
+                return
+            
+            # Catalog entries carry metadata only; bodies are loaded by id on demand
+            for document in self.workflow_index.documents:
+                self._add_catalog_entry(document["id"], {
+                    "file_path": document["file_path"],
+                    "metadata": document["metadata"],
+                    "version": document["source"][1]
+                })
             
             logger.info(f"✅ Indexed {len(self.workflow_catalog)} workflows across {len(self.workflow_categories)} categories")
             
@@ -108,6 +130,43 @@ class WorkflowSelector:
             logger.error(f"Error loading workflow catalog: {e}")
             self._create_sample_catalog()
     
+    def _add_catalog_entry(self, workflow_id: str, workflow: Dict[str, Any]):
+        """Register a workflow in the catalog and its category/keyword indexes"""
+        self.workflow_catalog[workflow_id] = workflow
+        metadata = workflow["metadata"]
+        
+        # Index by category
+        category = metadata.get('category', 'general')
+        if category not in self.workflow_categories:
+            self.workflow_categories[category] = []
+        self.workflow_categories[category].append(workflow_id)
+        
+        # Index by patterns/keywords
+        for keyword in metadata.get('keywords', []):
+            if keyword not in self.workflow_patterns:
+                self.workflow_patterns[keyword] = []
+            self.workflow_patterns[keyword].append(workflow_id)
+    
+    def get_workflow_data(self, workflow_id: str) -> Dict[str, Any]:
+        """Load a workflow body by id, keeping a small LRU of parsed bodies"""
+        workflow = self.workflow_catalog.get(workflow_id)
+        if workflow is None:
+            return {}
+        if 'workflow_data' in workflow or not workflow.get('file_path'):
+            return workflow.get('workflow_data', {})
+        
+        if workflow_id in self._workflow_bodies:
+            self._workflow_bodies.move_to_end(workflow_id)
+            return self._workflow_bodies[workflow_id]
+        
+        with open(workflow['file_path'], 'r', encoding='utf-8') as f:
+            workflow_data = json.load(f)
+        
+        self._workflow_bodies[workflow_id] = workflow_data
+        if len(self._workflow_bodies) > WORKFLOW_BODY_CACHE_SIZE:
+            self._workflow_bodies.popitem(last=False)
+        return workflow_data
+    
     def _extract_workflow_metadata(self, workflow_data: Dict, workflow_file: Path) -> Dict[str, Any]:
         """Extract searchable metadata from workflow data"""
         metadata = {
@@ -226,23 +285,13 @@ class WorkflowSelector:
             }
         }
         
-        self.workflow_catalog = sample_workflows
-        
-        # Build category and pattern indexes
         for workflow_id, workflow in sample_workflows.items():
-            metadata = workflow["metadata"]
-            
-            # Index by category
-            category = metadata["category"]
-            if category not in self.workflow_categories:
-                self.workflow_categories[category] = []
-            self.workflow_categories[category].append(workflow_id)
-            
-            # Index by keywords
-            for keyword in metadata["keywords"]:
-                if keyword not in self.workflow_patterns:
-                    self.workflow_patterns[keyword] = []
-                self.workflow_patterns[keyword].append(workflow_id)
+            self._add_catalog_entry(workflow_id, workflow)
+        
+        self.workflow_index = WorkflowIndex.build([
+            {"id": workflow_id, "file_path": None, "metadata": workflow["metadata"], "source": None}
+            for workflow_id, workflow in sample_workflows.items()
+        ])
     
     async def detect_workflow_intent(self, user_input: str, context: Dict[str, Any] = None) -> Dict[str, Any]:
         """
@@ -255,7 +304,8 @@ class WorkflowSelector:
             return await self._pattern_based_intent_detection(user_input, context)
         
         try:
-            client = AsyncOpenAI(api_key=self.openai_api_key)
+            from core.llm_client_pool import llm_client_registry
+            client = llm_client_registry.get_openai_client(self.openai_api_key)
             
             system_prompt = """You are an expert workflow automation analyst. Analyze user requests to determine:
 1. What type of automation they want
@@ -291,7 +341,12 @@ RESPOND IN JSON FORMAT:
   "reasoning": "explanation of analysis"
 }"""
             
-            response = await client.chat.completions.create(
+            # Intent analysis is user-independent, so near-identical requests may share an answer
+            content = await llm_cache.chat_completion(
+                client,
+                namespace="intent_detection",
+                semantic=True,
+                cacheable=_is_json_object,
                 model="gpt-3.5-turbo",
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -300,8 +355,7 @@ RESPOND IN JSON FORMAT:
                 temperature=0.1,
                 max_tokens=500
             )
-            
-            content = response.choices[0].message.content.strip()
+            content = content.strip()
             
             try:
                 result = json.loads(content)
@@ -382,37 +436,26 @@ RESPOND IN JSON FORMAT:
         
         logger.info(f"🎯 Selecting workflows for category: {category}, type: {workflow_type}")
         
-        # Get workflows from matching category
+        # Rank with BM25 over the inverted index, then keep the heuristic score
+        # for thresholds such as auto-selection
+        query_terms = self._intent_query_terms(intent)
         candidate_workflows = []
         
-        # Primary matches from category
-        if category in self.workflow_categories:
-            for workflow_id in self.workflow_categories[category]:
-                if workflow_id in self.workflow_catalog:
-                    workflow = self.workflow_catalog[workflow_id]
-                    score = self._calculate_workflow_score(workflow, intent)
-                    candidate_workflows.append({
-                        "workflow_id": workflow_id,
-                        "workflow": workflow,
-                        "relevance_score": score,
-                        "match_reason": f"Category match: {category}"
-                    })
-        
-        # Secondary matches from keyword patterns
-        for keyword in intent.get('extracted_parameters', {}).values():
-            if isinstance(keyword, str) and keyword in self.workflow_patterns:
-                for workflow_id in self.workflow_patterns[keyword]:
-                    if workflow_id in self.workflow_catalog:
-                        # Avoid duplicates
-                        if not any(cw['workflow_id'] == workflow_id for cw in candidate_workflows):
-                            workflow = self.workflow_catalog[workflow_id]
-                            score = self._calculate_workflow_score(workflow, intent)
-                            candidate_workflows.append({
-                                "workflow_id": workflow_id,
-                                "workflow": workflow,
-                                "relevance_score": score,
-                                "match_reason": f"Keyword match: {keyword}"
-                            })
+        for workflow_id, bm25_score in self.workflow_index.search(query_terms, limit=max(limit * 5, 20)):
+            workflow = self.workflow_catalog[workflow_id]
+            metadata = workflow["metadata"]
+            if metadata.get('category') == category:
+                match_reason = f"Category match: {category}"
+            else:
+                matched = [k for k in metadata.get('keywords', []) if k in query_terms]
+                match_reason = f"Keyword match: {', '.join(matched)}" if matched else "Text match"
+            candidate_workflows.append({
+                "workflow_id": workflow_id,
+                "workflow": workflow,
+                "relevance_score": self._calculate_workflow_score(workflow, intent),
+                "bm25_score": round(bm25_score, 4),
+                "match_reason": match_reason
+            })
         
         # If no matches found, include top general workflows
         if not candidate_workflows:
@@ -423,11 +466,12 @@ RESPOND IN JSON FORMAT:
                     "workflow_id": workflow_id,
                     "workflow": workflow,
                     "relevance_score": score,
+                    "bm25_score": 0.0,
                     "match_reason": "General workflow (no specific match)"
                 })
         
-        # Sort by relevance score and return top matches
-        candidate_workflows.sort(key=lambda x: x['relevance_score'], reverse=True)
+        # Sort by BM25 rank (heuristic score breaks ties) and return top matches
+        candidate_workflows.sort(key=lambda x: (x['bm25_score'], x['relevance_score']), reverse=True)
         
         selected_workflows = candidate_workflows[:limit]
         
@@ -435,6 +479,12 @@ RESPOND IN JSON FORMAT:
         
         return selected_workflows
     
+    def _intent_query_terms(self, intent: Dict[str, Any]) -> List[str]:
+        """Query tokens for the index from the detected intent"""
+        parts = [intent.get('workflow_category', ''), intent.get('workflow_type', '')]
+        parts.extend(str(v) for v in intent.get('extracted_parameters', {}).values() if isinstance(v, str))
+        return tokenize(" ".join(parts))
+    
     def _calculate_workflow_score(self, workflow: Dict[str, Any], intent: Dict[str, Any]) -> float:
         """Calculate relevance score for a workflow given the user intent"""
         score = 0.0
@@ -483,16 +533,13 @@ RESPOND IN JSON FORMAT:
         if workflow_id not in self.workflow_catalog:
             raise ValueError(f"Workflow {workflow_id} not found")
         
-        workflow = self.workflow_catalog[workflow_id]
-        workflow_data = workflow.get('workflow_data', {})
+        workflow_data = self.get_workflow_data(workflow_id)
         
         logger.info(f"🔧 Customizing workflow {workflow_id} with parameters: {user_parameters}")
         
-        # Create a copy for customization
-        customized_workflow = json.loads(json.dumps(workflow_data))
-        
-        # Apply parameter substitutions
-        customized_workflow = self._apply_parameter_substitutions(customized_workflow, user_parameters)
+        # Apply parameter substitutions (rendering returns a fresh copy)
+        cache_key = ("workflow_selector", workflow_id, self.workflow_catalog[workflow_id].get('version'))
+        customized_workflow = self._apply_parameter_substitutions(workflow_data, user_parameters, cache_key)
         
         # Add execution metadata
         customized_workflow['customization'] = {
@@ -504,35 +551,29 @@ RESPOND IN JSON FORMAT:
         
         return customized_workflow
     
-    def _apply_parameter_substitutions(self, workflow_data: Dict[str, Any], parameters: Dict[str, Any]) -> Dict[str, Any]:
-        """Apply parameter substitutions to workflow data"""
-        # Convert to string for easy substitution
-        workflow_str = json.dumps(workflow_data)
+    def _apply_parameter_substitutions(self, workflow_data: Dict[str, Any], parameters: Dict[str, Any],
+                                       cache_key: Optional[tuple] = None) -> Dict[str, Any]:
+        """Apply parameter substitutions to workflow data
         
+        The workflow is compiled once per cache_key (workflow id + file version)
+        and rendered against the parameters and their common aliases.
+        """
         # Common parameter mappings
         param_mappings = {
-            'recipient_email': ['{{recipient}}', '{{email}}', '{{to_email}}'],
-            'content_topic': ['{{topic}}', '{{subject}}', '{{content}}'],
-            'sender_name': ['{{sender}}', '{{from_name}}'],
-            'company_name': ['{{company}}', '{{organization}}']
+            'recipient_email': ['recipient', 'email', 'to_email'],
+            'content_topic': ['topic', 'subject', 'content'],
+            'sender_name': ['sender', 'from_name'],
+            'company_name': ['company', 'organization']
         }
         
-        # Apply substitutions
+        substitutions = {}
         for param_key, param_value in parameters.items():
             if param_value and isinstance(param_value, str):
-                # Direct substitution
-                workflow_str = workflow_str.replace(f'{{{{{param_key}}}}}', param_value)
-                
-                # Common mappings
-                if param_key in param_mappings:
-                    for mapping in param_mappings[param_key]:
-                        workflow_str = workflow_str.replace(mapping, param_value)
+                substitutions[param_key] = param_value
+                for alias in param_mappings.get(param_key, []):
+                    substitutions[alias] = param_value
         
-        try:
-            return json.loads(workflow_str)
-        except json.JSONDecodeError:
-            logger.error("Failed to parse customized workflow JSON")
-            return workflow_data
+        return template_cache.render(workflow_data, substitutions, cache_key)
     
     def get_workflow_summary(self, workflow_id: str) -> Dict[str, Any]:
         """Get a human-readable summary of a workflow"""
@@ -7,13 +7,17 @@ Provides Calendly OAuth integration and scheduling capabilities
 import os
 import requests
 import asyncio
-import aiohttp
 from typing import Dict, List, Any, Optional
 from urllib.parse import quote_plus, urlencode
 import json
 from datetime import datetime, timedelta
 import logging
 
+try:
+    from core.http_client import http_client_manager
+except ImportError:
+    from backend.core.http_client import http_client_manager
+
 logger = logging.getLogger(__name__)
 
 class CalendlyService:
@@ -81,7 +85,7 @@ class CalendlyService:
                 'redirect_uri': self.redirect_uri
             }
             
-            async with aiohttp.ClientSession() as session:
+            async with http_client_manager.session("calendly") as session:
                 async with session.post(self.token_url, data=data) as response:
                     if response.status == 200:
                         token_data = await response.json()
@@ -106,7 +110,7 @@ class CalendlyService:
                 'Content-Type': 'application/json'
             }
             
-            async with aiohttp.ClientSession() as session:
+            async with http_client_manager.session("calendly") as session:
                 async with session.get(f"{self.api_base_url}/users/me", headers=headers) as response:
                     if response.status == 200:
                         user_data = await response.json()
@@ -131,7 +135,7 @@ class CalendlyService:
             
             params = {'user': user_uri}
             
-            async with aiohttp.ClientSession() as session:
+            async with http_client_manager.session("calendly") as session:
                 async with session.get(f"{self.api_base_url}/event_types", headers=headers, params=params) as response:
                     if response.status == 200:
                         event_data = await response.json()
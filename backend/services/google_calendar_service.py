@@ -7,13 +7,17 @@ Provides Google Calendar OAuth integration and event creation capabilities
 import os
 import requests
 import asyncio
-import aiohttp
 from typing import Dict, List, Any, Optional
 from urllib.parse import quote_plus, urlencode
 import json
 from datetime import datetime, timedelta
 import logging
 
+try:
+    from core.http_client import http_client_manager
+except ImportError:
+    from backend.core.http_client import http_client_manager
+
 logger = logging.getLogger(__name__)
 
 class GoogleCalendarService:
@@ -86,7 +90,7 @@ class GoogleCalendarService:
                 'redirect_uri': self.redirect_uri
             }
             
-            async with aiohttp.ClientSession() as session:
+            async with http_client_manager.session("google_calendar") as session:
                 async with session.post(self.token_url, data=data) as response:
                     if response.status == 200:
                         token_data = await response.json()
@@ -149,7 +153,7 @@ class GoogleCalendarService:
                     }
                 }
                 
-                async with aiohttp.ClientSession() as session:
+                async with http_client_manager.session("google_calendar") as session:
                     async with session.post(
                         f"{self.api_base_url}/calendars/primary/events?conferenceDataVersion=1",
                         headers=headers,
@@ -7,13 +7,17 @@ Provides Microsoft Outlook/Office 365 OAuth integration and calendar capabilitie
 import os
 import requests
 import asyncio
-import aiohttp
 from typing import Dict, List, Any, Optional
 from urllib.parse import quote_plus, urlencode
 import json
 from datetime import datetime, timedelta
 import logging
 
+try:
+    from core.http_client import http_client_manager
+except ImportError:
+    from backend.core.http_client import http_client_manager
+
 logger = logging.getLogger(__name__)
 
 class OutlookService:
@@ -88,7 +92,7 @@ class OutlookService:
                 'scope': ' '.join(self.scopes)
             }
             
-            async with aiohttp.ClientSession() as session:
+            async with http_client_manager.session("outlook") as session:
                 async with session.post(self.token_url, data=data) as response:
                     if response.status == 200:
                         token_data = await response.json()
@@ -162,7 +166,7 @@ class OutlookService:
                     "reminderMinutesBeforeStart": 15
                 }
                 
-                async with aiohttp.ClientSession() as session:
+                async with http_client_manager.session("outlook") as session:
                     async with session.post(
                         f"{self.api_base_url}/me/events",
                         headers=headers,
@@ -7,7 +7,6 @@ Provides comprehensive web search capabilities across multiple sources
 import os
 import requests
 import asyncio
-import aiohttp
 from typing import Dict, List, Any, Optional
 from urllib.parse import quote_plus
 import json
@@ -15,6 +14,11 @@ import re
 from datetime import datetime
 import logging
 
+try:
+    from core.http_client import http_client_manager
+except ImportError:
+    from backend.core.http_client import http_client_manager
+
 logger = logging.getLogger(__name__)
 
 class WebSearchService:
@@ -142,7 +146,7 @@ class WebSearchService:
                 "num": min(max_results, 10)  # Google API max is 10
             }
             
-            async with aiohttp.ClientSession() as session:
+            async with http_client_manager.session("web_search") as session:
                 async with session.get(url, params=params) as response:
                     if response.status == 200:
                         data = await response.json()
@@ -184,7 +188,7 @@ class WebSearchService:
                 "User-Agent": "WebSearchBot/1.0"
             }
             
-            async with aiohttp.ClientSession() as session:
+            async with http_client_manager.session("web_search") as session:
                 async with session.get(url, params=params, headers=headers) as response:
                     if response.status == 200:
                         data = await response.json()
@@ -252,7 +256,7 @@ class WebSearchService:
                 "skip_disambig": "1"
             }
             
-            async with aiohttp.ClientSession() as session:
+            async with http_client_manager.session("web_search") as session:
                 async with session.get(url, params=params) as response:
                     if response.status == 200:
                         data = await response.json()
@@ -7,7 +7,6 @@ Provides Zoom OAuth integration and meeting creation capabilities
 import os
 import requests
 import asyncio
-import aiohttp
 from typing import Dict, List, Any, Optional
 from urllib.parse import quote_plus, urlencode
 import json
@@ -15,6 +14,11 @@ import base64
 from datetime import datetime, timedelta
 import logging
 
+try:
+    from core.http_client import http_client_manager
+except ImportError:
+    from backend.core.http_client import http_client_manager
+
 logger = logging.getLogger(__name__)
 
 class ZoomService:
@@ -80,7 +84,7 @@ class ZoomService:
                 'redirect_uri': self.redirect_uri
             }
             
-            async with aiohttp.ClientSession() as session:
+            async with http_client_manager.session("zoom") as session:
                 async with session.post(self.token_url, headers=headers, data=data) as response:
                     if response.status == 200:
                         token_data = await response.json()
@@ -133,7 +137,7 @@ class ZoomService:
                 
             user_id = user_info.get('id', 'me')
             
-            async with aiohttp.ClientSession() as session:
+            async with http_client_manager.session("zoom") as session:
                 async with session.post(
                     f"{self.api_base_url}/users/{user_id}/meetings",
                     headers=headers,
@@ -162,7 +166,7 @@ class ZoomService:
                 'Content-Type': 'application/json'
             }
             
-            async with aiohttp.ClientSession() as session:
+            async with http_client_manager.session("zoom") as session:
                 async with session.get(f"{self.api_base_url}/users/me", headers=headers) as response:
                     if response.status == 200:
                         user_info = await response.json()
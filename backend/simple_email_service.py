@@ -1,8 +1,13 @@
-import smtplib
+import re
 import logging
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 
+try:
+    from core.email_delivery import email_delivery, SMTPCredential
+except ImportError:
+    from backend.core.email_delivery import email_delivery, SMTPCredential
+
 class EmailService:
     def __init__(self):
         # Default configuration - can be overridden
@@ -12,6 +17,10 @@ class EmailService:
         self.smtp_password = None
         self.configured = False
     
+    @property
+    def credential(self) -> SMTPCredential:
+        return SMTPCredential(self.smtp_host, self.smtp_port, self.smtp_user, self.smtp_password)
+    
     def configure(self, email: str, password: str, host: str = "mail.privateemail.com", port: int = 587):
         """Configure email service with credentials"""
         self.smtp_user = email
@@ -27,50 +36,74 @@ class EmailService:
             return {"success": False, "error": "Email service not configured"}
         
         try:
-            with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.smtp_user, self.smtp_password)
+            email_delivery.get_pool(self.credential).test_connection()
             return {"success": True, "message": "SMTP connection successful"}
         except Exception as e:
             return {"success": False, "error": str(e)}
     
+    def _build_message(self, to_email: str, subject: str, body: str, html_body: str = None) -> MIMEMultipart:
+        msg = MIMEMultipart('alternative')
+        msg['From'] = self.smtp_user
+        msg['To'] = to_email
+        msg['Subject'] = subject
+        
+        # Add text body
+        text_part = MIMEText(body, 'plain')
+        msg.attach(text_part)
+        
+        # Add HTML body if provided
+        if html_body:
+            html_part = MIMEText(html_body, 'html')
+            msg.attach(html_part)
+        return msg
+    
+    def _result(self, delivery: dict, to_email: str, subject: str) -> dict:
+        if delivery["success"]:
+            print(f"✅ Email sent successfully to {to_email}")
+            return {
+                "success": True,
+                "message": f"Email sent to {to_email}",
+                "subject": subject,
+                "attempts": delivery["attempts"]
+            }
+        print(f"❌ Failed to send email: {delivery['error']}")
+        return {"success": False, "error": delivery["error"], "attempts": delivery["attempts"]}
+    
     def send_email(self, to_email: str, subject: str, body: str, html_body: str = None):
-        """Send email"""
+        """Send email (blocking; async callers should use send_email_async)"""
         if not self.configured:
             print("❌ Email service not configured")
             return {"success": False, "error": "Email service not configured"}
         
         try:
-            msg = MIMEMultipart('alternative')
-            msg['From'] = self.smtp_user
-            msg['To'] = to_email
-            msg['Subject'] = subject
-            
-            # Add text body
-            text_part = MIMEText(body, 'plain')
-            msg.attach(text_part)
+            msg = self._build_message(to_email, subject, body, html_body)
+            delivery = email_delivery.send_sync(self.credential, msg)
+            return self._result(delivery, to_email, subject)
             
-            # Add HTML body if provided
-            if html_body:
-                html_part = MIMEText(html_body, 'html')
-                msg.attach(html_part)
-            
-            # Send email
-            with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.smtp_user, self.smtp_password)
-                server.send_message(msg)
-            
-            print(f"✅ Email sent successfully to {to_email}")
-            return {
-                "success": True,
-                "message": f"Email sent to {to_email}",
-                "subject": subject
-            }
+        except Exception as e:
+            print(f"❌ Failed to send email: {e}")
+            return {"success": False, "error": str(e)}
+    
+    async def send_email_async(self, to_email: str, subject: str, body: str, html_body: str = None):
+        """Send email through the shared async delivery queue"""
+        if not self.configured:
+            print("❌ Email service not configured")
+            return {"success": False, "error": "Email service not configured"}
+        
+        try:
+            msg = self._build_message(to_email, subject, body, html_body)
+            delivery = await email_delivery.send(self.credential, msg)
+            return self._result(delivery, to_email, subject)
             
         except Exception as e:
             print(f"❌ Failed to send email: {e}")
             return {"success": False, "error": str(e)}
+    
+    async def send_html_email(self, to_email: str, subject: str, html_content: str) -> bool:
+        """Send an HTML email; returns whether it was delivered"""
+        text_body = re.sub(r'<[^>]+>', '', html_content)
+        result = await self.send_email_async(to_email, subject, text_body, html_body=html_content)
+        return result.get("success", False)
 
 # Global email service instance
 email_service = EmailService()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Agent Memory Test
+Checks AgentProcessor's conversation memory on a migrated database (turn
+rows plus the compact context row) and on one where agent_conversation_turns
+can't be created, where turns must keep going to the agent_memory blob.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sys
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+logging.disable(logging.CRITICAL)
+
+from core.agent_processor import AgentProcessor, MEMORY_HISTORY_LIMIT
+from core.agent_schema import AGENT_RUNTIME_SCHEMA
+
+
+class FakeConnection:
+    """Just enough of asyncpg for the memory queries, over plain lists and dicts"""
+
+    def __init__(self, db):
+        self.db = db
+
+    async def execute(self, sql, *args):
+        if sql is AGENT_RUNTIME_SCHEMA:
+            if not self.db.can_create:
+                raise PermissionError("permission denied for schema public")
+            self.db.turns = self.db.turns if self.db.turns is not None else []
+        elif "INSERT INTO agent_conversation_turns" in sql:
+            if self.db.turns is None:
+                raise LookupError('relation "agent_conversation_turns" does not exist')
+            self.db.turns.append((args[0], args[1], args[2], datetime.now()))
+        elif "INSERT INTO agent_memory" in sql:
+            self.db.memory.setdefault((args[0], args[1]), ("{}", args[2]))
+        elif "UPDATE agent_memory" in sql:
+            self.db.memory[(args[0], args[1])] = (args[2], args[3])
+        else:
+            raise AssertionError(sql)
+
+    async def fetch(self, sql, agent_id, user_id, limit):
+        if self.db.turns is None:
+            raise LookupError('relation "agent_conversation_turns" does not exist')
+        rows = [{"turn_data": data, "created_at": created}
+                for a, u, data, created in self.db.turns if (a, u) == (agent_id, user_id)]
+        return list(reversed(rows))[:limit]
+
+    async def fetchrow(self, sql, agent_id, user_id):
+        row = self.db.memory.get((agent_id, user_id))
+        return {"memory_data": row[0], "updated_at": row[1]} if row else None
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield
+
+
+class FakeDatabase:
+    def __init__(self, can_create, turns=None):
+        self.can_create = can_create
+        self.turns = turns
+        self.memory = {}
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield FakeConnection(self)
+
+
+def legacy_blob(count):
+    history = [{"user_input": f"old {i}", "agent_response": f"reply {i}"} for i in range(count)]
+    return json.dumps({"conversation_history": history, "context": {"tone": "formal"}})
+
+
+async def say(processor, text, **result):
+    await processor._update_agent_memory("agent-1", "user-1", text, {"message": f"re: {text}", **result})
+
+
+async def test_unmigrated_database_keeps_blob():
+    print("\n🗄️ Without the turns table, memory stays in the agent_memory blob")
+    db = FakeDatabase(can_create=False)
+    db.memory[("agent-1", "user-1")] = (legacy_blob(3), datetime.now())
+    processor = AgentProcessor(db, automation_engine=None)
+
+    memory = await processor._fetch_agent_memory("agent-1", "user-1")
+    assert [t["user_input"] for t in memory["conversation_history"]] == ["old 0", "old 1", "old 2"], memory
+    assert memory["context"] == {"tone": "formal"}
+
+    await say(processor, "new 1")
+    await say(processor, "new 2", status="preview_ready", workflow_id="wf_1")
+    memory = await processor._fetch_agent_memory("agent-1", "user-1")
+    assert [t["user_input"] for t in memory["conversation_history"]][-2:] == ["new 1", "new 2"]
+    assert len(memory["conversation_history"]) == 5
+    assert memory["context"]["tone"] == "formal"
+    assert memory["context"]["active_email_workflow"]["workflow_id"] == "wf_1"
+
+    # The blob stays bounded like the turn reads
+    for i in range(MEMORY_HISTORY_LIMIT):
+        await say(processor, f"bulk {i}")
+    blob = json.loads(db.memory[("agent-1", "user-1")][0])
+    assert len(blob["conversation_history"]) == MEMORY_HISTORY_LIMIT
+    print("   ✅ passed")
+
+
+async def test_table_created_on_first_use():
+    print("\n🧱 The turns table is created on first use and turns go there")
+    db = FakeDatabase(can_create=True)
+    db.memory[("agent-1", "user-1")] = (legacy_blob(2), datetime.now())
+    processor = AgentProcessor(db, automation_engine=None)
+
+    await say(processor, "hello")
+    assert db.turns is not None and len(db.turns) == 1
+    blob = json.loads(db.memory[("agent-1", "user-1")][0])
+    assert len(blob["conversation_history"]) == 2  # left for the migration
+
+    memory = await processor._fetch_agent_memory("agent-1", "user-1")
+    assert [t["user_input"] for t in memory["conversation_history"]] == ["old 0", "old 1", "hello"]
+    assert await processor.ensure_schema()
+    print("   ✅ passed")
+
+
+async def main():
+    print("🧪 Agent Memory Test")
+    print("=" * 50)
+    await test_unmigrated_database_keeps_blob()
+    await test_table_created_on_first_use()
+    print("\n🎉 All agent memory tests passed")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Bulk Load Test
+Checks the row batching behind the Postgres/MySQL bulkInsert operation:
+lists, generators and async iterators are consumed in fixed-size batches,
+columns come from the first object row, conflict options are validated and
+explicit rows win over the automation engine's input_data.
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from core.bulk_load import RowBatches, bulk_rows_source, conflict_options
+
+
+async def collect(batches: RowBatches):
+    await batches.prepare()
+    return [batch async for batch in batches]
+
+
+async def test_sources_and_batches():
+    print("\n📦 Every row source streams in fixed-size batches")
+
+    def generator():
+        for i in range(7):
+            yield {"id": i, "name": f"row {i}", "note": ""}
+
+    async def async_generator():
+        for row in generator():
+            yield row
+
+    csv_result = {"success": True, "data": list(generator())}
+    for source in (list(generator()), generator(), async_generator(),
+                   bulk_rows_source({}, {"input_data": csv_result})):
+        batches = RowBatches(source, batch_size=3, empty_as_null=True)
+        result = await collect(batches)
+        assert batches.columns == ["id", "name", "note"]
+        assert [len(batch) for batch in result] == [3, 3, 1]
+        assert result[2][0] == (6, "row 6", None)
+        assert batches.row_count == 7 and batches.batch_count == 3
+    print("   ✅ passed")
+
+
+async def test_sequence_rows_need_columns():
+    print("\n🧾 Sequence rows are checked against the column list")
+    rows = [[1, "a"], [2, "b"]]
+    assert await collect(RowBatches(rows, columns=["id", "name"])) == [[(1, "a"), (2, "b")]]
+    for columns in (None, ["id"]):
+        try:
+            await collect(RowBatches(rows, columns=columns))
+        except ValueError as e:
+            print(f"   rejected: {e}")
+        else:
+            raise AssertionError("mismatched rows were accepted")
+    print("   ✅ passed")
+
+
+def test_conflict_options():
+    print("\n🔁 Upsert options")
+    columns = ["id", "email", "name"]
+    assert conflict_options({}, columns) == ("error", [], ["id", "email", "name"])
+    assert conflict_options({"onConflict": "update", "conflictColumns": ["id"]}, columns) == \
+        ("update", ["id"], ["email", "name"])
+    for bad in ({"onConflict": "merge"}, {"onConflict": "update", "conflictColumns": ["missing"]}):
+        try:
+            conflict_options(bad, columns)
+        except ValueError:
+            continue
+        raise AssertionError(f"{bad} was accepted")
+    print("   ✅ passed")
+
+
+def test_rows_source():
+    print("\n🎯 Explicit rows win over input_data")
+    rows = [{"id": 1}, {"id": 2}]
+    parameters = {"table": "users", "rows": rows}
+    # The engine always passes the node's own parameters as input_data
+    assert bulk_rows_source(parameters, {"input_data": [parameters]}) == rows
+    assert bulk_rows_source({"table": "users", "values": rows}, {"input_data": [{"id": 9}]}) == rows
+
+    upstream = [{"id": 3}]
+    assert bulk_rows_source({"table": "users"}, {"input_data": upstream}) == upstream
+    own = {"table": "users"}
+    assert bulk_rows_source(own, {"input_data": [own]}) == []
+    assert bulk_rows_source({}, {"input_data": [{}]}) == []
+    print("   ✅ passed")
+
+
+async def main():
+    print("🧪 Bulk Load Test")
+    print("=" * 50)
+    await test_sources_and_batches()
+    await test_sequence_rows_need_columns()
+    test_conflict_options()
+    test_rows_source()
+    print("\n🎉 All bulk load tests passed")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
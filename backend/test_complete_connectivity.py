@@ -35,7 +35,7 @@ async def test_complete_automation_connectivity():
         # Initialize all drivers
         print("🔧 Initializing universal driver system...")
         try:
-            driver_registry = await initialize_universal_drivers()
+            driver_registry = await initialize_universal_drivers(eager=True)
             print(f"✅ Driver initialization completed")
             print(f"   • Driver registry: {len(driver_registry)} entries")
             
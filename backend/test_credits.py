@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Credit Ledger Test
+Checks the buffered credit_logs writer behind CreditManager: rows are
+written in COPY batches by size or interval, failed writes are retried
+without losing rows, and close() flushes what is left. Also checks that the
+expired-reservation sweep runs from startup.
+"""
+
+import asyncio
+import os
+import sys
+from contextlib import asynccontextmanager
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import core.credits as credits
+from core.credits import CreditLedgerWriter, CreditManager, LEDGER_COLUMNS
+
+
+class RecordingPool:
+    """Collects copy_records_to_table calls; can be told to fail the next N"""
+
+    def __init__(self):
+        self.copies = []
+        self.fail_next = 0
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self
+
+    async def copy_records_to_table(self, table, records, columns):
+        if self.fail_next:
+            self.fail_next -= 1
+            raise ConnectionError("connection reset")
+        assert table == "credit_logs" and tuple(columns) == LEDGER_COLUMNS
+        self.copies.append(list(records))
+
+
+async def test_size_and_interval_flush():
+    print("\n📒 Rows are written in batches, not one INSERT per charge")
+    pool = RecordingPool()
+    ledger = CreditLedgerWriter(pool, batch_size=100, flush_interval=0.2)
+    for i in range(250):
+        ledger.append("user-1", -1, "workflow_execution", "automation_engine")
+    await asyncio.sleep(0.05)
+    # A full batch wakes the writer well before the interval; it drains everything buffered
+    assert [len(batch) for batch in pool.copies] == [100, 100, 50], [len(b) for b in pool.copies]
+
+    ledger.append("user-2", 5, "top_up")
+    await asyncio.sleep(0.3)
+    assert sum(map(len, pool.copies)) == 251
+    assert pool.copies[-1][-1][:3] == ("user-2", 5, "top_up")
+    await ledger.close()
+    print(f"   {ledger.get_stats()}")
+    print("   ✅ passed")
+
+
+async def test_failed_write_is_retried():
+    print("\n🔁 A failed COPY keeps its rows for the next flush")
+    pool = RecordingPool()
+    ledger = CreditLedgerWriter(pool, batch_size=10, flush_interval=60)
+    for i in range(25):
+        ledger.append("user-1", -i, "charge")
+    pool.fail_next = 1
+    assert await ledger.flush() == 0
+    assert ledger.get_stats()["pending"] == 25 and ledger.failures == 1
+
+    assert await ledger.flush() == 25
+    changes = [row[1] for batch in pool.copies for row in batch]
+    assert changes == [-i for i in range(25)], changes
+    await ledger.close()
+    print("   ✅ passed")
+
+
+async def test_close_flushes():
+    print("\n🔌 close() writes whatever is still buffered")
+    pool = RecordingPool()
+    ledger = CreditLedgerWriter(pool, batch_size=1000, flush_interval=60)
+    for i in range(3):
+        ledger.append("user-1", -2, "charge")
+    assert pool.copies == []
+    await ledger.close()
+    assert [len(batch) for batch in pool.copies] == [3]
+    print("   ✅ passed")
+
+
+async def test_sweeper_runs_without_reservations():
+    print("\n🧹 Expired holds are swept from startup, before any reserve()")
+    pool = RecordingPool()
+    sweeps = []
+
+    async def fetch(sql, *args):
+        sweeps.append(sql)
+        return [{"user_id": "user-1", "holds": 2}] if len(sweeps) == 1 else []
+
+    async def table_exists(sql, *args):
+        assert sql == credits.RESERVATIONS_TABLE_SQL
+        return True
+
+    pool.fetch = fetch
+    pool.fetchval = table_exists
+    credits.RESERVATION_SWEEP_INTERVAL = 0.02
+    manager = CreditManager(pool, CreditLedgerWriter(pool, flush_interval=60))
+    manager.start()
+    await asyncio.sleep(0.1)
+    await manager.close()
+    assert len(sweeps) >= 2 and manager.stats["expired_released"] == 2, (sweeps, manager.stats)
+    print("   ✅ passed")
+
+
+async def test_no_sweep_before_migration():
+    print("\n🚧 Without credit_reservations the sweep doesn't run")
+    pool = RecordingPool()
+    sweeps = []
+
+    async def fetch(sql, *args):
+        sweeps.append(sql)
+        raise AssertionError('relation "credit_reservations" does not exist')
+
+    async def table_missing(sql, *args):
+        return False
+
+    pool.fetch = fetch
+    pool.fetchval = table_missing
+    credits.RESERVATION_SWEEP_INTERVAL = 0.02
+    manager = CreditManager(pool, CreditLedgerWriter(pool, flush_interval=60))
+    manager.start()
+    await asyncio.sleep(0.1)
+    assert sweeps == [] and manager._sweeper.done()
+    await manager.close()
+    print("   ✅ passed")
+
+
+async def main():
+    print("🧪 Credit Ledger Test")
+    print("=" * 50)
+    await test_size_and_interval_flush()
+    await test_failed_write_is_retried()
+    await test_close_flushes()
+    await test_sweeper_runs_without_reservations()
+    await test_no_sweep_before_migration()
+    print("\n🎉 All credit ledger tests passed")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+CSV Driver Test
+Checks CsvDriver's streaming mode (chunked filter/transform output and
+byte-position paging) against the in-memory path, and every join strategy (hash,
+grace_hash, sort_merge with multi-pass run merging) against a naive join.
+"""
+
+import asyncio
+import builtins
+import csv
+import logging
+import os
+import random
+import sys
+import tempfile
+from collections import Counter
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+logging.disable(logging.CRITICAL)
+
+from mcp.drivers.universal.csv_driver import CsvDriver
+
+LEFT_HEADERS = ["id", "name", "tag"]
+RIGHT_HEADERS = ["id", "score", "tag"]
+
+
+def write_csv(path, headers, rows):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(headers)
+        writer.writerows(rows)
+
+
+def read_rows(path):
+    with open(path, newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def make_files(work_dir):
+    random.seed(11)
+    left = [[str(random.randint(0, 150)), f"name{i}", f"l{i}"] for i in range(400)]
+    right = [[str(random.randint(50, 200)), str(i), f"r{i}"] for i in range(300)]
+    left_path = os.path.join(work_dir, "left.csv")
+    right_path = os.path.join(work_dir, "right.csv")
+    write_csv(left_path, LEFT_HEADERS, left)
+    write_csv(right_path, RIGHT_HEADERS, right)
+    return left_path, right_path, left, right
+
+
+def naive_join(left, right, join_type):
+    """Nested-loop reference: right-hand values win on name collisions"""
+    headers = LEFT_HEADERS + [h for h in RIGHT_HEADERS if h not in LEFT_HEADERS]
+    rows = []
+    matched = set()
+    for l in left:
+        matches = [r for r in right if r[0] == l[0]]
+        if matches:
+            matched.add(l[0])
+            for r in matches:
+                row = dict(zip(LEFT_HEADERS, l))
+                row.update({h: v for h, v in zip(RIGHT_HEADERS, r) if h != "id"})
+                rows.append(row)
+        elif join_type in ("left", "outer"):
+            rows.append(dict(zip(LEFT_HEADERS, l)))
+    if join_type in ("right", "outer"):
+        rows += [dict(zip(RIGHT_HEADERS, r)) for r in right if r[0] not in matched]
+    return Counter(tuple(row.get(h, "") for h in headers) for row in rows)
+
+
+def as_counter(rows):
+    headers = LEFT_HEADERS + [h for h in RIGHT_HEADERS if h not in LEFT_HEADERS]
+    return Counter(tuple(row[h] for h in headers) for row in rows)
+
+
+async def test_streaming_matches_in_memory(driver, work_dir):
+    print("\n🌊 Streaming filter/transform write the same rows chunk by chunk")
+    left_path, _, left, _ = make_files(work_dir)
+    conditions = {"id": {"greater_than": 75}}
+
+    in_memory = await driver.execute("csv.filter", {"file_path": left_path, "filter_conditions": conditions})
+    streamed = await driver.execute("csv.filter", {
+        "file_path": left_path, "filter_conditions": conditions, "streaming": True,
+        "chunk_size": 7, "output_path": os.path.join(work_dir, "filtered.csv")
+    })
+    assert streamed["success"] and "data" not in streamed, streamed
+    assert streamed["input_rows"] == len(left)
+    assert read_rows(streamed["output_file"]) == in_memory["data"]
+    assert streamed["cursor"]["row_count"] == in_memory["filtered_count"]
+
+    transformed = await driver.execute("csv.transform", {
+        "file_path": left_path, "transformations": {"name": "upper"}, "streaming": True,
+        "chunk_size": 13, "output_path": os.path.join(work_dir, "upper.csv")
+    })
+    assert [row["name"] for row in read_rows(transformed["output_file"])] == [row[1].upper() for row in left]
+    print(f"   {streamed['output_rows']} of {streamed['input_rows']} rows kept")
+    print("   ✅ passed")
+
+
+async def test_streaming_pages(driver, work_dir):
+    print("\n📄 Streaming reads page through the file by byte position")
+    left_path, _, left, _ = make_files(work_dir)
+    pages, offset, position, rows = 0, 0, None, []
+    while offset is not None:
+        page = await driver.execute("csv.read", {"file_path": left_path, "streaming": True,
+                                                 "chunk_size": 64, "offset": offset, "position": position})
+        rows += page["data"]
+        offset, position = page["next_offset"], page["next_position"]
+        pages += 1
+    assert [[row[h] for h in LEFT_HEADERS] for row in rows] == left
+    assert pages == -(-len(left) // 64)
+
+    # The position alone decides where a page starts: earlier rows aren't re-read
+    first = await driver.execute("csv.read", {"file_path": left_path, "streaming": True, "chunk_size": 10})
+    resumed = await driver.execute("csv.read", {"file_path": left_path, "streaming": True, "chunk_size": 10,
+                                                "offset": 10, "position": first["next_position"]})
+    assert [row["name"] for row in resumed["data"]] == [f"name{i}" for i in range(10, 20)]
+
+    # Quoted newlines inside a field don't break the cursor
+    quoted_path = os.path.join(work_dir, "quoted.csv")
+    quoted = [[str(i), f"line one\nline two {i}", "t"] for i in range(25)]
+    write_csv(quoted_path, LEFT_HEADERS, quoted)
+    offset, position, rows = 0, None, []
+    while offset is not None:
+        page = await driver.execute("csv.read", {"file_path": quoted_path, "streaming": True,
+                                                 "chunk_size": 7, "offset": offset, "position": position})
+        rows += page["data"]
+        offset, position = page["next_offset"], page["next_position"]
+    assert [[row[h] for h in LEFT_HEADERS] for row in rows] == quoted
+
+    # max_rows caps the rows read across pages
+    head = await driver.execute("csv.read", {"file_path": left_path, "streaming": True, "chunk_size": 64,
+                                             "max_rows": 100})
+    assert head["row_count"] == 64 and head["has_more"]
+    capped = await driver.execute("csv.read", {"file_path": left_path, "streaming": True, "chunk_size": 64,
+                                               "offset": 64, "position": head["next_position"], "max_rows": 100})
+    assert capped["row_count"] == 36 and not capped["has_more"] and capped["next_position"] is None
+    print(f"   {len(left)} rows in {pages} pages")
+    print("   ✅ passed")
+
+
+async def test_streaming_needs_output_path(driver, work_dir):
+    print("\n📁 Streaming writes need an explicit output_path")
+    left_path, _, _, _ = make_files(work_dir)
+    result = await driver.execute("csv.filter", {"file_path": left_path, "streaming": True,
+                                                 "filter_conditions": {"id": {"greater_than": 75}}})
+    assert not result["success"] and "output_path" in result["error"], result
+    print("   ✅ passed")
+
+
+async def test_join_strategies(driver, work_dir):
+    print("\n🔗 Every join strategy matches a nested-loop join")
+    left_path, right_path, left, right = make_files(work_dir)
+    strategies = {
+        "hash": {"join_strategy": "hash"},
+        # A right side larger than the budget spills both sides into partitions
+        "grace_hash": {"join_strategy": "hash", "memory_budget_mb": 0.005},
+        # 50-row runs with a fan-in of 4 need more than one merge pass
+        "sort_merge": {"join_strategy": "sort_merge", "chunk_size": 50, "merge_fan_in": 4},
+    }
+    for join_type in ("inner", "left", "right", "outer"):
+        expected = naive_join(left, right, join_type)
+        for strategy, options in strategies.items():
+            output_path = os.path.join(work_dir, f"{strategy}_{join_type}.csv")
+            result = await driver.execute("csv.merge", {
+                "file_paths": [left_path, right_path], "merge_type": "join", "join_column": "id",
+                "join_type": join_type, "output_path": output_path, **options
+            })
+            assert result["success"], result
+            assert result["join_strategy"] == [strategy], result["join_strategy"]
+            assert as_counter(read_rows(output_path)) == expected, (strategy, join_type)
+            if strategy == "sort_merge":
+                assert result["join_stats"][0]["merge_passes"] >= 1, result["join_stats"]
+        print(f"   {join_type}: {sum(expected.values())} rows")
+    print("   ✅ passed")
+
+
+async def test_merge_passes_bound_open_runs(driver, work_dir):
+    print("\n🗂️ Sort-merge never opens more runs than the fan-in")
+    left_path, _, _, _ = make_files(work_dir)
+    options = {"encoding": "utf-8", "delimiter": ",", "chunk_size": 10, "merge_fan_in": 4}
+    stats = {"spill_files": 0, "merge_passes": 0}
+    runs_dir = tempfile.mkdtemp(dir=work_dir)
+
+    opened = 0
+    peak = 0
+    real_open = open
+
+    class TrackedFile:
+        def __init__(self, handle):
+            self.handle = handle
+
+        def __getattr__(self, name):
+            return getattr(self.handle, name)
+
+        def __iter__(self):
+            return iter(self.handle)
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            self.close()
+
+        def close(self):
+            nonlocal opened
+            if not self.handle.closed:
+                opened -= 1
+                self.handle.close()
+
+    def counting_open(path, *args, **kwargs):
+        nonlocal opened, peak
+        handle = real_open(path, *args, **kwargs)
+        if os.path.dirname(str(path)) != runs_dir:
+            return handle
+        opened += 1
+        peak = max(peak, opened)
+        return TrackedFile(handle)
+
+    builtins.open = counting_open
+    try:
+        runs = driver._sort_runs(left_path, 0, options, runs_dir, "left", 2, stats)
+    finally:
+        builtins.open = real_open
+
+    # 400 rows -> 40 runs -> 10 -> 3 -> 1
+    assert len(runs) == 1 and stats["merge_passes"] == 3, (runs, stats)
+    assert peak <= 5, peak  # fan-in inputs plus the run being written
+    assert sorted(os.listdir(runs_dir)) == [os.path.basename(runs[0])]
+    with open(runs[0], newline="") as f:
+        keys = [row[0] for row in csv.reader(f)]
+    assert keys == sorted(keys) and len(keys) == 400
+    print(f"   {stats['spill_files']} run files in {stats['merge_passes']} passes, at most {peak} open")
+    print("   ✅ passed")
+
+
+async def main():
+    print("🧪 CSV Driver Test")
+    print("=" * 50)
+    driver = CsvDriver()
+    with tempfile.TemporaryDirectory() as work_dir:
+        await test_streaming_matches_in_memory(driver, work_dir)
+        await test_streaming_pages(driver, work_dir)
+        await test_streaming_needs_output_path(driver, work_dir)
+        await test_join_strategies(driver, work_dir)
+        await test_merge_passes_bound_open_runs(driver, work_dir)
+    print("\n🎉 All CSV driver tests passed")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
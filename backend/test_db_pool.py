@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Database Driver Pool Test
+Checks the pool registry behind the Postgres/MySQL drivers with an in-memory
+pool that, like asyncpg, hands out a new proxy on every checkout: one pool
+per credential and event loop, bounded size, dead-connection replacement
+after idle health checks, bounded idle tracking, idle pool reaping and the
+statement cache.
+"""
+
+import asyncio
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import core.db_pool as db_pool
+from core.db_pool import ConnectionPoolRegistry, StatementCache, pool_key
+
+CONFIG = {"host": "db", "port": 5432, "database": "app", "user": "svc", "password": "secret"}
+
+
+class MemoryConnection:
+    def __init__(self, number):
+        self.number = number
+        self.alive = True
+
+
+class MemoryProxy:
+    """A fresh wrapper per checkout, like asyncpg's PoolConnectionProxy"""
+
+    def __init__(self, connection):
+        self._con = connection
+
+
+class MemoryPool:
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.opened = 0
+        self.idle = []
+        self.slots = asyncio.Semaphore(max_size)
+        self.closed = False
+        self.terminated = False
+
+    async def acquire(self):
+        await self.slots.acquire()
+        if self.idle:
+            return MemoryProxy(self.idle.pop())
+        self.opened += 1
+        return MemoryProxy(MemoryConnection(self.opened))
+
+    async def release(self, proxy):
+        if proxy._con.alive:
+            self.idle.append(proxy._con)
+        self.slots.release()
+
+
+class MemoryRegistry(ConnectionPoolRegistry):
+    dialect = "memory"
+
+    async def _open(self, config):
+        return MemoryPool(db_pool.POOL_MAX_SIZE)
+
+    async def _close(self, pool):
+        pool.closed = True
+
+    def _terminate(self, pool):
+        pool.terminated = True
+
+    def _raw(self, connection):
+        return connection._con
+
+    async def _ping(self, connection):
+        if not connection._con.alive:
+            raise ConnectionError("server closed the connection")
+
+    async def _discard(self, pool, connection):
+        connection._con.alive = False
+        await pool.release(connection)
+
+    def _sizes(self, pool):
+        return pool.opened, len(pool.idle)
+
+
+async def test_per_credential_bounded_pools():
+    print("\n🔐 One bounded pool per credential")
+    registry = MemoryRegistry()
+    db_pool.POOL_MAX_SIZE = 2
+
+    active = 0
+    peak = 0
+
+    async def query(config):
+        nonlocal active, peak
+        async with registry.connection(config):
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+    await asyncio.gather(*(query(CONFIG) for _ in range(8)))
+    await query({**CONFIG, "password": "rotated"})
+
+    stats = registry.get_stats()
+    assert stats["active_pools"] == 2, stats
+    assert peak <= 2, f"pool exceeded its size limit ({peak})"
+    pool = stats["pools"][pool_key(CONFIG)]
+    assert pool["acquisitions"] == 8 and pool["size"] == 2 and pool["in_use"] == 0
+    # Stats only carry opaque ids: nothing about the credential itself
+    assert not any(part in str(stats["pools"]) for part in ("svc", "app", "host"))
+    assert pool_key(CONFIG) != pool_key({**CONFIG, "password": "rotated"})
+    print(f"   {pool}")
+    await registry.close()
+    print("   ✅ passed")
+
+
+async def test_dead_connection_replaced():
+    print("\n🩺 Idle connections are health checked before reuse")
+    registry = MemoryRegistry()
+    db_pool.HEALTH_CHECK_INTERVAL = 0
+
+    async with registry.connection(CONFIG) as connection:
+        first = connection._con
+    first.alive = False  # server dropped it while idle
+
+    async with registry.connection(CONFIG) as connection:
+        assert connection._con is not first and connection._con.alive
+    pool = registry.get_stats()["pools"][pool_key(CONFIG)]
+    assert pool["health_checks"] == 1 and pool["health_check_failures"] == 1, pool
+    await registry.close()
+    print("   ✅ passed")
+
+
+async def test_idle_tracking_bounded():
+    print("\n📏 Idle times are kept per pooled connection, not per checkout")
+    registry = MemoryRegistry()
+    db_pool.POOL_MAX_SIZE = 2
+    db_pool.HEALTH_CHECK_INTERVAL = 30
+
+    async def query():
+        async with registry.connection(CONFIG):
+            await asyncio.sleep(0)
+
+    for _ in range(5):
+        await asyncio.gather(query(), query())
+    key = pool_key(CONFIG)
+    assert len(registry._idle_since.get(key)) == 2
+    await registry.close()
+    assert registry._idle_since.get(key) is None
+    print("   ✅ passed")
+
+
+async def test_idle_pools_reaped():
+    print("\n🧹 Unused pools are closed by the reaper")
+    registry = MemoryRegistry()
+    db_pool.POOL_IDLE_TIMEOUT = 0.02
+
+    async with registry.connection(CONFIG):
+        pass
+    pool = next(iter(registry._pools.values()))
+    await asyncio.sleep(0.1)
+    assert pool.closed and not registry._pools and not registry._reapers
+    await registry.close()
+    print("   ✅ passed")
+
+
+async def test_pools_are_per_loop():
+    print("\n🔁 Pools belong to the loop that opened them")
+    registry = MemoryRegistry()
+    db_pool.POOL_IDLE_TIMEOUT = 900
+    other = asyncio.new_event_loop()
+
+    async def borrow():
+        async with registry.connection(CONFIG):
+            return next(iter(registry._pools.current().values()))
+
+    def run_and_shut_down():
+        # Like asyncio.run(): cancel what is left (the reaper) and close, but never close() the registry
+        pool = other.run_until_complete(borrow())
+        tasks = asyncio.all_tasks(other)
+        for task in tasks:
+            task.cancel()
+        other.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        other.close()
+        return pool
+
+    # Another thread's loop opens its own pool and is closed without calling close()
+    with ThreadPoolExecutor(1) as executor:
+        orphan = await asyncio.get_running_loop().run_in_executor(executor, run_and_shut_down)
+
+    pool = await borrow()
+    assert pool is not orphan
+    assert orphan.terminated and not orphan.closed
+    assert registry.get_stats()["active_pools"] == 1
+    await registry.close()
+    assert pool.closed and not registry._pools
+    print("   ✅ passed")
+
+
+def test_statement_cache():
+    print("\n📝 Statement cache reuses SQL text per shape")
+    cache = StatementCache(max_entries=2)
+    built = []
+
+    def build(text):
+        built.append(text)
+        return text
+
+    assert cache.get(("select", "users"), lambda: build("SELECT * FROM users")) == "SELECT * FROM users"
+    cache.get(("select", "users"), lambda: build("unused"))
+    cache.get(("insert", "users"), lambda: build("INSERT"))
+    cache.get(("insert", "orders"), lambda: build("INSERT orders"))
+    assert built == ["SELECT * FROM users", "INSERT", "INSERT orders"]
+    stats = cache.get_stats()
+    assert stats["hits"] == 1 and stats["statements"] == 2
+    print(f"   {stats}")
+    print("   ✅ passed")
+
+
+async def main():
+    print("🧪 Database Driver Pool Test")
+    print("=" * 50)
+    await test_per_credential_bounded_pools()
+    await test_dead_connection_replaced()
+    await test_idle_tracking_bounded()
+    await test_idle_pools_reaped()
+    await test_pools_are_per_loop()
+    test_statement_cache()
+    print("\n🎉 All database pool tests passed")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
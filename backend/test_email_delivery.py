@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Email Delivery Service Test
+Runs the pooled async SMTP delivery against a local debugging SMTP server
+(no credentials or network needed) and checks session reuse and retries.
+"""
+
+import asyncio
+import os
+import sys
+import time
+from email.mime.text import MIMEText
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from core.email_delivery import EmailDeliveryService, SMTPCredential
+
+
+class DebuggingSMTPServer:
+    """Minimal plaintext SMTP sink (no STARTTLS): accepts every message, counts
+    connections, messages and AUTH attempts. The first `fail_first` DATA
+    commands are answered with a transient 451."""
+
+    def __init__(self, fail_first: int = 0):
+        self.fail_first = fail_first
+        self.connections = 0
+        self.messages = []
+        self.auth_attempts = 0
+        self.server = None
+        self.port = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        writer.write(b"220 localhost debugging server\r\n")
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            command = line.decode().strip().upper()
+            if command.startswith(("EHLO", "HELO")):
+                writer.write(b"250 localhost\r\n")
+            elif command.startswith("AUTH"):
+                self.auth_attempts += 1
+                writer.write(b"235 Authentication successful\r\n")
+            elif command.startswith(("MAIL", "RCPT", "RSET", "NOOP")):
+                writer.write(b"250 OK\r\n")
+            elif command == "DATA":
+                writer.write(b"354 End data with <CR><LF>.<CR><LF>\r\n")
+                await writer.drain()
+                data = []
+                while (chunk := await reader.readline()) not in (b".\r\n", b""):
+                    data.append(chunk)
+                if self.fail_first > 0:
+                    self.fail_first -= 1
+                    writer.write(b"451 Try again later\r\n")
+                else:
+                    self.messages.append(b"".join(data))
+                    writer.write(b"250 Queued\r\n")
+            elif command == "QUIT":
+                writer.write(b"221 Bye\r\n")
+                await writer.drain()
+                break
+            else:
+                writer.write(b"502 Not implemented\r\n")
+            await writer.drain()
+        writer.close()
+
+
+def build_message(index: int) -> MIMEText:
+    msg = MIMEText(f"Message body {index}")
+    msg["From"] = "automation@example.com"
+    msg["To"] = f"user{index}@example.com"
+    msg["Subject"] = f"Delivery test {index}"
+    return msg
+
+
+async def test_pooled_delivery():
+    print("\n📮 Pooled delivery (100 messages)")
+    server = DebuggingSMTPServer()
+    await server.start()
+    service = EmailDeliveryService()
+    credential = SMTPCredential("127.0.0.1", server.port, use_tls=False)
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(service.send(credential, build_message(i)) for i in range(100)))
+    elapsed = time.perf_counter() - started
+
+    stats = service.get_stats()
+    print(f"   delivered {sum(r['success'] for r in results)}/100 in {elapsed:.2f}s over "
+          f"{server.connections} SMTP connections")
+    print(f"   stats: {stats['pools']}")
+
+    assert all(r["success"] for r in results)
+    assert len(server.messages) == 100
+    assert server.connections <= service.sessions_per_credential
+
+    await service.close()
+    await server.stop()
+    print("   ✅ passed")
+
+
+async def test_transient_retry():
+    print("\n🔁 Retry on transient 451")
+    server = DebuggingSMTPServer(fail_first=2)
+    await server.start()
+    service = EmailDeliveryService()
+    service.retry_base_delay = 0.05
+    credential = SMTPCredential("127.0.0.1", server.port, use_tls=False)
+
+    result = await service.send(credential, build_message(0))
+    print(f"   result: {result}")
+    assert result["success"] and result["attempts"] == 3
+
+    await service.close()
+    await server.stop()
+    print("   ✅ passed")
+
+
+async def test_connection_refused():
+    print("\n🚫 Unreachable server fails after retries")
+    service = EmailDeliveryService()
+    service.retry_base_delay = 0.01
+    service.max_retries = 1
+    result = await service.send(SMTPCredential("127.0.0.1", 1, use_tls=False), build_message(0))
+    print(f"   result: {result}")
+    assert not result["success"] and result["attempts"] == 2
+    await service.close()
+    print("   ✅ passed")
+
+
+async def test_starttls_required():
+    print("\n🔒 use_tls never falls back to a plaintext login")
+    server = DebuggingSMTPServer()
+    await server.start()
+    service = EmailDeliveryService()
+    service.retry_base_delay = 0.01
+    credential = SMTPCredential("127.0.0.1", server.port, "user", "secret", use_tls=True)
+
+    result = await service.send(credential, build_message(0))
+    print(f"   result: {result}")
+    assert not result["success"] and "STARTTLS" in result["error"]
+    # Not a transient failure, and the password was never sent
+    assert result["attempts"] == 1 and server.auth_attempts == 0 and not server.messages
+
+    await service.close()
+    await server.stop()
+    print("   ✅ passed")
+
+
+async def main():
+    print("🧪 Email Delivery Service Test")
+    print("=" * 50)
+    await test_pooled_delivery()
+    await test_transient_retry()
+    await test_connection_refused()
+    await test_starttls_required()
+    print("\n🎉 All email delivery tests passed")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
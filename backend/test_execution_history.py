@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Execution History Test
+Checks keyset pagination and field projection for workflow execution
+history, the latency histograms behind the hourly execution rollups, and
+that agent executions are still logged before the rollup table exists.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import sqlite3
+import sys
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+logging.disable(logging.CRITICAL)
+
+from core.execution_history import (
+    encode_cursor, decode_cursor, project_fields, execution_histogram,
+    merge_histograms, histogram_percentile, summarize_rollup
+)
+from core.execution_history import INSERT_EXECUTION_SQL, LOG_EXECUTION_SQL
+from core.agent_processor import AgentProcessor
+from core.agent_schema import AGENT_RUNTIME_SCHEMA
+from mcp.simple_automation_engine import AutomationEngine
+
+
+def make_engine(executions: int):
+    """Just the SQLite side of AutomationEngine, filled with executions sharing timestamps"""
+    conn = sqlite3.connect(":memory:")
+    engine = SimpleNamespace(db_connection=conn)
+    AutomationEngine._init_automation_tables(engine)
+    rows = [(f"exec_{i:05d}", "wf_1" if i % 3 else "wf_2", "cron", json.dumps({"i": i}),
+             "completed", json.dumps({"success": True, "i": i}), f"2024-01-01T10:{i // 120:02d}:00")
+            for i in range(executions)]
+    conn.executemany("""
+        INSERT INTO workflow_executions
+        (execution_id, workflow_id, trigger_type, trigger_data, execution_status, execution_results, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, rows)
+    engine.get_workflow_execution_page = AutomationEngine.get_workflow_execution_page.__get__(engine)
+    return engine
+
+
+async def test_keyset_pages():
+    print("\n📄 Cursor pages cover every execution exactly once, newest first")
+    engine = make_engine(1000)
+    seen, cursor, pages = [], None, 0
+    while True:
+        page = await engine.get_workflow_execution_page("wf_1", limit=37, cursor=cursor)
+        seen += [(e["created_at"], e["execution_id"]) for e in page["executions"]]
+        pages += 1
+        if not page["has_more"]:
+            assert page["next_cursor"] is None
+            break
+        cursor = page["next_cursor"]
+
+    expected = engine.db_connection.execute("""
+        SELECT created_at, execution_id FROM workflow_executions WHERE workflow_id = 'wf_1'
+        ORDER BY created_at DESC, execution_id DESC
+    """).fetchall()
+    assert seen == expected, (len(seen), len(expected))
+    assert pages == -(-len(expected) // 37)
+    print(f"   {len(seen)} executions in {pages} pages")
+    print("   ✅ passed")
+
+
+async def test_projection():
+    print("\n✂️ Blobs are opt-in")
+    engine = make_engine(10)
+    page = await engine.get_workflow_execution_page("wf_1", limit=5)
+    first = page["executions"][0]
+    assert "results" not in first and "trigger_data" not in first and first["status"] == "completed"
+
+    page = await engine.get_workflow_execution_page("wf_1", limit=5, fields="results")
+    first = page["executions"][0]
+    assert set(first) == {"execution_id", "created_at", "results"} and first["results"]["success"]
+
+    for bad in ({"fields": "password"}, {"cursor": "not-a-cursor"}):
+        try:
+            await engine.get_workflow_execution_page("wf_1", **bad)
+        except ValueError:
+            continue
+        raise AssertionError(f"{bad} was accepted")
+    print("   ✅ passed")
+
+
+def test_cursor_round_trip():
+    print("\n🔖 Cursor encoding")
+    cursor = encode_cursor("2024-01-01T10:00:00.123456+00:00", "0b8e6f1e-2c8a-4a55-9c1f-1f0a3d9b7a10")
+    assert decode_cursor(cursor) == ("2024-01-01T10:00:00.123456+00:00", "0b8e6f1e-2c8a-4a55-9c1f-1f0a3d9b7a10")
+    assert project_fields(None, ("id", "input_data", "created_at"), ("input_data",), ("id",)) == ["id", "created_at"]
+    print("   ✅ passed")
+
+
+def test_rollup_percentiles():
+    print("\n📊 Rollup percentiles track the exact ones")
+    random.seed(7)
+    hours = []
+    durations = []
+    for _ in range(24):
+        hour = [int(random.lognormvariate(6, 1.2)) for _ in range(500)]
+        durations += hour
+        hours.append(merge_histograms(execution_histogram(ms) for ms in hour))
+    histogram = merge_histograms(hours)
+    durations.sort()
+    for q in (0.5, 0.95):
+        exact = durations[int(q * len(durations)) - 1]
+        estimate = histogram_percentile(histogram, q, max(durations))
+        assert abs(estimate - exact) / exact < 0.1, (q, exact, estimate)
+        print(f"   p{int(q * 100)}: exact {exact}ms, rollup {estimate}ms")
+
+    summary = summarize_rollup(12, 3, 0, 0, None, execution_histogram(None))
+    assert summary["error_rate"] == 0.25 and summary["p95_execution_time_ms"] is None
+    print("   ✅ passed")
+
+
+class StatementLog:
+    """A pool whose connections record statements; DDL fails unless allowed"""
+
+    def __init__(self, can_create):
+        self.can_create = can_create
+        self.statements = []
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self
+
+    async def execute(self, sql, *args):
+        if sql is AGENT_RUNTIME_SCHEMA and not self.can_create:
+            raise PermissionError("permission denied for schema public")
+        self.statements.append((sql, args))
+
+
+async def test_logging_without_rollups():
+    print("\n🧾 Executions are logged with or without the rollup table")
+    for can_create, expected_sql, arg_count in ((False, INSERT_EXECUTION_SQL, 8), (True, LOG_EXECUTION_SQL, 9)):
+        pool = StatementLog(can_create)
+        processor = AgentProcessor(pool, automation_engine=None)
+        await processor._log_agent_execution("agent-1", "user-1", "manual", {"q": 1}, {}, "success",
+                                             execution_time_ms=120)
+        logged = [(sql, args) for sql, args in pool.statements if sql is not AGENT_RUNTIME_SCHEMA]
+        assert len(logged) == 1 and logged[0][0] is expected_sql, logged
+        assert len(logged[0][1]) == arg_count
+    print("   ✅ passed")
+
+
+async def main():
+    print("🧪 Execution History Test")
+    print("=" * 50)
+    await test_keyset_pages()
+    await test_projection()
+    test_cursor_round_trip()
+    test_rollup_percentiles()
+    await test_logging_without_rollups()
+    print("\n🎉 All execution history tests passed")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
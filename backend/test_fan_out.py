@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Loop Fan-out Test
+Checks the bounded-concurrency fan-out behind LoopItemsDriver: in-flight
+iterations never exceed the limit, ordered and unordered collection, failure
+cancellation and the expected speed-up for I/O-bound loop bodies, plus
+splitInBatches taking its items from parameters before input_data.
+"""
+
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+# Generated drivers import universal_driver_manager from the mcp folder, as when the manager loads them
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "mcp"))
+
+from core.fan_out import bounded_map, batched
+from mcp.drivers.universal.data_processor_driver import DataProcessorDriverDriver
+
+
+async def test_ordering_and_limit():
+    print("\n🚦 In-flight limit and result ordering")
+    active = 0
+    peak = 0
+
+    async def body(index, item):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(random.uniform(0, 0.005))
+        active -= 1
+        return item * 2
+
+    ordered = [index async for index, _ in bounded_map(body, range(200), concurrency=8)]
+    assert ordered == list(range(200)) and peak <= 8, peak
+
+    peak = 0
+    results = [result async for _, result in bounded_map(body, range(200), concurrency=8, ordered=False)]
+    assert sorted(results) == [i * 2 for i in range(200)] and peak <= 8
+    print(f"   peak in flight {peak}")
+    print("   ✅ passed")
+
+
+async def test_failure_cancels_in_flight():
+    print("\n🛑 A failing iteration cancels the rest")
+    started = []
+    cancelled = []
+
+    async def body(index, item):
+        started.append(index)
+        try:
+            if index == 3:
+                raise RuntimeError("node failed")
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.append(index)
+            raise
+
+    try:
+        async for _ in bounded_map(body, range(100), concurrency=5):
+            pass
+    except RuntimeError:
+        pass
+    else:
+        raise AssertionError("failure was swallowed")
+    assert len(started) == 5 and len(cancelled) == 4, (started, cancelled)
+    print("   ✅ passed")
+
+
+async def test_round_trips():
+    print("\n⚡ 5000 simulated API calls at concurrency 100")
+
+    async def call_api(index, row):
+        await asyncio.sleep(0.005)
+        return row
+
+    start = time.perf_counter()
+    count = 0
+    async for _ in bounded_map(call_api, range(5000), concurrency=100):
+        count += 1
+    elapsed = time.perf_counter() - start
+    # Sequentially this is 5000 * 5ms = 25s; 50 round trips should take well under 3s
+    assert count == 5000 and elapsed < 3, elapsed
+    print(f"   {count} calls in {elapsed:.2f}s")
+    print("   ✅ passed")
+
+
+def test_batched():
+    print("\n📦 Batch sizing")
+    assert list(batched(range(7), 3)) == [[0, 1, 2], [3, 4, 5], [6]]
+    print("   ✅ passed")
+
+
+async def test_split_in_batches_items():
+    print("\n🧺 splitInBatches prefers explicit items over input_data")
+    driver = DataProcessorDriverDriver()
+    parameters = {"items": list(range(25)), "batchSize": 10, "batchIndex": 2}
+    # The engine passes the node's own parameters as input_data
+    result = await driver.execute_splitInBatches(parameters, {"input_data": [parameters]})
+    assert result["data"] == [20, 21, 22, 23, 24] and result["done"], result
+
+    upstream = await driver.execute_splitInBatches({"batchSize": 2, "returnAll": True},
+                                                   {"input_data": [1, 2, 3]})
+    assert upstream["batches"] == [[1, 2], [3]], upstream
+    own = {"batchSize": 2}
+    assert (await driver.execute_splitInBatches(own, {"input_data": [own]}))["item_count"] == 0
+    print("   ✅ passed")
+
+
+async def main():
+    print("🧪 Loop Fan-out Test")
+    print("=" * 50)
+    await test_ordering_and_limit()
+    await test_failure_cancels_in_flight()
+    await test_round_trips()
+    test_batched()
+    await test_split_in_batches_items()
+    print("\n🎉 All fan-out tests passed")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -33,7 +33,7 @@ class FinalAutomationValidation:
             print("   ✅ AutomationEngine created")
             
             # Initialize universal drivers
-            await self.engine.universal_driver_manager.load_all_drivers()
+            await self.engine.universal_driver_manager.load_all_drivers(eager=True)
             driver_count = len(self.engine.universal_driver_manager.loaded_drivers)
             print(f"   ✅ Universal drivers initialized: {driver_count} drivers")
             
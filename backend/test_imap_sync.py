@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+IMAP Sync Test
+Runs the incremental IMAP reader behind EmailReadImapDriver against a local
+IMAP stand-in: UID tracking across runs, one batched UID FETCH per batch,
+UIDVALIDITY resets, pooled connections and IDLE push.
+"""
+
+import asyncio
+import os
+import re
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import core.imap_sync as imap_sync
+from core.imap_sync import ImapSync, ImapConnectionPool, MemoryUidStore
+
+
+def make_message(number: int) -> bytes:
+    return (f"From: sender{number}@example.com\r\nTo: ops@example.com\r\n"
+            f"Subject: Invoice {number}\r\nMessage-ID: <{number}@example.com>\r\n"
+            f"Date: Mon, 1 Jan 2024 10:00:00 +0000\r\n\r\nBody of message {number}\r\n").encode()
+
+
+class LocalImapServer:
+    """Just enough IMAP4rev1 (LOGIN, SELECT, UID SEARCH/FETCH/STORE, EXPUNGE, NOOP, IDLE) for one mailbox;
+    NOOP reports EXISTS when the mailbox grew since the session last looked"""
+
+    def __init__(self):
+        self.uidvalidity = 1
+        self.next_uid = 1
+        self.messages = []  # [uid, flags, raw]
+        self.commands = []
+        self.idlers = []
+        self.logins = 0
+        self.capabilities = "IMAP4rev1 IDLE"
+        self.server = None
+
+    def deliver(self, raw: bytes, flags=()):
+        self.messages.append([self.next_uid, set(flags), raw])
+        self.next_uid += 1
+        for writer in self.idlers:
+            writer.write(f"* {len(self.messages)} EXISTS\r\n".encode())
+
+    async def start(self) -> int:
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    def matching(self, uid_set: str):
+        highest = self.messages[-1][0] if self.messages else 0
+        wanted = set()
+        for part in uid_set.split(","):
+            low, _, high = part.partition(":")
+            low = int(low)
+            high = highest if high == "*" else int(high or low)
+            wanted.update(range(min(low, high), max(low, high) + 1))
+        return [(seq + 1, m) for seq, m in enumerate(self.messages) if m[0] in wanted]
+
+    async def handle(self, reader, writer):
+        writer.write(b"* OK IMAP stand-in ready\r\n")
+        reported = 0  # mailbox size this session last saw
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            tag, command, *rest = line.decode().rstrip("\r\n").split(" ", 2)
+            args = rest[0] if rest else ""
+            command = command.upper()
+            self.commands.append(f"{command} {args}".strip())
+            out = []
+
+            if command == "CAPABILITY":
+                out.append(f"* CAPABILITY {self.capabilities}")
+            elif command == "LOGIN":
+                self.logins += 1
+            elif command in ("SELECT", "EXAMINE"):
+                reported = len(self.messages)
+                out += [f"* {len(self.messages)} EXISTS", f"* OK [UIDVALIDITY {self.uidvalidity}] UIDs valid"]
+            elif command == "UID":
+                sub, _, params = args.partition(" ")
+                sub = sub.upper()
+                self.commands[-1] = f"UID {sub}"
+                if sub == "SEARCH":
+                    tokens = params.split()
+                    uids = [m[0] for m in self.messages]
+                    if "UID" in tokens:
+                        uids = [uid for _, (uid, _, _) in self.matching(tokens[tokens.index("UID") + 1])]
+                    if "UNSEEN" in tokens:
+                        seen = {m[0] for m in self.messages if "\\Seen" in m[1]}
+                        uids = [uid for uid in uids if uid not in seen]
+                    out.append("* SEARCH " + " ".join(map(str, uids)))
+                elif sub == "FETCH":
+                    uid_set, _, items = params.partition(" ")
+                    for seq, (uid, flags, raw) in self.matching(uid_set):
+                        if "HEADER.FIELDS" in items:
+                            literal = raw.split(b"\r\n\r\n")[0] + b"\r\n\r\n"
+                            head = (f"* {seq} FETCH (UID {uid} FLAGS ({' '.join(sorted(flags))}) "
+                                    f"RFC822.SIZE {len(raw)} BODY[HEADER.FIELDS (FROM)] {{{len(literal)}}}")
+                        else:
+                            literal = raw
+                            head = f"* {seq} FETCH (UID {uid} BODY[] {{{len(literal)}}}"
+                        writer.write(head.encode() + b"\r\n" + literal + b")\r\n")
+                elif sub == "STORE":
+                    uid_set, _, flag_spec = params.partition(" ")
+                    new_flags = re.search(r"\((.*)\)", flag_spec).group(1).split()
+                    for _, message in self.matching(uid_set):
+                        message[1].update(new_flags)
+            elif command == "EXPUNGE":
+                for seq in range(len(self.messages), 0, -1):
+                    if "\\Deleted" in self.messages[seq - 1][1]:
+                        del self.messages[seq - 1]
+                        out.append(f"* {seq} EXPUNGE")
+            elif command == "NOOP":
+                if len(self.messages) != reported:
+                    reported = len(self.messages)
+                    out.append(f"* {reported} EXISTS")
+            elif command == "IDLE":
+                writer.write(b"+ idling\r\n")
+                self.idlers.append(writer)
+                await reader.readline()  # DONE
+                self.idlers.remove(writer)
+            elif command == "LOGOUT":
+                writer.write(f"* BYE\r\n{tag} OK LOGOUT completed\r\n".encode())
+                await writer.drain()
+                break
+
+            for response in out:
+                writer.write(response.encode() + b"\r\n")
+            writer.write(f"{tag} OK {command} completed\r\n".encode())
+            await writer.drain()
+        writer.close()
+
+
+async def test_incremental_sync(server: LocalImapServer, credential: dict):
+    print("\n📥 Only new messages are fetched, headers and bodies in one batch each")
+    for number in range(1, 6):
+        server.deliver(make_message(number), flags=("\\Seen",) if number <= 2 else ())
+    sync = ImapSync(ImapConnectionPool(), MemoryUidStore())
+
+    server.commands.clear()
+    first = await sync.fetch_new(credential, "INBOX", post_process="read")
+    assert [m["uid"] for m in first["messages"]] == [3, 4, 5]
+    assert b"Body of message 3" in first["messages"][0]["raw"]
+    assert server.commands.count("UID FETCH") == 2, server.commands
+    assert all("\\Seen" in m[1] for m in server.messages)
+
+    server.commands.clear()
+    second = await sync.fetch_new(credential, "INBOX", post_process="read")
+    assert second["messages"] == [] and "UID FETCH" not in server.commands
+
+    server.deliver(make_message(6))
+    server.deliver(make_message(7))
+    third = await sync.fetch_new(credential, "INBOX", criteria="ALL", fetch_bodies=False)
+    assert [m["uid"] for m in third["messages"]] == [6, 7] and third["messages"][0]["raw"] is None
+    bodies = await sync.fetch_bodies(credential, "INBOX", [7])
+    assert b"Body of message 7" in bodies[7]
+
+    stats = sync.pool.get_stats()
+    assert stats["opened"] == 1 and server.logins == 1, stats
+    print(f"   pool {stats}")
+    print("   ✅ passed")
+    return sync
+
+
+async def test_uidvalidity_reset(server: LocalImapServer, credential: dict, sync: ImapSync):
+    print("\n🔄 A new UIDVALIDITY resyncs the mailbox")
+    server.uidvalidity = 2
+    result = await sync.fetch_new(credential, "INBOX", criteria="ALL")
+    assert len(result["messages"]) == len(server.messages) and result["uidvalidity"] == 2
+    print("   ✅ passed")
+
+
+async def test_idle_push(server: LocalImapServer, credential: dict, sync: ImapSync):
+    print("\n🔔 IDLE wakes up on new mail instead of polling")
+    start = time.perf_counter()
+    assert await sync.wait_for_new(credential, "INBOX", timeout=0.3) is False
+    assert time.perf_counter() - start >= 0.3
+
+    waiter = asyncio.create_task(sync.wait_for_new(credential, "INBOX", timeout=10))
+    await asyncio.sleep(0.2)
+    start = time.perf_counter()
+    server.deliver(make_message(8))
+    assert await waiter is True
+    assert time.perf_counter() - start < 2
+    new = await sync.fetch_new(credential, "INBOX", criteria="ALL")
+    assert [m["uid"] for m in new["messages"]] == [8]
+    print("   ✅ passed")
+
+
+async def test_noop_fallback(server: LocalImapServer, credential: dict):
+    print("\n⏳ Without IDLE, NOOP polling waits for mail that is actually new")
+    server.capabilities = "IMAP4rev1"
+    server.commands.clear()
+    imap_sync.IMAP_HEALTH_CHECK_INTERVAL = 0.05
+    sync = ImapSync(ImapConnectionPool(), MemoryUidStore())
+    try:
+        # The EXISTS from SELECT alone must not count as new mail
+        start = time.perf_counter()
+        assert await sync.wait_for_new(credential, "INBOX", timeout=0.3) is False
+        assert time.perf_counter() - start >= 0.3
+
+        waiter = asyncio.create_task(sync.wait_for_new(credential, "INBOX", timeout=10))
+        await asyncio.sleep(0.1)
+        server.deliver(make_message(9))
+        assert await asyncio.wait_for(waiter, 2) is True
+        assert "IDLE" not in server.commands
+    finally:
+        await sync.pool.close()
+        server.capabilities = "IMAP4rev1 IDLE"
+    print("   ✅ passed")
+
+
+async def main():
+    print("🧪 IMAP Sync Test")
+    print("=" * 50)
+    server = LocalImapServer()
+    port = await server.start()
+    credential = {"host": "127.0.0.1", "port": port, "user": "ops", "password": "secret", "ssl": False}
+    try:
+        sync = await test_incremental_sync(server, credential)
+        await test_uidvalidity_reset(server, credential, sync)
+        await test_idle_push(server, credential, sync)
+        await test_noop_fallback(server, credential)
+        await sync.pool.close()
+    finally:
+        await server.stop()
+    print("\n🎉 All IMAP sync tests passed")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+LLM Cache Test
+Checks that cached completions are scoped per agent and per prompt-shaping
+parameter, that invalidate_scope() and TTLs drop entries, that failed or
+uncacheable results are never stored, that identical concurrent prompts
+coalesce, and that semantic matches never cross a scope.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+logging.disable(logging.CRITICAL)
+
+from core.llm_cache import LLMResponseCache
+
+
+def new_cache(**overrides):
+    cache = LLMResponseCache()
+    cache.enabled = True
+    cache.semantic_enabled = False
+    for name, value in overrides.items():
+        setattr(cache, name, value)
+    return cache
+
+
+def prompt(text, system="You are helpful"):
+    return [{"role": "system", "content": system}, {"role": "user", "content": text}]
+
+
+class Model:
+    """Counts completions and answers with the call number"""
+
+    def __init__(self, delay=0.0):
+        self.calls = 0
+        self.delay = delay
+
+    def compute(self, value=None):
+        async def run():
+            self.calls += 1
+            await asyncio.sleep(self.delay)
+            return value if value is not None else f"answer {self.calls}"
+        return run
+
+
+async def test_scopes_are_isolated():
+    print("\n🔒 Entries are only served within their scope")
+    cache, model = new_cache(), Model()
+    ask = lambda text, scope, **params: cache.get_or_compute(
+        prompt(text), "gpt-4o-mini", params, model.compute(), "agents", scope=scope)
+
+    first = await ask("What is our refund policy?", "agent:1")
+    assert await ask("  what is our REFUND policy? ", "agent:1") == first
+    assert model.calls == 1
+
+    # Another agent, global scope and a different temperature all miss
+    assert await ask("What is our refund policy?", "agent:2") != first
+    await ask("What is our refund policy?", None)
+    await ask("What is our refund policy?", "agent:1", temperature=0.9)
+    assert model.calls == 4
+
+    # So does a different system prompt
+    await cache.get_or_compute(prompt("What is our refund policy?", system="Be terse"), "gpt-4o-mini", {},
+                               model.compute(), "agents", scope="agent:1")
+    assert model.calls == 5
+    assert cache.get_stats()["namespaces"]["agents"]["exact_hits"] == 1
+    print("   ✅ passed")
+
+
+async def test_invalidate_scope():
+    print("\n🧽 invalidate_scope() drops one agent's entries only")
+    cache, model = new_cache(), Model()
+    for text, scope in (("hello", "agent:1"), ("goodbye", "agent:1"), ("hello", "agent:2")):
+        await cache.get_or_compute(prompt(text), "m", {}, model.compute(), scope=scope)
+    assert cache.get_stats()["entries"] == 3
+
+    assert cache.invalidate_scope("agent:1") == 2
+    assert cache.invalidate_scope("agent:1") == 0
+    assert cache.get_stats()["entries"] == 1
+
+    await cache.get_or_compute(prompt("hello"), "m", {}, model.compute(), scope="agent:1")
+    await cache.get_or_compute(prompt("hello"), "m", {}, model.compute(), scope="agent:2")
+    assert model.calls == 4, model.calls  # agent:1 recomputed, agent:2 still cached
+    print("   ✅ passed")
+
+
+async def test_ttl_and_lru():
+    print("\n⏳ Expired and least recently used entries are dropped")
+    cache, model = new_cache(max_entries=2), Model()
+    await cache.get_or_compute(prompt("short"), "m", {}, model.compute(), ttl=0.01)
+    await asyncio.sleep(0.02)
+    await cache.get_or_compute(prompt("short"), "m", {}, model.compute())
+    assert model.calls == 2
+
+    for text in ("a", "b", "short", "c"):
+        await cache.get_or_compute(prompt(text), "m", {}, model.compute())
+    assert cache.get_stats()["entries"] == 2
+    calls = model.calls
+    await cache.get_or_compute(prompt("short"), "m", {}, model.compute())
+    await cache.get_or_compute(prompt("a"), "m", {}, model.compute())
+    assert model.calls == calls + 1  # "short" was recently used, "a" was evicted
+    print("   ✅ passed")
+
+
+async def test_failures_are_not_cached():
+    print("\n🚫 Errors, None and uncacheable answers are never stored")
+    cache, model = new_cache(), Model()
+
+    async def fail():
+        raise RuntimeError("provider down")
+
+    try:
+        await cache.get_or_compute(prompt("q"), "m", {}, fail)
+        raise AssertionError("expected the provider error")
+    except RuntimeError:
+        pass
+    assert await cache.get_or_compute(prompt("q"), "m", {}, model.compute()) == "answer 1"
+
+    async def empty():
+        return None
+
+    assert await cache.get_or_compute(prompt("none"), "m", {}, empty) is None
+    assert cache.get_stats()["entries"] == 1
+    refused = lambda value: not value.startswith("Error")
+    await cache.get_or_compute(prompt("e"), "m", {}, model.compute("Error: timeout"), cacheable=refused)
+    await cache.get_or_compute(prompt("e"), "m", {}, model.compute("Error: timeout"), cacheable=refused)
+    assert model.calls == 3
+    print("   ✅ passed")
+
+
+async def test_concurrent_prompts_coalesce():
+    print("\n🤝 Identical concurrent prompts share one completion")
+    cache, model = new_cache(), Model(delay=0.05)
+    results = await asyncio.gather(*[
+        cache.get_or_compute(prompt("same"), "m", {}, model.compute(), "bulk", scope="agent:1")
+        for _ in range(5)
+    ])
+    assert model.calls == 1 and len(set(results)) == 1
+    assert cache.get_stats()["namespaces"]["bulk"]["coalesced"] == 4
+    print("   ✅ passed")
+
+
+async def test_semantic_scoped():
+    print("\n🧭 Semantic hits stay inside the scope and partition")
+    cache, model = new_cache(semantic_enabled=True, semantic_threshold=0.9), Model()
+    vectors = {"reset my password": [1.0, 0.0, 0.1], "how do i reset my password": [1.0, 0.0, 0.12],
+               "delete my account": [0.0, 1.0, 0.0]}
+
+    async def embedder(text):
+        return vectors[text]
+
+    ask = lambda text, scope: cache.get_or_compute(prompt(text), "m", {}, model.compute(), scope=scope,
+                                                   embedder=embedder)
+    first = await ask("Reset my password", "agent:1")
+    assert await ask("How do I reset my password", "agent:1") == first
+    await ask("Delete my account", "agent:1")
+    await ask("How do I reset my password", "agent:2")
+    assert model.calls == 3, model.calls
+
+    cache.invalidate_scope("agent:1")
+    await ask("How do I reset my password", "agent:1")
+    assert model.calls == 4
+    print("   ✅ passed")
+
+
+async def main():
+    print("🧪 LLM Cache Test")
+    print("=" * 50)
+    await test_scopes_are_isolated()
+    await test_invalidate_scope()
+    await test_ttl_and_lru()
+    await test_failures_are_not_cached()
+    await test_concurrent_prompts_coalesce()
+    await test_semantic_scoped()
+    print("\n🎉 All LLM cache tests passed")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+LLM Client Pool Test
+Checks that loop-bound objects (semaphores, sessions) are held per event
+loop object rather than per id(loop), that entries of closed loops are
+dropped, that close() reaches entries living on another thread's loop, that
+a pooled OpenAI handle resolves a separate client on each loop, and the
+connection-reuse counters of the OpenAI httpx hooks.
+"""
+
+import asyncio
+import gc
+import os
+import sys
+import threading
+from types import SimpleNamespace
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from core.loop_local import LoopLocal
+from core.llm_client_pool import LLMClientRegistry, PooledOpenAIClient, _ConnectionTrace
+
+
+def test_per_loop_semaphores():
+    print("\n🔁 Each loop gets its own provider semaphore")
+    registry = LLMClientRegistry()
+
+    async def borrow():
+        async with registry.limit("openai"):
+            return registry._semaphore("openai")
+
+    first = asyncio.run(borrow())
+    second = asyncio.run(borrow())
+    assert first is not second
+    # Both loops are gone, and their semaphores with them
+    gc.collect()
+    assert len(registry._semaphores) == 0
+    assert registry.metrics["openai"].requests_total == 2
+    print("   ✅ passed")
+
+
+def test_discard_closed_loop():
+    print("\n🧹 Entries of a closed loop are discarded on the next access")
+    discarded = []
+    local = LoopLocal(on_discard=discarded.append)
+    loop = asyncio.new_event_loop()
+
+    async def put(value):
+        local.set("session", value)
+
+    loop.run_until_complete(put("old"))
+    loop.close()
+    # The loop object is still referenced here, so only the closed check can drop it
+    asyncio.run(put("new"))
+    assert discarded == ["old"], discarded
+    del loop
+    print("   ✅ passed")
+
+
+def test_close_all_across_loops():
+    print("\n🔌 close_all() closes entries on the loop that owns them")
+    local = LoopLocal()
+    closed_on = []
+    background = asyncio.new_event_loop()
+    thread = threading.Thread(target=background.run_forever, daemon=True)
+    thread.start()
+
+    async def put(value):
+        local.set("session", value)
+
+    async def closer(value):
+        closed_on.append((value, threading.current_thread() is thread))
+
+    asyncio.run_coroutine_threadsafe(put("background"), background).result(timeout=5)
+
+    async def shutdown():
+        await put("main")
+        await local.close_all(closer)
+
+    asyncio.run(shutdown())
+    assert sorted(closed_on) == [("background", True), ("main", False)], closed_on
+    assert len(local) == 0
+    background.call_soon_threadsafe(background.stop)
+    thread.join(timeout=5)
+    background.close()
+    print("   ✅ passed")
+
+
+class FakeOpenAI:
+    """Stands in for AsyncOpenAI; records the loop each client was made on"""
+
+    def __init__(self):
+        self.loop = asyncio.get_running_loop()
+        self.closed = False
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _create(self, **kwargs):
+        assert asyncio.get_running_loop() is self.loop
+        return self
+
+    async def close(self):
+        self.closed = True
+
+
+def test_openai_client_per_loop():
+    print("\n🔌 One pooled OpenAI handle resolves a client per event loop")
+    registry = LLMClientRegistry()
+    created = []
+
+    def factory():
+        created.append(FakeOpenAI())
+        return created[-1]
+
+    # Engines keep the handle they were given and use it from any loop
+    handle = PooledOpenAIClient(registry, "openai", "openai::key", factory)
+
+    async def complete():
+        first = await handle.chat.completions.create(model="m")
+        second = await handle.chat.completions.create(model="m")
+        assert first is second and handle.current() is first
+        return first
+
+    background = asyncio.new_event_loop()
+    thread = threading.Thread(target=background.run_forever, daemon=True)
+    thread.start()
+    other = asyncio.run_coroutine_threadsafe(complete(), background).result(timeout=5)
+
+    async def main_loop():
+        client = await complete()
+        assert client is not other
+        assert len(registry._openai_clients) == 2
+        await registry.close()
+        return client
+
+    mine = asyncio.run(main_loop())
+    assert len(created) == 2
+    assert mine.closed and other.closed
+    assert registry.metrics["openai"].requests_total == 4
+    background.call_soon_threadsafe(background.stop)
+    thread.join(timeout=5)
+    background.close()
+    print("   ✅ passed")
+
+
+def test_httpx_reuse_metrics():
+    print("\n📊 OpenAI httpx hooks count new and reused connections")
+    registry = LLMClientRegistry()
+    metrics = registry._metrics("openai")
+    hooks = registry._connection_hooks(metrics)
+
+    async def exchange(connects: bool):
+        request = SimpleNamespace(extensions={})
+        for hook in hooks["request"]:
+            await hook(request)
+        trace = request.extensions["trace"]
+        assert isinstance(trace, _ConnectionTrace)
+        if connects:
+            await trace("connection.connect_tcp.started", {})
+            await trace("connection.connect_tcp.complete", {})
+        await trace("http11.send_request_headers.complete", {})
+        for hook in hooks["response"]:
+            await hook(SimpleNamespace(request=request))
+
+    async def run():
+        await exchange(True)
+        for _ in range(3):
+            await exchange(False)
+
+    asyncio.run(run())
+    stats = metrics.to_dict()
+    assert stats["connections_created"] == 1 and stats["connections_reused"] == 3, stats
+    assert stats["connection_reuse_ratio"] == 0.75
+    print("   ✅ passed")
+
+
+def main():
+    print("🧪 LLM Client Pool Test")
+    print("=" * 50)
+    test_per_loop_semaphores()
+    test_discard_closed_loop()
+    test_close_all_across_loops()
+    test_openai_client_per_loop()
+    test_httpx_reuse_metrics()
+    print("\n🎉 All LLM client pool tests passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Pagination Test
+Checks that PageIterator stops on the last cursor and at max_items without
+fetching extra pages, cancels its prefetch when the consumer stops early,
+regroups pages into batches, that failed responses become PageErrors even
+when the body isn't JSON, and that collect_pages reports provider errors
+and streams to JSON lines.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from core.pagination import PageError, PageIterator, collect_pages, page_error
+
+
+class FakeProvider:
+    """Serves `total` items in pages of `page_size` behind an offset cursor"""
+
+    def __init__(self, total, page_size, fail_at=None, empty_pages=()):
+        self.total = total
+        self.page_size = page_size
+        self.fail_at = fail_at
+        self.empty_pages = set(empty_pages)
+        self.cursors = []
+        self.cancelled = 0
+
+    async def fetch_page(self, cursor):
+        offset = cursor or 0
+        self.cursors.append(offset)
+        try:
+            await asyncio.sleep(0.01)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if offset == self.fail_at:
+            raise PageError("rate limited")
+        if offset in self.empty_pages:
+            # Some providers return an empty page that still carries a cursor
+            self.empty_pages.discard(offset)
+            return [], offset
+        items = list(range(offset, min(offset + self.page_size, self.total)))
+        next_cursor = offset + self.page_size if offset + self.page_size < self.total else None
+        return items, next_cursor
+
+
+async def test_stops_on_last_page():
+    print("\n🏁 Iteration ends when the provider returns no cursor")
+    provider = FakeProvider(total=95, page_size=10)
+    iterator = PageIterator(provider.fetch_page)
+    items = [item async for item in iterator]
+    assert items == list(range(95))
+    assert iterator.pages_fetched == 10 and provider.cursors == list(range(0, 100, 10))
+
+    empty = FakeProvider(total=0, page_size=10)
+    assert [item async for item in PageIterator(empty.fetch_page)] == []
+    assert empty.cursors == [0]
+
+    skipping = FakeProvider(total=30, page_size=10, empty_pages={10})
+    assert [item async for item in PageIterator(skipping.fetch_page)] == list(range(30))
+    print("   ✅ passed")
+
+
+async def test_max_items_stops_fetching():
+    print("\n✂️ max_items truncates and fetches no further pages")
+    provider = FakeProvider(total=1000, page_size=10)
+    iterator = PageIterator(provider.fetch_page, max_items=25)
+    items = [item async for item in iterator]
+    assert items == list(range(25))
+    assert provider.cursors == [0, 10, 20], provider.cursors
+
+    exact = FakeProvider(total=1000, page_size=10)
+    assert len([item async for item in PageIterator(exact.fetch_page, max_items=20)]) == 20
+    assert exact.cursors == [0, 10], exact.cursors
+    print("   ✅ passed")
+
+
+async def test_early_break_cancels_prefetch():
+    print("\n🛑 Stopping early cancels the prefetched page")
+    provider = FakeProvider(total=1000, page_size=10)
+    pages = PageIterator(provider.fetch_page).pages()
+    first = await pages.__anext__()
+    await asyncio.sleep(0)  # let the prefetch start
+    await pages.aclose()
+    await asyncio.sleep(0)
+    assert first == list(range(10))
+    assert provider.cursors == [0, 10] and provider.cancelled == 1, (provider.cursors, provider.cancelled)
+
+    sequential = FakeProvider(total=1000, page_size=10)
+    pages = PageIterator(sequential.fetch_page, prefetch=False).pages()
+    await pages.__anext__()
+    await pages.aclose()
+    assert sequential.cursors == [0]
+    print("   ✅ passed")
+
+
+async def test_batches():
+    print("\n📦 Batches are independent of the provider's page size")
+    provider = FakeProvider(total=95, page_size=10)
+    batches = [batch async for batch in PageIterator(provider.fetch_page).batches(40)]
+    assert [len(batch) for batch in batches] == [40, 40, 15]
+    assert sum(batches, []) == list(range(95))
+    print("   ✅ passed")
+
+
+class FakeResponse:
+    def __init__(self, status, body):
+        self.status = status
+        self.body = body
+
+    async def text(self):
+        return self.body
+
+
+async def test_page_error():
+    print("\n🚫 Failed pages become PageErrors, JSON or not")
+    stripe_message = lambda data: data.get('error', {}).get('message')
+    error = await page_error(FakeResponse(400, '{"error": {"message": "No such customer"}}'), stripe_message)
+    assert isinstance(error, PageError) and str(error) == "No such customer"
+    error = await page_error(FakeResponse(502, "<html>Bad Gateway</html>"), stripe_message)
+    assert str(error) == "HTTP 502: <html>Bad Gateway</html>", error
+    error = await page_error(FakeResponse(500, '{"errors": []}'), lambda data: data['errors'][0]['message'])
+    assert str(error) == 'HTTP 500: {"errors": []}', error
+    assert str(await page_error(FakeResponse(503, ""), stripe_message)) == "HTTP 503: Unknown error"
+
+    async def fetch_page(cursor):
+        raise await page_error(FakeResponse(502, "Bad Gateway"), stripe_message)
+
+    result = await collect_pages(PageIterator(fetch_page, prefetch=False), {}, "customers")
+    assert not result["success"] and result["error"] == "HTTP 502: Bad Gateway", result
+    print("   ✅ passed")
+
+
+async def test_collect_pages():
+    print("\n🧺 collect_pages reports errors and streams to a file")
+    failing = FakeProvider(total=100, page_size=10, fail_at=30)
+    result = await collect_pages(PageIterator(failing.fetch_page, prefetch=False), {}, "customers")
+    assert not result["success"] and result["error"] == "rate limited", result
+    assert result["count"] == 30 and result["pages"] == 3, result
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        output_file = os.path.join(work_dir, "customers.jsonl")
+        provider = FakeProvider(total=95, page_size=10)
+        result = await collect_pages(PageIterator(provider.fetch_page),
+                                     {"output_file": output_file, "batch_size": 25}, "customers")
+        assert result["success"] and result["count"] == 95 and result["batches"] == 4, result
+        with open(output_file, encoding="utf-8") as f:
+            assert [json.loads(line) for line in f] == list(range(95))
+    print("   ✅ passed")
+
+
+async def main():
+    print("🧪 Pagination Test")
+    print("=" * 50)
+    await test_stops_on_last_page()
+    await test_max_items_stops_fetching()
+    await test_early_break_cancels_prefetch()
+    await test_batches()
+    await test_page_error()
+    await test_collect_pages()
+    print("\n🎉 All pagination tests passed")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Rate Limit Scheduler Test
+Drives the per-credential token buckets with a fake provider session
+(no network needed) and checks pacing, header learning, 429 retries and
+coalescing of identical GETs.
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from core.rate_limiter import RateLimitScheduler
+
+
+class FakeResponse:
+    def __init__(self, status, headers, body=b'{"ok": true}'):
+        self.status = status
+        self.headers = headers
+        self.reason = "OK" if status < 400 else "Too Many Requests"
+        self._body = body
+
+    async def read(self):
+        return self._body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeProviderSession:
+    """Answers with scripted (status, headers) pairs, then 200s"""
+
+    def __init__(self, script=None, latency=0.0, headers=None):
+        self.script = list(script or [])
+        self.latency = latency
+        self.headers = headers or {}
+        self.calls = []
+
+    def request(self, method, url, **kwargs):
+        session = self
+
+        class _Call:
+            async def __aenter__(self):
+                session.calls.append((method, url, time.monotonic()))
+                if session.latency:
+                    await asyncio.sleep(session.latency)
+                status, headers = session.script.pop(0) if session.script else (200, session.headers)
+                return FakeResponse(status, headers)
+
+            async def __aexit__(self, *exc):
+                return False
+
+        return _Call()
+
+
+async def test_pacing():
+    print("\n🪣 Requests are paced to the bucket rate instead of failing")
+    os.environ["RATE_LIMIT_PACED"] = "5/0.5"  # burst 5, 10 requests per second
+    scheduler = RateLimitScheduler()
+    provider = FakeProviderSession()
+    session = scheduler.wrap(provider, "paced", "key-1")
+
+    started = time.perf_counter()
+    responses = await asyncio.gather(*(session.post(f"https://api.test/items/{i}") for i in range(15)))
+    elapsed = time.perf_counter() - started
+
+    print(f"   15 requests in {elapsed:.2f}s, stats {scheduler.get_stats()['services']['paced']}")
+    assert all(r.status == 200 for r in responses)
+    # 5 burst tokens, then 10 more at 10/s
+    assert 0.9 <= elapsed < 1.5
+    print("   ✅ passed")
+
+
+async def test_learns_from_headers_and_retries():
+    print("\n📉 429 with Retry-After is retried and limits are learned")
+    scheduler = RateLimitScheduler()
+    provider = FakeProviderSession(script=[
+        (429, {"Retry-After": "0.3", "X-RateLimit-Limit": "20", "X-RateLimit-Remaining": "0"}),
+        (200, {"X-HubSpot-RateLimit-Max": "20", "X-HubSpot-RateLimit-Interval-Milliseconds": "2000",
+               "X-HubSpot-RateLimit-Remaining": "7"}),
+    ])
+    session = scheduler.wrap(provider, "hubspot", "key-2")
+
+    started = time.perf_counter()
+    async with session.post("https://api.test/contacts", json={"email": "a@example.com"}) as response:
+        data = await response.json()
+    elapsed = time.perf_counter() - started
+
+    budget = scheduler.get_budget("hubspot", "key-2")
+    print(f"   status {response.status} after {elapsed:.2f}s, budget {budget}")
+    assert response.status == 200 and data == {"ok": True}
+    assert len(provider.calls) == 2 and elapsed >= 0.3
+    assert budget["capacity"] == 20 and budget["refill_per_second"] == 10.0
+    assert budget["remaining"] <= 7 and budget["learned_from_headers"]
+    print("   ✅ passed")
+
+
+async def test_coalescing():
+    print("\n🔗 Identical concurrent GETs share one call")
+    scheduler = RateLimitScheduler()
+    provider = FakeProviderSession(latency=0.05)
+    session = scheduler.wrap(provider, "stripe", "key-3")
+    other = scheduler.wrap(provider, "stripe", "key-4")
+
+    results = await asyncio.gather(
+        *(session.get("https://api.test/customers", params={"limit": 10}) for _ in range(5)),
+        other.get("https://api.test/customers", params={"limit": 10}),
+        session.get("https://api.test/customers", params={"limit": 20})
+    )
+
+    print(f"   7 callers, {len(provider.calls)} provider calls")
+    assert all(r.status == 200 for r in results)
+    assert len(provider.calls) == 3
+    assert scheduler.get_stats()["services"]["stripe"]["coalesced"] == 4
+    print("   ✅ passed")
+
+
+async def main():
+    print("🧪 Rate Limit Scheduler Test")
+    print("=" * 50)
+    await test_pacing()
+    await test_learns_from_headers_and_retries()
+    await test_coalescing()
+    print("\n🎉 All rate limit tests passed")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
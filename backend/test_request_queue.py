@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Session Request Queue Test
+Checks that overlapping requests for one agent session are processed in
+order instead of rejected, retries with the same idempotency key are
+coalesced (repeated text without a key is not) and depth is bounded.
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from core.request_queue import SessionRequestQueue, RequestQueueFull, request_idempotency_key
+
+
+async def test_ordered_processing():
+    print("\n📬 Overlapping requests run in arrival order")
+    queue = SessionRequestQueue(name="test", max_depth=10)
+    order = []
+    active = 0
+
+    async def handler(message):
+        nonlocal active
+        active += 1
+        assert active == 1, "requests overlapped"
+        await asyncio.sleep(0.01)
+        order.append(message)
+        active -= 1
+        return message.upper()
+
+    results = await asyncio.gather(*(queue.submit(handler, f"msg{i}", idempotency_key=f"k{i}") for i in range(5)))
+    print(f"   order {order}, stats {queue.get_stats()}")
+    assert order == [f"msg{i}" for i in range(5)]
+    assert results == [f"MSG{i}" for i in range(5)]
+    print("   ✅ passed")
+
+
+async def test_duplicate_coalescing():
+    print("\n🖱️ Double submissions share one result")
+    queue = SessionRequestQueue(name="test")
+    calls = 0
+
+    async def handler(message):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.02)
+        return {"response": message, "call": calls}
+
+    key = request_idempotency_key("send the report", {"request_id": "req-1"})
+    first, second = await asyncio.gather(queue.submit(handler, "send the report", idempotency_key=key),
+                                         queue.submit(handler, "send the report", idempotency_key=key))
+    retry = await queue.submit(handler, "send the report", idempotency_key=key)
+    print(f"   handler calls: {calls}, coalesced: {queue.coalesced}")
+    assert calls == 1 and first is second is retry
+    print("   ✅ passed")
+
+
+async def test_repeated_text_without_key():
+    print("\n🔂 Repeating a message without a key runs it again")
+    queue = SessionRequestQueue(name="test")
+    calls = 0
+
+    async def handler(message):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.02)
+        return {"response": message, "call": calls}
+
+    key = request_idempotency_key("yes", {})
+    assert key is None
+    first, second = await asyncio.gather(queue.submit(handler, "yes", idempotency_key=key),
+                                         queue.submit(handler, "yes", idempotency_key=key))
+    third = await queue.submit(handler, "yes", idempotency_key=key)
+    assert calls == 3 and [r["call"] for r in (first, second, third)] == [1, 2, 3]
+    assert queue.coalesced == 0
+    print("   ✅ passed")
+
+
+async def test_backpressure():
+    print("\n🚧 Queue depth is bounded")
+    queue = SessionRequestQueue(name="test", max_depth=2)
+    release = asyncio.Event()
+
+    async def handler(message):
+        await release.wait()
+        return message
+
+    running = [asyncio.ensure_future(queue.submit(handler, f"m{i}", idempotency_key=f"k{i}")) for i in range(2)]
+    await asyncio.sleep(0)
+    try:
+        await queue.submit(handler, "overflow", idempotency_key="k-overflow")
+        raise AssertionError("expected RequestQueueFull")
+    except RequestQueueFull as e:
+        print(f"   rejected third request: {e}")
+    release.set()
+    assert await asyncio.gather(*running) == ["m0", "m1"]
+    assert queue.get_stats()["rejected"] == 1 and queue.depth == 0
+    print("   ✅ passed")
+
+
+async def main():
+    print("🧪 Session Request Queue Test")
+    print("=" * 50)
+    await test_ordered_processing()
+    await test_duplicate_coalescing()
+    await test_repeated_text_without_key()
+    await test_backpressure()
+    print("\n🎉 All request queue tests passed")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Session Cache Test
+Checks the hot-path TTL caches: expiry, copies, and invalidation of sessions
+and agents after logout / agent changes.
+"""
+
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from core.session_cache import (TTLCache, session_cache, agent_cache, default_agent_cache,
+                                session_key, invalidate_user, invalidate_agent)
+
+
+def test_expiry_and_copies():
+    print("\n⏳ Entries expire and callers get copies")
+    cache = TTLCache("test", ttl=60, max_entries=2)
+    cache.set("a", {"credits": 10}, ttl=0.05)
+    row = cache.get("a")
+    row["credits"] = 0
+    assert cache.get("a")["credits"] == 10, "cached row was mutated"
+    time.sleep(0.06)
+    assert cache.get("a") is None, "entry outlived its ttl"
+    for key in ("b", "c", "d"):
+        cache.set(key, {})
+    assert cache.get("b") is None and cache.get("d") == {}
+    print(f"   stats {cache.get_stats()}")
+    print("   ✅ passed")
+
+
+def test_invalidation():
+    print("\n🔑 Logout and agent updates invalidate cached rows")
+    token_key = session_key("token-123")
+    session_cache.set(token_key, {"user_id": "u1", "email": "a@b.c"})
+    agent_cache.set("agent-1", {"agent_id": "agent-1", "agent_name": "Sam"})
+    default_agent_cache.set("u1", {"agent_id": "agent-1", "agent_name": "Sam"})
+    assert session_cache.get(token_key)["email"] == "a@b.c"
+
+    assert invalidate_user("u1") == 1
+    assert session_cache.get(token_key) is None
+    assert invalidate_agent("agent-1") == 2
+    assert agent_cache.get("agent-1") is None and default_agent_cache.get("u1") is None
+    assert "token-123" not in token_key
+    print("   ✅ passed")
+
+
+def main():
+    print("🧪 Session Cache Test")
+    print("=" * 50)
+    test_expiry_and_copies()
+    test_invalidation()
+    print("\n🎉 All session cache tests passed")
+
+
+if __name__ == "__main__":
+    main()
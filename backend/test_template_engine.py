@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Template Engine Test
+Checks compiled workflow parameter templates: whole and embedded
+expressions, dotted paths, and that mutating a rendered result never
+leaks into the cached template or the next render.
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from mcp.template_engine import TemplateCache, compile_template
+
+WORKFLOW = {
+    "nodes": [
+        {"id": "n1", "parameters": {"to": "{{recipient}}", "subject": "Hi {{user.name}}!",
+                                    "options": {"retries": 3, "headers": ["x-a", "x-b"]}}},
+        {"id": "n2", "parameters": {"first_id": "{{node_1_output.items.0.id}}", "missing": "{{nope}}"}}
+    ],
+    "settings": {"timezone": "UTC", "tags": ["email"]}
+}
+CONTEXT = {"recipient": ["a@example.com"], "user": {"name": "Ada"},
+           "node_1_output": {"items": [{"id": 7}]}}
+
+
+def test_substitution():
+    print("\n🧩 Expressions resolve through dotted paths")
+    rendered = compile_template(WORKFLOW).render(CONTEXT)
+    first, second = rendered["nodes"][0]["parameters"], rendered["nodes"][1]["parameters"]
+    assert first["to"] == ["a@example.com"] and first["subject"] == "Hi Ada!"
+    assert second["first_id"] == 7 and second["missing"] == "{{nope}}"
+    print("   ✅ passed")
+
+
+def test_renders_are_independent():
+    print("\n🧊 Mutating a render doesn't touch the cached template")
+    cache = TemplateCache(maxsize=4)
+    key = ("wf_1", 1, "workflow")
+    first = cache.render(WORKFLOW, CONTEXT, key)
+
+    # Constant containers at every depth, including fully constant subtrees
+    first["settings"]["timezone"] = "PST"
+    first["settings"]["tags"].append("mutated")
+    first["nodes"][0]["parameters"]["options"]["retries"] = 0
+    first["nodes"][0]["parameters"]["options"]["headers"].clear()
+
+    second = cache.render(WORKFLOW, CONTEXT, key)
+    assert cache.hits == 1
+    assert second["settings"] == {"timezone": "UTC", "tags": ["email"]}, second["settings"]
+    assert second["nodes"][0]["parameters"]["options"] == {"retries": 3, "headers": ["x-a", "x-b"]}
+    assert WORKFLOW["settings"] == {"timezone": "UTC", "tags": ["email"]}
+
+    # A template with no expressions at all is copied too
+    constant = compile_template({"a": {"b": [1]}})
+    rendered = constant.render({})
+    rendered["a"]["b"].append(2)
+    assert constant.render({}) == {"a": {"b": [1]}}
+    print("   ✅ passed")
+
+
+def main():
+    print("🧪 Template Engine Test")
+    print("=" * 50)
+    test_substitution()
+    test_renders_are_independent()
+    print("\n🎉 All template engine tests passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Time Series Store Test
+Checks the fixed-size metric store behind AnalyticsDriver: bounded raw
+points, rollups that match a brute-force aggregation, range queries and
+snapshot round trips.
+"""
+
+import os
+import random
+import sys
+import tempfile
+from collections import defaultdict
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from core.timeseries import TimeSeriesStore
+
+BASE = 1_700_000_000
+
+
+def build_store(points: int = 3000, raw_points: int = 200):
+    random.seed(7)
+    store = TimeSeriesStore(raw_points=raw_points)
+    tracked = []
+    for i in range(points):
+        # Every ninth point arrives late
+        timestamp = BASE + i * 37 - (random.randint(0, 500) if i % 9 == 0 else 0)
+        value = random.uniform(-5, 5)
+        store.add("latency", timestamp, value)
+        tracked.append((timestamp, value))
+    return store, tracked
+
+
+def test_bounded_raw_points():
+    print("\n📦 Raw points stay bounded and sorted")
+    store, _ = build_store()
+    series = store.get("latency")
+    keys = [timestamp for timestamp, _, _ in series.points()]
+    assert len(keys) == 200 and keys == sorted(keys)
+    inside = list(series.points(keys[50], keys[120]))
+    assert inside[0][0] == keys[50] and inside[-1][0] == keys[120]
+    print(f"   summary {series.summary()}")
+    print("   ✅ passed")
+
+
+def test_rollups_match_brute_force():
+    print("\n🧮 Hourly rollups cover every tracked point")
+    store, tracked = build_store()
+    expected = defaultdict(lambda: [0, 0.0, float("inf"), float("-inf")])
+    for timestamp, value in tracked:
+        bucket = expected[timestamp - timestamp % 3600]
+        bucket[0] += 1
+        bucket[1] += value
+        bucket[2] = min(bucket[2], value)
+        bucket[3] = max(bucket[3], value)
+
+    buckets = list(store.get("latency").buckets("1h"))
+    assert len(buckets) == len(expected)
+    for start, count, total, low, high in buckets:
+        want = expected[start]
+        assert count == want[0] and abs(total - want[1]) < 1e-6 and (low, high) == (want[2], want[3])
+    print(f"   {len(buckets)} hourly buckets from {len(tracked)} points")
+    print("   ✅ passed")
+
+
+def test_snapshot_round_trip():
+    print("\n💾 Persisted store reloads identically")
+    store, _ = build_store()
+    store.path = os.path.join(tempfile.mkdtemp(), "metrics.json")
+    store.save()
+    reloaded = TimeSeriesStore(path=store.path, raw_points=200)
+    before, after = store.get("latency"), reloaded.get("latency")
+    assert list(before.points()) == list(after.points())
+    assert list(before.buckets("1m")) == list(after.buckets("1m"))
+    assert before.summary()["data_points"] == after.summary()["data_points"]
+    assert abs(before.summary()["average_value"] - after.summary()["average_value"]) < 1e-9
+    print("   ✅ passed")
+
+
+def main():
+    print("🧪 Time Series Store Test")
+    print("=" * 50)
+    test_bounded_raw_points()
+    test_rollups_match_brute_force()
+    test_snapshot_round_trip()
+    print("\n🎉 All time series tests passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Trigger Scheduler Test
+Checks the heap-based TriggerScheduler: cron next-fire times, and that
+removing and re-adding a trigger (pause / resume) keeps exactly one live
+schedule for it.
+"""
+
+import asyncio
+import os
+import sys
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from mcp.trigger_scheduler import TriggerScheduler, compile_cron
+
+INTERVAL_SECONDS = 0.1
+INTERVAL = {"interval_minutes": INTERVAL_SECONDS / 60}
+
+
+def live_entries(scheduler: TriggerScheduler, trigger_id: str) -> int:
+    return sum(1 for _, _, tid, generation in scheduler._heap
+               if tid == trigger_id and scheduler.triggers.get(tid) is not None
+               and scheduler.triggers[tid].generation == generation)
+
+
+def test_cron_next_fire():
+    print("\n🕐 Cron next fire times")
+    cron = compile_cron("*/15 9-17 * * 1-5")
+    # Friday 17:50 -> next is Monday 09:00
+    assert cron.next_after(datetime(2024, 1, 5, 17, 50)) == datetime(2024, 1, 8, 9, 0)
+    assert cron.next_after(datetime(2024, 1, 8, 9, 0)) == datetime(2024, 1, 8, 9, 15)
+    print("   ✅ passed")
+
+
+async def test_remove_and_re_add():
+    print("\n⏯️ Pause and resume keeps a single schedule")
+    fired = []
+
+    async def on_fire(trigger, scheduled_for):
+        fired.append(trigger.trigger_id)
+
+    scheduler = TriggerScheduler(on_fire)
+    scheduler.add("t1", "wf_1", "interval", INTERVAL)
+    assert scheduler.remove("t1") and not scheduler.remove("t1")
+    scheduler.add("t1", "wf_1", "interval", INTERVAL)
+    assert live_entries(scheduler, "t1") == 1, scheduler._heap
+
+    # Replacing a live trigger also leaves one schedule
+    scheduler.add("t1", "wf_1", "interval", INTERVAL)
+    assert live_entries(scheduler, "t1") == 1, scheduler._heap
+
+    scheduler.start()
+    await asyncio.sleep(INTERVAL_SECONDS * 3.5)
+    scheduler.stop()
+    # Fires immediately and then once per interval: 4 runs, not 8
+    assert 3 <= len(fired) <= 5, fired
+    print(f"   {len(fired)} fires in {INTERVAL_SECONDS * 3.5:.2f}s")
+
+    scheduler.remove("t1")
+    assert scheduler.next_fire_time() is None
+    print("   ✅ passed")
+
+
+async def main():
+    print("🧪 Trigger Scheduler Test")
+    print("=" * 50)
+    test_cron_next_fire()
+    await test_remove_and_re_add()
+    print("\n🎉 All trigger scheduler tests passed")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
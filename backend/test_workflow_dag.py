@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Workflow DAG Execution Test
+Checks the parallel execution mode of AutomationEngine.execute_workflow_nodes:
+independent nodes overlap, dependents wait for their inputs, max_concurrency
+is honoured, results come back in node order and cycles fall back to the
+sequential mode.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+logging.disable(logging.CRITICAL)
+
+from mcp.simple_automation_engine import AutomationEngine
+
+
+class RecordingEngine(AutomationEngine):
+    """AutomationEngine without its database, triggers or drivers"""
+
+    def __init__(self, max_node_concurrency=4, delay=0.05):
+        self.max_node_concurrency = max_node_concurrency
+        self.delay = delay
+        self.events = []
+        self.running = 0
+        self.peak = 0
+
+    async def execute_json_script_to_api(self, node_type, json_script, parameters):
+        name = parameters["name"]
+        self.events.append(("start", name))
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        await asyncio.sleep(self.delay)
+        self.running -= 1
+        self.events.append(("end", name))
+        if parameters.get("fail"):
+            return {"success": False, "error": "boom"}
+        return {"success": True, "output": f"{name}:{parameters.get('input', '')}"}
+
+
+def node(node_id, **parameters):
+    return {"id": node_id, "type": "test", "parameters": {"name": node_id, **parameters}}
+
+
+def diamond():
+    # a -> (b, c) -> d, with d also reading c's output through a template
+    return {
+        "workflow_id": "wf_dag",
+        "nodes": [node("a"), node("b"), node("c"), node("d", input="{{c_output}}")],
+        "connections": {"a": {"main": [[{"node": "b"}, {"node": "c"}]]}, "b": {"main": [["d"]]}}
+    }
+
+
+async def test_independent_nodes_overlap():
+    print("\n🌿 Independent branches run concurrently, dependents wait")
+    engine = RecordingEngine()
+    context = {"trigger": "test"}
+    result = await engine.execute_workflow_nodes(diamond(), context, execution_mode="parallel")
+    assert result["success"] and result["execution_mode"] == "parallel", result
+    assert [r["node_id"] for r in result["execution_results"]] == ["a", "b", "c", "d"]
+
+    order = engine.events
+    assert order[:2] == [("start", "a"), ("end", "a")], order
+    # b and c both start before either finishes
+    assert {order[2], order[3]} == {("start", "b"), ("start", "c")}, order
+    assert order[-2:] == [("start", "d"), ("end", "d")], order
+    assert engine.peak == 2
+    assert context["d_output"] == "d:c:", context
+    print(f"   peak concurrency {engine.peak}")
+    print("   ✅ passed")
+
+
+async def test_max_concurrency():
+    print("\n🚦 max_concurrency bounds the number of running nodes")
+    engine = RecordingEngine()
+    workflow = {"workflow_id": "wf_wide", "max_concurrency": 2, "nodes": [node(f"n{i}") for i in range(6)]}
+    result = await engine.execute_workflow_nodes(workflow, {}, execution_mode="parallel")
+    assert result["success"] and result["nodes_executed"] == 6, result
+    assert engine.peak == 2, engine.peak
+    print("   ✅ passed")
+
+
+async def test_failure_stops_dependents():
+    print("\n🛑 A failed node keeps its dependents from starting")
+    engine = RecordingEngine()
+    workflow = diamond()
+    workflow["nodes"][1]["parameters"]["fail"] = True
+    result = await engine.execute_workflow_nodes(workflow, {}, execution_mode="parallel")
+    assert not result["success"], result
+    assert ("start", "d") not in engine.events, engine.events
+    assert [r["node_id"] for r in result["execution_results"]] == ["a", "b", "c"]
+    print("   ✅ passed")
+
+
+async def test_cycle_falls_back_to_sequential():
+    print("\n🔄 A dependency cycle is rejected and runs sequentially")
+    engine = RecordingEngine()
+    workflow = {
+        "workflow_id": "wf_cycle",
+        "nodes": [node("a", input="{{b_output}}"), node("b"), node("c")],
+        "connections": {"a": {"main": [["b"]]}}
+    }
+    assert engine._build_node_dependencies(workflow) is None
+    result = await engine.execute_workflow_nodes(workflow, {}, execution_mode="parallel")
+    assert result.get("execution_mode") != "parallel", result
+    assert engine.peak == 1
+    assert [name for kind, name in engine.events if kind == "start"] == ["a", "b", "c"]
+    print("   ✅ passed")
+
+
+async def main():
+    print("🧪 Workflow DAG Execution Test")
+    print("=" * 50)
+    await test_independent_nodes_overlap()
+    await test_max_concurrency()
+    await test_failure_stops_dependents()
+    await test_cycle_falls_back_to_sequential()
+    print("\n🎉 All workflow DAG execution tests passed")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
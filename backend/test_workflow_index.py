@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Workflow Index Test
+Checks the BM25 ranking of WorkflowIndex against a direct computation, for
+both the sparse and dense query paths, and that the saved mmap index and
+incremental rebuilds return the same rankings.
+"""
+
+import json
+import logging
+import os
+import sys
+import tempfile
+from math import log
+from pathlib import Path
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+logging.disable(logging.CRITICAL)
+
+from mcp.workflow_index import BM25_B, BM25_K1, WorkflowIndex, metadata_terms, tokenize
+
+WORKFLOWS = [
+    {"id": "slack_alerts", "name": "Slack Alerts", "category": "notifications",
+     "description": "Post a message to Slack when a webhook fires",
+     "keywords": ["slack", "alert"], "node_types": ["n8n-nodes-base.slack", "n8n-nodes-base.webhook"]},
+    {"id": "gmail_digest", "name": "Gmail Digest", "category": "email",
+     "description": "Summarise unread email and send a digest",
+     "keywords": ["email", "digest"], "node_types": ["n8n-nodes-base.gmail", "n8n-nodes-base.scheduleTrigger"]},
+    {"id": "sheets_sync", "name": "Google Sheets Sync", "category": "data",
+     "description": "Copy rows from a webhook into a spreadsheet",
+     "keywords": ["sheets", "sync"], "node_types": ["n8n-nodes-base.googleSheets", "n8n-nodes-base.webhook"]},
+    {"id": "email_to_slack", "name": "Email to Slack", "category": "notifications",
+     "description": "Forward important email to a Slack channel",
+     "keywords": ["email", "slack"], "node_types": ["n8n-nodes-base.gmail", "n8n-nodes-base.slack"]},
+] + [
+    # Unrelated filler so rare terms take the sparse accumulator path
+    {"id": f"filler_{i}", "name": f"Filler {i}", "category": "misc", "description": "Resize images in storage",
+     "keywords": ["images"], "node_types": ["n8n-nodes-base.s3"]}
+    for i in range(12)
+]
+
+
+def documents():
+    return [{"id": w["id"], "file_path": f"{w['id']}.json", "metadata": w, "source": [w["id"], 0, 0]}
+            for w in WORKFLOWS]
+
+
+def reference_scores(query):
+    """BM25 computed directly from the field-weighted term frequencies"""
+    doc_terms = [metadata_terms(w) for w in WORKFLOWS]
+    lengths = [sum(terms.values()) for terms in doc_terms]
+    avg_length = sum(lengths) / len(lengths)
+    scores = {}
+    for i, terms in enumerate(doc_terms):
+        total = 0.0
+        for term in set(query):
+            if term not in terms:
+                continue
+            df = sum(1 for t in doc_terms if term in t)
+            idf = log(1 + (len(doc_terms) - df + 0.5) / (df + 0.5))
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[i] / avg_length)
+            total += idf * terms[term] * (BM25_K1 + 1) / (terms[term] + norm)
+        if total > 0:
+            scores[WORKFLOWS[i]["id"]] = total
+    return scores
+
+
+def assert_matches_reference(results, query):
+    expected = reference_scores(query)
+    assert {workflow_id for workflow_id, _ in results} == set(expected), (results, expected)
+    for workflow_id, score in results:
+        assert abs(score - expected[workflow_id]) < 1e-4, (workflow_id, score, expected[workflow_id])
+    assert [score for _, score in results] == sorted((score for _, score in results), reverse=True)
+
+
+def test_tokenize():
+    print("\n🔤 Tokens are lowercased and camelCase is split")
+    assert tokenize("googleSheets Sync-2") == ["google", "sheets", "sync", "2"]
+    terms = metadata_terms(WORKFLOWS[2])
+    # Node type noise is dropped, the full short name is kept
+    assert "n8n" not in terms and "base" not in terms and "googlesheets" in terms
+    print("   ✅ passed")
+
+
+def test_ranking():
+    print("\n🏆 Search ranks by BM25 on both query paths")
+    index = WorkflowIndex.build(documents())
+
+    # Sparse path: a rare term matching a single workflow
+    assert index.terms["spreadsheet"][1] * 4 < len(index)
+    sparse = index.search(tokenize("spreadsheet"))
+    assert [workflow_id for workflow_id, _ in sparse] == ["sheets_sync"]
+    assert_matches_reference(sparse, tokenize("spreadsheet"))
+
+    # Dense path: common terms touching most workflows
+    query = tokenize("forward email to slack")
+    assert sum(index.terms[term][1] for term in set(query)) * 4 >= len(index)
+    dense = index.search(query)
+    assert_matches_reference(dense, query)
+    assert dense[0][0] == "email_to_slack", dense
+
+    # Name matches outweigh description matches
+    assert index.search(["digest"])[0][0] == "gmail_digest"
+    assert index.search(["unknownterm"]) == []
+    assert len(index.search(query, limit=2)) == 2
+    print(f"   top hit for {' '.join(query)!r}: {dense[0][0]} ({dense[0][1]:.3f})")
+    print("   ✅ passed")
+
+
+def test_saved_index_matches():
+    print("\n💾 The mmap'd index ranks like the in-memory one")
+    built = WorkflowIndex.build(documents(), fingerprint="f1")
+    with tempfile.TemporaryDirectory() as index_dir:
+        built.save(Path(index_dir))
+        loaded = WorkflowIndex.load(Path(index_dir))
+        assert loaded is not None and loaded.fingerprint == "f1"
+        for query in (["slack"], ["email", "digest"], tokenize("webhook sheets alert")):
+            assert [w for w, _ in loaded.search(query)] == [w for w, _ in built.search(query)]
+        loaded.close()
+    print("   ✅ passed")
+
+
+def test_load_or_build_reuses_unchanged_files():
+    print("\n♻️ Rebuilds only parse new or modified workflow files")
+    parsed = []
+
+    def extract(workflow_data, workflow_file):
+        parsed.append(workflow_file.name)
+        return workflow_data["meta"]
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        work_dir = Path(work_dir)
+        files = []
+        for workflow in WORKFLOWS:
+            path = work_dir / f"{workflow['id']}.json"
+            path.write_text(json.dumps({"id": workflow["id"], "nodes": [], "meta": workflow}))
+            files.append(path)
+        index_dir = work_dir / "index"
+
+        first = WorkflowIndex.load_or_build(files, index_dir, extract)
+        assert len(first) == len(WORKFLOWS) and len(parsed) == len(WORKFLOWS)
+        ranking = first.search(["slack"])
+        first.close()
+
+        parsed.clear()
+        second = WorkflowIndex.load_or_build(files, index_dir, extract)
+        assert parsed == [] and second.search(["slack"]) == ranking
+        second.close()
+
+        changed = dict(WORKFLOWS[1], name="Gmail Slack Digest")
+        files[1].write_text(json.dumps({"id": "gmail_digest", "nodes": [], "meta": changed, "v": 2}))
+        third = WorkflowIndex.load_or_build(files, index_dir, extract)
+        assert parsed == ["gmail_digest.json"], parsed
+        assert "gmail_digest" in [w for w, _ in third.search(["slack"])]
+        third.close()
+    print("   ✅ passed")
+
+
+def main():
+    print("🧪 Workflow Index Test")
+    print("=" * 50)
+    test_tokenize()
+    test_ranking()
+    test_saved_index_matches()
+    test_load_or_build_reuses_unchanged_files()
+    print("\n🎉 All workflow index tests passed")
+
+
+if __name__ == "__main__":
+    main()
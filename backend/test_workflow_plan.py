@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Workflow Plan Test
+Checks the compiled execution plan behind automation_engine.run_workflow:
+deep chains run without recursion, if-branches only activate their side,
+references are resolved after the referenced node ran, cycles are rejected
+and repeat executions reuse the cached plan.
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from automation_engine.engine import run_workflow, compile_workflow, plan_cache
+
+
+def chain(length: int):
+    nodes = [{"name": "start", "type": "manualTrigger"}]
+    connections = {"start": ["step0"]}
+    for i in range(length):
+        nodes.append({"name": f"step{i}", "type": "set", "parameters": {"fields": {"i": i}}})
+        if i + 1 < length:
+            connections[f"step{i}"] = [f"step{i + 1}"]
+    return {"nodes": nodes, "connections": connections}
+
+
+async def test_deep_chain():
+    print("\n🪜 A chain deeper than the recursion limit runs iteratively")
+    depth = sys.getrecursionlimit() * 2
+    outputs = await run_workflow(chain(depth))
+    assert len(outputs) == depth + 1 and outputs[f"step{depth - 1}"] == {"i": depth - 1}
+    print(f"   {depth} nodes executed")
+    print("   ✅ passed")
+
+
+async def test_branches_and_references():
+    print("\n🔀 Branches and references")
+    workflow = {
+        "nodes": [
+            # Declared before the node it references: the plan still orders it after
+            {"name": "report", "type": "set", "parameters": {"fields": {"total": "{{order.total}}", "who": "{{order.customer.name}}"}}},
+            {"name": "start", "type": "manualTrigger"},
+            {"name": "order", "type": "set", "parameters": {"fields": {"total": 120, "customer": {"name": "Ada"}}}},
+            {"name": "check", "type": "if", "parameters": {"valueA": "{{order.total}}", "valueB": 100, "operation": "greater"}},
+            {"name": "big", "type": "set", "parameters": {"fields": {"tier": "big"}}},
+            {"name": "small", "type": "set", "parameters": {"fields": {"tier": "small"}}}
+        ],
+        "connections": {
+            "start": ["order", "report"],
+            "order": ["check"],
+            "check": {"true": ["big"], "false": ["small"]}
+        }
+    }
+    outputs = await run_workflow(workflow)
+    assert outputs["check"] == {"pass": True}
+    assert "big" in outputs and "small" not in outputs
+    assert outputs["report"] == {"total": 120, "who": "Ada"}
+
+    plan = compile_workflow(workflow)
+    order = [node.name for node in plan.nodes]
+    assert order.index("report") > order.index("order")
+    print(f"   plan order {order}, levels {plan.levels}")
+    print("   ✅ passed")
+
+
+async def test_cycles_rejected():
+    print("\n♻️ Cycles are rejected at compile time")
+    workflow = chain(3)
+    workflow["connections"]["step2"] = ["step0"]
+    try:
+        compile_workflow(workflow)
+    except ValueError as e:
+        print(f"   rejected: {e}")
+    else:
+        raise AssertionError("cyclic workflow compiled")
+    print("   ✅ passed")
+
+
+async def test_plan_cache():
+    print("\n💾 Repeat executions reuse the compiled plan")
+    workflow = chain(50)
+    before = plan_cache.get_stats()
+    first = await run_workflow(workflow)
+    first["step0"]["i"] = "mutated"
+    second = await run_workflow(workflow)
+    stats = plan_cache.get_stats()
+    assert stats["misses"] - before["misses"] == 1 and stats["hits"] - before["hits"] == 1
+    assert second["step0"] == {"i": 0}, "outputs alias the cached plan"
+    print(f"   {stats}")
+    print("   ✅ passed")
+
+
+async def main():
+    print("🧪 Workflow Plan Test")
+    print("=" * 50)
+    await test_deep_chain()
+    await test_branches_and_references()
+    await test_cycles_rejected()
+    await test_plan_cache()
+    print("\n🎉 All workflow plan tests passed")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())